@@ -18,7 +18,7 @@ def create_app(config_class='app.config.DevelopmentConfig'):
     jwt.init_app(app)
     migrate.init_app(app, db)
 
-    from app.models import User,Book,BookCopy,Transaction,Reservation
+    from app.models import User,Book,BookCopy,Transaction,Reservation,SweepState,Notification,OutboxMessage,CatalogVersion,RevokedToken
 
     #registering blueprints for backend routes
     from app.routes.auth_routes import auth_bp
@@ -26,11 +26,13 @@ def create_app(config_class='app.config.DevelopmentConfig'):
     from app.routes.book_management_routes import book_management_bp
     from app.routes.borrow_routes import borrow_bp
     from app.routes.search_routes import search_bp
+    from app.routes.dashboard_routes import dashboard_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(user_management_bp, url_prefix='/api')
     app.register_blueprint(book_management_bp, url_prefix='/api')
     app.register_blueprint(borrow_bp, url_prefix='/api')
     app.register_blueprint(search_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api')
     #register blueprints for frontend views
     from app.views.auth_views import auth_view_bp
     from app.views.dashboard_views import dashboard_view_bp
@@ -44,6 +46,44 @@ def create_app(config_class='app.config.DevelopmentConfig'):
     app.register_blueprint(auth_view_bp, url_prefix='/')
     app.register_blueprint(dashboard_view_bp, url_prefix='/dashboard')
 
+    #bounded pool of password hashing processes used by login and registration
+    from app.services.password_service import init_password_hasher
+    init_password_hasher(app)
+
+    #per-process cache of the users behind access tokens (also registers the JWT user loader)
+    from app.services.user_cache import init_user_cache
+    init_user_cache(app)
+
+    #revoked tokens, checked on every authenticated request (also registers the JWT blocklist loader)
+    from app.services.revocation_service import init_revocation_store
+    init_revocation_store(app)
+
+    #token bucket rate limiter applied to the login and search routes
+    from app.services.rate_limit_service import init_rate_limiter
+    init_rate_limiter(app)
+
+    #per-app cache of search responses and dashboard figures, typeahead and fuzzy search indexes,
+    #all kept current by the session listeners in catalog_changes (which also move the catalog version)
+    from app.services import catalog_changes  # registers the listeners
+    from app.services.search_cache import init_search_cache
+    from app.services.dashboard_service import init_dashboard_summary
+    from app.services.suggest_service import init_suggest_index
+    from app.services.fuzzy_service import init_fuzzy_index
+    init_search_cache(app)
+    init_dashboard_summary(app)
+    init_suggest_index(app)
+    init_fuzzy_index(app)
+
+    #register flask CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
+    #run the overdue/due-soon sweep and the notification dispatcher in the background when enabled
+    #(from the first request, so CLI commands such as `flask db upgrade` start no threads)
+    if not app.testing:
+        from app.services.background import start_background_workers_on_first_request
+        start_background_workers_on_first_request(app)
+
 
 
 
@@ -0,0 +1,165 @@
+# app/commands.py
+import click
+from flask.cli import AppGroup
+
+# Command groups exposed through the flask CLI (e.g. `flask search rebuild-index`)
+search_cli = AppGroup('search', help='Search index maintenance commands.')
+circulation_cli = AppGroup('circulation', help='Overdue and due-soon notification commands.')
+outbox_cli = AppGroup('outbox', help='Notification delivery commands.')
+catalog_cli = AppGroup('catalog', help='Catalog maintenance commands.')
+users_cli = AppGroup('users', help='Member account commands.')
+
+
+@search_cli.command('rebuild-index')
+def rebuild_search_index():
+    """
+    Rebuild the full-text search index over the book catalog.
+    """
+    from app.services.fts_service import rebuild_book_fts
+
+    if rebuild_book_fts():
+        click.echo("Search index rebuilt.")
+    else:
+        click.echo("FTS5 is not available on this database; search will use ilike filtering.")
+
+
+@circulation_cli.command('sweep')
+def circulation_sweep():
+    """
+    Queue notifications for loans that became overdue or due soon since the last sweep.
+    """
+    from app.services.circulation_sweep_service import run_circulation_sweep
+
+    counts = run_circulation_sweep()
+    click.echo(f"Queued {counts['overdue']} overdue and {counts['due_soon']} due-soon notifications.")
+
+
+@circulation_cli.command('scheduler')
+@click.option('--interval', type=int, default=None, help='Seconds between sweeps (defaults to CIRCULATION_SWEEP_INTERVAL).')
+def circulation_scheduler(interval):
+    """
+    Run the circulation sweep in the foreground on a fixed interval.
+    """
+    from flask import current_app
+    from app.services.circulation_sweep_service import start_circulation_scheduler
+
+    stop = start_circulation_scheduler(current_app._get_current_object(), interval)
+    click.echo("Circulation scheduler running; press Ctrl+C to stop.")
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        stop.set()
+
+
+@outbox_cli.command('dispatch')
+def outbox_dispatch():
+    """
+    Deliver every pending notification that is due, in batches.
+    """
+    from app.services.outbox_service import drain_outbox
+
+    counts = drain_outbox()
+    click.echo(f"Sent {counts['sent']}, retrying {counts['retried']}, failed {counts['failed']}.")
+
+
+@outbox_cli.command('worker')
+@click.option('--interval', type=int, default=None, help='Seconds between runs (defaults to OUTBOX_DISPATCH_INTERVAL).')
+def outbox_worker(interval):
+    """
+    Run the notification dispatcher in the foreground on a fixed interval.
+    """
+    from flask import current_app
+    from app.services.outbox_service import start_outbox_dispatcher
+
+    stop = start_outbox_dispatcher(current_app._get_current_object(), interval)
+    click.echo("Outbox dispatcher running; press Ctrl+C to stop.")
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        stop.set()
+
+
+@catalog_cli.command('reconcile-counts')
+@click.option('--dry-run', is_flag=True, help='Only report drift, do not repair it.')
+def catalog_reconcile_counts(dry_run):
+    """
+    Recount every book's copies and repair available/total counts that drifted.
+    """
+    from app.services.catalog_service import reconcile_copy_counts
+
+    drift = reconcile_copy_counts(repair=not dry_run)
+    for row in drift:
+        click.echo(f"{row['barcode']}: available {row['available_count']} -> {row['actual_available']}, "
+                   f"total {row['total_count']} -> {row['actual_total']}")
+    if not drift:
+        click.echo("All copy counts are consistent.")
+    else:
+        click.echo(f"{'Found' if dry_run else 'Repaired'} drift on {len(drift)} book(s).")
+
+
+@catalog_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'import_format', type=click.Choice(['csv', 'ndjson', 'mrk']), default=None,
+              help='File format (defaults to the file extension).')
+def catalog_import(path, import_format):
+    """
+    Bulk import books and copies from a CSV, NDJSON or MARC text (.mrk) file.
+    """
+    from app.services.catalog_import_service import (CatalogImportError, format_from_filename, import_catalog,
+                                                     import_failure_response)
+
+    import_format = import_format or format_from_filename(path)
+
+    def report(totals):
+        click.echo(f"{totals['records']} records read, {totals['books']} books and {totals['copies']} copies imported...")
+
+    try:
+        with open(path, encoding='utf-8-sig', newline='') as stream:
+            totals = import_catalog(stream, import_format, progress=report)
+    except CatalogImportError as e:
+        raise click.ClickException(import_failure_response(e)[0]['error'])
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for error in totals['errors']:
+        click.echo(f"Line {error['line']}: {error['error']}")
+    click.echo(f"Imported {totals['books']} books and {totals['copies']} copies from {totals['records']} records "
+               f"({totals['duplicates']} duplicates skipped, {totals['rejected']} rejected).")
+
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', type=int, default=None,
+              help='Password hashing workers to use at most (defaults to USER_IMPORT_HASH_WORKERS, else all of them).')
+def users_import(path, workers):
+    """
+    Bulk register members from a CSV roster (name, email, password and optionally role).
+    """
+    from app.services.user_import_service import import_users
+
+    def report(totals):
+        click.echo(f"{totals['records']} records read, {totals['users']} users imported...")
+
+    try:
+        with open(path, encoding='utf-8-sig', newline='') as stream:
+            totals = import_users(stream, progress=report, workers=workers)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for error in totals['errors']:
+        click.echo(f"Line {error['line']}: {error['error']}")
+    click.echo(f"Imported {totals['users']} users from {totals['records']} records "
+               f"({totals['duplicates']} duplicates skipped, {totals['rejected']} rejected).")
+
+
+def register_commands(app):
+    """
+    Register all CLI command groups on the Flask app.
+    """
+    app.cli.add_command(search_cli)
+    app.cli.add_command(circulation_cli)
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(users_cli)
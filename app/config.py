@@ -8,9 +8,129 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
 
+    # Password hashing (Werkzeug method string with every parameter spelled out, so stored hashes
+    # can be compared with it: a user whose hash differs is rehashed on their next successful login).
+    # Hashes run in a pool of worker processes (None = one per CPU, 0 = on the request thread);
+    # beyond QUEUE_DEPTH waiting hashes, /auth/login and /auth/register answer 503 with Retry-After
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+    PASSWORD_HASH_WORKERS = None
+    PASSWORD_HASH_QUEUE_DEPTH = 16
+    PASSWORD_HASH_RETRY_AFTER = 1  # seconds
+
+    # Users resolved from access tokens (/dashboard/get-current-user; other routes only read the claims)
+    # are cached per process for this many seconds (0 disables the cache); deleting a user drops it
+    USER_CACHE_TTL = 60
+    USER_CACHE_MAX_ENTRIES = 10000
+
+    # Token revocation (logout, deleted users). Every authenticated request checks an in-process
+    # Bloom filter of the revoked_token table sized for BLOOM_CAPACITY keys; only filter hits query
+    # the table, and their answers are reused for CACHE_TTL seconds. Revocations made by other
+    # processes are picked up every SYNC_INTERVAL seconds, and expired rows are deleted (and the
+    # filter rebuilt) every COMPACT_INTERVAL seconds
+    REVOCATION_BLOOM_CAPACITY = 100000
+    REVOCATION_BLOOM_ERROR_RATE = 0.01
+    REVOCATION_CACHE_TTL = 60
+    REVOCATION_SYNC_INTERVAL = 5
+    REVOCATION_COMPACT_INTERVAL = 60 * 60
+
+    # Token bucket rate limits: name -> (requests, per seconds); a bucket allows bursts of `requests`
+    # and refills at requests/seconds. Over the limit, requests get 429 with Retry-After.
+    # Buckets live in this process's memory (at most MAX_KEYS), or in a SQLite file shared by
+    # every worker process on the host when RATE_LIMIT_SQLITE_PATH is set
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMITS = {
+        'login': (20, 60),          # /auth/login per client IP
+        'login_account': (5, 60),   # /auth/login per email being logged in to and client IP
+        'search': (120, 60),        # /api/search/books per user, or per IP when anonymous
+    }
+    RATE_LIMIT_SQLITE_PATH = None
+    RATE_LIMIT_MAX_KEYS = 100000
+
+    # Keyset pagination for list endpoints (/api/books, /api/search/books)
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 200
+    # Rows fetched per query by the streaming exports (e.g. borrowing history CSV)
+    EXPORT_CHUNK_SIZE = 500
+
+    # In-process cache of /api/search/books responses, invalidated by every committed catalog write
+    SEARCH_CACHE_ENABLED = True
+    SEARCH_CACHE_MAX_BYTES = 8 * 1024 * 1024
+    SEARCH_CACHE_TTL = 60  # seconds; bounds staleness from writes made by other processes
+
+    # Typeahead suggestions (/api/search/suggest) from an in-memory prefix index
+    SUGGEST_LIMIT_DEFAULT = 8
+    SUGGEST_LIMIT_MAX = 20
+    SUGGEST_INDEX_MAX_AGE = 15 * 60  # seconds before a background rebuild picks up writes from other processes
+
+    # Catalog GET endpoints send an ETag (the catalog version) and answer If-None-Match with 304.
+    # 0 makes clients revalidate every time (Cache-Control: no-cache); more lets them reuse a response
+    # for that many seconds without asking
+    CATALOG_CACHE_MAX_AGE = 0
+
+    # Bulk catalog import (`flask catalog import`, POST /api/books/import): books per transaction,
+    # and how many rejected records are listed in the report
+    CATALOG_IMPORT_CHUNK_SIZE = 2000
+    CATALOG_IMPORT_MAX_ERRORS = 100
+
+    # Bulk member import (`flask users import`, POST /api/users/import): users per transaction,
+    # password hashing workers an import may keep busy, out of PASSWORD_HASH_WORKERS (None = all of
+    # them; logins still get the queue slots) and rejected rows listed in the report
+    USER_IMPORT_CHUNK_SIZE = 500
+    USER_IMPORT_HASH_WORKERS = None
+    USER_IMPORT_MAX_ERRORS = 100
+
+    # Librarian dashboard figures (/api/dashboard/summary) are recounted at most this often (seconds)
+    DASHBOARD_SUMMARY_TTL = 30
+
+    # Values returned per facet (subject category, author, decade) with facets=1
+    FACET_LIMIT = 20
+
+    # Typo-tolerant search (/api/search/books?fuzzy=1) from an in-memory trigram index
+    FUZZY_SEARCH_THRESHOLD = 0.3  # minimum trigram similarity of a title or author (pg_trgm's default)
+    FUZZY_INDEX_MAX_AGE = 15 * 60  # seconds before a background rebuild picks up writes from other processes
+    # Build the suggest and fuzzy indexes in the background from the first request, instead of on first use
+    BOOK_INDEX_PRELOAD_ENABLED = True
+
+    # Retries of a circulation write that hit SQLite's "database is locked"
+    LOCK_RETRY_ATTEMPTS = 5
+    LOCK_RETRY_BACKOFF = 0.05  # seconds, multiplied by the attempt number
+
+    # Maximum number of operations in one /api/circulation/batch request
+    CIRCULATION_BATCH_MAX = 100
+
+    # Circulation sweep: loans processed (and notifications committed) per chunk
+    OVERDUE_SWEEP_CHUNK_SIZE = 500
+    # Loans due within this window get a one-time "due soon" reminder
+    DUE_SOON_WINDOW = timedelta(days=2)
+    # In-process background scheduler (the sweep can also run via `flask circulation sweep`;
+    # turn this off when a separate scheduler or cron job runs it instead)
+    CIRCULATION_SCHEDULER_ENABLED = True
+    CIRCULATION_SWEEP_INTERVAL = 15 * 60  # seconds between runs
+
+    # Notification outbox dispatcher (also available as `flask outbox dispatch`)
+    OUTBOX_BATCH_SIZE = 100
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_BACKOFF = 60  # seconds, doubled after every failed attempt
+    OUTBOX_CLAIM_TIMEOUT = 5 * 60  # seconds before a claimed but unfinished message is retried
+    OUTBOX_DISPATCHER_ENABLED = True  # off when a separate `flask outbox worker` delivers instead
+    OUTBOX_DISPATCH_INTERVAL = 30  # seconds between runs
+
+    # Outgoing email; with no MAIL_SERVER notifications are delivered in-app only
+    MAIL_SERVER = None
+    MAIL_PORT = 25
+    MAIL_USE_TLS = False
+    MAIL_USERNAME = None
+    MAIL_PASSWORD = None
+    MAIL_SENDER = 'library@example.com'
+    MAIL_TIMEOUT = 10  # seconds
+
 class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///library.db'  # Production database
 
 class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'  # separate test DB
     TESTING = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # cheap hashes keep the suite fast
+    RATE_LIMIT_ENABLED = False  # the suite logs in far more often than any client should
+    CIRCULATION_SCHEDULER_ENABLED = False  # tests run the sweep and the dispatcher themselves
+    OUTBOX_DISPATCHER_ENABLED = False
@@ -1,17 +1,35 @@
 from app import db
+from sqlalchemy import func, literal_column
 import uuid
 
 # Book Model (Represents a general book with a unique barcode)
 class Book(db.Model):
     __tablename__ = 'book'
+    __table_args__ = (
+        # Search facets group by these columns; the indexes make the counts covering index scans
+        db.Index('ix_book_subject_category', 'subject_category'),
+        db.Index('ix_book_author', 'author'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     barcode = db.Column(db.String(10), unique=True, nullable=False)  # Each book has a unique barcode
     title = db.Column(db.String(255), nullable=False)
     author = db.Column(db.String(255), nullable=False)
     subject_category = db.Column(db.String(100), nullable=False)
     publication_date = db.Column(db.Date, nullable=False)
+    # Denormalized copy counts, kept in step with book_copy by every write path
+    # (see adjust_copy_counts in app/services/catalog_service.py)
+    available_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     copies = db.relationship('BookCopy', backref='book', cascade='all, delete-orphan', lazy=True)
 
     def generate_barcode(self):
         # Generate a unique barcode for each book using UUID
         return str(uuid.uuid4())
+
+
+# Publication decade (e.g. 1990) as an SQL expression, used by the search facets.
+# The literal 10 is inlined (not a bound parameter) so the expression matches the
+# index below exactly, which is what lets SQLite use it.
+_publication_year = func.extract('year', Book.publication_date)
+publication_decade = _publication_year - _publication_year % literal_column('10')
+db.Index('ix_book_publication_decade', publication_decade)
@@ -3,6 +3,10 @@ from app import db
 # BookCopy Model (Represents individual copies of books)
 class BookCopy(db.Model):
     __tablename__ = 'book_copy'
+    __table_args__ = (
+        # Copy counts per book (catalog/search) and available-copy lookups
+        db.Index('ix_book_copy_book_id_is_available', 'book_id', 'is_available'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)  # ForeignKey to Book
     rack_location = db.Column(db.String(50), nullable=False)
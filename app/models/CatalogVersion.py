@@ -0,0 +1,12 @@
+from app import db
+from sqlalchemy import DDL, event
+
+# CatalogVersion Model (Single-row counter bumped by every committed change to books or copies)
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_version'
+    id = db.Column(db.Integer, primary_key=True)  # always 1
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+# The row is created with the table, so writers only ever UPDATE it
+event.listen(CatalogVersion.__table__, 'after_create', DDL("INSERT INTO catalog_version (id, version) VALUES (1, 0)"))
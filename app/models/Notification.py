@@ -0,0 +1,30 @@
+from datetime import datetime
+from app import db
+
+# Notification Model (Messages sent to users, one row per notification)
+class Notification(db.Model):
+    __tablename__ = 'notification'
+    __table_args__ = (
+        # A user's notifications, newest first (inbox pagination, unread count)
+        db.Index('ix_notification_user_id_created_at', 'user_id', 'created_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    book_title = db.Column(db.String(200), nullable=True)  # optional
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    is_read = db.Column(db.Boolean, default=False, nullable=False)
+
+    user = db.relationship('User', backref=db.backref('notification_items', lazy='dynamic',
+                                                      cascade='all, delete-orphan'))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "subject": self.subject,
+            "body": self.body,
+            "book_title": self.book_title,
+            "timestamp": self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            "is_read": self.is_read,
+        }
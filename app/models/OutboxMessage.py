@@ -0,0 +1,29 @@
+from datetime import datetime
+from app import db
+
+# OutboxMessage Model (Notification intents waiting to be delivered by the dispatcher)
+class OutboxMessage(db.Model):
+    __tablename__ = 'outbox_message'
+    __table_args__ = (
+        # Dispatcher claims: due pending messages in id order
+        db.Index('ix_outbox_message_status_next_attempt_at', 'status', 'next_attempt_at'),
+        # Loading the batch a dispatcher just claimed
+        db.Index('ix_outbox_message_claim_token', 'claim_token'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g. 'reservation_available', 'overdue', 'due_soon'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id'), nullable=True)
+    # The same intent is only ever queued once (e.g. one availability notice per reservation and returned copy)
+    dedup_key = db.Column(db.String(100), unique=True, nullable=False)
+    status = db.Column(db.Enum('Pending', 'Sent', 'Failed'), default='Pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    # Earliest time the dispatcher may (re)try; pushed forward while a worker holds the message
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claim_token = db.Column(db.String(32), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    # When the in-app notification was written; only the email is retried after that
+    notified_at = db.Column(db.DateTime, nullable=True)
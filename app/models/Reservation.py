@@ -4,6 +4,12 @@ from app import db
 # Reservation Model (Tracks reserved books)
 class Reservation(db.Model):
     __tablename__ = 'reservation'
+    __table_args__ = (
+        # Pending holds per book (availability notifications)
+        db.Index('ix_reservation_book_id_status', 'book_id', 'status'),
+        # A user's hold on a specific book (issue/checkout fulfilment, duplicate check)
+        db.Index('ix_reservation_user_id_book_id_status', 'user_id', 'book_id', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)
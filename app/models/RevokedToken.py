@@ -0,0 +1,12 @@
+from app import db
+
+# RevokedToken Model (Revoked JWTs and users, kept until the tokens they cover would have expired)
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_token'
+    # Ids are never reused (AUTOINCREMENT), so other processes can pick up new rows after the last id they saw
+    __table_args__ = {'sqlite_autoincrement': True}
+    id = db.Column(db.Integer, primary_key=True)
+    # The token's jti, or "user:<email>" to revoke every token of a user issued up to revoked_at
+    key = db.Column(db.String(120), unique=True, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # compacted away after this
@@ -0,0 +1,12 @@
+from app import db
+
+# SweepState Model (Progress of the background circulation sweeps)
+class SweepState(db.Model):
+    __tablename__ = 'sweep_state'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)  # e.g. 'overdue', 'due_soon'
+    # (due_date, transaction id) of the last loan handled; the next run resumes after it
+    cursor_due_date = db.Column(db.DateTime, nullable=True)
+    cursor_transaction_id = db.Column(db.Integer, nullable=True)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+    last_notified = db.Column(db.Integer, default=0)  # notifications queued by the last run
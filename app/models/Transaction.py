@@ -4,6 +4,16 @@ from app import db
 # Transaction Model (To track book checkouts and returns)
 class Transaction(db.Model):
     __tablename__ = 'transaction'
+    __table_args__ = (
+        # Active loans per user (5-book limit and checked-out list)
+        db.Index('ix_transaction_user_id_return_date', 'user_id', 'return_date'),
+        # Per-user history, newest first, paged on (checkout_date, id)
+        db.Index('ix_transaction_user_id_checkout_date', 'user_id', 'checkout_date', 'id'),
+        # Unreturned loans by due date for the overdue sweep (partial where the engine supports it)
+        db.Index('ix_transaction_open_due_date', 'due_date',
+                 sqlite_where=db.text('return_date IS NULL'),
+                 postgresql_where=db.text('return_date IS NULL')),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     book_copy_id = db.Column(db.Integer, db.ForeignKey('book_copy.id'), nullable=False)
@@ -1,7 +1,7 @@
 from app import db
+from sqlalchemy import func
 from datetime import datetime
 import uuid
-import json
 
 # User Model (Members and Librarians)
 class User(db.Model):
@@ -13,31 +13,51 @@ class User(db.Model):
     role = db.Column(db.Enum('Member', 'Librarian'), nullable=False)
     barcode = db.Column(db.String(10), unique=True, nullable=False)  # Unique barcode for member identification
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    notifications = db.Column(db.Text, default='[]')  # Store notifications as a JSON string
 
     def add_notification(self, subject, body,book_title=None):
         """
-        Add a notification to the user's notifications list.
+        Add a notification for the user.
         
         Arguments:
         - subject: The subject of the notification.
         - body: The body of the notification.
         """
-        # Deserialize the existing notifications from JSON
-        notifications = json.loads(self.notifications)
-        
-        # Add the new notification
-        notifications.append({
+        from app.models.Notification import Notification
+
+        # One insert per notification, whatever the size of the user's history
+        db.session.add(Notification(user_id=self.id, subject=subject, body=body, book_title=book_title))
+        db.session.commit()
+
+    @staticmethod
+    def add_notifications_bulk(entries):
+        """
+        Add notifications for many users with a single bulk insert.
+
+        The caller is responsible for committing, so a batch of notifications can
+        share a single transaction.
+
+        Arguments:
+        - entries: Iterable of (user_id, subject, body, book_title) tuples.
+        """
+        from app.models.Notification import Notification
+
+        created_at = datetime.utcnow()
+        rows = [{
+            "user_id": user_id,
             "subject": subject,
             "body": body,
-            "book_title": book_title, #optional
-            "timestamp": datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
-        })
-        
-        # Serialize the updated notifications back to JSON
-        self.notifications = json.dumps(notifications)
-        db.session.commit()
+            "book_title": book_title,
+            "created_at": created_at,
+            "is_read": False,
+        } for user_id, subject, body, book_title in entries]
+        if rows:
+            db.session.execute(db.insert(Notification), rows)
 
     def generate_barcode(self):
         # Generate a unique barcode for each user using UUID
-        return str(uuid.uuid4())
\ No newline at end of file
+        return str(uuid.uuid4())
+
+
+# Case-insensitive prefix search on names and emails (GET /api/users?q=...)
+db.Index('ix_user_name_lower', func.lower(User.name))
+db.Index('ix_user_email_lower', func.lower(User.email))
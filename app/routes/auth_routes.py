@@ -1,10 +1,19 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.auth_service import register_user, login_user, refresh_token#, logout_user
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.services.auth_service import register_user, login_user, refresh_token, logout_user
+from app.routes.rate_limit import rate_limit, client_ip, login_account
 
 # Create a Blueprint for authentication
 auth_bp = Blueprint('auth', __name__)
 
+def busy_headers(status):
+    """
+    Tell clients turned away while password hashing is saturated (503) when to retry.
+    """
+    if status != 503:
+        return {}
+    return {"Retry-After": str(current_app.config['PASSWORD_HASH_RETRY_AFTER'])}
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -23,9 +32,11 @@ def register():
     data = request.json
 
     response = register_user(data)
-    return jsonify(response[0]), response[1]
+    return jsonify(response[0]), response[1], busy_headers(response[1])
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login', client_ip)
+@rate_limit('login_account', login_account)
 def login():
     """
     Handle user login and JWT generation.
@@ -43,7 +54,7 @@ def login():
     # }
     data = request.json
     response = login_user(data)
-    return jsonify(response[0]), response[1]
+    return jsonify(response[0]), response[1], busy_headers(response[1])
 
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
@@ -56,16 +67,20 @@ def refresh():
     """
     identity = get_jwt_identity()
     response = refresh_token(identity)
-    return jsonify({"access_token": response}), 200
+    return jsonify(response[0]), response[1]
 
-# @auth_bp.route('/logout', methods=['POST'])
-# @jwt_required()
-# def logout():
-#     """
-#     Logout the user. This is typically handled client-side by removing the JWT token.
-    
-#     Returns:
-#         A JSON response indicating success.
-#     """
-#     response = logout_user()
-#     return jsonify({"message": response}), 200
\ No newline at end of file
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Log out by revoking the presented token (access or refresh).
+
+    Expected JSON Data (optional):
+    - refresh_token: str, the session's refresh token, revoked as well
+
+    Returns:
+        A JSON response indicating success.
+    """
+    data = request.get_json(silent=True) or {}
+    response = logout_user(get_jwt(), data.get('refresh_token'))
+    return jsonify(response[0]), response[1]
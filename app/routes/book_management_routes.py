@@ -1,6 +1,8 @@
 from flask import Blueprint,request, jsonify
 from app.services.book_management_service import add_book_service,delete_book_service, modify_book_service,create_book_copy_service, delete_book_copy_service, modify_book_copy_service,get_all_books_service,get_book_by_barcode_service,get_book_copies_service
 from flask_jwt_extended import jwt_required, get_jwt
+from app.services.catalog_import_service import import_catalog_service, format_from_filename
+from app.routes.conditional import conditional_catalog_response
 
 # Create a Blueprint for book-related routes
 book_management_bp = Blueprint("book_management", __name__)  
@@ -11,16 +13,47 @@ book_management_bp = Blueprint("book_management", __name__)
 @jwt_required()
 def get_all_books():
     """
-    Fetch all books from the catalog.
+    Fetch a page of books from the catalog.
+
+    Query Parameters:
+    - limit: Maximum number of books to return (optional, capped server-side)
+    - cursor: The next_cursor value from the previous page (optional)
 
     Returns:
-        - JSON response with the list of books or an error message.
+        - JSON response with the list of books and next_cursor, or an error message.
     """
     # Check if the user has librarian role
     claims = get_jwt()
     if claims.get("role") != "Librarian":
         return jsonify({"error": "Unauthorized: Librarian role required"}), 403
-    response = get_all_books_service()
+    # 304 when the client's ETag matches the catalog version
+    return conditional_catalog_response(
+        lambda: get_all_books_service(request.args.get('limit', type=int), request.args.get('cursor')))
+
+#Route for bulk importing books and copies
+@book_management_bp.route('/books/import', methods=['POST'])
+@jwt_required()
+def import_books():
+    """
+    Import books and copies from a CSV, NDJSON or MARC text (.mrk) file.
+
+    The file is sent either as the raw request body or as the "file" field of
+    a multipart form, and is read while it is imported.
+
+    Query Parameters:
+    - format: csv, ndjson or mrk (optional; defaults to the uploaded file's extension, else csv)
+
+    Returns:
+        - JSON response with the import totals or an error message.
+    """
+    # Check if the user has librarian role
+    claims = get_jwt()
+    if claims.get("role") != "Librarian":
+        return jsonify({"error": "Unauthorized: Librarian role required"}), 403
+
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    import_format = request.args.get('format') or format_from_filename(upload.filename if upload else None)
+    response = import_catalog_service(upload.stream if upload else request.stream, import_format)
     return jsonify(response[0]), response[1]
 
 #Route for getting book by barcode
@@ -37,8 +70,7 @@ def get_book_by_barcode(barcode):
     claims = get_jwt()
     if claims.get("role") != "Librarian":
         return jsonify({"error": "Unauthorized: Librarian role required"}), 403
-    response = get_book_by_barcode_service(barcode)
-    return jsonify(response[0]), response[1]
+    return conditional_catalog_response(lambda: get_book_by_barcode_service(barcode))
 
 # Route for adding a new book
 @book_management_bp.route('/books', methods=['POST'])
@@ -194,5 +226,4 @@ def get_book_copies(barcode):
     claims = get_jwt()
     if claims.get("role") != "Librarian":
         return jsonify({"error": "Unauthorized: Librarian role required"}), 403
-    response = get_book_copies_service(barcode)
-    return jsonify(response[0]), response[1]
\ No newline at end of file
+    return conditional_catalog_response(lambda: get_book_copies_service(barcode))
\ No newline at end of file
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from app.services.borrow_service import (
     issue_book_service,
     return_book_service,
@@ -8,7 +8,9 @@ from app.services.borrow_service import (
     check_overdue_books_service,
     checkout_book_service,
     get_borrowing_history_service,
-    get_checked_out_books_service
+    export_borrowing_history_service,
+    get_checked_out_books_service,
+    circulation_batch_service
 )
 from flask_jwt_extended import jwt_required, get_jwt
 
@@ -40,6 +42,31 @@ def issue_book():
     response = issue_book_service(data['user_barcode'], data['book_barcode'])
     return jsonify(response[0]), response[1]
 
+@borrow_bp.route('/circulation/batch', methods=['POST'])
+@jwt_required()
+def circulation_batch():
+    """
+    Issue, return and renew a cart of items in one request.
+    
+    Expected JSON data:
+    - operations: List of items, each with an "action" of
+      "issue" (user_barcode, book_barcode), "return" (transaction_id) or "renew" (transaction_id)
+    
+    Returns:
+        - JSON response with a result per item, in request order, or error message.
+    """
+    # Check if the user has librarian role
+    claims = get_jwt()
+    if claims.get("role") != "Librarian":
+        return jsonify({"error": "Unauthorized: Librarian role required"}), 403
+    
+    data = request.get_json(silent=True)
+    if not data or 'operations' not in data:
+        return jsonify({"error": "Missing required fields"}), 400
+    
+    response = circulation_batch_service(data['operations'])
+    return jsonify(response[0]), response[1]
+
 @borrow_bp.route('/return/<int:transaction_id>', methods=['PUT'])
 @jwt_required()
 def return_book(transaction_id):
@@ -114,17 +141,21 @@ def renew_book(transaction_id):
 @jwt_required()
 def check_overdue_books():
     """
-    Check for overdue books and calculate fines.
+    List overdue books and calculate fines.
+
+    Query parameters:
+    - limit: Page size (optional, capped at PAGE_SIZE_MAX)
+    - cursor: The next_cursor value from the previous page (optional)
     
     Returns:
-        - JSON response with list of overdue books or error message.
+        - JSON response with a page of overdue books or error message.
     """
     # Check if the user has librarian role
     claims = get_jwt()
     if claims.get("role") != "Librarian":
         return jsonify({"error": "Unauthorized: Librarian role required"}), 403
     
-    response = check_overdue_books_service()
+    response = check_overdue_books_service(request.args.get('limit', type=int), request.args.get('cursor'))
     return jsonify(response[0]), response[1]
 
 @borrow_bp.route('/checkout', methods=['POST'])
@@ -158,13 +189,48 @@ def get_borrowing_history(user_id):
     
     Arguments:
     - user_id: The ID of the user.
+
+    Query parameters:
+    - limit: Page size (optional, capped at PAGE_SIZE_MAX)
+    - cursor: The next_cursor value from the previous page (optional)
+    - start_date, end_date: Inclusive checkout date range, YYYY-MM-DD (optional)
     
     Returns:
-    - JSON response with the user's borrowing history.
+    - JSON response with a page of the user's borrowing history.
     """
-    response = get_borrowing_history_service(user_id)
+    response = get_borrowing_history_service(user_id, request.args.get('limit', type=int), request.args.get('cursor'),
+                                             request.args.get('start_date'), request.args.get('end_date'))
     return jsonify(response[0]), response[1]
 
+@borrow_bp.route('/users/<int:user_id>/borrowing-history/export', methods=['GET'])
+@jwt_required()
+def export_borrowing_history(user_id):
+    """
+    Download the whole borrowing history of a user as a streamed file.
+
+    Arguments:
+    - user_id: The ID of the user.
+
+    Query parameters:
+    - format: 'csv' (default) or 'ndjson'
+    - start_date, end_date: Inclusive checkout date range, YYYY-MM-DD (optional)
+
+    Returns:
+    - The streamed CSV/NDJSON file, or a JSON error message.
+    """
+    # Librarians may export anyone's history, members only their own
+    claims = get_jwt()
+    if claims.get("role") != "Librarian" and claims.get("id") != user_id:
+        return jsonify({"error": "Unauthorized: Librarian role or own account required"}), 403
+
+    response = export_borrowing_history_service(user_id, request.args.get('format', 'csv'),
+                                                request.args.get('start_date'), request.args.get('end_date'))
+    if response[1] != 200:
+        return jsonify(response[0]), response[1]
+    rows, content_type, filename = response[0]
+    return Response(stream_with_context(rows), content_type=content_type,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
 @borrow_bp.route('/users/<int:user_id>/checked-out-books', methods=['GET'])
 @jwt_required()
 def get_checked_out_books(user_id):
@@ -173,9 +239,15 @@ def get_checked_out_books(user_id):
     
     Arguments:
     - user_id: The ID of the user.
+
+    Query parameters:
+    - limit: Page size (optional, capped at PAGE_SIZE_MAX)
+    - cursor: The next_cursor value from the previous page (optional)
+    - start_date, end_date: Inclusive checkout date range, YYYY-MM-DD (optional)
     
     Returns:
-    - JSON response with the user's currently checked-out books.
+    - JSON response with a page of the user's currently checked-out books.
     """
-    response = get_checked_out_books_service(user_id)
+    response = get_checked_out_books_service(user_id, request.args.get('limit', type=int), request.args.get('cursor'),
+                                             request.args.get('start_date'), request.args.get('end_date'))
     return jsonify(response[0]), response[1]
\ No newline at end of file
@@ -0,0 +1,40 @@
+# app/routes/conditional.py
+from flask import current_app, jsonify, request
+from app.services.catalog_version_service import catalog_etag
+
+
+def conditional_catalog_response(build, private=True):
+    """
+    Answer a GET on catalog data with ETag / If-None-Match support.
+
+    The entity tag is the catalog version, read with one primary key lookup
+    before anything else. When the client already holds that version the
+    response is a bodyless 304 and `build` is never called, so no ORM query
+    or serialization happens. Reading the version before the data means a
+    write committed in between can only make the tag older than the body,
+    which costs a refetch but never a stale 304.
+
+    Arguments:
+    - build: Function returning the (body, status) tuple of the service
+    - private: Mark the response as cacheable by the browser only (authenticated endpoints)
+
+    Returns:
+    - A Flask response (200/304, or the service's error status without caching headers).
+    """
+    etag = catalog_etag()
+    if etag is not None and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        body, status = build()
+        response = jsonify(body)
+        response.status_code = status
+        if status != 200 or etag is None:
+            return response
+
+    response.set_etag(etag)
+    max_age = current_app.config['CATALOG_CACHE_MAX_AGE']
+    directives = [f"max-age={max_age}, must-revalidate" if max_age else "no-cache"]
+    if private:
+        directives.insert(0, "private")
+    response.headers['Cache-Control'] = ", ".join(directives)
+    return response
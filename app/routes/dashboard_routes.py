@@ -0,0 +1,45 @@
+# app/routes/dashboard_routes.py
+from flask import Blueprint, jsonify
+from app.services.dashboard_service import dashboard_summary_service
+from app.services.rate_limit_service import rate_limit_stats_service
+from flask_jwt_extended import jwt_required, get_jwt
+
+# Create a Blueprint for dashboard data
+dashboard_bp = Blueprint("dashboard", __name__)
+
+
+@dashboard_bp.route('/dashboard/summary', methods=['GET'])
+@jwt_required()
+def dashboard_summary():
+    """
+    Summary figures for the librarian dashboard: titles, copies, loans,
+    overdue loans, pending reservations and members.
+
+    Returns:
+    - JSON response with the summary or error message.
+    """
+    # Check if the user has librarian role
+    claims = get_jwt()
+    if claims.get("role") != "Librarian":
+        return jsonify({"error": "Unauthorized: Librarian role required"}), 403
+
+    response = dashboard_summary_service()
+    return jsonify(response[0]), response[1]
+
+
+@dashboard_bp.route('/dashboard/rate-limits', methods=['GET'])
+@jwt_required()
+def rate_limit_stats():
+    """
+    Report the rate limits (login, search) and how many requests each allowed and limited.
+
+    Returns:
+    - JSON response with the limits and the counters of this process.
+    """
+    # Check if the user has librarian role
+    claims = get_jwt()
+    if claims.get("role") != "Librarian":
+        return jsonify({"error": "Unauthorized: Librarian role required"}), 403
+
+    response = rate_limit_stats_service()
+    return jsonify(response[0]), response[1]
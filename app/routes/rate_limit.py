@@ -0,0 +1,62 @@
+# app/routes/rate_limit.py
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+
+# Bucket keys: each returns the key of the caller's bucket, or None to leave the request unlimited
+
+def client_ip():
+    """
+    The client's IP address (behind a reverse proxy, configure werkzeug's ProxyFix so this is the real client).
+    """
+    return f"ip:{request.remote_addr}"
+
+
+def jwt_subject_or_ip():
+    """
+    The JWT subject for authenticated callers, so users behind one address get a bucket each;
+    the IP address for anonymous callers (or an invalid token, which the view deals with).
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    return f"user:{identity}" if identity else client_ip()
+
+
+def login_account():
+    """
+    The account a login attempt is for, from this address: guessing one user's password is
+    slowed down well below the address's own limit, while bad attempts from elsewhere cannot
+    lock the user out of their account.
+    """
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return f"account:{email.strip().lower()}|{client_ip()}"
+
+
+def rate_limit(name, key):
+    """
+    Limit a route with the token bucket limit RATE_LIMITS[name], one bucket per key(); decorators stack.
+
+    Over the limit, the request is answered with 429 and a Retry-After header
+    (seconds until the bucket has a token again) without running the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if current_app.config['RATE_LIMIT_ENABLED']:
+                bucket = key()
+                if bucket is not None:
+                    capacity, per_seconds = current_app.config['RATE_LIMITS'][name]
+                    retry_after = current_app.extensions['rate_limiter'].hit(name, bucket, capacity, per_seconds)
+                    if retry_after:
+                        return (jsonify({"error": "Too many requests, please try again later"}), 429,
+                                {"Retry-After": str(retry_after)})
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,13 +1,17 @@
 # app/routes/search_routes.py
 from flask import Blueprint, request, jsonify
 from app.services.search_service import search_books
-#from flask_jwt_extended import jwt_required
+from app.services.search_cache import get_search_cache
+from app.services.suggest_service import suggest_service
+from app.routes.conditional import conditional_catalog_response
+from app.routes.rate_limit import rate_limit, jwt_subject_or_ip
+from flask_jwt_extended import jwt_required, get_jwt
 
 search_bp = Blueprint('search', __name__)
 
 @search_bp.route('/search/books', methods=['GET'])
-# @jwt_required()
 #any one can search so i removed jwt_required
+@rate_limit('search', jwt_subject_or_ip)
 def search_books_route():
     """
     Search for books based on query parameters.
@@ -17,17 +21,63 @@ def search_books_route():
     - author: Author of the book
     - subject_category: Subject category of the book
     - publication_date: Publication date of the book (YYYY-MM-DD)
+    - fuzzy: 1 to match title and author tolerating misspellings, most similar first
+    - facet_subject_category, facet_author, facet_decade: Facet values to keep (repeatable)
+    - facets: 1 to include the counts per subject category, author and decade
+    - limit: Maximum number of books to return (capped server-side)
+    - cursor: The next_cursor value from the previous page
     
     Returns:
-    - JSON response with search results.
+    - JSON response with search results, next_cursor and, when requested, the facet counts.
     """
     # Get query parameters
     query_params = {
         'title': request.args.get('title'),
         'author': request.args.get('author'),
         'subject_category': request.args.get('subject_category'),
-        'publication_date': request.args.get('publication_date')
+        'publication_date': request.args.get('publication_date'),
+        'fuzzy': request.args.get('fuzzy'),
+        'facet_subject_category': request.args.getlist('facet_subject_category'),
+        'facet_author': request.args.getlist('facet_author'),
+        'facet_decade': request.args.getlist('facet_decade'),
+        'facets': request.args.get('facets'),
+        'limit': request.args.get('limit', type=int),
+        'cursor': request.args.get('cursor')
     }
     
-    response = search_books(query_params)
-    return jsonify(response[0]), response[1]
\ No newline at end of file
+    # 304 when the client's ETag matches the catalog version; results are the same for everyone
+    return conditional_catalog_response(lambda: search_books(query_params), private=False)
+
+@search_bp.route('/search/suggest', methods=['GET'])
+def search_suggest_route():
+    """
+    Suggest book titles and authors for a partially typed query, most borrowed first.
+
+    Query Parameters:
+    - q: The text typed so far (every word is matched as a word prefix)
+    - limit: Maximum number of suggestions (capped server-side)
+
+    Returns:
+    - JSON response with the list of suggestions.
+    """
+    response = suggest_service(request.args.get('q', ''), request.args.get('limit', type=int))
+    return jsonify(response[0]), response[1]
+
+
+@search_bp.route('/search/cache-stats', methods=['GET'])
+@jwt_required()
+def search_cache_stats_route():
+    """
+    Report the search cache counters (hits, misses, evictions, expirations, invalidations) and size.
+
+    Returns:
+    - JSON response with the cache statistics of this process.
+    """
+    claims = get_jwt()
+    if claims.get("role") != "Librarian":
+        return jsonify({"error": "Unauthorized: Librarian role required"}), 403
+
+    cache = get_search_cache()
+    if cache is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **cache.stats()}), 200
@@ -1,6 +1,7 @@
 from flask import jsonify, Blueprint, request
-from app.services.user_management_service import get_all_users,delete_user_by_barcode,get_user_by_barcode,get_user_notifications_service
-from flask_jwt_extended import jwt_required
+from app.services.user_management_service import get_all_users,delete_user_by_barcode,get_user_by_barcode,get_user_notifications_service,mark_notifications_read_service
+from app.services.user_import_service import import_users_service
+from flask_jwt_extended import jwt_required, get_jwt
 
 user_management_bp = Blueprint('user_management', __name__)
 
@@ -8,12 +9,40 @@ user_management_bp = Blueprint('user_management', __name__)
 @user_management_bp.route("/users", methods=["GET"])
 def get_users():
     """
-    Fetch all users.
+    Fetch a page of users, optionally searched.
+
+    Query Parameters:
+    - q: Name or email prefix (case-insensitive), or an exact barcode (optional)
+    - limit: Maximum number of users to return (optional, capped server-side)
+    - cursor: The next_cursor value from the previous page (optional)
 
     Returns:
-        A JSON response with a list of users.
+        A JSON response with the list of users and next_cursor.
     """
-    response = get_all_users()
+    response = get_all_users(request.args.get('q'), request.args.get('limit', type=int), request.args.get('cursor'))
+    return jsonify(response[0]), response[1]
+
+
+# Route to bulk register members from a CSV roster
+@user_management_bp.route("/users/import", methods=["POST"])
+@jwt_required()
+def import_users_route():
+    """
+    Register members from a CSV roster (name, email, password and optionally role).
+
+    The file is sent either as the raw request body or as the "file" field of
+    a multipart form, and is read while it is imported.
+
+    Returns:
+        A JSON response with the import totals or an error message.
+    """
+    # Check if the user has librarian role
+    claims = get_jwt()
+    if claims.get("role") != "Librarian":
+        return jsonify({"error": "Unauthorized: Librarian role required"}), 403
+
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    response = import_users_service(upload.stream if upload else request.stream)
     return jsonify(response[0]), response[1]
 
 
@@ -51,13 +80,55 @@ def delete_user_route():
 @jwt_required()
 def get_user_notifications(barcode):
     """
-    Get notifications for a specific user.
+    Get notifications for a specific user, newest first.
     
     Arguments:
-    - barcode: The ID of the user.
+    - barcode: The barcode of the user.
+
+    Query parameters:
+    - limit: Page size (optional, capped at PAGE_SIZE_MAX)
+    - cursor: The next_cursor value from the previous page (optional)
+    - unread: Set to 1 to only return unread notifications (optional)
     
     Returns:
-    - JSON response with the user's notifications.
+    - JSON response with a page of the user's notifications.
     """
-    response = get_user_notifications_service(barcode)
-    return jsonify(response[0]), response[1]
\ No newline at end of file
+    # Librarians may see anyone's notifications, members only their own
+    claims = get_jwt()
+    if claims.get("role") != "Librarian" and claims.get("barcode") != barcode:
+        return jsonify({"error": "Unauthorized: Librarian role or own account required"}), 403
+
+    response = get_user_notifications_service(
+        barcode,
+        request.args.get('limit', type=int),
+        request.args.get('cursor'),
+        request.args.get('unread') in ('1', 'true')
+    )
+    return jsonify(response[0]), response[1]
+
+
+@user_management_bp.route('/users/<string:barcode>/notifications/read', methods=['POST'])
+@jwt_required()
+def mark_notifications_read(barcode):
+    """
+    Mark notifications as read.
+
+    Expected JSON data (optional):
+    - ids: List of notification ids to mark; all notifications are marked if omitted
+
+    Returns:
+    - JSON response with the number of notifications updated.
+    """
+    # Librarians may mark anyone's notifications, members only their own
+    claims = get_jwt()
+    if claims.get("role") != "Librarian" and claims.get("barcode") != barcode:
+        return jsonify({"error": "Unauthorized: Librarian role or own account required"}), 403
+
+    data = request.get_json(silent=True) or {}
+    notification_ids = data.get('ids')
+    if notification_ids is not None and (
+            not isinstance(notification_ids, list) or not all(isinstance(i, int) for i in notification_ids)):
+        return jsonify({"error": "ids must be a list of integers"}), 400
+
+    response = mark_notifications_read_service(barcode, notification_ids)
+    return jsonify(response[0]), response[1]
@@ -1,9 +1,15 @@
 # app/services/auth_service.py
 
-from flask_jwt_extended import create_access_token, create_refresh_token
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
 from app import db
 from app.models.User import User
+from app.services.password_service import HashingBusy
+from app.services.revocation_service import revoke_token
+from app.services.user_cache import get_user, remember_user, user_claims
+
+# Response when the password hashing pool is saturated (the route adds Retry-After)
+BUSY_RESPONSE = {"error": "The server is busy, please try again shortly"}, 503
 
 # Helper function to check if the email is valid for a Librarian role
 def is_valid_librarian_email(email):
@@ -31,7 +37,8 @@ def register_user(data):
         if User.query.filter_by(email=data['email']).first():
             return {"error": "A user with this email already exists"}, 400
 
-        hashed_password = generate_password_hash(data['password'])
+        # Hashed in the bounded worker pool; raises HashingBusy when it is saturated
+        hashed_password = current_app.extensions['password_hasher'].hash(data['password'])
         user = User(
             name=data['name'],
             email=data['email'],
@@ -45,6 +52,9 @@ def register_user(data):
         
         return {"message": "User registered successfully"}, 201
 
+    except HashingBusy:
+        return BUSY_RESPONSE
+
     except Exception as e:
         db.session.rollback()  # Rollback transaction on failure
         return {"error": "Database error occurred", "details": str(e)}, 500
@@ -66,11 +76,20 @@ def login_user(data):
     try:
         user = User.query.filter_by(email=data.get('email')).first()
         
-        if not user or not check_password_hash(user.password, data.get('password')):
+        if not user:
             return {"error": "Invalid credentials"}, 401
 
-        # Create access and refresh tokens with the user's role included in the additional claims
-        additional_claims = {"role": user.role}
+        # Verified in the bounded worker pool, which also rehashes passwords stored with old parameters
+        matches, new_hash = current_app.extensions['password_hasher'].verify(user.password, data.get('password'))
+        if not matches:
+            return {"error": "Invalid credentials"}, 401
+        if new_hash:
+            user.password = new_hash
+            db.session.commit()
+
+        # Create access and refresh tokens; the access token carries the user's role, id, barcode
+        # and name as claims, so pages and role checks need no user lookup
+        additional_claims = user_claims(remember_user(user))
         access_token = create_access_token(identity=user.email, additional_claims=additional_claims)
         refresh_token = create_refresh_token(identity=user.email)
         
@@ -80,31 +99,56 @@ def login_user(data):
             "role": user.role
         }, 200
 
+    except HashingBusy:
+        return BUSY_RESPONSE
+
     except Exception as e:
+        db.session.rollback()
         return {"error": "Database error occurred", "details": str(e)}, 500
 
 
 
 def refresh_token(identity):
     """
-    Handles the refresh token process by creating a new access token.
+    Handles the refresh token process by creating a new access token with the user's current claims.
 
     Arguments:
-    - identity (int): The user ID.
+    - identity (str): The user's email (the refresh token's identity).
 
     Returns:
-    - A new access token string.
+    - A tuple containing the new access token (or an error) and HTTP status code.
     """
-    return create_access_token(identity=identity)
+    try:
+        user = get_user(identity)
+        if not user:
+            return {"error": "User not found"}, 401
+        return {"access_token": create_access_token(identity=identity, additional_claims=user_claims(user))}, 200
+    except Exception as e:
+        db.session.rollback()
+        return {"error": "Database error occurred", "details": str(e)}, 500
 
 
-# def logout_user():
-#     """
-#     Handles the user logout process. For now, this is a placeholder.
+def logout_user(token, refresh=None):
+    """
+    Handles the user logout process by revoking the presented token, and the
+    refresh token of the same session when it is sent along.
 
-#     Returns:
-#     - A message indicating logout was successful.
-#     """
-#     # For JWT, logging out is generally handled client-side.
-#     # No action is needed on the server as JWT tokens are stateless.
-#     return {"message": "Logout successful"}, 200
+    Arguments:
+    - token (dict): The decoded token the request was authenticated with.
+    - refresh (str): Optional encoded refresh token to revoke as well.
+
+    Returns:
+    - A tuple containing the response message and HTTP status code.
+    """
+    try:
+        revoke_token(token)
+        if refresh:
+            try:
+                refresh_payload = decode_token(refresh)
+            except Exception:
+                refresh_payload = None  # expired, revoked or invalid: already unusable
+            if refresh_payload and refresh_payload["sub"] == token["sub"]:
+                revoke_token(refresh_payload)
+        return {"message": "Logout successful"}, 200
+    except Exception as e:
+        return {"error": "Database error occurred", "details": str(e)}, 500
@@ -0,0 +1,71 @@
+# app/services/background.py
+import logging
+import threading
+from app import db
+
+
+def start_periodic_task(app, name, task, interval):
+    """
+    Call task() every `interval` seconds in a daemon thread, inside an app context.
+
+    Errors are logged and the session is rolled back, so one failed run does not
+    stop the next one.
+
+    Arguments:
+    - app: The Flask app
+    - name: Thread name, also used in log messages
+    - task: Function taking no arguments; its return value is logged
+    - interval: Seconds between runs
+
+    Returns:
+    - A threading.Event; set it to stop the task.
+    """
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            with app.app_context():
+                try:
+                    logging.info(f"{name} finished: {task()}")
+                except Exception:
+                    db.session.rollback()
+                    logging.exception(f"{name} failed")
+                finally:
+                    db.session.remove()
+            stop.wait(interval)
+
+    threading.Thread(target=loop, name=name, daemon=True).start()
+    return stop
+
+
+def start_background_workers_on_first_request(app):
+    """
+    Start the circulation scheduler and the outbox dispatcher, and build the book
+    indexes (typeahead, fuzzy search), each when enabled in the config, once the
+    app handles its first request.
+
+    Waiting for a request keeps them out of CLI commands (migrations, imports)
+    and, with a pre-forking server, starts them in every worker process instead
+    of in the parent, whose threads would not survive the fork. Both are safe
+    to run in several processes at once.
+    """
+    lock = threading.Lock()
+    started = threading.Event()
+
+    @app.before_request
+    def start_background_workers():
+        if started.is_set():
+            return
+        with lock:
+            if started.is_set():
+                return
+            if app.config.get('CIRCULATION_SCHEDULER_ENABLED'):
+                from app.services.circulation_sweep_service import start_circulation_scheduler
+                start_circulation_scheduler(app)
+            if app.config.get('OUTBOX_DISPATCHER_ENABLED'):
+                from app.services.outbox_service import start_outbox_dispatcher
+                start_outbox_dispatcher(app)
+            if app.config.get('BOOK_INDEX_PRELOAD_ENABLED'):
+                from app.services.catalog_changes import preload_book_indexes
+                preload_book_indexes(app)
+            started.set()
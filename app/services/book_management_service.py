@@ -2,65 +2,53 @@ from app import db
 from app.models.Book import Book
 from app.models.BookCopy import BookCopy
 from datetime import datetime
-from app.models.Reservation import Reservation
-from app.models.User import User
+from app.services.catalog_service import catalog_query, serialize_catalog_row, adjust_copy_counts
+from app.services.pagination import resolve_page_size, decode_cursor, split_page
+from app.services.outbox_service import enqueue_reservation_available
 
-def get_all_books_service():
+def get_all_books_service(limit=None, cursor=None):
     """
-    Fetch all books from the catalog.
+    Fetch one page of books from the catalog, ordered by id.
+
+    Arguments:
+    - limit: Maximum number of books to return (capped server-side)
+    - cursor: The next_cursor value from the previous page, if any
 
     Returns:
-        - A tuple containing the list of books and HTTP status code.
+        - A tuple containing the page of books with the next cursor and HTTP status code.
     """
     try:
-        books = Book.query.all()
-        results = []
-        for book in books:
-            # Count available and total copies
-            available_copies = BookCopy.query.filter_by(book_id=book.id, is_available=True).count()
-            total_copies = BookCopy.query.filter_by(book_id=book.id).count()
+        try:
+            page_size = resolve_page_size(limit)
+            query = catalog_query()
+            if cursor:
+                last_id, = decode_cursor(cursor, 1)
+                query = query.filter(Book.id > last_id)
+        except ValueError as e:
+            return {"error": str(e)}, 400
 
-            results.append({
-                "id": book.id,
-                "barcode": book.barcode,
-                "title": book.title,
-                "author": book.author,
-                "subject_category": book.subject_category,
-                "publication_date": book.publication_date.strftime('%Y-%m-%d'),
-                "available_copies": available_copies,
-                "total_copies": total_copies
-            })
+        # One query over book alone: copy counts are read from its denormalized count columns
+        rows = query.order_by(Book.id).limit(page_size + 1).all()
+        rows, next_cursor = split_page(rows, page_size, lambda row: (row.id,))
 
-        return {"books": results}, 200
+        return {"books": [serialize_catalog_row(row) for row in rows], "next_cursor": next_cursor}, 200
 
     except Exception as e:
         return {"error": f"An error occurred: {str(e)}"}, 500
 
 def get_book_by_barcode_service(barcode):
     """
-    Fetch all books from the catalog.
+    Fetch a single book from the catalog by its barcode.
 
     Returns:
-        - A tuple containing the list of books and HTTP status code.
+        - A tuple containing the book details and HTTP status code.
     """
     try:
-        book = Book.query.filter_by(barcode=barcode).first()
-        if not book:
+        row = catalog_query().filter(Book.barcode == barcode).first()
+        if not row:
             return {"error": "Book not found"}, 404
-        
-        # Count available and total copies
-        available_copies = BookCopy.query.filter_by(book_id=book.id, is_available=True).count()
-        total_copies = BookCopy.query.filter_by(book_id=book.id).count()
-        return{
-            "id": book.id,
-            "barcode": book.barcode,
-            "title": book.title,
-            "author": book.author,
-            "subject_category": book.subject_category,
-            "publication_date": book.publication_date.strftime('%Y-%m-%d'),
-            "available_copies": available_copies,
-            "total_copies": total_copies
-            }, 200
+
+        return serialize_catalog_row(row), 200
 
     except Exception as e:
         return {"error": f"An error occurred: {str(e)}"}, 500
@@ -179,16 +167,12 @@ def create_book_copy_service(barcode, data):
         )
         
         db.session.add(book_copy)
+        db.session.flush()  # assigns the copy id
+        adjust_copy_counts(book.id, available=1, total=1)
+
+        # Queue a notice for users with pending reservations for this book (same transaction)
+        enqueue_reservation_available([book.id], f"copy:{book_copy.id}")
         db.session.commit()
-        
-        # Notify users with pending reservations for this book
-        reservations = Reservation.query.filter_by(book_id=book.id, status='Pending').all()
-        for reservation in reservations:
-            user = User.query.get(reservation.user_id)
-            if user:
-                subject = "Book Reservation Available"
-                body = f"Dear {user.name},\n\nThe book '{book.title}' you reserved is now available. Please check it out soon.\n\nThank you!"
-                user.add_notification(subject, body)
 
         return {"message": "Book copy created successfully"}, 201
 
@@ -225,6 +209,7 @@ def delete_book_copy_service(barcode, copy_id):
         
         # Delete the book copy
         db.session.delete(book_copy)
+        adjust_copy_counts(book.id, available=-1 if book_copy.is_available else 0, total=-1)
         db.session.commit()
         return {"message": "Book copy deleted successfully"}, 200
 
@@ -256,20 +241,17 @@ def modify_book_copy_service(barcode, copy_id, data):
             return {"error": "Book copy not found"}, 404
         
         # Modify the book copy
+        was_available = bool(book_copy.is_available)
         book_copy.rack_location = data.get('rack_location', book_copy.rack_location)
         book_copy.is_available = data.get('is_available', book_copy.is_available)
-        
+        if bool(book_copy.is_available) != was_available:
+            adjust_copy_counts(book.id, available=1 if book_copy.is_available else -1)
+
+        if book_copy.is_available and not was_available:
+            # Queue a notice for users with pending reservations for this book (same transaction)
+            now = datetime.utcnow()
+            enqueue_reservation_available([book.id], f"copy:{book_copy.id}:{now:%Y%m%d%H%M%S%f}", now)
         db.session.commit()
-        
-        if book_copy.is_available:
-            # Notify users with pending reservations for this book
-            reservations = Reservation.query.filter_by(book_id=book.id, status='Pending').all()
-            for reservation in reservations:
-                user = User.query.get(reservation.user_id)
-                if user:
-                    subject = "Book Reservation Available"
-                    body = f"Dear {user.name},\n\nThe book '{book.title}' you reserved is now available. Please check it out soon.\n\nThank you!"
-                    user.add_notification(subject, body)
 
         return {"message": "Book copy modified successfully"}, 200
 
@@ -4,7 +4,154 @@ from app.models.Reservation import Reservation
 from app.models.Book import Book
 from app.models.BookCopy import BookCopy
 from app.models.User import User
+from app.services.pagination import (
+    resolve_page_size, decode_cursor, split_page, datetime_to_cursor_value, cursor_value_to_datetime
+)
+from app.services.circulation_sweep_service import last_sweep_time
+from app.services.outbox_service import enqueue_reservation_available
+from app.services.catalog_service import adjust_copy_counts
+from app.services.suggest_service import queue_loan_for_suggestions
 from datetime import datetime, timedelta
+import csv
+import io
+import json
+import time
+from flask import current_app
+from sqlalchemy import and_, or_, func
+from sqlalchemy.exc import OperationalError
+
+# Maximum number of books a user can have on loan at once
+MAX_ACTIVE_LOANS = 5
+
+# Operations accepted by the batch circulation endpoint and their required fields
+BATCH_ACTIONS = {
+    'issue': ('user_barcode', 'book_barcode'),
+    'return': ('transaction_id',),
+    'renew': ('transaction_id',),
+}
+
+def allocate_available_copy(book_id):
+    """
+    Atomically take one available copy of a book.
+
+    The copy is picked and marked unavailable by a single conditional UPDATE ...
+    RETURNING, so two concurrent requests can never be handed the same copy. On
+    PostgreSQL the inner SELECT uses FOR UPDATE SKIP LOCKED so concurrent
+    allocations move on to the next free copy instead of queueing on one row;
+    SQLite ignores the locking clause and serializes the statement itself. The
+    book's available_count is decremented in the same transaction.
+
+    Arguments:
+    - book_id: The id of the book
+
+    Returns:
+    - The id of the allocated copy, or None if no copy is available.
+    """
+    free_copy = (
+        db.select(BookCopy.id)
+        .where(BookCopy.book_id == book_id, BookCopy.is_available == True)  # noqa: E712
+        .order_by(BookCopy.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    copy_id = db.session.execute(
+        db.update(BookCopy)
+        # Re-checking availability keeps the UPDATE safe if another transaction got there first
+        .where(BookCopy.id == free_copy, BookCopy.is_available == True)  # noqa: E712
+        .values(is_available=False)
+        .returning(BookCopy.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if copy_id is not None:
+        adjust_copy_counts(book_id, available=-1)
+    return copy_id
+
+
+def retry_on_database_lock(operation):
+    """
+    Run a database operation, retrying it a bounded number of times on "database is locked".
+
+    SQLite reports lock contention between concurrent writers as an OperationalError
+    instead of waiting; the transaction is rolled back and replayed after a short,
+    growing pause. Any other error, or the last failed attempt, is re-raised.
+
+    Arguments:
+    - operation: Function taking no arguments that performs and commits the work
+
+    Returns:
+    - The return value of operation().
+    """
+    attempts = current_app.config['LOCK_RETRY_ATTEMPTS']
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except OperationalError as e:
+            db.session.rollback()
+            if 'database is locked' not in str(e) or attempt == attempts:
+                raise
+            time.sleep(current_app.config['LOCK_RETRY_BACKOFF'] * attempt)
+
+
+def _issue_loan(user, active_loans, book, reservation):
+    """
+    Apply the issue rules and, if they pass, allocate a copy and open a loan.
+
+    Shared by issue_book_service and the batch circulation endpoint. The loan is
+    flushed (so it has an id) but not committed.
+
+    Arguments:
+    - user: The borrowing User, or None if the barcode was not found
+    - active_loans: Number of loans the user currently has open
+    - book: The Book to issue, or None if the barcode was not found
+    - reservation: The user's pending Reservation for the book, if any
+
+    Returns:
+    - A tuple containing the response message and HTTP status code.
+    """
+    if not user:
+        return {"error": "User not found"}, 404
+    
+    # Check if user has reached the maximum number of books (5)
+    if active_loans >= MAX_ACTIVE_LOANS:
+        return {"error": "User has reached the maximum number of books allowed (5)"}, 400
+    
+    if not book:
+        return {"error": "Book not found"}, 404
+    
+    # Take an available copy of the book (atomic, race-free)
+    book_copy_id = allocate_available_copy(book.id)
+    if book_copy_id is None:
+        return {"error": "No available copies of this book"}, 400
+    
+    # Calculate due date (10 days from now)
+    due_date = datetime.utcnow() + timedelta(days=10)
+    
+    # Create a new transaction
+    new_transaction = Transaction(
+        user_id=user.id,
+        book_copy_id=book_copy_id,
+        checkout_date=datetime.utcnow(),
+        due_date=due_date,
+        return_date=None,
+        fine_amount=0.0
+    )
+    
+    # Fulfil the user's pending reservation for this book, if any
+    if reservation:
+        reservation.status = 'Fulfilled'
+    
+    db.session.add(new_transaction)
+    db.session.flush()
+    # The loan counts towards the book's rank in search suggestions once it commits
+    queue_loan_for_suggestions(book.id)
+    
+    return {
+        "message": "Book issued successfully",
+        "transaction_id": new_transaction.id,
+        "due_date": due_date.strftime("%Y-%m-%d")
+    }, 201
+
 
 def issue_book_service(user_barcode, book_barcode):
     """
@@ -17,61 +164,81 @@ def issue_book_service(user_barcode, book_barcode):
     Returns:
         - A tuple containing the response message and HTTP status code.
     """
-    try:
-        # Find the user
+    def issue():
+        # Find the user, their open loans and the book
         user = User.query.filter_by(barcode=user_barcode).first()
-        if not user:
-            return {"error": "User not found"}, 404
-        
-        # Check if user has reached the maximum number of books (5)
-        active_transactions = Transaction.query.filter_by(user_id=user.id, return_date=None).count()
-        if active_transactions >= 5:
-            return {"error": "User has reached the maximum number of books allowed (5)"}, 400
-        
-        # Find the book
+        active_loans = Transaction.query.filter_by(user_id=user.id, return_date=None).count() if user else 0
         book = Book.query.filter_by(barcode=book_barcode).first()
-        if not book:
-            return {"error": "Book not found"}, 404
-        
-        # Find an available copy of the book
-        book_copy = BookCopy.query.filter_by(book_id=book.id, is_available=True).first()
-        if not book_copy:
-            return {"error": "No available copies of this book"}, 400
-        
-        # Calculate due date (10 days from now)
-        due_date = datetime.utcnow() + timedelta(days=10)
-        
-        # Create a new transaction
-        new_transaction = Transaction(
-            user_id=user.id,
-            book_copy_id=book_copy.id,
-            checkout_date=datetime.utcnow(),
-            due_date=due_date,
-            return_date=None,
-            fine_amount=0.0
-        )
-        
-        # Update the book copy to unavailable
-        book_copy.is_available = False
-        
-        # Check if there's a pending reservation for this book and update it
-        reservation = Reservation.query.filter_by(user_id=user.id, book_id=book.id, status='Pending').first()
-        if reservation:
-            reservation.status = 'Fulfilled'
-        
-        db.session.add(new_transaction)
-        db.session.commit()
-        
-        return {
-            "message": "Book issued successfully",
-            "transaction_id": new_transaction.id,
-            "due_date": due_date.strftime("%Y-%m-%d")
-        }, 201
+        reservation = Reservation.query.filter_by(
+            user_id=user.id, book_id=book.id, status='Pending'
+        ).first() if user and book else None
+
+        response = _issue_loan(user, active_loans, book, reservation)
+        if response[1] == 201:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        return response
+
+    try:
+        return retry_on_database_lock(issue)
         
     except Exception as e:
         db.session.rollback()
         return {"error": f"An error occurred: {str(e)}"}, 500
 
+def _return_loan(transaction, book_copy, current_date):
+    """
+    Apply the return rules to a loan: charge any fine, close it and free the copy.
+
+    Shared by return_book_service and the batch circulation endpoint. Nothing is
+    committed, and reservation notices are left to the caller.
+
+    Arguments:
+    - transaction: The Transaction, or None if it was not found
+    - book_copy: The BookCopy on loan, if it still exists
+    - current_date: The return time
+
+    Returns:
+    - A tuple containing the response message and HTTP status code.
+    """
+    if not transaction:
+        return {"error": "Transaction not found"}, 404
+    
+    # Check if the book has already been returned
+    if transaction.return_date:
+        return {"error": "This book has already been returned"}, 400
+    
+    # Calculate fine if the book is overdue
+    if current_date > transaction.due_date:
+        # Calculate days overdue
+        # the return of subtraction is timedelta object, so we can use days method to get the number of days
+        days_overdue = (current_date - transaction.due_date).days
+        # Calculate fine amount (assuming $0.50 per day)
+        fine_amount = days_overdue * 0.50
+        transaction.fine_amount = fine_amount
+    
+    # Update the transaction with return date
+    transaction.return_date = current_date
+    
+    # Update the book copy to available
+    if book_copy:
+        if not book_copy.is_available:
+            adjust_copy_counts(book_copy.book_id, available=1)
+        book_copy.is_available = True
+    
+    response = {
+        "message": "Book returned successfully",
+        "transaction_id": transaction.id,
+    }
+    
+    if transaction.fine_amount > 0:
+        response["fine_amount"] = transaction.fine_amount
+        response["message"] += f", with a fine of ${transaction.fine_amount:.2f}"
+    
+    return response, 200
+
+
 def return_book_service(transaction_id):
     """
     Return a book to the library.
@@ -83,57 +250,22 @@ def return_book_service(transaction_id):
         - A tuple containing the response message and HTTP status code.
     """
     try:
-        # Find the transaction
-        transaction = Transaction.query.get(transaction_id)
-        if not transaction:
-            return {"error": "Transaction not found"}, 404
-        
-        # Check if the book has already been returned
-        if transaction.return_date:
-            return {"error": "This book has already been returned"}, 400
+        # Find the transaction and the copy on loan
+        transaction = db.session.get(Transaction, transaction_id)
+        book_copy = db.session.get(BookCopy, transaction.book_copy_id) if transaction else None
         
-        # Calculate fine if the book is overdue
         current_date = datetime.utcnow()
-        if current_date > transaction.due_date:
-            # Calculate days overdue
-            # the return of subtraction is timedelta object, so we can use days method to get the number of days
-            days_overdue = (current_date - transaction.due_date).days
-            # Calculate fine amount (assuming $0.50 per day)
-            fine_amount = days_overdue * 0.50
-            transaction.fine_amount = fine_amount
+        response = _return_loan(transaction, book_copy, current_date)
+        if response[1] != 200:
+            return response
         
-        # Update the transaction with return date
-        transaction.return_date = current_date
-        
-        # Update the book copy to available
-        book_copy = BookCopy.query.get(transaction.book_copy_id)
         if book_copy:
-            book_copy.is_available = True
-        
-            # Notify users with pending reservations for this book
-            # I think this is the simplest way to send notification, open for discussion in the presentation
-            reservations = Reservation.query.filter_by(book_id=book_copy.book_id, status='Pending').all()
-            for reservation in reservations:
-                user = User.query.get(reservation.user_id)
-                book = Book.query.get(book_copy.book_id)
-                if user and book:
-                    subject = "Book Reservation Available"
-                    body = f"Dear {user.name},\n\nThe book '{book.title}' you reserved is now available. Please check it out soon.\n\nThank you!"
-                    user.add_notification(subject, body)
-        
+            # Queue a notice for users with pending reservations for this book;
+            # it commits with the return and is delivered by the outbox dispatcher
+            enqueue_reservation_available([book_copy.book_id], f"return:{transaction.id}", current_date)
 
         db.session.commit()
-        
-        response = {
-            "message": "Book returned successfully",
-            "transaction_id": transaction.id,
-        }
-        
-        if transaction.fine_amount > 0:
-            response["fine_amount"] = transaction.fine_amount
-            response["message"] += f", with a fine of ${transaction.fine_amount:.2f}"
-        
-        return response, 200
+        return response
         
     except Exception as e:
         db.session.rollback()
@@ -162,8 +294,7 @@ def reserve_book_service(user_barcode, book_barcode):
             return {"error": "Book not found"}, 404
         
         # Check if any copies are available
-        available_copies = BookCopy.query.filter_by(book_id=book.id, is_available=True).count()
-        if available_copies > 0:
+        if book.available_count > 0:
             return {"error": "This book is currently available, no need to reserve"}, 400
         
         # Check if user already has a pending reservation for this book
@@ -229,6 +360,39 @@ def cancel_reservation_service(reservation_id):
         db.session.rollback()
         return {"error": f"An error occurred: {str(e)}"}, 500
 
+def _renew_loan(transaction, current_date):
+    """
+    Apply the renewal rules to a loan and extend its due date (nothing is committed).
+
+    Shared by renew_book_service and the batch circulation endpoint.
+
+    Arguments:
+    - transaction: The Transaction, or None if it was not found
+    - current_date: The renewal time
+
+    Returns:
+    - A tuple containing the response message and HTTP status code.
+    """
+    if not transaction:
+        return {"error": "Transaction not found"}, 404
+    
+    # Check if the book has been returned
+    if transaction.return_date:
+        return {"error": "This book has already been returned"}, 400
+    
+    # Check if the book is overdue
+    if current_date > transaction.due_date:
+        return {"error": "Overdue books cannot be renewed"}, 400
+    
+    # Extend the due date by 10 more days from the current due date
+    transaction.due_date = transaction.due_date + timedelta(days=10)
+    
+    return {
+        "message": "Book renewed successfully",
+        "new_due_date": transaction.due_date.strftime("%Y-%m-%d")
+    }, 200
+
+
 def renew_book_service(transaction_id):
     """
     Renew a book (extend the due date).
@@ -241,76 +405,204 @@ def renew_book_service(transaction_id):
     """
     try:
         # Find the transaction
-        transaction = Transaction.query.get(transaction_id)
-        if not transaction:
-            return {"error": "Transaction not found"}, 404
+        transaction = db.session.get(Transaction, transaction_id)
         
-        # Check if the book has been returned
-        if transaction.return_date:
-            return {"error": "This book has already been returned"}, 400
-        
-        # Check if the book is overdue
-        if datetime.utcnow() > transaction.due_date:
-            return {"error": "Overdue books cannot be renewed"}, 400
-        
-        # Extend the due date by 10 more days from the current due date
-        transaction.due_date = transaction.due_date + timedelta(days=10)
+        response = _renew_loan(transaction, datetime.utcnow())
+        if response[1] == 200:
+            db.session.commit()
+        return response
         
+    except Exception as e:
+        db.session.rollback()
+        return {"error": f"An error occurred: {str(e)}"}, 500
+
+def circulation_batch_service(operations):
+    """
+    Apply a cart of issue, return and renew operations in one transaction.
+
+    Every barcode and transaction id in the cart is resolved up front with one IN
+    query per kind, and open loans are counted once per patron with a single
+    grouped query. Operations then run in order through the same rules as the
+    single-item services, with the loan counts kept up to date in memory (so a
+    return earlier in the cart frees a slot for a later issue). A failed item
+    does not affect the others; the whole cart is committed once.
+
+    Arguments:
+    - operations: List of dictionaries, each with an "action" of "issue"
+      (user_barcode, book_barcode), "return" (transaction_id) or "renew" (transaction_id)
+
+    Returns:
+        - A tuple containing the per-item results and a summary, and HTTP status code.
+    """
+    if not isinstance(operations, list) or not operations:
+        return {"error": "operations must be a non-empty list"}, 400
+    if len(operations) > current_app.config['CIRCULATION_BATCH_MAX']:
+        return {"error": f"A batch can hold at most {current_app.config['CIRCULATION_BATCH_MAX']} operations"}, 400
+
+    def apply_batch():
+        # Validate the shape of every item before touching the database
+        items = []
+        for operation in operations:
+            operation = operation if isinstance(operation, dict) else {}
+            action = operation.get('action')
+            required = BATCH_ACTIONS.get(action)
+            if required is None:
+                items.append((action, None, ({"error": "Unknown action"}, 400)))
+            elif not all(operation.get(key) is not None for key in required):
+                items.append((action, None, ({"error": "Missing required fields"}, 400)))
+            else:
+                items.append((action, operation, None))
+
+        valid = [operation for _, operation, _ in items if operation]
+        user_barcodes = {str(o['user_barcode']) for o in valid if o['action'] == 'issue'}
+        book_barcodes = {str(o['book_barcode']) for o in valid if o['action'] == 'issue'}
+        transaction_ids = {o['transaction_id'] for o in valid if o['action'] != 'issue'
+                           and isinstance(o['transaction_id'], int)}
+
+        # Resolve everything with one IN query per kind
+        users = {u.barcode: u for u in User.query.filter(User.barcode.in_(user_barcodes))} if user_barcodes else {}
+        books = {b.barcode: b for b in Book.query.filter(Book.barcode.in_(book_barcodes))} if book_barcodes else {}
+        transactions = {t.id: t for t in Transaction.query.filter(Transaction.id.in_(transaction_ids))} \
+            if transaction_ids else {}
+        copy_ids = {t.book_copy_id for t in transactions.values()}
+        copies = {c.id: c for c in BookCopy.query.filter(BookCopy.id.in_(copy_ids))} if copy_ids else {}
+
+        # Open loans, counted once per patron (issuers and the borrowers of returned loans)
+        patron_ids = {u.id for u in users.values()} | {t.user_id for t in transactions.values()}
+        active_loans = dict(
+            db.session.query(Transaction.user_id, func.count(Transaction.id))
+            .filter(Transaction.user_id.in_(patron_ids), Transaction.return_date.is_(None))
+            .group_by(Transaction.user_id)
+            .all()
+        ) if patron_ids else {}
+
+        # Pending holds that an issue in this cart would fulfil
+        reservations = {}
+        if users and books:
+            for reservation in Reservation.query.filter(
+                Reservation.user_id.in_([u.id for u in users.values()]),
+                Reservation.book_id.in_([b.id for b in books.values()]),
+                Reservation.status == 'Pending'
+            ):
+                reservations.setdefault((reservation.user_id, reservation.book_id), reservation)
+
+        current_date = datetime.utcnow()
+        returned_book_ids = set()
+        returned_transaction_ids = []
+        results = []
+        for index, (action, operation, response) in enumerate(items):
+            if response is None and action == 'issue':
+                user = users.get(str(operation['user_barcode']))
+                book = books.get(str(operation['book_barcode']))
+                reservation = reservations.pop((user.id, book.id), None) if user and book else None
+                response = _issue_loan(user, active_loans.get(user.id, 0) if user else 0, book, reservation)
+                if response[1] == 201:
+                    active_loans[user.id] = active_loans.get(user.id, 0) + 1
+                elif reservation:
+                    reservations[(user.id, book.id)] = reservation
+            elif response is None and action == 'return':
+                transaction = transactions.get(operation['transaction_id'])
+                book_copy = copies.get(transaction.book_copy_id) if transaction else None
+                response = _return_loan(transaction, book_copy, current_date)
+                if response[1] == 200:
+                    active_loans[transaction.user_id] = active_loans.get(transaction.user_id, 1) - 1
+                    returned_transaction_ids.append(transaction.id)
+                    if book_copy:
+                        returned_book_ids.add(book_copy.book_id)
+            elif response is None:
+                response = _renew_loan(transactions.get(operation['transaction_id']), current_date)
+
+            results.append({"index": index, "action": action, "status": response[1], **response[0]})
+
+        if returned_book_ids:
+            # Queue notices for pending holds on every returned title, in the same transaction;
+            # a loan is returned only once, so its id names this batch's availability event
+            enqueue_reservation_available(returned_book_ids, f"return:{returned_transaction_ids[0]}", current_date)
         db.session.commit()
-        
+
+        succeeded = sum(1 for result in results if result["status"] < 400)
         return {
-            "message": "Book renewed successfully",
-            "new_due_date": transaction.due_date.strftime("%Y-%m-%d")
+            "results": results,
+            "summary": {"succeeded": succeeded, "failed": len(results) - succeeded}
         }, 200
-        
+
+    try:
+        return retry_on_database_lock(apply_batch)
+
     except Exception as e:
         db.session.rollback()
         return {"error": f"An error occurred: {str(e)}"}, 500
 
-def check_overdue_books_service():
+
+def check_overdue_books_service(limit=None, cursor=None):
     """
-    Check for overdue books and calculate fines.
-    
+    List overdue books and calculate fines.
+
+    This is a read only: borrowers are notified by the circulation sweep
+    (`flask circulation sweep` or the background scheduler), not by this call.
+    Loans come back in (due_date, id) order, one keyset page at a time.
+
+    Arguments:
+    - limit: Maximum number of loans to return (defaults to PAGE_SIZE_DEFAULT)
+    - cursor: The next_cursor value returned by the previous page, or None for the first page
+
     Returns:
-        - A tuple containing the list of overdue books and HTTP status code.
+        - A tuple containing the overdue books, the next cursor and the time of
+          the last sweep, and HTTP status code.
     """
     try:
+        page_size = resolve_page_size(limit)
         current_date = datetime.utcnow()
-        
-        # Find all transactions where the book is overdue and not returned
-        overdue_transactions = Transaction.query.filter(
-            Transaction.due_date < current_date,
-            Transaction.return_date.is_(None) 
-        ).all()
-        
-        result = []
-        for transaction in overdue_transactions:
-            days_overdue = (current_date - transaction.due_date).days
-            fine_amount = days_overdue * 0.50  # $0.50 per day
-            
-            user = User.query.get(transaction.user_id)
-            book_copy = BookCopy.query.get(transaction.book_copy_id)
-            book = Book.query.get(book_copy.book_id) if book_copy else None
-
-            if user and book:
-                # Add a notification to the user's notifications list here and open for discussion in the presentation
-                subject = "Overdue Book Notification"
-                body = f"Dear {user.name},\n\nThe book '{book.title}' is overdue by {days_overdue} days. Please return it as soon as possible to avoid further fines.\n\nThank you!"
-                user.add_notification(subject, body)
-
-            result.append({
-                "transaction_id": transaction.id,
-                "user_name": user.name if user else "Unknown",
-                "user_email": user.email if user else "Unknown",
-                "book_title": book.title if book else "Unknown",
+
+        query = (
+            db.session.query(
+                Transaction.id,
+                Transaction.due_date,
+                User.name.label('user_name'),
+                User.email.label('user_email'),
+                Book.title.label('book_title'),
+            )
+            .outerjoin(User, User.id == Transaction.user_id)
+            .outerjoin(BookCopy, BookCopy.id == Transaction.book_copy_id)
+            .outerjoin(Book, Book.id == BookCopy.book_id)
+            .filter(Transaction.due_date < current_date, Transaction.return_date.is_(None))
+        )
+        if cursor:
+            due_date, transaction_id = decode_cursor(cursor, 2)
+            due_date = cursor_value_to_datetime(due_date)
+            # Keyset on (due_date, id) so every page is an index range scan
+            query = query.filter(or_(
+                Transaction.due_date > due_date,
+                and_(Transaction.due_date == due_date, Transaction.id > transaction_id)
+            ))
+        rows = query.order_by(Transaction.due_date, Transaction.id).limit(page_size + 1).all()
+        rows, next_cursor = split_page(rows, page_size,
+                                       lambda row: (datetime_to_cursor_value(row.due_date), row.id))
+
+        overdue_books = []
+        for row in rows:
+            days_overdue = (current_date - row.due_date).days
+            overdue_books.append({
+                "transaction_id": row.id,
+                "user_name": row.user_name or "Unknown",
+                "user_email": row.user_email or "Unknown",
+                "book_title": row.book_title or "Unknown",
                 "days_overdue": days_overdue,
-                "fine_amount": fine_amount,
-                "due_date": transaction.due_date.strftime("%Y-%m-%d")
+                "fine_amount": days_overdue * 0.50,  # $0.50 per day
+                "due_date": row.due_date.strftime("%Y-%m-%d")
             })
-        
-        return {"overdue_books": result}, 200
-        
+
+        last_sweep = last_sweep_time()
+        return {
+            "overdue_books": overdue_books,
+            "next_cursor": next_cursor,
+            "last_sweep_at": last_sweep.strftime("%Y-%m-%d %H:%M:%S") if last_sweep else None
+        }, 200
+
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except Exception as e:
+        db.session.rollback()
         return {"error": f"An error occurred: {str(e)}"}, 500
     
 
@@ -326,137 +618,250 @@ def checkout_book_service(user_barcode, book_barcode):
     Returns:
         - A tuple containing the response message and HTTP status code.
     """
+    # Same rules and the same atomic copy allocation as a librarian issue
+    return issue_book_service(user_barcode, book_barcode)
+
+
+#####################two routes I was missing in the requirements############################################
+#o The system should retrieve information about checked-out books and borrowing history.
+
+def parse_date_range(start_date=None, end_date=None):
+    """
+    Parse an inclusive YYYY-MM-DD date range into datetime bounds.
+
+    Arguments:
+    - start_date: First day of the range, or None for no lower bound
+    - end_date: Last day of the range, or None for no upper bound
+
+    Returns:
+    - A tuple (lower bound, exclusive upper bound); either may be None.
+
+    Raises:
+    - ValueError if a date is malformed or the range is reversed.
+    """
+    bounds = []
+    for name, value in (("start_date", start_date), ("end_date", end_date)):
+        try:
+            bounds.append(datetime.strptime(value, "%Y-%m-%d") if value else None)
+        except ValueError:
+            raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+    lower, upper = bounds
+    if lower and upper and lower > upper:
+        raise ValueError("start_date must not be after end_date")
+    # The end date is inclusive, so stop at the start of the next day
+    return lower, upper + timedelta(days=1) if upper else None
+
+
+def _loan_query(user_id, lower=None, upper=None):
+    """
+    Projection of a user's loans joined to the book title, filtered on checkout date.
+
+    One statement returns every column the history and checked-out views need,
+    instead of loading the copy and the book separately for each loan.
+    """
+    query = (
+        db.session.query(
+            Transaction.id,
+            Transaction.checkout_date,
+            Transaction.due_date,
+            Transaction.return_date,
+            Transaction.fine_amount,
+            Book.title.label('book_title'),
+        )
+        .outerjoin(BookCopy, BookCopy.id == Transaction.book_copy_id)
+        .outerjoin(Book, Book.id == BookCopy.book_id)
+        .filter(Transaction.user_id == user_id)
+    )
+    if lower:
+        query = query.filter(Transaction.checkout_date >= lower)
+    if upper:
+        query = query.filter(Transaction.checkout_date < upper)
+    return query
+
+
+def _history_page(query, after_key, size):
+    """
+    Fetch up to size history rows, newest checkout first, after the (checkout_date, id) key.
+    """
+    if after_key:
+        checkout_date, transaction_id = after_key
+        # Keyset on (checkout_date, id) descending, served by ix_transaction_user_id_checkout_date
+        query = query.filter(or_(
+            Transaction.checkout_date < checkout_date,
+            and_(Transaction.checkout_date == checkout_date, Transaction.id < transaction_id)
+        ))
+    return query.order_by(Transaction.checkout_date.desc(), Transaction.id.desc()).limit(size).all()
+
+
+def _serialize_history_row(row):
+    return {
+        "transaction_id": row.id,
+        "book_title": row.book_title or "Unknown",
+        "checkout_date": row.checkout_date.strftime("%Y-%m-%d"),
+        "due_date": row.due_date.strftime("%Y-%m-%d"),
+        "return_date": row.return_date.strftime("%Y-%m-%d") if row.return_date else None,
+        "fine_amount": row.fine_amount
+    }
+
+
+def get_borrowing_history_service(user_id, limit=None, cursor=None, start_date=None, end_date=None):
+    """
+    Retrieve borrowing history for a specific user.
+
+    Loans come back newest checkout first, one keyset page at a time.
+
+    Arguments:
+    - user_id: The ID of the user.
+    - limit: Maximum number of loans to return (defaults to PAGE_SIZE_DEFAULT)
+    - cursor: The next_cursor value returned by the previous page, or None for the first page
+    - start_date, end_date: Optional inclusive checkout date range (YYYY-MM-DD)
+
+    Returns:
+    - A tuple containing the borrowing history and the next cursor, and HTTP status code.
+    """
     try:
+        page_size = resolve_page_size(limit)
+        lower, upper = parse_date_range(start_date, end_date)
+        after_key = None
+        if cursor:
+            checkout_date, transaction_id = decode_cursor(cursor, 2)
+            after_key = (cursor_value_to_datetime(checkout_date), transaction_id)
+
         # Find the user
-        user = User.query.filter_by(barcode=user_barcode).first()
+        user = db.session.get(User, user_id)
         if not user:
             return {"error": "User not found"}, 404
-        
-        # Check if user has reached the maximum number of books (5)
-        active_transactions = Transaction.query.filter_by(user_id=user.id, return_date=None).count()
-        if active_transactions >= 5:
-            return {"error": "User has reached the maximum number of books allowed (5)"}, 400
-        
-        # Find the book
-        book = Book.query.filter_by(barcode=book_barcode).first()
-        if not book:
-            return {"error": "Book not found"}, 404
-        
-        # Find an available copy of the book
-        book_copy = BookCopy.query.filter_by(book_id=book.id, is_available=True).first()
-        if not book_copy:
-            return {"error": "No available copies of this book"}, 400
-        
-        # Calculate due date (10 days from now)
-        due_date = datetime.utcnow() + timedelta(days=10)
-        
-        # Create a new transaction
-        new_transaction = Transaction(
-            user_id=user.id,
-            book_copy_id=book_copy.id,
-            checkout_date=datetime.utcnow(),
-            due_date=due_date,
-            return_date=None,
-            fine_amount=0.0
-        )
-        
-        # Update the book copy to unavailable
-        book_copy.is_available = False
-        
-        # Check if there's a pending reservation for this book and update it
-        reservation = Reservation.query.filter_by(user_id=user.id, book_id=book.id, status='Pending').first()
-        if reservation:
-            reservation.status = 'Fulfilled'
-        
-        db.session.add(new_transaction)
-        db.session.commit()
-        
+
+        rows = _history_page(_loan_query(user_id, lower, upper), after_key, page_size + 1)
+        rows, next_cursor = split_page(rows, page_size,
+                                       lambda row: (datetime_to_cursor_value(row.checkout_date), row.id))
+
         return {
-            "message": "Book issued successfully",
-            "transaction_id": new_transaction.id,
-            "due_date": due_date.strftime("%Y-%m-%d")
-        }, 201
-        
+            "borrowing_history": [_serialize_history_row(row) for row in rows],
+            "next_cursor": next_cursor
+        }, 200
+
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except Exception as e:
-        db.session.rollback()
         return {"error": f"An error occurred: {str(e)}"}, 500
 
 
-#####################two routes I was missing in the requirements############################################
-#o The system should retrieve information about checked-out books and borrowing history.
+# Formats accepted by the borrowing history export: (content type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Column order of the CSV export
+EXPORT_COLUMNS = ("transaction_id", "book_title", "checkout_date", "due_date", "return_date", "fine_amount")
 
-def get_borrowing_history_service(user_id):
+
+def export_borrowing_history_service(user_id, export_format='csv', start_date=None, end_date=None):
     """
-    Retrieve borrowing history for a specific user.
-    
+    Stream a user's whole borrowing history as CSV or NDJSON.
+
+    The rows are read in keyset chunks of EXPORT_CHUNK_SIZE and each chunk is
+    encoded and yielded before the next is fetched, so memory use does not
+    depend on the length of the history.
+
     Arguments:
     - user_id: The ID of the user.
-    
+    - export_format: 'csv' or 'ndjson'
+    - start_date, end_date: Optional inclusive checkout date range (YYYY-MM-DD)
+
     Returns:
-    - A tuple containing the borrowing history and HTTP status code.
+    - A tuple (generator of text chunks, content type, file name) and HTTP status
+      code 200, or an error dictionary and HTTP status code.
     """
     try:
+        if export_format not in EXPORT_FORMATS:
+            return {"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}, 400
+        lower, upper = parse_date_range(start_date, end_date)
+
         # Find the user
-        user = User.query.get(user_id)
-        if not user:
+        if not db.session.get(User, user_id):
             return {"error": "User not found"}, 404
-        
-        # Retrieve all transactions for the user
-        transactions = Transaction.query.filter_by(user_id=user_id).all()
-        
-        # Format the results
-        history = []
-        for transaction in transactions:
-            book_copy = BookCopy.query.get(transaction.book_copy_id)
-            book = Book.query.get(book_copy.book_id) if book_copy else None
-            history.append({
-                "transaction_id": transaction.id,
-                "book_title": book.title,
-                "checkout_date": transaction.checkout_date.strftime("%Y-%m-%d"),
-                "due_date": transaction.due_date.strftime("%Y-%m-%d"),
-                "return_date": transaction.return_date.strftime("%Y-%m-%d") if transaction.return_date else None,
-                "fine_amount": transaction.fine_amount
-            })
-        
-        return {"borrowing_history": history}, 200
-    
+
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except Exception as e:
         return {"error": f"An error occurred: {str(e)}"}, 500
 
+    chunk_size = current_app.config['EXPORT_CHUNK_SIZE']
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+        if export_format == 'csv':
+            writer.writeheader()
+        after_key = None
+        while True:
+            rows = _history_page(_loan_query(user_id, lower, upper), after_key, chunk_size)
+            for row in rows:
+                if export_format == 'csv':
+                    writer.writerow(_serialize_history_row(row))
+                else:
+                    buffer.write(json.dumps(_serialize_history_row(row)) + "\n")
+            if buffer.tell():
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if len(rows) < chunk_size:
+                break
+            after_key = (rows[-1].checkout_date, rows[-1].id)
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    return (generate(), content_type, f"borrowing-history-{user_id}.{extension}"), 200
+
 
-def get_checked_out_books_service(user_id):
+def get_checked_out_books_service(user_id, limit=None, cursor=None, start_date=None, end_date=None):
     """
     Retrieve currently checked-out books for a specific user.
-    
+
+    Loans come back soonest due date first, one keyset page at a time.
+
     Arguments:
     - user_id: The ID of the user.
-    
+    - limit: Maximum number of loans to return (defaults to PAGE_SIZE_DEFAULT)
+    - cursor: The next_cursor value returned by the previous page, or None for the first page
+    - start_date, end_date: Optional inclusive checkout date range (YYYY-MM-DD)
+
     Returns:
-    - A tuple containing the list of checked-out books and HTTP status code.
+    - A tuple containing the list of checked-out books and the next cursor, and HTTP status code.
     """
     try:
+        page_size = resolve_page_size(limit)
+        lower, upper = parse_date_range(start_date, end_date)
+
         # Find the user
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return {"error": "User not found"}, 404
-        
-        # Retrieve all active transactions (not returned)
-        transactions = Transaction.query.filter_by(user_id=user_id, return_date=None).all()
-        
-        # Format the results
-        checked_out_books = []
-        for transaction in transactions:
-            book_copy = BookCopy.query.get(transaction.book_copy_id)
-            book = Book.query.get(book_copy.book_id) if book_copy else None
-            checked_out_books.append({
-                "transaction_id": transaction.id,
-                "book_title": book.title if book else "Unknown",
-                "checkout_date": transaction.checkout_date.strftime("%Y-%m-%d"),
-                "due_date": transaction.due_date.strftime("%Y-%m-%d")
-            })
-        
-        return {"checked_out_books": checked_out_books}, 200
-    
+
+        # Active transactions (not returned), served by ix_transaction_user_id_return_date
+        query = _loan_query(user_id, lower, upper).filter(Transaction.return_date.is_(None))
+        if cursor:
+            due_date, transaction_id = decode_cursor(cursor, 2)
+            due_date = cursor_value_to_datetime(due_date)
+            query = query.filter(or_(
+                Transaction.due_date > due_date,
+                and_(Transaction.due_date == due_date, Transaction.id > transaction_id)
+            ))
+        rows = query.order_by(Transaction.due_date, Transaction.id).limit(page_size + 1).all()
+        rows, next_cursor = split_page(rows, page_size,
+                                       lambda row: (datetime_to_cursor_value(row.due_date), row.id))
+
+        checked_out_books = [{
+            "transaction_id": row.id,
+            "book_title": row.book_title or "Unknown",
+            "checkout_date": row.checkout_date.strftime("%Y-%m-%d"),
+            "due_date": row.due_date.strftime("%Y-%m-%d")
+        } for row in rows]
+
+        return {"checked_out_books": checked_out_books, "next_cursor": next_cursor}, 200
+
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except Exception as e:
         return {"error": f"An error occurred: {str(e)}"}, 500
-    
\ No newline at end of file
@@ -0,0 +1,269 @@
+# app/services/catalog_changes.py
+import logging
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from app import db
+from app.models.Book import Book
+from app.models.BookCopy import BookCopy
+from app.services.catalog_version_service import bump_catalog_version
+from app.services.search_cache import bump_catalog_generation
+
+# Tables whose changes alter a catalog response or search result (titles, authors, copies, counts)
+_CATALOG_TABLES = {Book.__table__, BookCopy.__table__}
+
+# app.extensions keys of the in-memory book indexes fed with committed Book changes -> their build functions
+_BOOK_INDEXES = {}
+
+
+class BookIndex:
+    """
+    Base of the in-memory indexes built from every book and kept current with
+    committed Book changes (typeahead suggestions, fuzzy search).
+
+    Subclasses load their contents in load(), ending with _finish_build() under
+    the lock, and apply one change in _apply(). Changes committed while a
+    rebuild reads the books are queued and replayed on the new contents, so
+    none is lost. Until a rebuild swaps in the new contents, the current ones
+    keep being served.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._building = False
+        self._replay = []
+        self.built_at = None
+        self.loaded = threading.Event()  # set once the index has contents to serve
+
+    def begin_build(self):
+        """
+        Mark a rebuild as started; changes applied until load() are replayed on the new contents.
+
+        Returns:
+        - False if another thread is already building the index.
+        """
+        with self._lock:
+            if self._building:
+                return False
+            self._building = True
+            self._replay = []
+            return True
+
+    def abort_build(self):
+        with self._lock:
+            self._building = False
+            self._replay = []
+
+    def _finish_build(self):
+        # Called by load() with the lock held, once the new contents are in place
+        self.built_at = time.monotonic()
+        self.loaded.set()
+        self._building = False
+        replay, self._replay = self._replay, []
+        for change in replay:
+            self._apply(change)
+
+    def apply(self, change):
+        """
+        Apply one committed change: ('upsert', id, title, author), ('delete', id) or ('loan', id).
+        """
+        with self._lock:
+            if self._building:
+                self._replay.append(change)
+            else:
+                self._apply(change)
+
+    def _apply(self, change):
+        raise NotImplementedError
+
+    def is_stale(self, max_age):
+        """
+        Whether the index was never built, or was built more than max_age seconds ago (0: never too old).
+        """
+        return self.built_at is None or bool(max_age and time.monotonic() - self.built_at > max_age)
+
+
+def build_book_index(index, load, wait=True):
+    """
+    Rebuild an index by calling load(index), unless another thread is already rebuilding it
+    (the current contents are served meanwhile).
+
+    Arguments:
+    - index: The BookIndex
+    - load: Function filling the index from the database
+    - wait: False to rebuild in a background thread and return at once
+
+    Returns:
+    - The index.
+    """
+    if not index.begin_build():
+        return index
+    if not wait:
+        threading.Thread(target=_load_in_background, args=(current_app._get_current_object(), index, load),
+                         name=f"{type(index).__name__}-build", daemon=True).start()
+        return index
+    try:
+        load(index)
+    except Exception:
+        index.abort_build()
+        raise
+    return index
+
+
+def _load_in_background(app, index, load):
+    with app.app_context():
+        try:
+            load(index)
+        except Exception:
+            index.abort_build()  # The current contents stay in use; the next use tries again
+            logging.exception(f"Building the {type(index).__name__} failed")
+        finally:
+            db.session.remove()
+
+
+def serve_book_index(index, build, max_age):
+    """
+    Return an index ready for a request, without rebuilding it on the request thread once it has contents.
+
+    An index that was never built (the build started with the first request
+    has not finished, or is turned off) is built, or waited for, once. One
+    older than max_age seconds, or marked for a rebuild after a bulk write,
+    keeps serving its current contents while a background thread rebuilds
+    it, which picks up writes made by other processes (e.g. CLI imports).
+
+    Arguments:
+    - index: The BookIndex
+    - build: Its build function, taking the index and wait
+    - max_age: Seconds before the index is rebuilt (0: only when marked)
+    """
+    while not index.loaded.is_set():
+        build(index)  # Returns at once while another thread builds it
+        index.loaded.wait(0.1)
+    if index.is_stale(max_age):
+        build(index, wait=False)
+    return index
+
+
+def register_book_index(name, build):
+    """
+    Feed the index stored as app.extensions[name] with every committed Book change.
+
+    Arguments:
+    - name: The app.extensions key
+    - build: Its build function, taking the index and wait (used by preload_book_indexes)
+    """
+    _BOOK_INDEXES[name] = build
+
+
+def preload_book_indexes(app):
+    """
+    Build every registered index of the app in background threads, so requests find them ready.
+    """
+    with app.app_context():
+        for name, build in _BOOK_INDEXES.items():
+            index = app.extensions.get(name)
+            if index is not None and not index.loaded.is_set():
+                build(index, wait=False)
+
+
+def queue_book_change(change):
+    """
+    Queue a change for the book indexes, applied once the current transaction commits.
+    """
+    _queue(db.session, change)
+
+
+# One set of session listeners tracks catalog writes for every consumer:
+# - the Book changes themselves, applied to the book indexes after the commit;
+# - a per-transaction "catalog changed" marker, set at most once, which moves the catalog
+#   version inside the transaction (ETags in every process) and the search cache generation
+#   after the commit. Bumping the cache after the commit means a search running concurrently
+#   with the write either sees the new data or stores its result under the old generation.
+#
+# The marker is only set by writes a catalog response can show: books or copies added or
+# deleted, and column values that actually changed. Every column of both tables is shown
+# (book fields and copy counts in search, copies with their rack and availability in the
+# book details), so issuing and returning a copy do move the version, which is what keeps
+# available_copies right; renewals, reservations and writes that leave the values as they
+# were (e.g. an edit saving the same title) do not.
+
+def _queue(session, change):
+    session.info.setdefault('book_changes', []).append(change)
+
+
+def _column_changed(session, obj):
+    # A flushed object is in session.dirty as soon as an attribute was set, even to its old value
+    return session.is_modified(obj, include_collections=False)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_catalog_flush(session, flush_context):
+    if not session.info.get('catalog_changed') and (
+            any(isinstance(obj, (Book, BookCopy)) for obj in (*session.new, *session.deleted)) or
+            any(isinstance(obj, (Book, BookCopy)) and _column_changed(session, obj) for obj in session.dirty)):
+        session.info['catalog_changed'] = True
+    for obj in session.new:
+        if isinstance(obj, Book):
+            _queue(session, ('upsert', obj.id, obj.title, obj.author))
+    for obj in session.dirty:
+        if isinstance(obj, Book) and (inspect(obj).attrs.title.history.has_changes() or
+                                      inspect(obj).attrs.author.history.has_changes()):
+            _queue(session, ('upsert', obj.id, obj.title, obj.author))
+    for obj in session.deleted:
+        if isinstance(obj, Book):
+            _queue(session, ('delete', obj.id))
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _collect_bulk_catalog_writes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is None or table not in _CATALOG_TABLES:
+        return
+    # Bulk INSERT/UPDATE/DELETE statements such as the copy count increments (a loan or return)
+    orm_execute_state.session.info['catalog_changed'] = True
+    # Bulk inserts and deletes of books (e.g. imports) are cheaper to pick up with a rebuild
+    if table is Book.__table__ and (orm_execute_state.is_insert or orm_execute_state.is_delete):
+        _queue(orm_execute_state.session, ('rebuild',))
+
+
+@event.listens_for(db.session, 'before_commit')
+def _bump_catalog_version(session):
+    # Flush first so changes still pending in the session set the marker
+    session.flush()
+    if session.info.get('catalog_changed'):
+        bump_catalog_version(session)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_catalog_changes(session):
+    changes = session.info.pop('book_changes', None)
+    catalog_changed = session.info.pop('catalog_changed', False)
+    if not has_app_context():
+        return
+    # The book indexes are brought up to date before the search cache moves to a new generation
+    if changes:
+        _apply_book_changes(changes)
+    if catalog_changed:
+        bump_catalog_generation()
+
+
+def _apply_book_changes(changes):
+    rebuild = any(change[0] == 'rebuild' for change in changes)
+    for name in _BOOK_INDEXES:
+        index = current_app.extensions.get(name)
+        if index is None:
+            continue
+        if rebuild:
+            index.built_at = None  # Rebuilt in the background on its next use
+            continue
+        for change in changes:
+            index.apply(change)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_catalog_changes(session):
+    session.info.pop('book_changes', None)
+    session.info.pop('catalog_changed', None)
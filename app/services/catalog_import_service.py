@@ -0,0 +1,330 @@
+# app/services/catalog_import_service.py
+import csv
+import io
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert, select
+from app import db
+from app.models.Book import Book
+from app.models.BookCopy import BookCopy
+
+IMPORT_FORMATS = ('csv', 'ndjson', 'mrk')
+
+# Columns every imported record needs (as in POST /api/books)
+REQUIRED_FIELDS = ('title', 'author', 'subject_category', 'publication_date')
+
+# Upper bound on copies per record, so a typo cannot create millions of rows
+MAX_COPIES_PER_RECORD = 1000
+
+
+# Parsers: each yields (line number, raw record dictionary) while reading the stream
+
+def _parse_csv(stream):
+    """
+    Records of a CSV file with a header row (title, author, subject_category,
+    publication_date, and optionally copies and rack_location).
+    """
+    reader = csv.DictReader(stream)
+    missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _parse_ndjson(stream):
+    """
+    Records of a newline-delimited JSON file (one object per line, same keys as the CSV columns).
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else {"_error": "Line is not a JSON object"}
+
+
+_MRK_FIELD = re.compile(r'^=(\d{3}|LDR)  (.*)$')
+
+
+def _mrk_subfields(value):
+    """
+    Split the data of a MARC variable field ("ind1ind2$aValue$bValue") into {code: [values]}.
+    """
+    subfields = {}
+    for part in value[2:].split('$')[1:]:
+        if part:
+            subfields.setdefault(part[0], []).append(part[1:].strip())
+    return subfields
+
+
+def _mrk_record(fields):
+    """
+    Map the fields of one MARC record to an import record:
+    245 $a $b -> title, 100 $a (or 110/700) -> author, 650 $a -> subject_category,
+    264/260 $c -> publication_date (a year becomes January 1st), one copy per 852 field
+    with its $h as rack_location.
+    """
+    def first(tags, code):
+        for tag in tags:
+            for subfields in fields.get(tag, ()):
+                if subfields.get(code):
+                    return subfields[code][0]
+        return None
+
+    title = " ".join(filter(None, (first(('245',), 'a'), first(('245',), 'b'))))
+    record = {
+        "title": title.rstrip(' /:;,.') or None,
+        "author": (first(('100', '110', '700'), 'a') or "").rstrip(' ,.') or None,
+        "subject_category": (first(('650',), 'a') or "").rstrip(' .') or None,
+        "publication_date": first(('264', '260'), 'c'),
+    }
+    date = record["publication_date"]
+    if date and not re.match(r'^\d{4}-\d{2}-\d{2}$', date):
+        year = re.search(r'\d{4}', date)
+        record["publication_date"] = f"{year.group()}-01-01" if year else date
+    holdings = fields.get('852', ())
+    if holdings:
+        record["copies"] = len(holdings)
+        record["rack_location"] = next((h['h'][0] for h in holdings if h.get('h')), None)
+    return record
+
+
+def _parse_mrk(stream):
+    """
+    Records of a MARC mnemonic text file (.mrk, as written by MarcEdit): one
+    "=TAG  data" line per field, records separated by blank lines.
+    """
+    fields, start = {}, None
+    for line_number, line in enumerate(stream, start=1):
+        line = line.rstrip('\r\n')
+        match = _MRK_FIELD.match(line)
+        if not match:
+            if not line.strip():
+                if fields:
+                    yield start, _mrk_record(fields)
+                fields, start = {}, None
+            continue
+        tag, value = match.groups()
+        if tag == 'LDR' and fields:
+            yield start, _mrk_record(fields)
+            fields, start = {}, None
+        if start is None:
+            start = line_number
+        # Control fields (001-009) carry no bibliographic data used here
+        if tag != 'LDR' and tag >= '010':
+            fields.setdefault(tag, []).append(_mrk_subfields(value))
+    if fields:
+        yield start, _mrk_record(fields)
+
+
+_PARSERS = {'csv': _parse_csv, 'ndjson': _parse_ndjson, 'mrk': _parse_mrk}
+
+
+def format_from_filename(filename, default='csv'):
+    """
+    Guess the import format from a file name's extension (.csv, .ndjson or .jsonl, .mrk).
+    """
+    extension = os.path.splitext(filename or "")[1].lower().lstrip('.')
+    extension = {'jsonl': 'ndjson'}.get(extension, extension)
+    return extension if extension in IMPORT_FORMATS else default
+
+
+class CatalogImportError(Exception):
+    """
+    Raised when an import stops on an error (undecodable input, bad header, database
+    error). The chunks committed before it stay imported: `totals` counts them and
+    `line` is the last line read successfully.
+    """
+
+    def __init__(self, error, totals, line):
+        super().__init__(str(error))
+        self.error = error
+        self.totals = totals
+        self.line = line
+
+
+def _clean_record(record):
+    """
+    Validate one raw record.
+
+    Returns:
+    - A tuple (book column values, number of copies, rack location).
+
+    Raises:
+    - ValueError with a message for the import report.
+    """
+    if "_error" in record:
+        raise ValueError(record["_error"])
+    values = {field: str(record.get(field) or "").strip() for field in REQUIRED_FIELDS}
+    missing = [field for field, value in values.items() if not value]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    try:
+        values['publication_date'] = datetime.strptime(values['publication_date'], "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+    # Every copy is shelved somewhere: copies defaults to one when a rack location is given, else none
+    rack_location = str(record.get('rack_location') or "").strip() or None
+    copies = record.get('copies')
+    try:
+        copies = (1 if rack_location else 0) if copies in (None, "") else int(copies)
+    except (TypeError, ValueError):
+        raise ValueError("copies must be a whole number")
+    if not 0 <= copies <= MAX_COPIES_PER_RECORD:
+        raise ValueError(f"copies must be between 0 and {MAX_COPIES_PER_RECORD}")
+    if copies and not rack_location:
+        raise ValueError("rack_location is required for copies")
+    return values, copies, rack_location
+
+
+def _existing_book_keys():
+    """
+    The (title, author, publication_date) of every book already in the catalog,
+    read once so duplicate checks need no query per record.
+    """
+    rows = db.session.execute(select(Book.title, Book.author, Book.publication_date).execution_options(yield_per=10000))
+    return {tuple(row) for row in rows}
+
+
+def _insert_chunk(books):
+    """
+    Insert one chunk of books and their copies (two multi-row INSERTs) without committing.
+
+    Arguments:
+    - books: List of (book column values, copies, rack location)
+    """
+    book_ids = db.session.scalars(
+        insert(Book).returning(Book.id, sort_by_parameter_order=True),
+        [{**values, "barcode": str(uuid.uuid4()), "available_count": copies, "total_count": copies}
+         for values, copies, rack_location in books],
+    ).all()
+    copy_rows = [{"book_id": book_id, "rack_location": rack_location, "is_available": True}
+                 for book_id, (values, copies, rack_location) in zip(book_ids, books) for _ in range(copies)]
+    if copy_rows:
+        db.session.execute(insert(BookCopy), copy_rows)
+    return len(copy_rows)
+
+
+def import_catalog(stream, import_format='csv', progress=None):
+    """
+    Import books and copies from a text stream, reading it incrementally.
+
+    Records are validated, checked against the existing catalog and the
+    records already seen (same title, author and publication date), given
+    barcodes and inserted in chunks of CATALOG_IMPORT_CHUNK_SIZE books, one
+    transaction per chunk. A failed chunk rolls back on its own; the chunks
+    committed before it stay imported.
+
+    Arguments:
+    - stream: A text stream (file, request body wrapped in io.TextIOWrapper, ...)
+    - import_format: 'csv', 'ndjson' or 'mrk'
+    - progress: Optional function called with the running totals after every committed chunk
+
+    Returns:
+    - A dictionary with the totals: records, books and copies imported,
+      duplicates skipped, rejected records and the first errors (line and message).
+
+    Raises:
+    - ValueError if the format is unknown.
+    - CatalogImportError if reading or inserting fails once the import has started
+      (e.g. the CSV header lacks required columns), with the totals reached so far.
+    """
+    if import_format not in _PARSERS:
+        raise ValueError(f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    chunk_size = current_app.config['CATALOG_IMPORT_CHUNK_SIZE']
+    max_errors = current_app.config['CATALOG_IMPORT_MAX_ERRORS']
+
+    totals = {"records": 0, "books": 0, "copies": 0, "duplicates": 0, "rejected": 0, "errors": []}
+    seen = _existing_book_keys()
+    db.session.commit()  # End the read transaction so chunks are not held behind it
+    chunk = []
+    line = 0
+
+    def flush():
+        totals["copies"] += _insert_chunk(chunk)
+        db.session.commit()
+        totals["books"] += len(chunk)
+        chunk.clear()
+        if progress:
+            progress(totals)
+
+    try:
+        for line, record in _PARSERS[import_format](stream):
+            totals["records"] += 1
+            try:
+                values, copies, rack_location = _clean_record(record)
+            except ValueError as e:
+                totals["rejected"] += 1
+                if len(totals["errors"]) < max_errors:
+                    totals["errors"].append({"line": line, "error": str(e)})
+                continue
+            key = (values['title'], values['author'], values['publication_date'])
+            if key in seen:
+                totals["duplicates"] += 1
+                continue
+            seen.add(key)
+            chunk.append((values, copies, rack_location))
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    except Exception as e:
+        db.session.rollback()  # only the chunk in progress; the committed ones stay
+        raise CatalogImportError(e, totals, line) from e
+    return totals
+
+
+def import_failure_response(failure):
+    """
+    The error response for an import that stopped partway, saying how far it got.
+
+    Returns:
+    - A tuple containing the error, the totals imported before it and the HTTP status code.
+    """
+    if isinstance(failure.error, UnicodeDecodeError):
+        message, status = "The file must be UTF-8 encoded", 400
+    elif isinstance(failure.error, ValueError):
+        message, status = str(failure.error), 400
+    else:
+        message, status = f"An error occurred: {str(failure.error)}", 500
+    totals = {key: failure.totals[key] for key in ("records", "books", "copies", "duplicates", "rejected")}
+    if totals["books"]:
+        message += (f" (the import stopped after line {failure.line}; the {totals['books']} books and "
+                    f"{totals['copies']} copies imported before it stay in the catalog)")
+    return {"error": message, "partial": bool(totals["books"]), "line": failure.line, **totals}, status
+
+
+def import_catalog_service(binary_stream, import_format='csv'):
+    """
+    Import a catalog file uploaded to the API.
+
+    Arguments:
+    - binary_stream: The uploaded file or request body (bytes, UTF-8 encoded)
+    - import_format: 'csv', 'ndjson' or 'mrk'
+
+    Returns:
+    - A tuple containing the import totals and HTTP status code
+      (201 when books were added, 200 when there was nothing new). When the
+      import stops on an error, the error response also carries the totals
+      imported before it, with partial set when some books were imported.
+    """
+    stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    try:
+        totals = import_catalog(stream, import_format)
+    except CatalogImportError as e:
+        return import_failure_response(e)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}, 500
+    finally:
+        stream.detach()  # Leave the underlying stream to its owner
+    return totals, 201 if totals["books"] else 200
@@ -0,0 +1,118 @@
+# app/services/catalog_service.py
+from sqlalchemy import case, func, or_
+from app import db
+from app.models.Book import Book
+from app.models.BookCopy import BookCopy
+
+
+def catalog_query():
+    """
+    Build the catalog projection: one row per book with its copy counts.
+
+    The counts are read from the denormalized available_count and total_count
+    columns, so listing the catalog needs no join, GROUP BY or COUNT over
+    book_copy. Only the columns needed by the API are selected (no ORM objects
+    are hydrated).
+
+    Returns:
+    - A SQLAlchemy query that callers can filter, order and execute.
+    """
+    return db.session.query(
+        Book.id,
+        Book.barcode,
+        Book.title,
+        Book.author,
+        Book.subject_category,
+        Book.publication_date,
+        Book.available_count.label('available_copies'),
+        Book.total_count.label('total_copies'),
+    )
+
+
+def adjust_copy_counts(book_id, available=0, total=0):
+    """
+    Apply a change in copies to a book's denormalized counts.
+
+    The columns are incremented in place (SET x = x + n) in the caller's
+    transaction, so the counts commit or roll back together with the copy
+    change and concurrent writers never overwrite each other's update.
+
+    Arguments:
+    - book_id: The id of the book
+    - available: Change in the number of available copies
+    - total: Change in the total number of copies
+    """
+    if not available and not total:
+        return
+    db.session.execute(
+        db.update(Book)
+        .where(Book.id == book_id)
+        .values(available_count=Book.available_count + available, total_count=Book.total_count + total)
+    )
+
+
+def reconcile_copy_counts(repair=True):
+    """
+    Compare every book's stored copy counts with the book_copy table and fix any drift.
+
+    Arguments:
+    - repair: Write the recounted values back (False only reports the drift)
+
+    Returns:
+    - A list of dictionaries (book id, barcode, stored and actual counts) for
+      the books whose counts were wrong.
+    """
+    available = func.count(case((BookCopy.is_available == True, BookCopy.id)))  # noqa: E712
+    total = func.count(BookCopy.id)
+    rows = (
+        db.session.query(
+            Book.id,
+            Book.barcode,
+            Book.available_count,
+            Book.total_count,
+            available.label('actual_available'),
+            total.label('actual_total'),
+        )
+        .outerjoin(BookCopy, BookCopy.book_id == Book.id)
+        .group_by(Book.id)
+        .having(or_(Book.available_count != available, Book.total_count != total))
+        .all()
+    )
+    drift = [{
+        "book_id": row.id,
+        "barcode": row.barcode,
+        "available_count": row.available_count,
+        "total_count": row.total_count,
+        "actual_available": row.actual_available,
+        "actual_total": row.actual_total,
+    } for row in rows]
+
+    if repair and drift:
+        db.session.execute(db.update(Book), [
+            {"id": row["book_id"], "available_count": row["actual_available"], "total_count": row["actual_total"]}
+            for row in drift
+        ])
+        db.session.commit()
+    return drift
+
+
+def serialize_catalog_row(row):
+    """
+    Convert a row from catalog_query() into the JSON shape used by the book endpoints.
+
+    Arguments:
+    - row: A result row from catalog_query()
+
+    Returns:
+    - A dictionary with the book details and its copy counts.
+    """
+    return {
+        "id": row.id,
+        "barcode": row.barcode,
+        "title": row.title,
+        "author": row.author,
+        "subject_category": row.subject_category,
+        "publication_date": row.publication_date.strftime('%Y-%m-%d'),
+        "available_copies": row.available_copies,
+        "total_copies": row.total_copies
+    }
@@ -0,0 +1,32 @@
+# app/services/catalog_version_service.py
+from app import db
+from app.models.CatalogVersion import CatalogVersion
+
+
+def current_catalog_version():
+    """
+    Return the committed catalog version, or None if the counter row is missing.
+
+    This is a single primary key lookup (no ORM objects are loaded), cheap
+    enough to run before deciding whether a response has to be built at all.
+    """
+    return db.session.execute(db.select(CatalogVersion.version).where(CatalogVersion.id == 1)).scalar()
+
+
+def catalog_etag():
+    """
+    Return the entity tag shared by the catalog responses, or None when versions are unavailable.
+    """
+    version = current_catalog_version()
+    return None if version is None else f"catalog-{version}"
+
+
+def bump_catalog_version(session):
+    """
+    Move the catalog version on inside the session's transaction, so every process
+    (and every restart) sees it move together with the data. Called before every
+    commit that changed the catalog (see catalog_changes).
+    """
+    session.execute(
+        db.update(CatalogVersion).where(CatalogVersion.id == 1).values(version=CatalogVersion.version + 1)
+    )
@@ -0,0 +1,171 @@
+# app/services/circulation_sweep_service.py
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, or_
+from app import db
+from app.models.Transaction import Transaction
+from app.models.BookCopy import BookCopy
+from app.models.Book import Book
+from app.models.User import User
+from app.models.SweepState import SweepState
+from app.services.background import start_periodic_task
+from app.services.outbox_service import enqueue_messages, OVERDUE, DUE_SOON
+
+# Names of the persisted sweep cursors
+OVERDUE_SWEEP = 'overdue'
+DUE_SOON_SWEEP = 'due_soon'
+
+
+def _get_sweep_state(name):
+    """
+    Load the cursor row for a sweep, creating it on first use.
+    """
+    state = SweepState.query.filter_by(name=name).first()
+    if state is None:
+        state = SweepState(name=name, last_notified=0)
+        db.session.add(state)
+        db.session.commit()
+    return state
+
+
+def _advance_cursor(state_id, old_key, new_key, now, notified):
+    """
+    Move a sweep cursor from old_key to new_key, but only if no other worker moved it first.
+
+    Returns:
+    - True if this worker owns the chunk, False if the cursor changed underneath it.
+    """
+    cursor_matches = and_(SweepState.cursor_due_date.is_(None), SweepState.cursor_transaction_id.is_(None)) \
+        if old_key is None else \
+        and_(SweepState.cursor_due_date == old_key[0], SweepState.cursor_transaction_id == old_key[1])
+    result = db.session.execute(
+        db.update(SweepState)
+        .where(SweepState.id == state_id, cursor_matches)
+        .values(cursor_due_date=new_key[0], cursor_transaction_id=new_key[1],
+                last_run_at=now, last_notified=notified)
+    )
+    return result.rowcount == 1
+
+
+def _run_sweep(name, upper_bound, kind, now, lower_bound=None, chunk_size=None):
+    """
+    Queue notifications for open loans whose due date passed a threshold since the last run.
+
+    Loans are visited in (due_date, id) order starting after the persisted cursor,
+    so a run only reads the loans that changed state since the previous run. Each
+    chunk is one joined query, one bulk outbox insert, and a compare-and-set of
+    the cursor committed together: a crash loses no notifications and two
+    concurrent workers never queue the same loan twice. Delivery is left to the
+    outbox dispatcher.
+
+    Arguments:
+    - name: The sweep name (key of its SweepState row)
+    - upper_bound: Loans due before this time are in scope
+    - kind: The outbox message kind to queue
+    - now: The reference time
+    - lower_bound: Loans due before this time are skipped (the cursor still moves past them)
+    - chunk_size: Loans per chunk (defaults to OVERDUE_SWEEP_CHUNK_SIZE)
+
+    Returns:
+    - The number of notifications queued.
+    """
+    chunk_size = chunk_size or current_app.config['OVERDUE_SWEEP_CHUNK_SIZE']
+    state = _get_sweep_state(name)
+    state_id = state.id
+    last_key = (state.cursor_due_date, state.cursor_transaction_id) if state.cursor_due_date else None
+
+    query = (
+        db.session.query(
+            Transaction.id,
+            Transaction.due_date,
+            User.id.label('user_id'),
+            Book.id.label('book_id'),
+        )
+        .outerjoin(User, User.id == Transaction.user_id)
+        .outerjoin(BookCopy, BookCopy.id == Transaction.book_copy_id)
+        .outerjoin(Book, Book.id == BookCopy.book_id)
+        .filter(Transaction.due_date < upper_bound, Transaction.return_date.is_(None))
+        .order_by(Transaction.due_date, Transaction.id)
+    )
+
+    notified = 0
+    while True:
+        chunk_query = query
+        if last_key:
+            # Keyset on (due_date, id) so every chunk is an index range scan
+            chunk_query = chunk_query.filter(or_(
+                Transaction.due_date > last_key[0],
+                and_(Transaction.due_date == last_key[0], Transaction.id > last_key[1])
+            ))
+        rows = chunk_query.limit(chunk_size).all()
+        if not rows:
+            break
+
+        notifications = [{
+            "kind": kind,
+            "user_id": row.user_id,
+            "book_id": row.book_id,
+            "transaction_id": row.id,
+            # A renewal moves the due date, which makes the loan eligible again
+            "dedup_key": f"{kind}:{row.id}:{row.due_date.strftime('%Y%m%d%H%M%S')}",
+        } for row in rows
+            if row.user_id and row.book_id and (lower_bound is None or row.due_date >= lower_bound)]
+
+        new_key = (rows[-1].due_date, rows[-1].id)
+        if not _advance_cursor(state_id, last_key, new_key, now, notified + len(notifications)):
+            # Another worker already handled this range
+            db.session.rollback()
+            break
+        enqueue_messages(notifications, now)
+        db.session.commit()
+
+        notified += len(notifications)
+        last_key = new_key
+
+    # Record the run even when nothing was due
+    db.session.execute(
+        db.update(SweepState).where(SweepState.id == state_id).values(last_run_at=now, last_notified=notified)
+    )
+    db.session.commit()
+    return notified
+
+
+def run_circulation_sweep(now=None, chunk_size=None):
+    """
+    Run the overdue and due-soon sweeps once.
+
+    Arguments:
+    - now: The reference time (defaults to the current UTC time)
+    - chunk_size: Loans per chunk (defaults to OVERDUE_SWEEP_CHUNK_SIZE)
+
+    Returns:
+    - A dictionary with the number of notifications queued by each sweep.
+    """
+    now = now or datetime.utcnow()
+    overdue = _run_sweep(OVERDUE_SWEEP, now, OVERDUE, now, chunk_size=chunk_size)
+    # Loans that became overdue before the reminder was sent only get the overdue notice
+    due_soon = _run_sweep(DUE_SOON_SWEEP, now + current_app.config['DUE_SOON_WINDOW'],
+                          DUE_SOON, now, lower_bound=now, chunk_size=chunk_size)
+    return {"overdue": overdue, "due_soon": due_soon}
+
+
+def last_sweep_time():
+    """
+    Return when the overdue sweep last ran, or None if it never ran.
+    """
+    return db.session.query(SweepState.last_run_at).filter_by(name=OVERDUE_SWEEP).scalar()
+
+
+def start_circulation_scheduler(app, interval=None):
+    """
+    Run the circulation sweep periodically in a daemon thread.
+
+    Arguments:
+    - app: The Flask app
+    - interval: Seconds between runs (defaults to CIRCULATION_SWEEP_INTERVAL)
+
+    Returns:
+    - A threading.Event; set it to stop the scheduler.
+    """
+    return start_periodic_task(app, 'circulation-sweep', run_circulation_sweep,
+                               interval or app.config['CIRCULATION_SWEEP_INTERVAL'])
@@ -0,0 +1,100 @@
+# app/services/dashboard_service.py
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import case, func, select, true
+from app import db
+from app.models.Book import Book
+from app.models.Reservation import Reservation
+from app.models.Transaction import Transaction
+from app.models.User import User
+
+
+class SummaryCache:
+    """
+    Holds the last dashboard summary for a few seconds.
+
+    A single lock makes concurrent requests on an expired entry wait for one
+    computation instead of all running the aggregate query.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, compute):
+        """
+        Return the cached summary, computing and storing it when missing or expired.
+        """
+        with self._lock:
+            if self._value is None or self._expires_at <= time.monotonic():
+                self._value = compute()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._value
+
+    def clear(self):
+        with self._lock:
+            self._value = None
+
+
+def init_dashboard_summary(app):
+    """
+    Attach a SummaryCache kept for DASHBOARD_SUMMARY_TTL seconds.
+    """
+    app.extensions['dashboard_summary'] = SummaryCache(app.config['DASHBOARD_SUMMARY_TTL'])
+
+
+def compute_dashboard_summary():
+    """
+    Count the librarian dashboard figures in a single statement.
+
+    The statement joins one-row aggregates: book totals in one pass over book
+    (copy totals are summed from its denormalized counts, no join over
+    book_copy), open and overdue loans in one pass over the unreturned loans,
+    plus the pending reservations and members.
+
+    Returns:
+    - A dictionary of the summary figures.
+    """
+    now = datetime.utcnow()
+    books = select(
+        func.count(Book.id).label('total_titles'),
+        func.coalesce(func.sum(Book.total_count), 0).label('total_copies'),
+        func.coalesce(func.sum(Book.available_count), 0).label('available_copies'),
+    ).subquery()
+    loans = select(
+        func.count(Transaction.id).label('active_loans'),
+        func.count(case((Transaction.due_date < now, 1))).label('overdue_loans'),
+    ).where(Transaction.return_date.is_(None)).subquery()
+    statement = select(
+        books,
+        loans,
+        select(func.count(Reservation.id)).where(Reservation.status == 'Pending')
+        .scalar_subquery().label('pending_reservations'),
+        select(func.count(User.id)).where(User.role == 'Member').scalar_subquery().label('registered_members'),
+    ).select_from(books.join(loans, true()))  # both are single rows
+    row = db.session.execute(statement).one()
+    summary = dict(row._mapping)
+    summary["generated_at"] = now.strftime("%Y-%m-%d %H:%M:%S")
+    return summary
+
+
+def dashboard_summary_service():
+    """
+    Return the librarian dashboard summary, served from a short-lived cache.
+
+    The figures may be up to DASHBOARD_SUMMARY_TTL seconds old; generated_at
+    tells when they were counted.
+
+    Returns:
+    - A tuple containing the response and HTTP status code.
+    """
+    try:
+        cache = current_app.extensions['dashboard_summary']
+        return cache.get_or_compute(compute_dashboard_summary), 200
+    except Exception as e:
+        db.session.rollback()
+        return {"error": f"An error occurred: {str(e)}"}, 500
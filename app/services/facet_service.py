@@ -0,0 +1,94 @@
+# app/services/facet_service.py
+from sqlalchemy import and_, func, literal, select, union_all
+from app import db
+from app.models.Book import Book, publication_decade
+
+# Facet name -> the (indexed) expression its books are grouped and filtered by
+FACET_EXPRESSIONS = {
+    'subject_category': Book.subject_category,
+    'author': Book.author,
+    'decade': publication_decade,
+}
+
+
+def parse_facet_filters(query_params):
+    """
+    Read the multi-valued facet filters (facet_subject_category, facet_author, facet_decade).
+
+    Arguments:
+    - query_params: Dictionary of search parameters; each facet filter is a list or tuple of values
+
+    Returns:
+    - A dictionary of facet name -> tuple of selected values (facets without a selection are left out).
+
+    Raises:
+    - ValueError if a decade is not a year divisible by 10.
+    """
+    filters = {}
+    for name in FACET_EXPRESSIONS:
+        values = query_params.get(f'facet_{name}') or ()
+        if isinstance(values, str):
+            values = (values,)
+        values = tuple(value for value in values if value not in (None, ""))
+        if not values:
+            continue
+        if name == 'decade':
+            try:
+                values = tuple(int(value) for value in values)
+            except (TypeError, ValueError):
+                raise ValueError("facet_decade must be a year such as 1990")
+            if any(value % 10 for value in values):
+                raise ValueError("facet_decade must be a year such as 1990")
+        filters[name] = values
+    return filters
+
+
+def apply_facet_filters(query, filters, skip=None):
+    """
+    Restrict a book query to the selected facet values.
+
+    Values of one facet are alternatives (OR); different facets must all match (AND).
+
+    Arguments:
+    - query: A query over the book table
+    - filters: Facet name -> selected values, as returned by parse_facet_filters
+    - skip: A facet whose selection is ignored (used when counting that facet)
+    """
+    conditions = [FACET_EXPRESSIONS[name].in_(values) for name, values in filters.items() if name != skip]
+    return query.filter(and_(*conditions)) if conditions else query
+
+
+def facet_counts(query, filters, limit):
+    """
+    Count the books matching a search per subject category, author and decade,
+    in a single statement (one grouped aggregate per facet, UNION ALL).
+
+    Each facet is counted with the selections of the other facets applied but
+    not its own, so the counts show what adding a value to the selection would
+    return (disjunctive faceting).
+
+    Arguments:
+    - query: The filtered search query, before facet filters, ordering and paging
+    - filters: Facet name -> selected values
+    - limit: Maximum number of values per facet (the most frequent first)
+
+    Returns:
+    - A dictionary of facet name -> list of {"value", "count"} dictionaries.
+    """
+    branches = []
+    for name, expression in FACET_EXPRESSIONS.items():
+        count = func.count().label('count')
+        grouped = (
+            apply_facet_filters(query, filters, skip=name)
+            .with_entities(literal(name).label('facet'), expression.label('value'), count)
+            .group_by(expression)
+            .order_by(count.desc(), expression)
+            .limit(limit)
+            .subquery()
+        )
+        branches.append(select(grouped.c.facet, grouped.c.value, grouped.c['count']))
+
+    facets = {name: [] for name in FACET_EXPRESSIONS}
+    for facet, value, count in db.session.execute(union_all(*branches)):
+        facets[facet].append({"value": int(value) if facet == 'decade' else value, "count": count})
+    return facets
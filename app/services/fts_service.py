@@ -0,0 +1,168 @@
+# app/services/fts_service.py
+import re
+from sqlalchemy import event, text, Float, Integer
+from app import db
+from app.models.Book import Book
+
+# Columns of the book table mirrored into the full-text index
+FTS_COLUMNS = ('title', 'author', 'subject_category')
+
+# Cache of "does this database have a usable book_fts table", keyed by engine URL
+_fts_ready = {}
+
+_CREATE_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5(
+        title, author, subject_category,
+        content='book', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Keep the index in sync with every write to book, including bulk inserts
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN
+        INSERT INTO book_fts(rowid, title, author, subject_category)
+        VALUES (new.id, new.title, new.author, new.subject_category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, subject_category)
+        VALUES ('delete', old.id, old.title, old.author, old.subject_category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE OF title, author, subject_category ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, subject_category)
+        VALUES ('delete', old.id, old.title, old.author, old.subject_category);
+        INSERT INTO book_fts(rowid, title, author, subject_category)
+        VALUES (new.id, new.title, new.author, new.subject_category);
+    END
+    """,
+]
+
+
+def sqlite_supports_fts5(connection):
+    """
+    Check whether the connection is SQLite built with the FTS5 extension.
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+    return bool(connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def create_book_fts(connection):
+    """
+    Create the book_fts index and its sync triggers, then fill it from the book table.
+
+    Does nothing on engines without FTS5.
+
+    Arguments:
+    - connection: An open SQLAlchemy connection
+
+    Returns:
+    - True if the index was created, False otherwise.
+    """
+    if not sqlite_supports_fts5(connection):
+        return False
+    for statement in _CREATE_STATEMENTS:
+        connection.execute(text(statement))
+    connection.execute(text("INSERT INTO book_fts(book_fts) VALUES ('rebuild')"))
+    _fts_ready.pop(str(connection.engine.url), None)
+    return True
+
+
+def drop_book_fts(connection):
+    """
+    Drop the book_fts index and its triggers if they exist.
+
+    Arguments:
+    - connection: An open SQLAlchemy connection
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    for trigger in ('book_fts_ai', 'book_fts_ad', 'book_fts_au'):
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    connection.execute(text("DROP TABLE IF EXISTS book_fts"))
+    _fts_ready.pop(str(connection.engine.url), None)
+
+
+def rebuild_book_fts():
+    """
+    (Re)create the book_fts index for the current database and repopulate it.
+
+    Returns:
+    - True if the index is available after the rebuild, False if the engine has no FTS5.
+    """
+    with db.engine.begin() as connection:
+        drop_book_fts(connection)
+        return create_book_fts(connection)
+
+
+def fts_enabled():
+    """
+    Return True if the current database has a book_fts table to search against.
+
+    The answer is cached per engine so the hot search path does not hit sqlite_master.
+    """
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _fts_ready:
+        with engine.connect() as connection:
+            _fts_ready[key] = sqlite_supports_fts5(connection) and connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'book_fts'")
+            ).first() is not None
+    return _fts_ready[key]
+
+
+def build_match_expression(query_params):
+    """
+    Turn the text search parameters into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, scoped to its column, and all
+    terms must match (e.g. title=great gats -> title : ("great"* AND "gats"*)).
+
+    Arguments:
+    - query_params: Dictionary of search parameters
+
+    Returns:
+    - The MATCH expression, or None if no text parameter was given or a parameter
+      has no searchable words (the caller should fall back to ilike filtering).
+    """
+    clauses = []
+    for column in FTS_COLUMNS:
+        value = query_params.get(column)
+        if not value:
+            continue
+        words = re.findall(r"\w+", value.lower())
+        if not words:
+            return None
+        terms = " AND ".join(f'"{word}"*' for word in words)
+        clauses.append(f"{column} : ({terms})")
+    return " AND ".join(clauses) or None
+
+
+def fts_matches(match_expression):
+    """
+    Subquery of (rowid, rank) for books matching the expression.
+
+    FTS5's rank column is the BM25 score, where lower is a better match, so callers
+    should order ascending. The ORDER BY also stops SQLite from flattening the
+    subquery into the outer join, where the rank function cannot be evaluated.
+    """
+    return (
+        text("SELECT rowid, rank FROM book_fts WHERE book_fts MATCH :match ORDER BY rank")
+        .bindparams(match=match_expression)
+        .columns(rowid=Integer, rank=Float)
+        .subquery('book_fts_matches')
+    )
+
+
+@event.listens_for(Book.__table__, 'after_create')
+def _create_book_fts_after_create(target, connection, **kw):
+    create_book_fts(connection)
+
+
+@event.listens_for(Book.__table__, 'before_drop')
+def _drop_book_fts_before_drop(target, connection, **kw):
+    drop_book_fts(connection)
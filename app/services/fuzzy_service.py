@@ -0,0 +1,200 @@
+# app/services/fuzzy_service.py
+from collections import Counter
+from flask import current_app
+from app import db
+from app.models.Book import Book
+from app.services.catalog_changes import BookIndex, build_book_index, register_book_index, serve_book_index
+from app.services.suggest_service import tokenize
+
+# Book fields searched by fuzzy mode
+FUZZY_FIELDS = ('title', 'author')
+
+
+def word_trigrams(word):
+    """
+    Trigrams of a word padded like pg_trgm ("  w", " wo", ..., "rd "), so short
+    words and word starts weigh more than the middle of long words.
+    """
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to the distinct words of one book field.
+
+    Misspellings are matched word by word: the words sharing trigrams with a
+    query word are counted from the postings, scored by trigram similarity
+    (shared / union, as pg_trgm's similarity()), and mapped to their books.
+    Indexing the vocabulary rather than the books keeps the postings small.
+    """
+
+    def __init__(self):
+        self._trigram_words = {}   # trigram -> set of words
+        self._word_trigrams = {}   # word -> trigrams
+        self._word_books = {}      # word -> set of book ids
+        self._book_words = {}      # book id -> distinct words
+
+    def add(self, book_id, text):
+        words = frozenset(tokenize(text or ""))
+        self._book_words[book_id] = words
+        for word in words:
+            books = self._word_books.get(word)
+            if books is None:
+                books = self._word_books[word] = set()
+                trigrams = self._word_trigrams[word] = word_trigrams(word)
+                for trigram in trigrams:
+                    self._trigram_words.setdefault(trigram, set()).add(word)
+            books.add(book_id)
+
+    def remove(self, book_id):
+        for word in self._book_words.pop(book_id, ()):
+            books = self._word_books[word]
+            books.discard(book_id)
+            if books:
+                continue
+            del self._word_books[word]
+            for trigram in self._word_trigrams.pop(word):
+                words = self._trigram_words[trigram]
+                words.discard(word)
+                if not words:
+                    del self._trigram_words[trigram]
+
+    def similar_words(self, word, threshold):
+        """
+        Return {indexed word: similarity} for the words at least `threshold` similar to word.
+        """
+        trigrams = word_trigrams(word)
+        shared = Counter()
+        for trigram in trigrams:
+            shared.update(self._trigram_words.get(trigram, ()))
+        similar = {}
+        for candidate, count in shared.items():
+            score = count / (len(trigrams) + len(self._word_trigrams[candidate]) - count)
+            if score >= threshold:
+                similar[candidate] = score
+        return similar
+
+    def search(self, text, threshold):
+        """
+        Score books against a possibly misspelled text.
+
+        A book's score is the mean, over the query words, of the similarity of the
+        closest word in the book (0 when none is similar enough).
+
+        Returns:
+        - A dictionary {book id: score} of the books scoring at least threshold.
+        """
+        query_words = set(tokenize(text))
+        if not query_words:
+            return {}
+        totals = {}
+        for word in query_words:
+            best = {}
+            for candidate, score in self.similar_words(word, threshold).items():
+                for book_id in self._word_books[candidate]:
+                    if score > best.get(book_id, 0):
+                        best[book_id] = score
+            for book_id, score in best.items():
+                totals[book_id] = totals.get(book_id, 0) + score
+        return {book_id: total / len(query_words) for book_id, total in totals.items()
+                if total / len(query_words) >= threshold}
+
+    def stats(self):
+        return {"books": len(self._book_words), "words": len(self._word_books), "trigrams": len(self._trigram_words)}
+
+
+class FuzzyIndex(BookIndex):
+    """
+    Trigram indexes of the fuzzy-searchable book fields, updated as books change.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._fields = {field: TrigramIndex() for field in FUZZY_FIELDS}
+
+    def load(self, books):
+        """
+        Replace the index contents.
+
+        Arguments:
+        - books: Iterable of (book id, title, author)
+        """
+        fields = {field: TrigramIndex() for field in FUZZY_FIELDS}
+        for book_id, title, author in books:
+            fields['title'].add(book_id, title)
+            fields['author'].add(book_id, author)
+
+        with self._lock:
+            self._fields = fields
+            self._finish_build()
+
+    def _apply(self, change):
+        if change[0] not in ('upsert', 'delete'):
+            return  # loans do not change titles or authors
+        for index in self._fields.values():
+            index.remove(change[1])
+        if change[0] == 'upsert':
+            self._fields['title'].add(change[1], change[2])
+            self._fields['author'].add(change[1], change[3])
+
+    def search(self, threshold, **texts):
+        """
+        Score books against misspelled field values.
+
+        Arguments:
+        - threshold: Minimum similarity, per field, for a book to match
+        - texts: Field name -> text, for the fields in FUZZY_FIELDS that were searched
+
+        Returns:
+        - A dictionary {book id: score}, the score being the mean of the field scores.
+        """
+        with self._lock:
+            field_scores = [self._fields[field].search(text, threshold) for field, text in texts.items()]
+        if not field_scores:
+            return {}
+        # Every searched field has to match
+        book_ids = set(field_scores[0]).intersection(*field_scores[1:])
+        return {book_id: sum(scores[book_id] for scores in field_scores) / len(field_scores)
+                for book_id in book_ids}
+
+    def stats(self):
+        with self._lock:
+            return {field: index.stats() for field, index in self._fields.items()}
+
+
+def build_fuzzy_index(index=None, wait=True):
+    """
+    Load every book's title and author into a fuzzy index (one query).
+
+    Arguments:
+    - index: The FuzzyIndex to fill (defaults to the current app's index)
+    - wait: False to build it in a background thread (the current contents are served meanwhile)
+
+    Returns:
+    - The filled index.
+    """
+    def load(target):
+        target.load(db.session.query(Book.id, Book.title, Book.author).yield_per(5000))
+
+    return build_book_index(index or current_app.extensions['fuzzy_index'], load, wait)
+
+
+def init_fuzzy_index(app):
+    """
+    Attach an empty fuzzy index to the app; it is built from the database in the
+    background when the app handles its first request (or by the first use).
+    """
+    app.extensions['fuzzy_index'] = FuzzyIndex()
+    register_book_index('fuzzy_index', build_fuzzy_index)
+
+
+def get_fuzzy_index():
+    """
+    Return the current app's fuzzy index. It is rebuilt in the background once
+    older than FUZZY_INDEX_MAX_AGE (which picks up writes made by other
+    processes, e.g. CLI imports), serving its current contents meanwhile; see
+    serve_book_index.
+    """
+    return serve_book_index(current_app.extensions['fuzzy_index'], build_fuzzy_index,
+                            current_app.config['FUZZY_INDEX_MAX_AGE'])
@@ -0,0 +1,290 @@
+# app/services/outbox_service.py
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from flask import current_app
+from sqlalchemy import String, cast, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.OutboxMessage import OutboxMessage
+from app.models.Reservation import Reservation
+from app.models.Transaction import Transaction
+from app.models.Book import Book
+from app.models.User import User
+from app.services.background import start_periodic_task
+
+# Kinds of notification intents
+RESERVATION_AVAILABLE = 'reservation_available'
+OVERDUE = 'overdue'
+DUE_SOON = 'due_soon'
+
+
+def _insert_ignoring_duplicates():
+    """
+    INSERT into the outbox that silently skips rows whose dedup_key is already queued.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite.insert(OutboxMessage).on_conflict_do_nothing(index_elements=['dedup_key'])
+    if dialect == 'postgresql':
+        return postgresql.insert(OutboxMessage).on_conflict_do_nothing(index_elements=['dedup_key'])
+    return db.insert(OutboxMessage).prefix_with('IGNORE')  # MySQL
+
+
+def enqueue_messages(entries, now=None):
+    """
+    Queue notification intents in the caller's transaction (the caller commits).
+
+    Arguments:
+    - entries: Iterable of dictionaries with kind, user_id, dedup_key and
+      optionally book_id and transaction_id
+    - now: The reference time (defaults to the current UTC time)
+
+    Returns:
+    - The number of intents passed in (duplicates are skipped by the database).
+    """
+    now = now or datetime.utcnow()
+    rows = [{
+        "kind": entry["kind"],
+        "user_id": entry["user_id"],
+        "book_id": entry.get("book_id"),
+        "transaction_id": entry.get("transaction_id"),
+        "dedup_key": entry["dedup_key"],
+        "status": 'Pending',
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    } for entry in entries]
+    if rows:
+        db.session.execute(_insert_ignoring_duplicates(), rows)
+    return len(rows)
+
+
+def enqueue_reservation_available(book_ids, event, now=None):
+    """
+    Queue a "reservation available" notice for every pending hold on the given books.
+
+    This is one INSERT ... SELECT, whatever the number of holds, and runs in the
+    caller's transaction so the notice is queued if and only if the circulation
+    change commits. A reservation is notified once per availability event, so a
+    holder who missed one copy is told again when the next one comes back.
+
+    Arguments:
+    - book_ids: The ids of the books that became available
+    - event: What made them available, unique per occurrence (e.g. "return:<transaction id>")
+    - now: The reference time (defaults to the current UTC time)
+    """
+    now = now or datetime.utcnow()
+    holds = db.select(
+        literal(RESERVATION_AVAILABLE),
+        Reservation.user_id,
+        Reservation.book_id,
+        literal(f"{RESERVATION_AVAILABLE}:") + cast(Reservation.id, String) + literal(f":{event}"),
+        literal('Pending'),
+        literal(0),
+        literal(now),
+        literal(now),
+    ).where(Reservation.book_id.in_(book_ids), Reservation.status == 'Pending')
+    db.session.execute(_insert_ignoring_duplicates().from_select(
+        ['kind', 'user_id', 'book_id', 'dedup_key', 'status', 'attempts', 'next_attempt_at', 'created_at'],
+        holds
+    ))
+
+
+def render_message(message, now):
+    """
+    Build the subject and body for a claimed outbox row.
+
+    Arguments:
+    - message: A row with kind, user_name, book_title and due_date
+    - now: The reference time
+
+    Returns:
+    - A tuple (subject, body).
+    """
+    if message.kind == OVERDUE:
+        days_overdue = (now - message.due_date).days
+        return "Overdue Book Notification", f"Dear {message.user_name},\n\nThe book '{message.book_title}' is overdue by {days_overdue} days. Please return it as soon as possible to avoid further fines.\n\nThank you!"
+    if message.kind == DUE_SOON:
+        return "Book Due Soon", f"Dear {message.user_name},\n\nThe book '{message.book_title}' is due on {message.due_date.strftime('%Y-%m-%d')}. Please return or renew it before then to avoid fines.\n\nThank you!"
+    return "Book Reservation Available", f"Dear {message.user_name},\n\nThe book '{message.book_title}' you reserved is now available. Please check it out soon.\n\nThank you!"
+
+
+def _open_smtp():
+    """
+    Connect to the configured SMTP server, or return None when email is disabled.
+    """
+    config = current_app.config
+    if not config.get('MAIL_SERVER'):
+        return None
+    smtp = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT'])
+    if config.get('MAIL_USE_TLS'):
+        smtp.starttls()
+    if config.get('MAIL_USERNAME'):
+        smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+    return smtp
+
+
+def _email(message, subject, body):
+    email = EmailMessage()
+    email['From'] = current_app.config['MAIL_SENDER']
+    email['To'] = message.user_email
+    email['Subject'] = subject
+    # Stable id so a redelivered message (e.g. after a crash before commit) can be deduplicated downstream
+    email['Message-ID'] = f"<outbox-{message.id}@{current_app.config['MAIL_SENDER'].split('@')[-1]}>"
+    email.set_content(body)
+    return email
+
+
+def dispatch_outbox_batch(now=None, batch_size=None):
+    """
+    Deliver one batch of pending notification intents.
+
+    The batch is claimed with a single UPDATE that pushes next_attempt_at past the
+    claim timeout, so concurrent workers never pick the same message and a
+    crashed worker's batch becomes due again by itself. Every message gets an
+    in-app notification and, when MAIL_SERVER is set, an email sent over one
+    SMTP connection. The in-app notification is written on the first attempt
+    (recorded in notified_at, in the same commit, so it is written once) and
+    does not wait for the email; failed emails are retried with exponential
+    backoff up to OUTBOX_MAX_ATTEMPTS.
+
+    Arguments:
+    - now: The reference time (defaults to the current UTC time)
+    - batch_size: Messages per batch (defaults to OUTBOX_BATCH_SIZE)
+
+    Returns:
+    - A dictionary with the number of messages claimed, sent, retried and failed.
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    batch_size = batch_size or config['OUTBOX_BATCH_SIZE']
+    token = uuid.uuid4().hex
+    due = db.and_(OutboxMessage.status == 'Pending', OutboxMessage.next_attempt_at <= now)
+
+    # Claim (the outer `due` check makes the claim safe when two workers race)
+    batch_ids = db.select(OutboxMessage.id).where(due).order_by(OutboxMessage.id).limit(batch_size)
+    db.session.execute(
+        db.update(OutboxMessage)
+        .where(OutboxMessage.id.in_(batch_ids.scalar_subquery()), due)
+        .values(claim_token=token, next_attempt_at=now + timedelta(seconds=config['OUTBOX_CLAIM_TIMEOUT']))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    messages = (
+        db.session.query(
+            OutboxMessage.id,
+            OutboxMessage.kind,
+            OutboxMessage.user_id,
+            OutboxMessage.attempts,
+            OutboxMessage.notified_at,
+            User.name.label('user_name'),
+            User.email.label('user_email'),
+            Book.title.label('book_title'),
+            Transaction.due_date,
+        )
+        .outerjoin(User, User.id == OutboxMessage.user_id)
+        .outerjoin(Book, Book.id == OutboxMessage.book_id)
+        .outerjoin(Transaction, Transaction.id == OutboxMessage.transaction_id)
+        .filter(OutboxMessage.claim_token == token)
+        .order_by(OutboxMessage.id)
+        .all()
+    )
+    counts = {"claimed": len(messages), "sent": 0, "retried": 0, "failed": 0}
+    if not messages:
+        return counts
+
+    smtp = None
+    connect_error = None
+    try:
+        smtp = _open_smtp()
+    except (OSError, smtplib.SMTPException) as e:
+        connect_error = e
+
+    updates = []
+    notifications = []
+    try:
+        for message in messages:
+            if message.user_name is None:
+                # The user was deleted after the intent was queued
+                updates.append({"id": message.id, "status": 'Failed', "attempts": message.attempts + 1,
+                                "last_error": "User not found", "claim_token": None})
+                counts["failed"] += 1
+                continue
+            if message.kind in (OVERDUE, DUE_SOON) and message.due_date is None:
+                # The loan the notice is about no longer exists, so there is nothing to render
+                updates.append({"id": message.id, "status": 'Failed', "attempts": message.attempts + 1,
+                                "last_error": "Loan not found", "claim_token": None})
+                counts["failed"] += 1
+                continue
+
+            subject, body = render_message(message, now)
+            error = connect_error
+            if smtp is not None:
+                try:
+                    smtp.send_message(_email(message, subject, body))
+                except (OSError, smtplib.SMTPException) as e:
+                    error = e
+
+            attempts = message.attempts + 1
+            if error is None or attempts >= config['OUTBOX_MAX_ATTEMPTS']:
+                update = {"id": message.id, "status": 'Sent' if error is None else 'Failed',
+                          "attempts": attempts, "sent_at": now, "claim_token": None,
+                          "last_error": None if error is None else str(error)}
+                counts["sent" if error is None else "failed"] += 1
+            else:
+                backoff = config['OUTBOX_RETRY_BACKOFF'] * 2 ** (attempts - 1)
+                update = {"id": message.id, "attempts": attempts, "claim_token": None,
+                          "next_attempt_at": now + timedelta(seconds=backoff), "last_error": str(error)}
+                counts["retried"] += 1
+            if message.notified_at is None:
+                # The user gets the in-app notification right away, whatever happens to the email
+                notifications.append((message.user_id, subject, body, message.book_title))
+                update["notified_at"] = now
+            updates.append(update)
+    finally:
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+
+    User.add_notifications_bulk(notifications)
+    # Rows have different sets of changed columns, so group them for executemany
+    for keys in {tuple(sorted(update)) for update in updates}:
+        db.session.execute(db.update(OutboxMessage), [u for u in updates if tuple(sorted(u)) == keys])
+    db.session.commit()
+    return counts
+
+
+def drain_outbox(now=None, batch_size=None):
+    """
+    Dispatch batches until no pending message is due.
+
+    Returns:
+    - A dictionary with the total number of messages sent, retried and failed.
+    """
+    totals = {"sent": 0, "retried": 0, "failed": 0}
+    while True:
+        counts = dispatch_outbox_batch(now, batch_size)
+        if not counts["claimed"]:
+            return totals
+        for key in totals:
+            totals[key] += counts[key]
+
+
+def start_outbox_dispatcher(app, interval=None):
+    """
+    Drain the outbox periodically in a daemon thread.
+
+    Arguments:
+    - app: The Flask app
+    - interval: Seconds between runs (defaults to OUTBOX_DISPATCH_INTERVAL)
+
+    Returns:
+    - A threading.Event; set it to stop the dispatcher.
+    """
+    return start_periodic_task(app, 'outbox-dispatcher', drain_outbox,
+                               interval or app.config['OUTBOX_DISPATCH_INTERVAL'])
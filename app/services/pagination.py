@@ -0,0 +1,91 @@
+# app/services/pagination.py
+import base64
+import json
+from datetime import datetime, timedelta
+from flask import current_app
+
+
+def resolve_page_size(limit):
+    """
+    Work out how many rows a page should hold.
+
+    Arguments:
+    - limit: The limit requested by the client, or None for the default
+
+    Returns:
+    - The page size, capped at PAGE_SIZE_MAX.
+
+    Raises:
+    - ValueError if the limit is not a positive integer.
+    """
+    if limit is None:
+        return current_app.config['PAGE_SIZE_DEFAULT']
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, current_app.config['PAGE_SIZE_MAX'])
+
+# Reference point for encoding datetimes into cursors
+_CURSOR_EPOCH = datetime(1970, 1, 1)
+
+
+def datetime_to_cursor_value(value):
+    """
+    Convert a naive UTC datetime into integer microseconds so it round-trips exactly through a cursor.
+    """
+    return (value - _CURSOR_EPOCH) // timedelta(microseconds=1)
+
+
+def cursor_value_to_datetime(value):
+    """
+    Inverse of datetime_to_cursor_value().
+    """
+    return _CURSOR_EPOCH + timedelta(microseconds=value)
+
+
+def encode_cursor(*values):
+    """
+    Encode the sort key of the last row on a page into an opaque cursor string.
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Arguments:
+    - cursor: The cursor string sent by the client
+    - size: The number of sort key values the cursor must contain
+
+    Returns:
+    - A list with the decoded sort key values.
+
+    Raises:
+    - ValueError if the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if (not isinstance(values, list) or len(values) != size
+            or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def split_page(rows, page_size, cursor_values):
+    """
+    Trim a result fetched with page_size + 1 rows and build the next cursor.
+
+    Arguments:
+    - rows: The rows returned by the query (at most page_size + 1)
+    - page_size: The number of rows to keep
+    - cursor_values: Function mapping the last kept row to its sort key values
+
+    Returns:
+    - A tuple (rows for this page, next cursor or None when there are no more rows).
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(*cursor_values(rows[-1]))
@@ -0,0 +1,173 @@
+# app/services/password_service.py
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingBusy(Exception):
+    """
+    Raised when every hashing slot (running and queued) is taken; the request should be retried later.
+    """
+
+
+# Jobs run in the worker processes: module-level so they can be sent to them
+
+def hash_password(password, method):
+    """
+    Hash a password with a Werkzeug method string (e.g. "scrypt:32768:8:1").
+    """
+    return generate_password_hash(password, method=method)
+
+
+def hash_passwords(passwords, method):
+    """
+    Hash a list of passwords in one job (one round trip to a worker process for the lot).
+    """
+    return [generate_password_hash(password, method=method) for password in passwords]
+
+
+def verify_password(password_hash, password, method):
+    """
+    Check a password against its stored hash, rehashing it when the stored
+    hash was made with other parameters than `method`.
+
+    Returns:
+    - A tuple (matches, new hash to store or None).
+    """
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if password_hash.split('$', 1)[0] == method:
+        return True, None
+    return True, generate_password_hash(password, method=method)
+
+
+# Passwords per job of a bulk hash: small enough that a login queued behind one does not wait long
+_BULK_JOB_SIZE = 8
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification off the request thread, in a bounded pool of worker processes.
+
+    Hashing is deliberately slow CPU work. On the request threads a burst of
+    logins takes every worker and starves catalog and circulation requests;
+    in the pool at most `workers` hashes run at once, at most `queue_depth`
+    more wait for a worker, and anything beyond that is turned away with
+    HashingBusy instead of piling up. With workers=0 the hashes run on the
+    request thread, one at a time plus `queue_depth` waiting.
+    """
+
+    def __init__(self, method, workers, queue_depth):
+        self.method = method
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_depth)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        # Started on first use, so app start-up, CLI commands and tests that never log in fork nothing
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            if not self.workers:
+                return function(*args)
+            return self._result(self._executor().submit(function, *args))
+        finally:
+            self._slots.release()
+
+    def _result(self, future):
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next call starts a fresh one
+            with self._lock:
+                self._pool = None
+            raise
+
+    def hash(self, password):
+        """
+        Hash a new password with the configured method.
+        """
+        return self._run(hash_password, password, self.method)
+
+    def verify(self, password_hash, password):
+        """
+        Check a password; see verify_password for the returned (matches, new hash) tuple.
+        """
+        return self._run(verify_password, password_hash, password, self.method)
+
+    def hash_many(self, passwords, jobs=None):
+        """
+        Hash a batch of new passwords (e.g. a member import) in the same pool as logins.
+
+        The passwords go out in small jobs that each hold a slot while they
+        run. Unlike a login, bulk work waits for a free slot instead of raising
+        HashingBusy, and holds at most `jobs` slots at once (never more than
+        there are workers), so the queue_depth slots stay free for logins and
+        a queued login waits for one job at most, not for the whole batch.
+
+        Arguments:
+        - passwords: The plain-text passwords
+        - jobs: Slots the batch may hold at once (defaults to one per worker)
+
+        Returns:
+        - The hashes, in the order of the passwords.
+        """
+        jobs = min(jobs or self.workers, self.workers) or 1
+        size = max(1, min(_BULK_JOB_SIZE, len(passwords) // (jobs * 4)))
+        batches = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+        if not self.workers:
+            hashes = []
+            for batch in batches:
+                with self._slots:
+                    hashes.extend(hash_passwords(batch, self.method))
+            return hashes
+
+        running = threading.BoundedSemaphore(jobs)
+        futures = []
+
+        def release(future):
+            self._slots.release()
+            running.release()
+
+        try:
+            for batch in batches:
+                running.acquire()
+                self._slots.acquire()
+                try:
+                    future = self._executor().submit(hash_passwords, batch, self.method)
+                except BaseException:
+                    self._slots.release()
+                    running.release()
+                    raise
+                future.add_done_callback(release)
+                futures.append(future)
+            return [password_hash for future in futures for password_hash in self._result(future)]
+        finally:
+            for future in futures:
+                future.cancel()  # Jobs not started yet when a batch failed
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+def init_password_hasher(app):
+    """
+    Attach a PasswordHasher configured by PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS and PASSWORD_HASH_QUEUE_DEPTH.
+    """
+    workers = app.config['PASSWORD_HASH_WORKERS']
+    if workers is None:
+        workers = os.cpu_count() or 1
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'], workers, app.config['PASSWORD_HASH_QUEUE_DEPTH'])
@@ -0,0 +1,164 @@
+# app/services/rate_limit_service.py
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+
+# Token buckets: a bucket holds up to `capacity` tokens and regains `rate` tokens per second;
+# a request takes one token, or is refused when the bucket has less than one
+
+class MemoryBucketStore:
+    """
+    Buckets of this process, in a dictionary bounded to `max_keys` (least recently used
+    buckets are dropped first; by then they are usually full again anyway).
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        """
+        Take a token from a bucket. Returns (allowed, tokens left).
+        """
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class SQLiteBucketStore:
+    """
+    Buckets in a SQLite file shared by every worker process on the host.
+
+    Each take is a single UPSERT ... RETURNING statement, which SQLite runs
+    atomically, so concurrent processes never both spend the last token.
+    Rows record when their bucket is full again and are deleted after that
+    (every `cleanup_every` takes), since a missing bucket counts as full.
+    """
+
+    name = 'sqlite'
+
+    TAKE = """
+        INSERT INTO rate_limit_bucket (key, tokens, allowed, updated_at, full_at)
+        VALUES (:key, :capacity - 1, :capacity >= 1, :now, :now + 1 / :rate)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = min(:capacity, tokens + max(0, :now - updated_at) * :rate)
+                     - (min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1),
+            allowed = min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1,
+            updated_at = :now,
+            full_at = :now + (:capacity - min(:capacity, tokens + max(0, :now - updated_at) * :rate)
+                              + (min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1)) / :rate
+        RETURNING allowed, tokens
+    """
+
+    def __init__(self, path, cleanup_every=1000):
+        self.path = path
+        self.cleanup_every = cleanup_every
+        self._local = threading.local()  # one connection per thread
+        self._takes = 0
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_bucket (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                allowed INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                full_at REAL NOT NULL
+            )
+        """)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit: every statement is its own transaction
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, capacity, rate, now):
+        """
+        Take a token from a bucket. Returns (allowed, tokens left).
+        """
+        connection = self._connection()
+        allowed, tokens = connection.execute(
+            self.TAKE, {"key": key, "capacity": capacity, "rate": rate, "now": now}).fetchone()
+        self._takes += 1
+        if self._takes % self.cleanup_every == 0:
+            connection.execute("DELETE FROM rate_limit_bucket WHERE full_at < ?", (now,))
+        return bool(allowed), tokens
+
+
+class RateLimiter:
+    """
+    Applies the configured limits to buckets in a store and counts the outcomes per limit.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._counters = {}  # limit name -> {"allowed": n, "limited": n}
+        self._lock = threading.Lock()
+
+    def hit(self, name, key, capacity, per_seconds):
+        """
+        Count one request against bucket `key` of limit `name` (`capacity` requests per `per_seconds`).
+
+        Returns:
+        - 0 when the request may go ahead, else the seconds to wait for the next token.
+        """
+        rate = capacity / per_seconds
+        allowed, tokens = self.store.take(f"{name}:{key}", capacity, rate, time.time())
+        with self._lock:
+            counters = self._counters.setdefault(name, {"allowed": 0, "limited": 0})
+            counters["allowed" if allowed else "limited"] += 1
+        if allowed:
+            return 0
+        return max(1, math.ceil((1 - tokens) / rate))
+
+    def stats(self):
+        """
+        Return the allowed/limited counters of this process per limit.
+        """
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._counters.items()}
+
+
+def rate_limit_stats_service():
+    """
+    Report the configured limits with this process's counters of allowed and limited requests.
+
+    Returns:
+    - A tuple containing the statistics and HTTP status code.
+    """
+    limiter = current_app.extensions['rate_limiter']
+    counters = limiter.stats()
+    limits = {
+        name: {"requests": requests, "per_seconds": per_seconds,
+               **counters.get(name, {"allowed": 0, "limited": 0})}
+        for name, (requests, per_seconds) in current_app.config['RATE_LIMITS'].items()
+    }
+    return {"enabled": current_app.config['RATE_LIMIT_ENABLED'], "store": limiter.store.name, "limits": limits}, 200
+
+
+def init_rate_limiter(app):
+    """
+    Attach a RateLimiter, with buckets in RATE_LIMIT_SQLITE_PATH when set (shared by the
+    worker processes), else in this process's memory.
+    """
+    path = app.config['RATE_LIMIT_SQLITE_PATH']
+    store = SQLiteBucketStore(path) if path else MemoryBucketStore(app.config['RATE_LIMIT_MAX_KEYS'])
+    app.extensions['rate_limiter'] = RateLimiter(store)
@@ -0,0 +1,234 @@
+# app/services/revocation_service.py
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from app import db, jwt
+from app.models.RevokedToken import RevokedToken
+
+
+class BloomFilter:
+    """
+    Compact set of keys that answers "definitely not added" or "maybe added".
+
+    Sized for `capacity` keys with about `error_rate` false positives; a key
+    costs a few bits, so every unexpired revocation fits in memory.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def user_key(identity):
+    """
+    Revocation key covering every token of a user issued up to the revocation.
+    """
+    return f"user:{identity}"
+
+
+class RevocationStore:
+    """
+    Answers "is this token revoked?" for every authenticated request, normally without I/O.
+
+    The revoked_token table is the source of truth. Each process keeps a Bloom
+    filter of its unexpired keys: a token whose jti and user are both absent
+    from the filter (the common case) is accepted right away. Filter hits, real
+    or false positives, are looked up in the table and the answer kept for
+    `cache_ttl` seconds in a small TTL set.
+
+    Revocations made by this process enter the filter at once. Those of other
+    processes are picked up every `sync_interval` seconds with one query for
+    rows after the last id seen. Every `compact_interval` seconds the expired
+    rows are deleted and the filter is rebuilt from the rest, since a Bloom
+    filter cannot forget keys.
+    """
+
+    def __init__(self, capacity, error_rate, cache_ttl, sync_interval, compact_interval, max_answers=10000):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.cache_ttl = cache_ttl
+        self.sync_interval = sync_interval
+        self.compact_interval = compact_interval
+        self.max_answers = max_answers
+        self._filter = None  # built on the first check
+        self._last_id = 0
+        self._synced_at = 0
+        self._compacted_at = 0
+        self._answers = OrderedDict()  # key -> (valid until, revoked_at or None)
+        self._generation = 0  # bumped by every change, so a lookup racing one does not cache its answer
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    # Keeping the filter current
+
+    def _rebuild(self, compact):
+        with db.engine.begin() as connection:
+            now = datetime.utcnow()
+            if compact:
+                connection.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+            rows = connection.execute(select(RevokedToken.id, RevokedToken.key)
+                                      .where(RevokedToken.expires_at >= now)).all()
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        for _, key in rows:
+            bloom.add(key)
+        with self._lock:
+            self._filter = bloom
+            self._last_id = max((row_id for row_id, _ in rows), default=self._last_id)
+            self._answers.clear()
+            self._generation += 1
+
+    def _sync(self):
+        with db.engine.connect() as connection:
+            rows = connection.execute(select(RevokedToken.id, RevokedToken.key)
+                                      .where(RevokedToken.id > self._last_id).order_by(RevokedToken.id)).all()
+        if not rows:
+            return
+        with self._lock:
+            for row_id, key in rows:
+                self._filter.add(key)
+                self._answers.pop(key, None)  # a cached "not revoked" may be out of date
+            self._last_id = rows[-1][0]
+            self._generation += 1
+            overfull = self._filter.count > self._filter.capacity
+        if overfull:
+            self._rebuild(compact=False)  # resized for the current number of rows
+
+    def _refresh(self):
+        now = time.monotonic()
+        due_compaction = now - self._compacted_at >= self.compact_interval
+        if self._filter is not None and not due_compaction and now - self._synced_at < self.sync_interval:
+            return
+        # One thread refreshes; the others keep using the current filter (or wait for the first one)
+        if not self._refresh_lock.acquire(blocking=self._filter is None):
+            return
+        try:
+            if self._filter is None or due_compaction:
+                self._rebuild(compact=True)
+                self._compacted_at = time.monotonic()
+            else:
+                self._sync()
+            self._synced_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    # Checks
+
+    def _revoked_at(self, key):
+        """
+        revoked_at of an unexpired revocation of `key`, or None; answered from the TTL set when possible.
+        """
+        now = time.monotonic()
+        with self._lock:
+            answer = self._answers.get(key)
+            if answer is not None and answer[0] > now:
+                return answer[1]
+            generation = self._generation
+        with db.engine.connect() as connection:
+            revoked_at = connection.execute(select(RevokedToken.revoked_at).where(
+                RevokedToken.key == key, RevokedToken.expires_at >= datetime.utcnow())).scalar()
+        with self._lock:
+            if generation != self._generation:
+                return revoked_at
+            self._answers[key] = (now + self.cache_ttl, revoked_at)
+            self._answers.move_to_end(key)
+            while len(self._answers) > self.max_answers:
+                self._answers.popitem(last=False)
+        return revoked_at
+
+    def is_revoked(self, payload):
+        """
+        Whether a decoded token has been revoked, by its jti or by a revocation of its user.
+        """
+        self._refresh()
+        bloom = self._filter
+        if payload["jti"] in bloom and self._revoked_at(payload["jti"]) is not None:
+            return True
+        key = user_key(payload["sub"])
+        if key in bloom:
+            revoked_at = self._revoked_at(key)
+            # Tokens issued after the revocation (e.g. the email registered again) stay valid
+            return revoked_at is not None and payload["iat"] <= revoked_at.replace(tzinfo=timezone.utc).timestamp()
+        return False
+
+    # Revocations
+
+    def revoke(self, key, expires_at):
+        """
+        Record a revocation until `expires_at` (naive UTC) and add it to this process's filter.
+        """
+        self._refresh()
+        values = {"key": key, "revoked_at": datetime.utcnow(), "expires_at": expires_at}
+        try:
+            self._insert_renewing(values)
+        except IntegrityError:
+            self._insert_renewing(values)  # another process inserted the same key concurrently
+        with self._lock:
+            self._filter.add(key)
+            self._answers.pop(key, None)
+            self._generation += 1
+
+    @staticmethod
+    def _insert_renewing(values):
+        # A revocation renewing one with the same key (e.g. a user deleted again) replaces it with a
+        # new row rather than updating it, so its id is past every other process's last synced id
+        with db.engine.begin() as connection:
+            connection.execute(delete(RevokedToken).where(RevokedToken.key == values["key"]))
+            connection.execute(insert(RevokedToken).values(values))
+
+
+def init_revocation_store(app):
+    """
+    Attach a RevocationStore configured by the REVOCATION_* settings.
+    """
+    app.extensions['revocation_store'] = RevocationStore(
+        app.config['REVOCATION_BLOOM_CAPACITY'],
+        app.config['REVOCATION_BLOOM_ERROR_RATE'],
+        app.config['REVOCATION_CACHE_TTL'],
+        app.config['REVOCATION_SYNC_INTERVAL'],
+        app.config['REVOCATION_COMPACT_INTERVAL'],
+    )
+
+
+def revoke_token(payload):
+    """
+    Revoke one decoded token (access or refresh) until it expires.
+    """
+    current_app.extensions['revocation_store'].revoke(payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+
+
+def revoke_user_tokens(identity):
+    """
+    Revoke every token issued so far to a user (e.g. when the user is deleted).
+    The revocation is kept until the longest-lived of those tokens has expired.
+    """
+    lifetimes = [current_app.config[name] for name in ('JWT_ACCESS_TOKEN_EXPIRES', 'JWT_REFRESH_TOKEN_EXPIRES')]
+    longest = max((lifetime for lifetime in lifetimes if isinstance(lifetime, timedelta)), default=timedelta(days=7))
+    current_app.extensions['revocation_store'].revoke(user_key(identity), datetime.utcnow() + longest)
+
+
+@jwt.token_in_blocklist_loader
+def token_is_revoked(jwt_header, jwt_payload):
+    return current_app.extensions['revocation_store'].is_revoked(jwt_payload)
@@ -0,0 +1,174 @@
+# app/services/search_cache.py
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+
+# Search parameters matched case-insensitively on words (cursors and dates are kept as sent)
+_TEXT_PARAMS = ('title', 'author', 'subject_category')
+
+
+class SearchCache:
+    """
+    Thread-safe LRU cache of search responses, bounded in bytes and by age.
+
+    Every entry is stored under the catalog generation that was current when
+    its query started. A committed catalog write bumps the generation and
+    drops all entries, so a response computed from pre-write data can never
+    be served after the write, even if the query finished after the bump.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._drop(key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """
+        Store value under key, evicting least recently used entries to stay within max_bytes.
+
+        Values larger than the whole cache are not stored. Keys from an older
+        generation (the catalog changed while the query ran) are ignored.
+        """
+        with self._lock:
+            if size > self.max_bytes or key[0] != self.generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def bump_generation(self):
+        """
+        Invalidate every entry after a catalog write.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._counters["invalidations"] += 1
+
+    def stats(self):
+        """
+        Return the hit/miss/eviction counters and the current size of the cache.
+        """
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "generation": self.generation,
+            }
+
+    def _drop(self, key):
+        value, size, expires_at = self._entries.pop(key)
+        self._bytes -= size
+
+
+def init_search_cache(app):
+    """
+    Attach a SearchCache sized from the app config (SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_TTL).
+    """
+    app.extensions['search_cache'] = SearchCache(app.config['SEARCH_CACHE_MAX_BYTES'], app.config['SEARCH_CACHE_TTL'])
+
+
+def get_search_cache():
+    """
+    Return the current app's search cache, or None when caching is disabled.
+    """
+    if not current_app.config.get('SEARCH_CACHE_ENABLED'):
+        return None
+    return current_app.extensions.get('search_cache')
+
+
+def normalize_search_params(query_params):
+    """
+    Canonical form of the search parameters: free-text fields lower-cased with
+    whitespace collapsed (both search paths are case-insensitive and match whole
+    words), multi-valued filters sorted and empty values dropped, so
+    near-identical queries share one entry.
+
+    Returns:
+    - A tuple of sorted (name, value) pairs, usable as a cache key.
+    """
+    normalized = {}
+    for name, value in query_params.items():
+        if name in _TEXT_PARAMS and isinstance(value, str):
+            value = " ".join(value.lower().split())
+        elif isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, (list, tuple)):
+            # Multi-valued filters: order and repeats do not change the result
+            value = tuple(sorted({v.strip() for v in value if v and v.strip()}))
+        if value not in (None, "", ()):
+            normalized[name] = value
+    return tuple(sorted(normalized.items()))
+
+
+def cached_search(query_params, search):
+    """
+    Serve a search from the cache, running search(normalized params) on a miss.
+
+    Only successful (200) responses are cached.
+
+    Arguments:
+    - query_params: Dictionary of search parameters
+    - search: Function taking the normalized parameters and returning (response, status)
+
+    Returns:
+    - A tuple containing the response and HTTP status code.
+    """
+    params = normalize_search_params(query_params)
+    cache = get_search_cache()
+    if cache is None:
+        return search(dict(params))
+
+    # Read the generation before querying so a concurrent write makes this entry unusable
+    key = (cache.generation, params)
+    response = cache.get(key)
+    if response is not None:
+        return response, 200
+
+    response, status = search(dict(params))
+    if status == 200:
+        cache.put(key, response, len(json.dumps(response, default=str)))
+    return response, status
+
+
+def bump_catalog_generation():
+    """
+    Invalidate the current app's search cache. Called after every commit that changed the
+    catalog (see catalog_changes), and by writes made outside the ORM session.
+    """
+    cache = current_app.extensions.get('search_cache') if has_app_context() else None
+    if cache is not None:
+        cache.bump_generation()
+
@@ -1,56 +1,180 @@
 # app/services/search_service.py
+from flask import current_app
+from sqlalchemy import and_, or_
 from app.models.Book import Book
-from app.models.BookCopy import BookCopy
+from app.services.catalog_service import catalog_query, serialize_catalog_row
+from app.services.fts_service import build_match_expression, fts_enabled, fts_matches
+from app.services.facet_service import apply_facet_filters, facet_counts, parse_facet_filters
+from app.services.fuzzy_service import FUZZY_FIELDS, get_fuzzy_index
+from app.services.pagination import resolve_page_size, decode_cursor, split_page
+from app.services.search_cache import cached_search
+
+# Book ids fetched per query when loading fuzzy matches in rank order
+FUZZY_FETCH_CHUNK = 500
 
 def search_books(query_params):
+    """
+    Search for books based on query parameters, served from the search cache when possible.
+
+    Parameters are normalized first (see normalize_search_params) so that
+    near-identical queries, e.g. from debounced typing, share a cache entry.
+
+    Arguments:
+    - query_params: Dictionary containing search parameters (title, author, subject_category, publication_date),
+      the facet filters (facet_subject_category, facet_author, facet_decade), the fuzzy and facets flags
+      and the paging parameters (limit, cursor)
+
+    Returns:
+    - A tuple containing one page of search results with the next cursor and HTTP status code.
+    """
+    return cached_search(query_params, _search_books_uncached)
+
+
+def _search_books_uncached(query_params):
     """
     Search for books based on query parameters.
     
     Arguments:
-    - query_params: Dictionary containing search parameters (title, author, subject_category, publication_date)
+    - query_params: Dictionary containing search parameters (title, author, subject_category, publication_date),
+      the facet filters (facet_subject_category, facet_author, facet_decade), the fuzzy and facets flags
+      and the paging parameters (limit, cursor)
     
     Returns:
-    - A tuple containing the search results and HTTP status code.
+    - A tuple containing one page of search results with the next cursor and HTTP status code.
     """
     try:
-        # Start with a base query
-        query = Book.query
+        try:
+            page_size = resolve_page_size(query_params.get('limit'))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        cursor = query_params.get('cursor')
+        try:
+            facet_filters = parse_facet_filters(query_params)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        # Typo-tolerant matching of titles and authors through the trigram index
+        if _flag(query_params.get('fuzzy')) and any(query_params.get(field) for field in FUZZY_FIELDS):
+            return _fuzzy_search(query_params, facet_filters, page_size, cursor)
         
-        # Apply filters based on provided parameters
-        if 'title' in query_params and query_params['title']:
-            query = query.filter(Book.title.ilike(f"%{query_params['title']}%"))
-            
-        if 'author' in query_params and query_params['author']:
-            query = query.filter(Book.author.ilike(f"%{query_params['author']}%"))
-            
-        if 'subject_category' in query_params and query_params['subject_category']:
-            query = query.filter(Book.subject_category.ilike(f"%{query_params['subject_category']}%"))
+        # Start with the catalog projection (book columns plus copy counts)
+        query = catalog_query()
+        
+        # Use the FTS5 index for the text fields when the database has one (BM25-ranked)
+        match_expression = build_match_expression(query_params) if fts_enabled() else None
+        if match_expression:
+            matches = fts_matches(match_expression)
+            query = query.join(matches, matches.c.rowid == Book.id)
+        else:
+            # Fall back to substring filters on engines without FTS5
+            if 'title' in query_params and query_params['title']:
+                query = query.filter(Book.title.ilike(f"%{query_params['title']}%"))
+                
+            if 'author' in query_params and query_params['author']:
+                query = query.filter(Book.author.ilike(f"%{query_params['author']}%"))
+                
+            if 'subject_category' in query_params and query_params['subject_category']:
+                query = query.filter(Book.subject_category.ilike(f"%{query_params['subject_category']}%"))
             
         if 'publication_date' in query_params and query_params['publication_date']:
             query = query.filter(Book.publication_date == query_params['publication_date'])
+
+        # Facets count the whole filtered result (through the same FTS join), not just this page
+        facets = None
+        if _flag(query_params.get('facets')):
+            facets = facet_counts(query, facet_filters, current_app.config['FACET_LIMIT'])
+        query = apply_facet_filters(query, facet_filters)
+
+        if match_expression:
+            # Keyset on (rank, id) so pages follow the relevance order
+            if cursor:
+                try:
+                    last_rank, last_id = decode_cursor(cursor, 2)
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+                query = query.filter(or_(
+                    matches.c.rank > last_rank,
+                    and_(matches.c.rank == last_rank, Book.id > last_id)
+                ))
+            query = query.add_columns(matches.c.rank).order_by(matches.c.rank, Book.id)
+            cursor_values = lambda row: (row.rank, row.id)
+        else:
+            # Keyset on id
+            if cursor:
+                try:
+                    last_id, = decode_cursor(cursor, 1)
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+                query = query.filter(Book.id > last_id)
+            query = query.order_by(Book.id)
+            cursor_values = lambda row: (row.id,)
         
-        # Execute the query and get results
-        books = query.all()
-        
-        # Format the results
-        results = []
-        for book in books:
-            # Count available copies
-            available_copies = BookCopy.query.filter_by(book_id=book.id, is_available=True).count()
-            total_copies = BookCopy.query.filter_by(book_id=book.id).count()
-            
-            results.append({
-                'id': book.id,
-                'barcode': book.barcode,
-                'title': book.title,
-                'author': book.author,
-                'subject_category': book.subject_category,
-                'publication_date': book.publication_date.strftime('%Y-%m-%d'),
-                'available_copies': available_copies,
-                'total_copies': total_copies
-            })
+        # Fetch one extra row to know whether another page exists
+        rows, next_cursor = split_page(query.limit(page_size + 1).all(), page_size, cursor_values)
+        results = [serialize_catalog_row(row) for row in rows]
         
-        return {'books': results}, 200
+        response = {'books': results, 'next_cursor': next_cursor}
+        if facets is not None:
+            response['facets'] = facets
+        return response, 200
         
     except Exception as e:
-        return {'error': f'An error occurred: {str(e)}'}, 500
\ No newline at end of file
+        return {'error': f'An error occurred: {str(e)}'}, 500
+
+
+def _flag(value):
+    """
+    Interpret an on/off query parameter (1, true or yes turn it on).
+    """
+    return str(value or '').lower() in ('1', 'true', 'yes')
+
+
+def _fuzzy_search(query_params, facet_filters, page_size, cursor):
+    """
+    Search titles and authors tolerating misspellings, most similar books first.
+
+    Candidates and their similarity scores come from the in-memory trigram
+    index; the catalog rows are then loaded by id in rank order, applying the
+    subject_category, publication_date and facet filters in SQL. Facet counts
+    are not computed in this mode.
+
+    Arguments:
+    - query_params: Dictionary containing search parameters
+    - facet_filters: Facet name -> selected values
+    - page_size: The number of books per page
+    - cursor: The next_cursor value from the previous page, or None
+
+    Returns:
+    - A tuple containing one page of search results with the next cursor and HTTP status code.
+    """
+    texts = {field: query_params[field] for field in FUZZY_FIELDS if query_params.get(field)}
+    scores = get_fuzzy_index().search(current_app.config['FUZZY_SEARCH_THRESHOLD'], **texts)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    # Keyset on (score descending, id)
+    if cursor:
+        try:
+            last_score, last_id = decode_cursor(cursor, 2)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        ranked = [(book_id, score) for book_id, score in ranked
+                  if score < last_score or (score == last_score and book_id > last_id)]
+
+    rows = []
+    for start in range(0, len(ranked), FUZZY_FETCH_CHUNK):
+        chunk = ranked[start:start + FUZZY_FETCH_CHUNK]
+        query = catalog_query().filter(Book.id.in_([book_id for book_id, score in chunk]))
+        if query_params.get('subject_category'):
+            query = query.filter(Book.subject_category.ilike(f"%{query_params['subject_category']}%"))
+        if query_params.get('publication_date'):
+            query = query.filter(Book.publication_date == query_params['publication_date'])
+        query = apply_facet_filters(query, facet_filters)
+        found = {row.id: row for row in query.all()}
+        rows.extend((found[book_id], score) for book_id, score in chunk if book_id in found)
+        # One extra row tells whether another page exists
+        if len(rows) > page_size:
+            break
+
+    rows, next_cursor = split_page(rows, page_size, lambda item: (item[1], item[0].id))
+    results = [{**serialize_catalog_row(row), 'similarity': round(score, 4)} for row, score in rows]
+    return {'books': results, 'next_cursor': next_cursor}, 200
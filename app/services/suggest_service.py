@@ -0,0 +1,354 @@
+# app/services/suggest_service.py
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models.Book import Book
+from app.models.BookCopy import BookCopy
+from app.models.Transaction import Transaction
+from app.services.catalog_changes import BookIndex, build_book_index, register_book_index, serve_book_index, queue_book_change
+
+# Completions kept per cached query (more than the largest page, so lists rarely need recomputing)
+TOP_CAPACITY = 50
+# Number of distinct queries whose ranked completions are kept (least recently used are dropped)
+QUERY_CACHE_SIZE = 20000
+
+# Upper bound for a bisect range covering every token that starts with a prefix
+_MAX_CHAR = '\U0010ffff'
+
+
+def normalize_text(text):
+    """
+    Lower-case text and strip diacritics (matching the search index's unicode61 remove_diacritics).
+    """
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """
+    Split text into normalized word tokens.
+    """
+    return re.findall(r"\w+", normalize_text(text))
+
+
+class SuggestIndex(BookIndex):
+    """
+    In-memory prefix index over the normalized tokens of book titles and authors.
+
+    Each distinct title and each distinct author is one entry, ranked by its
+    circulation popularity (number of loans of its books). Tokens are kept in a
+    sorted list, so the tokens starting with a prefix are one bisect range, and
+    every token maps to the entries containing it.
+
+    Ranking a large range on every keystroke would be slow, so the best
+    TOP_CAPACITY entries of each query are cached (LRU) and kept exact as the
+    catalog changes: cached queries are indexed by their most selective word, and an
+    entry that changes only has to visit the queries driven by a prefix of one
+    of its tokens.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tokens = []                # sorted distinct tokens
+        self._postings = {}              # token -> set of entry keys
+        self._entries = {}               # entry key -> {"text", "type", "tokens", "books", "popularity"}
+        self._books = {}                 # book id -> (title key, author key, loans)
+        self._top = OrderedDict()        # sorted query words -> (driving word, entry keys ordered by rank)
+        self._by_driver = {}             # most selective query word -> cached queries
+
+    # -- building and maintenance -------------------------------------------------
+
+    def load(self, books, loans):
+        """
+        Replace the index contents.
+
+        Arguments:
+        - books: Iterable of (book id, title, author)
+        - loans: Dictionary of book id -> number of loans
+        """
+        entries, book_keys, postings = {}, {}, {}
+        for book_id, title, author in books:
+            count = loans.get(book_id, 0)
+            keys = []
+            for kind, text in (("title", title), ("author", author)):
+                tokens = tokenize(text)
+                key = (kind, " ".join(tokens))
+                entry = entries.get(key)
+                if entry is None:
+                    entry = entries[key] = {"text": text, "type": kind, "tokens": set(tokens),
+                                            "books": set(), "popularity": 0}
+                    for token in entry["tokens"]:
+                        postings.setdefault(token, set()).add(key)
+                entry["books"].add(book_id)
+                entry["popularity"] += count
+                keys.append(key)
+            book_keys[book_id] = (keys[0], keys[1], count)
+
+        with self._lock:
+            self._entries, self._books, self._postings = entries, book_keys, postings
+            self._tokens = sorted(postings)
+            self._top, self._by_driver = OrderedDict(), {}
+            self._finish_build()
+
+    def _apply(self, change):
+        if change[0] == 'upsert':
+            self.upsert_book(*change[1:])
+        elif change[0] == 'delete':
+            self.remove_book(change[1])
+        elif change[0] == 'loan':
+            self.record_loans(change[1])
+
+    def upsert_book(self, book_id, title, author):
+        """
+        Add a book, or re-index it after its title or author changed (its loan count is kept).
+        """
+        with self._lock:
+            loans = self._books[book_id][2] if book_id in self._books else 0
+            self._remove_book(book_id)
+            self._add_book(book_id, title, author, loans)
+
+    def remove_book(self, book_id):
+        """
+        Drop a deleted book from the index.
+        """
+        with self._lock:
+            self._remove_book(book_id)
+
+    def record_loans(self, book_id, count=1):
+        """
+        Raise the popularity of a book's title and author after it was lent.
+        """
+        with self._lock:
+            if book_id not in self._books:
+                return
+            title_key, author_key, loans = self._books[book_id]
+            self._books[book_id] = (title_key, author_key, loans + count)
+            for key in (title_key, author_key):
+                self._entries[key]["popularity"] += count
+                self._promote(key)
+
+    def _add_book(self, book_id, title, author, loans):
+        keys = []
+        for kind, text in (("title", title), ("author", author)):
+            tokens = tokenize(text)
+            key = (kind, " ".join(tokens))
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {"text": text, "type": kind, "tokens": set(tokens),
+                                              "books": set(), "popularity": 0}
+                for token in entry["tokens"]:
+                    if token not in self._postings:
+                        self._postings[token] = set()
+                        insort(self._tokens, token)
+                    self._postings[token].add(key)
+            entry["books"].add(book_id)
+            entry["popularity"] += loans
+            self._promote(key)
+            keys.append(key)
+        self._books[book_id] = (keys[0], keys[1], loans)
+
+    def _remove_book(self, book_id):
+        if book_id not in self._books:
+            return
+        title_key, author_key, loans = self._books.pop(book_id)
+        for key in (title_key, author_key):
+            entry = self._entries[key]
+            # Lists holding an entry that loses rank or disappears are recomputed on their next use
+            for query in self._affected_queries(key):
+                if key in self._top[query][1]:
+                    self._drop_query(query)
+            entry["books"].discard(book_id)
+            entry["popularity"] -= loans
+            if entry["books"]:
+                continue
+            del self._entries[key]
+            for token in entry["tokens"]:
+                keys = self._postings[token]
+                keys.discard(key)
+                if not keys:
+                    del self._postings[token]
+                    del self._tokens[bisect_left(self._tokens, token)]
+
+    def _affected_queries(self, key):
+        """
+        Cached queries that the entry matches.
+        """
+        tokens = self._entries[key]["tokens"]
+        found = set()
+        for token in tokens:
+            for length in range(1, len(token) + 1):
+                for query in self._by_driver.get(token[:length], ()):
+                    if query not in found and self._entry_matches(tokens, query):
+                        found.add(query)
+        return found
+
+    def _promote(self, key):
+        """
+        Move an entry that is new or gained popularity into place in the cached lists it matches.
+        """
+        rank = self._rank(key)
+        for query in self._affected_queries(key):
+            top = self._top[query][1]
+            if key not in top:
+                if len(top) >= TOP_CAPACITY and rank >= self._rank(top[-1]):
+                    continue
+                top.append(key)
+            top.sort(key=self._rank)
+            del top[TOP_CAPACITY:]
+
+    def _drop_query(self, query):
+        driver = self._top.pop(query)[0]
+        queries = self._by_driver[driver]
+        queries.discard(query)
+        if not queries:
+            del self._by_driver[driver]
+
+    @staticmethod
+    def _entry_matches(tokens, words):
+        return all(any(token.startswith(word) for token in tokens) for word in words)
+
+    def _rank(self, key):
+        entry = self._entries[key]
+        return (-entry["popularity"], len(entry["text"]), entry["text"])
+
+    # -- queries ---------------------------------------------------------------
+
+    def _completions(self, word):
+        """
+        The tokens starting with word (one bisect range of the sorted tokens).
+        """
+        start = bisect_left(self._tokens, word)
+        return self._tokens[start:bisect_left(self._tokens, word + _MAX_CHAR, start)]
+
+    def _ranked(self, query):
+        """
+        The best TOP_CAPACITY entries matching every word of the query (cached).
+
+        Arguments:
+        - query: Sorted tuple of distinct words
+        """
+        cached = self._top.get(query)
+        if cached is not None:
+            self._top.move_to_end(query)
+            return cached[1]
+
+        # The word matching the fewest entries drives the lookup; the others filter it
+        sizes = {word: sum(len(self._postings[token]) for token in self._completions(word)) for word in query}
+        driver = min(query, key=lambda word: (sizes[word], word))
+        others = [word for word in query if word != driver]
+        candidates = set()
+        for token in self._completions(driver):
+            candidates |= self._postings[token]
+        if others:
+            candidates = [key for key in candidates if self._entry_matches(self._entries[key]["tokens"], others)]
+        top = heapq.nsmallest(TOP_CAPACITY, candidates, key=self._rank)
+
+        self._top[query] = (driver, top)
+        self._by_driver.setdefault(driver, set()).add(query)
+        if len(self._top) > QUERY_CACHE_SIZE:
+            self._drop_query(next(iter(self._top)))
+        return top
+
+    def suggest(self, query, limit):
+        """
+        Return the best completions for a partially typed query.
+
+        Every word of the query must be the prefix of a word of the suggestion.
+
+        Arguments:
+        - query: The text typed so far
+        - limit: Maximum number of suggestions
+
+        Returns:
+        - A list of dictionaries with text, type ('title' or 'author') and popularity.
+        """
+        words = tuple(sorted(set(tokenize(query))))
+        if not words:
+            return []
+        with self._lock:
+            return [{"text": self._entries[key]["text"], "type": self._entries[key]["type"],
+                     "popularity": self._entries[key]["popularity"]} for key in self._ranked(words)[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {"books": len(self._books), "entries": len(self._entries), "tokens": len(self._tokens),
+                    "cached_queries": len(self._top)}
+
+
+def build_suggest_index(index=None, wait=True):
+    """
+    Load every book and its loan count into a suggest index (two queries).
+
+    Arguments:
+    - index: The SuggestIndex to fill (defaults to the current app's index)
+    - wait: False to build it in a background thread (the current contents are served meanwhile)
+
+    Returns:
+    - The filled index.
+    """
+    def load(target):
+        loans = dict(
+            db.session.query(BookCopy.book_id, func.count(Transaction.id))
+            .join(Transaction, Transaction.book_copy_id == BookCopy.id)
+            .group_by(BookCopy.book_id)
+            .all()
+        )
+        target.load(db.session.query(Book.id, Book.title, Book.author).yield_per(5000), loans)
+
+    return build_book_index(index or current_app.extensions['suggest_index'], load, wait)
+
+
+def init_suggest_index(app):
+    """
+    Attach an empty suggest index to the app; it is built from the database in the
+    background when the app handles its first request (or by the first use).
+    """
+    app.extensions['suggest_index'] = SuggestIndex()
+    register_book_index('suggest_index', build_suggest_index)
+
+
+def get_suggest_index():
+    """
+    Return the current app's suggest index. It is rebuilt in the background once
+    older than SUGGEST_INDEX_MAX_AGE (which picks up writes made by other
+    processes, e.g. CLI imports), serving its current contents meanwhile; see
+    serve_book_index.
+    """
+    return serve_book_index(current_app.extensions['suggest_index'], build_suggest_index,
+                            current_app.config['SUGGEST_INDEX_MAX_AGE'])
+
+
+def suggest_service(query, limit=None):
+    """
+    Suggest book titles and authors completing the text typed so far.
+
+    Arguments:
+    - query: The partial text (the q parameter)
+    - limit: Maximum number of suggestions (defaults to SUGGEST_LIMIT_DEFAULT)
+
+    Returns:
+    - A tuple containing the suggestions and HTTP status code.
+    """
+    try:
+        config = current_app.config
+        if limit is None:
+            limit = config['SUGGEST_LIMIT_DEFAULT']
+        if limit < 1:
+            return {"error": "limit must be a positive integer"}, 400
+        limit = min(limit, config['SUGGEST_LIMIT_MAX'])
+        return {"suggestions": get_suggest_index().suggest(query or "", limit)}, 200
+
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}, 500
+
+
+def queue_loan_for_suggestions(book_id):
+    """
+    Count a new loan towards the book's suggestion ranking once the current transaction commits.
+    """
+    queue_book_change(('loan', book_id))
@@ -0,0 +1,120 @@
+# app/services/user_cache.py
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models.User import User
+
+# Columns kept per user; the access token carries the same ones as claims (email is its identity)
+USER_FIELDS = ('id', 'name', 'email', 'role', 'barcode')
+
+
+def user_snapshot(user):
+    """
+    Plain dictionary of a User's identifying columns, safe to keep across sessions and threads.
+    """
+    return {field: getattr(user, field) for field in USER_FIELDS}
+
+
+def user_claims(snapshot):
+    """
+    Additional access token claims for a user: the role checked by every protected
+    route, plus the id, barcode and name the dashboards display and send back.
+    """
+    return {field: snapshot[field] for field in ('role', 'id', 'barcode', 'name')}
+
+
+class UserCache:
+    """
+    Per-process cache of user snapshots by email, each kept for `ttl` seconds.
+
+    Entries are removed when the user is deleted through this process; another
+    process (worker, CLI) may serve a deleted user for up to `ttl` seconds.
+    A generation counter, bumped by every invalidation, stops a lookup that
+    started before an invalidation from storing what it read.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, email, load):
+        """
+        Return the snapshot for `email`, calling `load(email)` when it is missing or expired.
+        Users that do not exist (load returns None) are not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(email)
+                return entry[1]
+            generation = self._generation
+        snapshot = load(email)
+        if snapshot is not None:
+            self.put(snapshot, generation)
+        return snapshot
+
+    def put(self, snapshot, generation=None):
+        """
+        Store a snapshot, unless the cache is disabled (ttl 0) or invalidated since `generation` was read.
+        """
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[snapshot['email']] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(snapshot['email'])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+def init_user_cache(app):
+    """
+    Attach a UserCache configured by USER_CACHE_TTL and USER_CACHE_MAX_ENTRIES.
+    """
+    app.extensions['user_cache'] = UserCache(app.config['USER_CACHE_TTL'], app.config['USER_CACHE_MAX_ENTRIES'])
+
+
+def _load_user(email):
+    row = db.session.execute(select(*(getattr(User, field) for field in USER_FIELDS)).where(User.email == email)).first()
+    return dict(row._mapping) if row else None
+
+
+def get_user(email):
+    """
+    Return the snapshot of the user with this email (from the cache when fresh), or None.
+    """
+    return current_app.extensions['user_cache'].get(email, _load_user)
+
+
+def remember_user(user):
+    """
+    Cache a user just read from the database (e.g. at login) and return its snapshot.
+    """
+    snapshot = user_snapshot(user)
+    current_app.extensions['user_cache'].put(snapshot)
+    return snapshot
+
+
+def forget_user(email):
+    """
+    Drop a user from this process's cache (after deleting it).
+    """
+    current_app.extensions['user_cache'].invalidate(email)
+
@@ -0,0 +1,146 @@
+# app/services/user_import_service.py
+import csv
+import io
+import uuid
+from flask import current_app
+from sqlalchemy import insert, select
+from app import db
+from app.models.User import User
+from app.services.auth_service import is_valid_librarian_email
+
+# Columns every imported member needs (role is optional and defaults to Member)
+REQUIRED_FIELDS = ('name', 'email', 'password')
+ROLES = ('Member', 'Librarian')
+
+
+def _parse_csv(stream):
+    """
+    Check the header of a CSV roster and return an iterator of (line number, record) for its rows.
+    """
+    reader = csv.DictReader(stream)
+    missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV header is missing: {', '.join(missing)}")
+    return ((reader.line_num, record) for record in reader)
+
+
+def _clean_record(record):
+    """
+    Validate one roster row with the rules of /auth/register.
+
+    Returns:
+    - A dictionary with name, email, password (plain text) and role.
+
+    Raises:
+    - ValueError with a message for the import report.
+    """
+    values = {field: (record.get(field) or "").strip() for field in REQUIRED_FIELDS}
+    values['password'] = record.get('password') or ""  # kept exactly as given
+    missing = [field for field, value in values.items() if not value]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    if '@' not in values['email']:
+        raise ValueError("Invalid email address")
+    values['role'] = (record.get('role') or "").strip() or 'Member'
+    if values['role'] not in ROLES:
+        raise ValueError(f"role must be one of: {', '.join(ROLES)}")
+    if values['role'] == 'Librarian' and not is_valid_librarian_email(values['email']):
+        raise ValueError("Invalid email for Librarian role")
+    return values
+
+
+def import_users(stream, progress=None, workers=None):
+    """
+    Register members from a CSV roster (name, email, password, optional role), reading it incrementally.
+
+    Rows whose email is already registered, or appears earlier in the file,
+    are skipped; the registered emails are read once up front. Passwords are
+    hashed in parallel by the app's password hasher (the pool logins use, so
+    an import never adds processes on top of it), one chunk of
+    USER_IMPORT_CHUNK_SIZE rows at a time, and each chunk is inserted with a
+    single multi-row INSERT and committed.
+
+    Arguments:
+    - stream: A text stream of CSV
+    - progress: Optional function called with the running totals after every committed chunk
+    - workers: Hashing workers the import may keep busy at once (defaults to
+      USER_IMPORT_HASH_WORKERS, else all of PASSWORD_HASH_WORKERS)
+
+    Returns:
+    - A dictionary with the totals: records, users imported, duplicates
+      skipped, rejected records and the first errors (line and message).
+
+    Raises:
+    - ValueError if the CSV header lacks required columns.
+    """
+    chunk_size = current_app.config['USER_IMPORT_CHUNK_SIZE']
+    max_errors = current_app.config['USER_IMPORT_MAX_ERRORS']
+    workers = workers or current_app.config['USER_IMPORT_HASH_WORKERS']
+    hasher = current_app.extensions['password_hasher']
+
+    totals = {"records": 0, "users": 0, "duplicates": 0, "rejected": 0, "errors": []}
+    records = _parse_csv(stream)  # Rejects a bad header before any work starts
+    seen = set(db.session.scalars(select(User.email).execution_options(yield_per=10000)))
+    db.session.commit()  # End the read transaction so chunks are not held behind it
+    chunk = []
+
+    def flush():
+        hashes = hasher.hash_many([values['password'] for values in chunk], jobs=workers)
+        db.session.execute(insert(User), [
+            {**values, "password": password_hash, "barcode": str(uuid.uuid4())}
+            for values, password_hash in zip(chunk, hashes)
+        ])
+        db.session.commit()
+        totals["users"] += len(chunk)
+        chunk.clear()
+        if progress:
+            progress(totals)
+
+    try:
+        for line_number, record in records:
+            totals["records"] += 1
+            try:
+                values = _clean_record(record)
+            except ValueError as e:
+                totals["rejected"] += 1
+                if len(totals["errors"]) < max_errors:
+                    totals["errors"].append({"line": line_number, "error": str(e)})
+                continue
+            if values['email'] in seen:
+                totals["duplicates"] += 1
+                continue
+            seen.add(values['email'])
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    except Exception:
+        db.session.rollback()
+        raise
+    return totals
+
+
+def import_users_service(binary_stream):
+    """
+    Import a CSV roster uploaded to the API.
+
+    Arguments:
+    - binary_stream: The uploaded file or request body (bytes, UTF-8 encoded)
+
+    Returns:
+    - A tuple containing the import totals and HTTP status code
+      (201 when users were added, 200 when there was nothing new).
+    """
+    stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    try:
+        totals = import_users(stream)
+    except UnicodeDecodeError:
+        return {"error": "The file must be UTF-8 encoded"}, 400
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}, 500
+    finally:
+        stream.detach()  # Leave the underlying stream to its owner
+    return totals, 201 if totals["users"] else 200
@@ -1,23 +1,65 @@
 from app.models.User import User, db
+from app.models.Notification import Notification
+from app.services.user_cache import forget_user
+from app.services.revocation_service import revoke_user_tokens
+from app.services.pagination import (
+    resolve_page_size, decode_cursor, split_page, datetime_to_cursor_value, cursor_value_to_datetime
+)
+from sqlalchemy import and_, func, or_
 
 
-def get_all_users():
+def prefix_condition(expression, prefix):
     """
-    Handles fetching all users from the database.
+    Match values of expression starting with prefix, as a range (prefix <= value < next prefix)
+    that an index on the expression can answer.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(expression >= prefix, expression < upper)
+
+
+def get_all_users(q=None, limit=None, cursor=None):
+    """
+    Handles fetching one page of users from the database, ordered by id.
+
+    Arguments:
+    - q: Optional search text; matches users whose name or email starts with it
+      (case-insensitive) or whose barcode is exactly q
+    - limit: Maximum number of users to return (capped server-side)
+    - cursor: The next_cursor value from the previous page, if any
 
     Returns:
-        A tuple containing a list of users and HTTP status code.
+        A tuple containing the page of users with the next cursor and HTTP status code.
     """
     try:
-        users = User.query.all()
+        try:
+            page_size = resolve_page_size(limit)
+            # Only the listed columns are read; no User objects are loaded
+            query = db.session.query(User.id, User.name, User.email, User.role, User.barcode)
+            q = (q or "").strip()
+            if q:
+                # Folded like SQLite's lower() (ASCII only) so the prefix lines up with the indexed values
+                prefix = "".join(char.lower() if char.isascii() else char for char in q)
+                query = query.filter(or_(
+                    prefix_condition(func.lower(User.name), prefix),
+                    prefix_condition(func.lower(User.email), prefix),
+                    User.barcode == q,
+                ))
+            if cursor:
+                last_id, = decode_cursor(cursor, 1)
+                query = query.filter(User.id > last_id)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        rows = query.order_by(User.id).limit(page_size + 1).all()
+        rows, next_cursor = split_page(rows, page_size, lambda row: (row.id,))
         user_list = [{
-            "name": user.name,
-            "email": user.email,
-            "role": user.role,
-            "barcode": user.barcode
-        } for user in users]
+            "name": row.name,
+            "email": row.email,
+            "role": row.role,
+            "barcode": row.barcode
+        } for row in rows]
 
-        return user_list, 200
+        return {"users": user_list, "next_cursor": next_cursor}, 200
     except Exception as e:
         return {"error": str(e)}, 500
 
@@ -66,8 +108,11 @@ def delete_user_by_barcode(barcode):
         if user_to_delete.role == "Librarian":
             return {"error": "Cannot delete a Librarian"}, 400
 
+        email = user_to_delete.email
         db.session.delete(user_to_delete)
         db.session.commit()
+        forget_user(email)  # Tokens of the deleted user stop resolving to it in this process
+        revoke_user_tokens(email)  # ... and are rejected by every process
         return {"message": "User deleted successfully"}, 200
     except Exception as e:
         db.session.rollback()  # Rollback in case of an error
@@ -75,20 +120,79 @@ def delete_user_by_barcode(barcode):
     
 
 
-def get_user_notifications_service(barcode):
+def get_user_notifications_service(barcode, limit=None, cursor=None, unread_only=False):
     """
-    Retrieve notifications for a specific user.
+    Retrieve one page of notifications for a specific user, newest first.
     
     Arguments:
     - barcode: The barcode of the user.
+    - limit: Maximum number of notifications to return (defaults to PAGE_SIZE_DEFAULT)
+    - cursor: The next_cursor value returned by the previous page, or None for the first page
+    - unread_only: Only return notifications that have not been marked as read
     
     Returns:
-    - A tuple containing the notifications list and HTTP status code.
+    - A tuple containing the notifications page and HTTP status code.
     """
-    user = User.query.get(barcode)
-    if not user:
-        return {"error": "User not found"}, 404
-    
-    # Deserialize the notifications JSON string into a Python list
-    notifications = user.get_notifications()
-    return notifications, 200
\ No newline at end of file
+    try:
+        page_size = resolve_page_size(limit)
+        user_id = db.session.query(User.id).filter_by(barcode=barcode).scalar()
+        if user_id is None:
+            return {"error": "User not found"}, 404
+
+        query = Notification.query.filter(Notification.user_id == user_id)
+        if unread_only:
+            query = query.filter(Notification.is_read == False)  # noqa: E712
+        if cursor:
+            created_at, notification_id = decode_cursor(cursor, 2)
+            created_at = cursor_value_to_datetime(created_at)
+            # Keyset on (created_at, id) descending, served by the (user_id, created_at) index
+            query = query.filter(or_(
+                Notification.created_at < created_at,
+                and_(Notification.created_at == created_at, Notification.id < notification_id)
+            ))
+        rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(page_size + 1).all()
+        rows, next_cursor = split_page(rows, page_size,
+                                       lambda row: (datetime_to_cursor_value(row.created_at), row.id))
+
+        unread_count = Notification.query.filter(
+            Notification.user_id == user_id, Notification.is_read == False  # noqa: E712
+        ).count()
+
+        return {
+            "notifications": [notification.to_dict() for notification in rows],
+            "unread_count": unread_count,
+            "next_cursor": next_cursor
+        }, 200
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
+def mark_notifications_read_service(barcode, notification_ids=None):
+    """
+    Mark a user's notifications as read.
+
+    Arguments:
+    - barcode: The barcode of the user.
+    - notification_ids: The ids to mark, or None to mark all of the user's notifications
+
+    Returns:
+    - A tuple containing the number of notifications updated and HTTP status code.
+    """
+    try:
+        user_id = db.session.query(User.id).filter_by(barcode=barcode).scalar()
+        if user_id is None:
+            return {"error": "User not found"}, 404
+
+        statement = db.update(Notification).where(
+            Notification.user_id == user_id, Notification.is_read == False  # noqa: E712
+        )
+        if notification_ids is not None:
+            statement = statement.where(Notification.id.in_(notification_ids))
+        result = db.session.execute(statement.values(is_read=True))
+        db.session.commit()
+        return {"message": "Notifications marked as read", "updated": result.rowcount}, 200
+    except Exception as e:
+        db.session.rollback()
+        return {"error": str(e)}, 500
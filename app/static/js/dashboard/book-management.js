@@ -4,6 +4,10 @@ document.addEventListener('DOMContentLoaded', function() {
         // Setup add book button
         document.getElementById('add-book-btn').addEventListener('click', showAddBookForm);
         
+        // Suggest titles and authors while typing
+        setupTypeahead('book-search-title', 'title');
+        setupTypeahead('book-search-author', 'author');
+
         // Setup search buttons
         document.getElementById('book-search-btn')?.addEventListener('click', searchBooks);
         document.getElementById('book-search-clear')?.addEventListener('click', function() {
@@ -19,9 +23,31 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Load books when the tab is clicked
         document.getElementById('nav-books').addEventListener('click', loadBooks);
+        
+        // Load the next page when the user scrolls near the bottom of the books table
+        window.addEventListener('scroll', function() {
+            const section = document.getElementById('books-section');
+            const nearBottom = window.innerHeight + window.scrollY >= document.body.offsetHeight - 200;
+            if (section.classList.contains('active') && nearBottom) {
+                loadNextBooksPage();
+            }
+        });
     }
 });
 
+// Number of books requested per page
+const BOOKS_PAGE_SIZE = 50;
+
+// Paging state for the books table: the API returns a next_cursor until the last page
+const booksPaging = {
+    url: null,
+    cursor: null,
+    done: true,
+    loading: false,
+    generation: 0,
+    emptyMessage: 'No books found.'
+};
+
 // Show form to add a new book
 function showAddBookForm() {
     // In a real app, you'd show a modal or form
@@ -69,44 +95,73 @@ async function addBook(title, author, subject_category, publication_date) {
     }
 }
 
-// Load all books from the database
+// Load the first page of books from the database
 async function loadBooks() {
+    await startBooksPaging('/api/books', 'No books found.');
+}
+
+// Reset the paging state for a new listing and fetch its first page
+async function startBooksPaging(url, emptyMessage) {
+    booksPaging.url = url;
+    booksPaging.cursor = null;
+    booksPaging.done = false;
+    booksPaging.loading = false;
+    booksPaging.generation += 1;
+    booksPaging.emptyMessage = emptyMessage;
+    
+    document.getElementById('books-list').innerHTML = '<tr><td colspan="6">Loading books...</td></tr>';
+    await loadNextBooksPage();
+}
+
+// Fetch the next page of the current listing and append it to the table
+async function loadNextBooksPage() {
+    if (booksPaging.loading || booksPaging.done) return;
+    
+    booksPaging.loading = true;
+    const generation = booksPaging.generation;
+    const firstPage = booksPaging.cursor === null;
+    
     try {
-        const booksList = document.getElementById('books-list');
-        booksList.innerHTML = '<tr><td colspan="6">Loading books...</td></tr>';
+        const url = new URL(booksPaging.url, window.location.origin);
+        url.searchParams.set('limit', BOOKS_PAGE_SIZE);
+        if (booksPaging.cursor) url.searchParams.set('cursor', booksPaging.cursor);
         
-        const response = await handleApiResponse(fetch('/api/books', {
+        const response = await handleApiResponse(fetchWithETag(url, {
             headers: getAuthHeader()
         }));
         
+        // Ignore responses for a listing that has since been replaced
+        if (generation !== booksPaging.generation) return;
+        
         if (response.ok) {
             const data = await response.json();
+            const books = data && Array.isArray(data.books) ? data.books : [];
             
-            // Check if data is an array or has a books property that's an array
-            let books;
-            if (Array.isArray(data)) {
-                books = data;
-            } else if (data && Array.isArray(data.books)) {
-                books = data.books;
-            } else {
-                // If we can't find an array of books, create an empty array
-                console.error('Unexpected API response format:', data);
-                books = [];
-            }
-            
-            displayBooks(books);
+            booksPaging.cursor = data.next_cursor || null;
+            booksPaging.done = !data.next_cursor;
+            displayBooks(books, !firstPage);
         } else {
-            booksList.innerHTML = '<tr><td colspan="6">Error loading books. Please try again.</td></tr>';
+            booksPaging.done = true;
+            if (firstPage) {
+                document.getElementById('books-list').innerHTML = '<tr><td colspan="6">Error loading books. Please try again.</td></tr>';
+            }
         }
     } catch (error) {
         console.error('Error loading books:', error);
-        document.getElementById('books-list').innerHTML = 
-            '<tr><td colspan="6">Error loading books. Please try again.</td></tr>';
+        booksPaging.done = true;
+        if (firstPage) {
+            document.getElementById('books-list').innerHTML = 
+                '<tr><td colspan="6">Error loading books. Please try again.</td></tr>';
+        }
+    } finally {
+        if (generation === booksPaging.generation) {
+            booksPaging.loading = false;
+        }
     }
 }
 
-// Display books in the table
-function displayBooks(books) {
+// Display books in the table (append adds a page below the rows already shown)
+function displayBooks(books, append = false) {
     const booksList = document.getElementById('books-list');
     
     // Ensure books is an array
@@ -115,16 +170,25 @@ function displayBooks(books) {
         books = [];
     }
     
+    if (append) {
+        books.forEach(book => booksList.appendChild(createBookRow(book)));
+        return;
+    }
+    
     if (books.length === 0) {
-        booksList.innerHTML = '<tr><td colspan="6">No books found.</td></tr>';
+        booksList.innerHTML = `<tr><td colspan="6">${booksPaging.emptyMessage}</td></tr>`;
         return;
     }
     
     booksList.innerHTML = '';
+    books.forEach(book => booksList.appendChild(createBookRow(book)));
+}
+
+// Build the table row for a single book
+function createBookRow(book) {
     
-    books.forEach(book => {
-        const row = document.createElement('tr');
-        row.innerHTML = `
+    const row = document.createElement('tr');
+    row.innerHTML = `
             <td>${book.barcode || 'N/A'}</td>
             <td>${book.title || 'N/A'}</td>
             <td>${book.author || 'N/A'}</td>
@@ -137,8 +201,7 @@ function displayBooks(books) {
                 <button class="btn-small btn-secondary" onclick="deleteBook('${book.barcode}')">Delete</button>
             </td>
         `;
-        booksList.appendChild(row);
-    });
+    return row;
 }
 
 // View copies of a specific book
@@ -146,7 +209,7 @@ async function viewCopies(barcode) {
     try {
         // Use the correct API endpoint for fetching book copies
         // UPDATED: Changed from /api/books/${barcode}/copies to /api/book_copies/${barcode}
-        const response = await handleApiResponse(fetch(`/api/book_copies/${barcode}`, {
+        const response = await handleApiResponse(fetchWithETag(`/api/book_copies/${barcode}`, {
             headers: getAuthHeader()
         }));
         
@@ -212,7 +275,7 @@ async function addCopy(barcode) {
 // Edit book details
 async function editBook(barcode) {
     try {
-        const response = await handleApiResponse(fetch(`/api/books/${barcode}`, {
+        const response = await handleApiResponse(fetchWithETag(`/api/books/${barcode}`, {
             headers: getAuthHeader()
         }));
         
@@ -311,52 +374,13 @@ async function searchBooks() {
         return;
     }
     
-    try {
-        const booksList = document.getElementById('books-list');
-        booksList.innerHTML = '<tr><td colspan="6">Searching...</td></tr>';
-        
-        // Create URLSearchParams object for proper URL parameter encoding
-        const params = new URLSearchParams();
-        if (titleSearch) params.append('title', titleSearch);
-        if (authorSearch) params.append('author', authorSearch);
-        if (categorySearch) params.append('subject_category', categorySearch);
-        if (barcodeSearch) params.append('barcode', barcodeSearch);
-        
-        // Convert to string and log for debugging
-        const queryString = params.toString();
-        console.log(`Searching with: /api/search/books?${queryString}`);
-        
-        const response = await handleApiResponse(fetch(`/api/search/books?${queryString}`, {
-            headers: getAuthHeader()
-        }));
-        
-        if (response.ok) {
-            const data = await response.json();
-            console.log("Search results:", data);
-            
-            // Handle different response formats
-            let books;
-            if (Array.isArray(data)) {
-                books = data;
-            } else if (data && Array.isArray(data.books)) {
-                books = data.books;
-            } else {
-                console.error('Unexpected API response format:', data);
-                books = [];
-            }
-            
-            if (books.length === 0) {
-                booksList.innerHTML = '<tr><td colspan="6">No books found matching your search criteria.</td></tr>';
-            } else {
-                displayBooks(books);
-            }
-        } else {
-            console.error("Search failed with status:", response.status);
-            booksList.innerHTML = '<tr><td colspan="6">Error searching books. Please try again.</td></tr>';
-        }
-    } catch (error) {
-        console.error('Error searching books:', error);
-        document.getElementById('books-list').innerHTML = 
-            '<tr><td colspan="6">Error searching books. Please try again.</td></tr>';
-    }
-}
\ No newline at end of file
+    // Create URLSearchParams object for proper URL parameter encoding
+    const params = new URLSearchParams();
+    if (titleSearch) params.append('title', titleSearch);
+    if (authorSearch) params.append('author', authorSearch);
+    if (categorySearch) params.append('subject_category', categorySearch);
+    if (barcodeSearch) params.append('barcode', barcodeSearch);
+    
+    // Page through the search results the same way as the full listing
+    await startBooksPaging(`/api/search/books?${params.toString()}`, 'No books found matching your search criteria.');
+}
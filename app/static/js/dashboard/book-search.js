@@ -3,85 +3,180 @@ document.addEventListener('DOMContentLoaded', function() {
     if (document.getElementById('search-books-section')) {
         // Setup search form
         document.getElementById('search-btn').addEventListener('click', searchBooks);
+
+        // Suggest titles and authors while typing
+        setupTypeahead('search-title', 'title');
+        setupTypeahead('search-author', 'author');
         
         // Load search section when the tab is clicked
         document.getElementById('nav-search-books').addEventListener('click', () => {
             // Clear previous search results
             document.getElementById('search-results-list').innerHTML = '';
         });
+        
+        // Load the next page of results when the user scrolls near the bottom
+        window.addEventListener('scroll', function() {
+            const section = document.getElementById('search-books-section');
+            const nearBottom = window.innerHeight + window.scrollY >= document.body.offsetHeight - 200;
+            if (section.classList.contains('active') && nearBottom) {
+                loadNextSearchPage();
+            }
+        });
     }
 });
 
-// Update the searchBooks function:
+// Number of results requested per page
+const SEARCH_PAGE_SIZE = 25;
+
+// Paging state for the search results: the API returns a next_cursor until the last page
+const searchPaging = {
+    queryString: '',
+    cursor: null,
+    done: true,
+    loading: false,
+    generation: 0
+};
+
+// Facet values selected by the user (values of one facet are alternatives)
+const FACET_LABELS = { subject_category: 'Category', author: 'Author', decade: 'Decade' };
+const facetSelection = { subject_category: new Set(), author: new Set(), decade: new Set() };
+
+// Start a new search from the form fields, clearing the facet selection
 async function searchBooks() {
-    const titleSearch = document.getElementById('book-search-title').value.trim();
-    const authorSearch = document.getElementById('book-search-author').value.trim();
-    const categorySearch = document.getElementById('book-search-category').value.trim();
-    const barcodeSearch = document.getElementById('book-search-barcode').value.trim();
+    Object.values(facetSelection).forEach(values => values.clear());
+    await runSearch();
+}
+
+// Add or remove a facet value and search again
+async function toggleFacet(name, value) {
+    const values = facetSelection[name];
+    if (values.has(value)) values.delete(value); else values.add(value);
+    await runSearch();
+}
+
+// Run the search described by the form fields and the facet selection (empty fields browse the whole catalog)
+async function runSearch() {
+    const titleSearch = document.getElementById('search-title').value.trim();
+    const authorSearch = document.getElementById('search-author').value.trim();
+    const categorySearch = document.getElementById('search-category').value.trim();
     
-    // If all fields are empty, load all books
-    if (!titleSearch && !authorSearch && !categorySearch && !barcodeSearch) {
-        loadBooks();
-        return;
-    }
+    // Build search query params
+    const params = new URLSearchParams();
+    if (titleSearch) params.append('title', titleSearch);
+    if (authorSearch) params.append('author', authorSearch);
+    if (categorySearch) params.append('subject_category', categorySearch);
+    Object.entries(facetSelection).forEach(([name, values]) => {
+        values.forEach(value => params.append(`facet_${name}`, value));
+    });
+    params.append('facets', '1');
+    params.append('limit', SEARCH_PAGE_SIZE);
+    
+    searchPaging.queryString = params.toString();
+    searchPaging.cursor = null;
+    searchPaging.done = false;
+    searchPaging.loading = false;
+    searchPaging.generation += 1;
+    
+    document.getElementById('search-results-list').innerHTML = '<tr><td colspan="5">Searching...</td></tr>';
+    await loadNextSearchPage();
+}
+
+// Fetch the next page of the current search and append it to the results table
+async function loadNextSearchPage() {
+    if (searchPaging.loading || searchPaging.done) return;
+    
+    searchPaging.loading = true;
+    const generation = searchPaging.generation;
+    const firstPage = searchPaging.cursor === null;
     
     try {
-        const booksList = document.getElementById('books-list');
-        booksList.innerHTML = '<tr><td colspan="6">Searching...</td></tr>';
-        
-        // Build search query params
-        let queryParams = [];
-        if (titleSearch) queryParams.push(`title=${encodeURIComponent(titleSearch)}`);
-        if (authorSearch) queryParams.push(`author=${encodeURIComponent(authorSearch)}`);
-        // CRITICAL FIX: Use subject_category not subject to match backend parameter name
-        if (categorySearch) queryParams.push(`subject_category=${encodeURIComponent(categorySearch)}`);
-        if (barcodeSearch) queryParams.push(`barcode=${encodeURIComponent(barcodeSearch)}`);
+        let url = `/api/search/books?${searchPaging.queryString}`;
+        if (searchPaging.cursor) url += `&cursor=${encodeURIComponent(searchPaging.cursor)}`;
         
-        const queryString = queryParams.join('&');
-        
-        const response = await handleApiResponse(fetch(`/api/search/books?${queryString}`, {
+        const response = await handleApiResponse(fetchWithETag(url, {
             headers: getAuthHeader()
         }));
         
+        // Ignore responses for a search that has since been replaced
+        if (generation !== searchPaging.generation) return;
+        
         if (response.ok) {
             const data = await response.json();
+            const books = data && Array.isArray(data.books) ? data.books : [];
             
-            // Handle different response formats
-            let books;
-            if (Array.isArray(data)) {
-                books = data;
-            } else if (data && Array.isArray(data.books)) {
-                books = data.books;
-            } else {
-                console.error('Unexpected API response format:', data);
-                books = [];
+            // Nothing matched exactly: retry once tolerating misspelled titles and authors
+            const params = new URLSearchParams(searchPaging.queryString);
+            if (firstPage && books.length === 0 && !params.has('fuzzy') && (params.has('title') || params.has('author'))) {
+                params.append('fuzzy', '1');
+                searchPaging.queryString = params.toString();
+                searchPaging.loading = false;
+                await loadNextSearchPage();
+                return;
             }
             
-            if (books.length === 0) {
-                booksList.innerHTML = '<tr><td colspan="6">No books found matching your search criteria.</td></tr>';
-            } else {
-                displayBooks(books);
-            }
+            searchPaging.cursor = data.next_cursor || null;
+            searchPaging.done = !data.next_cursor;
+            if (firstPage) displayFacets(data.facets);
+            displaySearchResults(books, !firstPage);
         } else {
-            booksList.innerHTML = '<tr><td colspan="6">Error searching books. Please try again.</td></tr>';
+            searchPaging.done = true;
+            if (firstPage) {
+                document.getElementById('search-results-list').innerHTML = '<tr><td colspan="5">Error searching books. Please try again.</td></tr>';
+            }
         }
     } catch (error) {
         console.error('Error searching books:', error);
-        document.getElementById('books-list').innerHTML = 
-            '<tr><td colspan="6">Error searching books. Please try again.</td></tr>';
+        searchPaging.done = true;
+        if (firstPage) {
+            document.getElementById('search-results-list').innerHTML = 
+                '<tr><td colspan="5">Error searching books. Please try again.</td></tr>';
+        }
+    } finally {
+        if (generation === searchPaging.generation) {
+            searchPaging.loading = false;
+        }
     }
 }
 
-function displaySearchResults(books) {
+// Show the counts per facet value next to the results; selected values are highlighted
+function displayFacets(facets) {
+    const container = document.getElementById('search-facets');
+    if (!container) return;
+    container.innerHTML = '';
+    // Fuzzy searches do not return facets
+    if (!facets) return;
+    
+    Object.entries(FACET_LABELS).forEach(([name, label]) => {
+        const values = facets[name] || [];
+        if (values.length === 0) return;
+        
+        const group = document.createElement('div');
+        group.className = 'facet-group';
+        group.innerHTML = `<strong>${label}:</strong>`;
+        values.forEach(({ value, count }) => {
+            const chip = document.createElement('button');
+            chip.type = 'button';
+            chip.className = facetSelection[name].has(String(value)) ? 'facet-chip selected' : 'facet-chip';
+            chip.textContent = `${name === 'decade' ? `${value}s` : value} (${count})`;
+            chip.addEventListener('click', () => toggleFacet(name, String(value)));
+            group.appendChild(chip);
+        });
+        container.appendChild(group);
+    });
+}
+
+// Display search results (append adds a page below the rows already shown)
+function displaySearchResults(books, append = false) {
     const searchResultsList = document.getElementById('search-results-list');
     
-    if (books.length === 0) {
-        searchResultsList.innerHTML = '<tr><td colspan="5">No books found matching your search criteria.</td></tr>';
-        return;
+    if (!append) {
+        if (books.length === 0) {
+            searchResultsList.innerHTML = '<tr><td colspan="5">No books found matching your search criteria.</td></tr>';
+            return;
+        }
+        searchResultsList.innerHTML = '';
     }
     
-    searchResultsList.innerHTML = '';
-    
     books.forEach(book => {
         const availableCopies = book.available_copies || 0;
         const totalCopies = book.total_copies || 0;
@@ -106,7 +201,7 @@ function displaySearchResults(books) {
 
 async function viewBookDetails(barcode) {
     try {
-        const response = await handleApiResponse(fetch(`/api/books/${barcode}`, {
+        const response = await handleApiResponse(fetchWithETag(`/api/books/${barcode}`, {
             headers: getAuthHeader()
         }));
         
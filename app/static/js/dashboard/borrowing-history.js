@@ -6,7 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 });
 
-async function loadBorrowingHistory() {
+async function loadBorrowingHistory(e, cursor = null) {
     try {
         // Get current user
         const userResponse = await handleApiResponse(fetch('/dashboard/get-current-user', {
@@ -19,17 +19,20 @@ async function loadBorrowingHistory() {
         
         const userData = await userResponse.json();
         
-        // Load user's borrowing history
+        // Load user's borrowing history, one page at a time (newest first)
         const historyList = document.getElementById('history-list');
-        historyList.innerHTML = '<tr><td colspan="5">Loading borrowing history...</td></tr>';
+        if (!cursor) {
+            historyList.innerHTML = '<tr><td colspan="5">Loading borrowing history...</td></tr>';
+        }
         
-        const historyResponse = await handleApiResponse(fetch(`/api/users/${userData.barcode}/borrowing-history`, {
+        const url = `/api/users/${userData.id}/borrowing-history?limit=50` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+        const historyResponse = await handleApiResponse(fetch(url, {
             headers: getAuthHeader()
         }));
         
         if (historyResponse.ok) {
             const history = await historyResponse.json();
-            displayBorrowingHistory(history);
+            displayBorrowingHistory(history, Boolean(cursor));
         } else {
             throw new Error('Failed to load borrowing history');
         }
@@ -40,20 +43,27 @@ async function loadBorrowingHistory() {
     }
 }
 
-function displayBorrowingHistory(history) {
+function displayBorrowingHistory(history, append) {
     const historyList = document.getElementById('history-list');
+    const items = history.borrowing_history;
+    
+    // Drop the "Load more" row of the previous page
+    const loadMore = document.getElementById('history-load-more');
+    if (loadMore) {
+        loadMore.remove();
+    }
     
-    if (history.length === 0) {
+    if (!append && items.length === 0) {
         historyList.innerHTML = '<tr><td colspan="5">You have no borrowing history.</td></tr>';
         return;
     }
     
-    historyList.innerHTML = '';
-    
-    // Sort history by checkout date, most recent first
-    history.sort((a, b) => new Date(b.checkout_date) - new Date(a.checkout_date));
+    if (!append) {
+        historyList.innerHTML = '';
+    }
     
-    history.forEach(item => {
+    // The server returns the history sorted by checkout date, most recent first
+    items.forEach(item => {
         const checkoutDate = new Date(item.checkout_date).toLocaleDateString();
         const dueDate = new Date(item.due_date).toLocaleDateString();
         const returnDate = item.return_date ? new Date(item.return_date).toLocaleDateString() : 'Not returned';
@@ -75,6 +85,14 @@ function displayBorrowingHistory(history) {
         historyList.appendChild(row);
     });
     
+    if (history.next_cursor) {
+        const row = document.createElement('tr');
+        row.id = 'history-load-more';
+        row.innerHTML = '<td colspan="5"><button class="btn-small">Load more</button></td>';
+        row.querySelector('button').addEventListener('click', e => loadBorrowingHistory(e, history.next_cursor));
+        historyList.appendChild(row);
+    }
+    
     // Add some CSS to highlight items with fines
     const style = document.createElement('style');
     style.innerHTML = `
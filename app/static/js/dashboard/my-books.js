@@ -23,13 +23,14 @@ async function loadMyBooks() {
         const myBooksList = document.getElementById('my-books-list');
         myBooksList.innerHTML = '<tr><td colspan="5">Loading your books...</td></tr>';
         
-        const borrowingsResponse = await handleApiResponse(fetch(`/api/users/${userData.barcode}/borrowings`, {
+        // A member has at most a handful of loans, so one page holds them all
+        const borrowingsResponse = await handleApiResponse(fetch(`/api/users/${userData.id}/checked-out-books?limit=200`, {
             headers: getAuthHeader()
         }));
         
         if (borrowingsResponse.ok) {
             const borrowings = await borrowingsResponse.json();
-            displayMyBooks(borrowings);
+            displayMyBooks(borrowings.checked_out_books);
         } else {
             throw new Error('Failed to load borrowings');
         }
@@ -104,19 +104,24 @@ async function loadOverdueBooks() {
         const overdueList = document.getElementById('overdue-list');
         overdueList.innerHTML = '<tr><td colspan="6">Loading overdue books...</td></tr>';
         
-        const response = await handleApiResponse(fetch('/api/overdue-books', {
-            headers: getAuthHeader()
-        }));
-        
-        if (response.ok) {
-            const overdueData = await response.json();
+        // The endpoint is paginated; follow next_cursor until every page is shown
+        let cursor = null;
+        let shown = 0;
+        do {
+            const url = '/api/overdue-books?limit=200' + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+            const response = await handleApiResponse(fetch(url, {
+                headers: getAuthHeader()
+            }));
             
-            if (overdueData.overdue_books.length === 0) {
-                overdueList.innerHTML = '<tr><td colspan="6">No overdue books found.</td></tr>';
+            if (!response.ok) {
+                overdueList.innerHTML = '<tr><td colspan="6">Error loading overdue books. Please try again.</td></tr>';
                 return;
             }
             
-            overdueList.innerHTML = '';
+            const overdueData = await response.json();
+            if (shown === 0) {
+                overdueList.innerHTML = '';
+            }
             
             overdueData.overdue_books.forEach(item => {
                 const row = document.createElement('tr');
@@ -130,8 +135,12 @@ async function loadOverdueBooks() {
                 `;
                 overdueList.appendChild(row);
             });
-        } else {
-            overdueList.innerHTML = '<tr><td colspan="6">Error loading overdue books. Please try again.</td></tr>';
+            shown += overdueData.overdue_books.length;
+            cursor = overdueData.next_cursor;
+        } while (cursor);
+        
+        if (shown === 0) {
+            overdueList.innerHTML = '<tr><td colspan="6">No overdue books found.</td></tr>';
         }
     } catch (error) {
         console.error('Error loading overdue books:', error);
@@ -11,45 +11,99 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('search-by-barcode').addEventListener('change', function() {
             searchUsers();
         });
+        
+        // Load the next page when the user scrolls near the bottom of the users table
+        window.addEventListener('scroll', function() {
+            const section = document.getElementById('users-section');
+            const nearBottom = window.innerHeight + window.scrollY >= document.body.offsetHeight - 200;
+            if (section.classList.contains('active') && nearBottom) {
+                loadNextUsersPage();
+            }
+        });
     }
 });
 
+// Number of users requested per page
+const USERS_PAGE_SIZE = 50;
+
+// Paging state for the users table: the API returns a next_cursor until the last page
+const usersPaging = {
+    query: '',
+    cursor: null,
+    done: true,
+    loading: false,
+    generation: 0
+};
+
+// Load the first page of all users
 async function loadUsers() {
+    await startUsersPaging('');
+}
+
+// Reset the paging state for a new listing (q = search text, '' for everyone) and fetch its first page
+async function startUsersPaging(query) {
+    usersPaging.query = query;
+    usersPaging.cursor = null;
+    usersPaging.done = false;
+    usersPaging.loading = false;
+    usersPaging.generation += 1;
+    
+    document.getElementById('users-list').innerHTML =
+        `<tr><td colspan="5">${query ? 'Searching...' : 'Loading users...'}</td></tr>`;
+    await loadNextUsersPage();
+}
+
+// Fetch the next page of the current listing and append it to the table
+async function loadNextUsersPage() {
+    if (usersPaging.loading || usersPaging.done) return;
+    
+    usersPaging.loading = true;
+    const generation = usersPaging.generation;
+    const firstPage = usersPaging.cursor === null;
+    
     try {
-        const usersList = document.getElementById('users-list');
-        usersList.innerHTML = '<tr><td colspan="5">Loading users...</td></tr>';
+        // The server filters and pages, so only the rows shown are downloaded
+        const url = new URL('/api/users', window.location.origin);
+        url.searchParams.set('limit', USERS_PAGE_SIZE);
+        if (usersPaging.query) url.searchParams.set('q', usersPaging.query);
+        if (usersPaging.cursor) url.searchParams.set('cursor', usersPaging.cursor);
         
-        const response = await handleApiResponse(fetch('/api/users', {
+        const response = await handleApiResponse(fetch(url, {
             headers: getAuthHeader()
         }));
         
+        // Ignore responses for a listing that has since been replaced (e.g. by the next keystroke)
+        if (generation !== usersPaging.generation) return;
+        
         if (response.ok) {
             const data = await response.json();
+            const users = data && Array.isArray(data.users) ? data.users : [];
             
-            // Check if data is an array or has a users property that's an array
-            let users;
-            if (Array.isArray(data)) {
-                users = data;
-            } else if (data && Array.isArray(data.users)) {
-                users = data.users;
-            } else {
-                // If we can't find an array of users, create an empty array
-                console.error('Unexpected API response format:', data);
-                users = [];
-            }
-            
-            displayUsers(users);
+            usersPaging.cursor = data.next_cursor || null;
+            usersPaging.done = !data.next_cursor;
+            displayUsers(users, !firstPage);
         } else {
-            usersList.innerHTML = '<tr><td colspan="5">Error loading users. Please try again.</td></tr>';
+            usersPaging.done = true;
+            if (firstPage) {
+                document.getElementById('users-list').innerHTML = '<tr><td colspan="5">Error loading users. Please try again.</td></tr>';
+            }
         }
     } catch (error) {
         console.error('Error loading users:', error);
-        document.getElementById('users-list').innerHTML = 
-            '<tr><td colspan="5">Error loading users. Please try again.</td></tr>';
+        usersPaging.done = true;
+        if (firstPage) {
+            document.getElementById('users-list').innerHTML = 
+                '<tr><td colspan="5">Error loading users. Please try again.</td></tr>';
+        }
+    } finally {
+        if (generation === usersPaging.generation) {
+            usersPaging.loading = false;
+        }
     }
 }
 
-function displayUsers(users) {
+// Display users in the table (append adds a page below the rows already shown)
+function displayUsers(users, append = false) {
     const usersList = document.getElementById('users-list');
     
     // Ensure users is an array
@@ -58,66 +112,63 @@ function displayUsers(users) {
         users = [];
     }
     
+    if (append) {
+        users.forEach(user => usersList.appendChild(createUserRow(user)));
+        return;
+    }
+    
     if (users.length === 0) {
         usersList.innerHTML = '<tr><td colspan="5">No users found.</td></tr>';
         return;
     }
     
     usersList.innerHTML = '';
-    
-    users.forEach(user => {
-        const row = document.createElement('tr');
-        row.innerHTML = `
-            <td>${user.barcode || 'N/A'}</td>
-            <td>${user.name || 'N/A'}</td>
-            <td>${user.email || 'N/A'}</td>
-            <td>${user.role || 'N/A'}</td>
-            <td>
-                <button class="btn-small" onclick="viewUserDetails('${user.barcode}')">Details</button>
-                <button class="btn-small btn-secondary" onclick="deleteUser('${user.barcode}')">Delete</button>
-            </td>
-        `;
-        usersList.appendChild(row);
-    });
+    users.forEach(user => usersList.appendChild(createUserRow(user)));
+}
+
+function createUserRow(user) {
+    const row = document.createElement('tr');
+    row.innerHTML = `
+        <td>${user.barcode || 'N/A'}</td>
+        <td>${user.name || 'N/A'}</td>
+        <td>${user.email || 'N/A'}</td>
+        <td>${user.role || 'N/A'}</td>
+        <td>
+            <button class="btn-small" onclick="viewUserDetails('${user.barcode}')">Details</button>
+            <button class="btn-small btn-secondary" onclick="deleteUser('${user.barcode}')">Delete</button>
+        </td>
+    `;
+    return row;
 }
 
 async function searchUsers() {
     const searchInput = document.getElementById('user-search').value.trim();
     const searchByBarcode = document.getElementById('search-by-barcode').checked;
     
-    if (searchInput === '') {
-        // If search is empty, load all users
-        loadUsers();
+    if (searchInput === '' || !searchByBarcode) {
+        // Name or email prefix (or a whole barcode), searched server-side; empty lists everyone
+        await startUsersPaging(searchInput);
         return;
     }
     
+    // Exact barcode lookup: a single user, no paging
+    usersPaging.generation += 1;
+    usersPaging.done = true;
+    const generation = usersPaging.generation;
+    
     try {
         const usersList = document.getElementById('users-list');
         usersList.innerHTML = '<tr><td colspan="5">Searching...</td></tr>';
         
-        let url;
-        if (searchByBarcode) {
-            url = `/api/users/barcode/${searchInput}`;
-        } //else {
-        //     // This assumes your backend has a search endpoint for users
-        //     // You might need to create this endpoint
-        //     url = `/api/users?search=${searchInput}`;
-        // }
-        
-        const response = await handleApiResponse(fetch(url, {
+        const response = await handleApiResponse(fetch(`/api/users/barcode/${encodeURIComponent(searchInput)}`, {
             headers: getAuthHeader()
         }));
         
+        if (generation !== usersPaging.generation) return;
+        
         if (response.ok) {
-            if (searchByBarcode) {
-                // If searching by barcode, we get a single user
-                const user = await response.json();
-                displayUsers([user]);
-            } else {
-                // If searching by name/email, we get an array of users
-                const users = await response.json();
-                displayUsers(users);
-            }
+            const user = await response.json();
+            displayUsers([user]);
         } else {
             usersList.innerHTML = '<tr><td colspan="5">No users found.</td></tr>';
         }
@@ -49,9 +49,20 @@ async function loadAuthenticatedPage(url) {
 
 // Clear tokens and redirect to login
 function logout() {
+    // Revoke the session's tokens on the server; fire and forget, the page is left right away
+    const token = localStorage.getItem('access_token');
+    if (token) {
+        fetch('/auth/logout', {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${token}`, 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: localStorage.getItem('refresh_token') }),
+            keepalive: true
+        }).catch(() => {});
+    }
     localStorage.removeItem('access_token');
     localStorage.removeItem('refresh_token');
     localStorage.removeItem('role');
+    etagCache.clear();
     window.location.href = '/login';
 }
 
@@ -72,6 +83,44 @@ async function handleApiResponse(responsePromise) {
     }
 }
 
+// Catalog responses kept for revalidation: URL -> { etag, body, status, headers }
+const ETAG_CACHE_SIZE = 100;
+const etagCache = new Map();
+
+// GET a catalog URL, revalidating a previously fetched copy with If-None-Match.
+// A 304 answer is turned back into a 200 response built from the kept body,
+// so callers handle it exactly like a fresh response.
+async function fetchWithETag(url, options = {}) {
+    const headers = { ...(options.headers || getAuthHeader()) };
+    // Responses are per user: key on the token as well as the URL
+    const key = `${headers['Authorization'] || ''} ${url}`;
+    const cached = etagCache.get(key);
+    if (cached) headers['If-None-Match'] = cached.etag;
+
+    // The kept copy replaces the browser cache, which would otherwise answer the revalidation itself
+    const response = await fetch(url, { ...options, headers, cache: 'no-store' });
+
+    if (response.status === 304 && cached) {
+        // Move to the end so the least recently used entries are dropped first
+        etagCache.delete(key);
+        etagCache.set(key, cached);
+        return new Response(cached.body, { status: cached.status, headers: cached.headers });
+    }
+
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        const body = await response.clone().text();
+        etagCache.delete(key);
+        etagCache.set(key, { etag, body, status: response.status, headers: [...response.headers] });
+        if (etagCache.size > ETAG_CACHE_SIZE) {
+            etagCache.delete(etagCache.keys().next().value);
+        }
+    } else {
+        etagCache.delete(key);
+    }
+    return response;
+}
+
 // Set up click handler for internal links
 document.addEventListener('DOMContentLoaded', function() {
     document.addEventListener('click', function(e) {
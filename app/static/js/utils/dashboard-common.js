@@ -30,4 +30,50 @@ function handleApiError(error, elementId) {
             element.innerHTML = `<div class="error-message">An error occurred: ${error.message || 'Unknown error'}</div>`;
         }
     }
-}
\ No newline at end of file
+}
+
+// Delay between the last keystroke and the suggestion request
+const TYPEAHEAD_DELAY_MS = 150;
+
+// Offer title or author completions from /api/search/suggest in a datalist under the input
+function setupTypeahead(inputId, type) {
+    const input = document.getElementById(inputId);
+    if (!input) return;
+
+    const datalist = document.createElement('datalist');
+    datalist.id = `${inputId}-suggestions`;
+    input.after(datalist);
+    input.setAttribute('list', datalist.id);
+    input.setAttribute('autocomplete', 'off');
+
+    let timer = null;
+    let latest = 0;
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (!query) {
+            datalist.innerHTML = '';
+            return;
+        }
+        timer = setTimeout(async () => {
+            // Ignore responses to requests that were overtaken by newer keystrokes
+            const requestId = ++latest;
+            try {
+                const response = await fetch(`/api/search/suggest?q=${encodeURIComponent(query)}`);
+                if (!response.ok || requestId !== latest) return;
+                const data = await response.json();
+                if (requestId !== latest) return;
+                datalist.innerHTML = '';
+                data.suggestions
+                    .filter(suggestion => suggestion.type === type)
+                    .forEach(suggestion => {
+                        const option = document.createElement('option');
+                        option.value = suggestion.text;
+                        datalist.appendChild(option);
+                    });
+            } catch (error) {
+                console.error('Error loading suggestions:', error);
+            }
+        }, TYPEAHEAD_DELAY_MS);
+    });
+}
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, redirect, url_for
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.views.authorization import dashboard_for_role
 
 auth_view_bp = Blueprint('auth_views', __name__)
 
@@ -19,16 +20,5 @@ def logout():
 @auth_view_bp.route('/dashboard')
 @jwt_required()
 def dashboard_redirect():
-    # Get current user identity from JWT
-    current_user = get_jwt_identity()
-    
-    # Get user role from database
-    from app.models.User import User
-    from app import db
-    
-    user = User.query.filter_by(email=current_user).first()
-    
-    if user.role == 'Librarian':
-        return redirect(url_for('dashboard_views.librarian_dashboard'))
-    else:  # Member
-        return redirect(url_for('dashboard_views.member_dashboard'))
\ No newline at end of file
+    # The role comes from the JWT claims, no user lookup needed
+    return dashboard_for_role()
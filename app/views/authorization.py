@@ -0,0 +1,34 @@
+from functools import wraps
+from flask import redirect, url_for
+from flask_jwt_extended import jwt_required, get_jwt
+
+
+def role_required(*roles):
+    """
+    Protect a page with a valid access token whose role claim is one of `roles`.
+
+    The role is read from the token's signed claims, so no user lookup is
+    made (tokens of deleted users are revoked, see revocation_service).
+    Other roles are sent back to the login page.
+    """
+    def decorator(view):
+        @wraps(view)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            if get_jwt().get("role") not in roles:
+                return redirect(url_for('auth_views.login_page'))
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def dashboard_for_role():
+    """
+    Redirect to the dashboard of the role in the current access token (the login page for none).
+    """
+    role = get_jwt().get("role")
+    if role == 'Librarian':
+        return redirect(url_for('dashboard_views.librarian_dashboard'))
+    if role == 'Member':
+        return redirect(url_for('dashboard_views.member_dashboard'))
+    return redirect(url_for('auth_views.login_page'))
@@ -1,70 +1,38 @@
-from flask import Blueprint, render_template, redirect, url_for, jsonify
+from flask import Blueprint, render_template, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.User import User
+from app.views.authorization import role_required, dashboard_for_role
+from app.services.user_cache import get_user
 
 dashboard_view_bp = Blueprint('dashboard_views', __name__)
 
 @dashboard_view_bp.route('/')
 @jwt_required()
 def dashboard_redirect():
-    # Get current user identity from JWT
-    current_user = get_jwt_identity()
-    
-    # Get user from database
-    user = User.query.filter_by(email=current_user).first()
-    
-    if not user:
-        return redirect(url_for('auth_views.login_page'))
-    
-    if user.role == 'Librarian':
-        return redirect(url_for('dashboard_views.librarian_dashboard'))
-    else:  # Member
-        return redirect(url_for('dashboard_views.member_dashboard'))
+    # The role comes from the JWT claims, no user lookup needed
+    return dashboard_for_role()
 
 @dashboard_view_bp.route('/librarian')
-@jwt_required()
+@role_required('Librarian')
 def librarian_dashboard():
-    # Get current user identity from JWT
-    current_user = get_jwt_identity()
-    
-    # Get user from database
-    user = User.query.filter_by(email=current_user).first()
-    
-    if not user or user.role != 'Librarian':
-        return redirect(url_for('auth_views.login_page'))
-    
     return render_template('dashboard/librarian_dashboard.html')
 
 @dashboard_view_bp.route('/member')
-@jwt_required()
+@role_required('Member')
 def member_dashboard():
-    # Get current user identity from JWT
-    current_user = get_jwt_identity()
-    
-    # Get user from database
-    user = User.query.filter_by(email=current_user).first()
-    
-    if not user or user.role != 'Member':
-        return redirect(url_for('auth_views.login_page'))
-    
     return render_template('dashboard/member_dashboard.html')
 
 @dashboard_view_bp.route('/get-current-user')
 @jwt_required()
 def get_current_user():
-    # Get current user identity from JWT
-    current_user = get_jwt_identity()
-    
-    # Get user from database
-    user = User.query.filter_by(email=current_user).first()
-    
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
+    # The only page that needs the user record: served from the per-process user cache
+    user = get_user(get_jwt_identity())
+    if user is None:
+        return jsonify({"error": "User not found"}), 404
+
     return jsonify({
-        'id': user.id,
-        'name': user.name,
-        'email': user.email,
-        'role': user.role,
-        'barcode': user.barcode
-    })
\ No newline at end of file
+        'id': user['id'],
+        'name': user['name'],
+        'email': user['email'],
+        'role': user['role'],
+        'barcode': user['barcode']
+    })
@@ -0,0 +1,145 @@
+# benchmarks/bench_allocation.py
+"""
+Copy allocation contention benchmark: N worker processes issue the same few titles at once.
+
+Compares the previous read-then-write allocation with the atomic conditional UPDATE and
+checks the database afterwards for copies that were issued twice.
+
+Usage:
+    python -m benchmarks.bench_allocation [--workers 16] [--attempts 100] [--books 10] [--copies 100]
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+
+from app import db
+from app.models.Book import Book
+from app.models.BookCopy import BookCopy
+from app.models.Transaction import Transaction
+from app.models.User import User
+from app.services.borrow_service import issue_book_service
+from benchmarks.common import make_app, print_table
+
+USERS_PER_WORKER = 25
+
+
+def legacy_issue_book(user_barcode, book_barcode):
+    """
+    The previous allocation: find an available copy, then flag it unavailable in Python.
+    """
+    try:
+        user = User.query.filter_by(barcode=user_barcode).first()
+        if Transaction.query.filter_by(user_id=user.id, return_date=None).count() >= 5:
+            return 400
+        book = Book.query.filter_by(barcode=book_barcode).first()
+        book_copy = BookCopy.query.filter_by(book_id=book.id, is_available=True).first()
+        if not book_copy:
+            return 400
+        db.session.add(Transaction(user_id=user.id, book_copy_id=book_copy.id, checkout_date=datetime.utcnow(),
+                                   due_date=datetime.utcnow() + timedelta(days=10), fine_amount=0.0))
+        book_copy.is_available = False
+        db.session.commit()
+        return 201
+    except Exception:
+        db.session.rollback()
+        return 500
+
+
+def seed(path, workers, books, copies):
+    """
+    Create `books` titles with `copies` available copies each and USERS_PER_WORKER members per worker.
+    """
+    app = make_app(path)
+    with app.app_context():
+        db.session.execute(insert(Book), [{
+            "id": i + 1, "barcode": f"B{i:09d}", "title": f"Hot Title {i}", "author": "Author",
+            "subject_category": "Contention", "publication_date": datetime(2000, 1, 1),
+            "available_count": copies, "total_count": copies,
+        } for i in range(books)])
+        db.session.execute(insert(BookCopy), [{
+            "book_id": i + 1, "rack_location": "R1", "is_available": True,
+        } for i in range(books) for _ in range(copies)])
+        db.session.execute(insert(User), [{
+            "id": i + 1, "name": f"Member {i}", "email": f"member{i}@example.com", "password": "not-a-real-hash",
+            "role": "Member", "barcode": f"U{i:09d}",
+        } for i in range(workers * USERS_PER_WORKER)])
+        db.session.commit()
+
+
+def worker(args):
+    """
+    Issue random hot titles to this worker's members.
+
+    Returns a count per status code and the wall-clock start and end of the issue loop.
+    """
+    path, index, attempts, books, legacy, start_at = args
+    app = make_app(path)
+    rng = random.Random(index)
+    results = {}
+    with app.app_context():
+        time.sleep(max(0.0, start_at - time.time()))  # start all workers together
+        started = time.time()
+        for attempt in range(attempts):
+            user_barcode = f"U{index * USERS_PER_WORKER + attempt % USERS_PER_WORKER:09d}"
+            book_barcode = f"B{rng.randrange(books):09d}"
+            if legacy:
+                status = legacy_issue_book(user_barcode, book_barcode)
+            else:
+                status = issue_book_service(user_barcode, book_barcode)[1]
+            results[status] = results.get(status, 0) + 1
+    return results, started, time.time()
+
+
+def run(workers, attempts, books, copies, legacy):
+    app = make_app()
+    path = app.config["SQLALCHEMY_DATABASE_URI"].removeprefix("sqlite:///")
+    seed(path, workers, books, copies)
+
+    # Fresh interpreters, so no process inherits another's connection pool
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        start_at = time.time() + 5.0
+        per_worker = pool.map(worker, [(path, i, attempts, books, legacy, start_at) for i in range(workers)])
+    seconds = max(end for _, _, end in per_worker) - min(start for _, start, _ in per_worker)
+
+    totals = {}
+    for results, _, _ in per_worker:
+        for status, count in results.items():
+            totals[status] = totals.get(status, 0) + count
+
+    with app.app_context():
+        double_issued = db.session.query(Transaction.book_copy_id).filter(Transaction.return_date.is_(None)) \
+            .group_by(Transaction.book_copy_id).having(func.count() > 1).count()
+        open_loans = Transaction.query.filter(Transaction.return_date.is_(None)).count()
+        unavailable = BookCopy.query.filter_by(is_available=False).count()
+
+    return (
+        "read-then-write" if legacy else "atomic UPDATE",
+        totals.get(201, 0), totals.get(400, 0), totals.get(500, 0),
+        double_issued, open_loans - unavailable, f"{workers * attempts / seconds:.0f}", f"{seconds:.2f}",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=100, help="issue attempts per worker")
+    parser.add_argument("--books", type=int, default=10)
+    parser.add_argument("--copies", type=int, default=100, help="copies per book")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    rows = []
+    if not args.skip_legacy:
+        rows.append(run(args.workers, args.attempts, args.books, args.copies, legacy=True))
+    rows.append(run(args.workers, args.attempts, args.books, args.copies, legacy=False))
+    print_table(("allocation", "issued", "rejected", "errors", "double-issued copies",
+                 "loans without a taken copy", "attempts/s", "seconds"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/bench_catalog.py
+"""
+Catalog listing benchmark: per-book COUNT queries vs a grouped COUNT projection vs
+the denormalized available_count/total_count columns.
+
+Every path lists the whole catalog; the paginated paths walk all pages of PAGE_SIZE_MAX books.
+
+Usage:
+    python -m benchmarks.bench_catalog [--sizes 1000 10000 100000] [--legacy-limit 10000]
+"""
+import argparse
+
+from flask import current_app
+from sqlalchemy import case, func
+
+from app import db
+from app.models.Book import Book
+from app.models.BookCopy import BookCopy
+from app.services.book_management_service import get_all_books_service
+from app.services.catalog_service import serialize_catalog_row
+from benchmarks.common import make_app, measure, print_table, seed_books
+
+
+def legacy_get_all_books():
+    """
+    The previous implementation: two COUNT queries for every book.
+    """
+    results = []
+    for book in Book.query.all():
+        available_copies = BookCopy.query.filter_by(book_id=book.id, is_available=True).count()
+        total_copies = BookCopy.query.filter_by(book_id=book.id).count()
+        results.append({
+            "id": book.id,
+            "barcode": book.barcode,
+            "title": book.title,
+            "author": book.author,
+            "subject_category": book.subject_category,
+            "publication_date": book.publication_date.strftime('%Y-%m-%d'),
+            "available_copies": available_copies,
+            "total_copies": total_copies
+        })
+    return results
+
+
+def grouped_catalog_page(limit, cursor=None):
+    """
+    The previous catalog projection: copies outer-joined and counted per book with GROUP BY.
+    """
+    query = (
+        db.session.query(
+            Book.id, Book.barcode, Book.title, Book.author, Book.subject_category, Book.publication_date,
+            func.count(case((BookCopy.is_available == True, BookCopy.id))).label('available_copies'),  # noqa: E712
+            func.count(BookCopy.id).label('total_copies'),
+        )
+        .outerjoin(BookCopy, BookCopy.book_id == Book.id)
+        .group_by(Book.id)
+    )
+    if cursor:
+        query = query.filter(Book.id > cursor)
+    rows = query.order_by(Book.id).limit(limit).all()
+    return [serialize_catalog_row(row) for row in rows], rows[-1].id if len(rows) == limit else None
+
+
+def walk_pages(fetch_page):
+    """
+    Follow cursors until the catalog is exhausted and return every book.
+    """
+    books, cursor = [], None
+    while True:
+        page, cursor = fetch_page(cursor)
+        books += page
+        if not cursor:
+            return books
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-limit", type=int, default=10000,
+                        help="skip the legacy N+1 path above this many books")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        app = make_app()
+        with app.app_context():
+            seed_books(size)
+
+            if size <= args.legacy_limit:
+                db.session.expunge_all()
+                with measure() as legacy:
+                    legacy_result = legacy_get_all_books()
+                rows.append((size, "per-book counts", legacy["queries"], f"{legacy['seconds'] * 1000:.1f}"))
+            else:
+                legacy_result = None
+
+            page_size = current_app.config['PAGE_SIZE_MAX']
+
+            db.session.expunge_all()
+            with measure() as grouped:
+                grouped_result = walk_pages(lambda cursor: grouped_catalog_page(page_size, cursor))
+            if legacy_result is not None:
+                assert grouped_result == legacy_result, "grouped projection disagrees with legacy counts"
+            rows.append((size, "grouped counts", grouped["queries"], f"{grouped['seconds'] * 1000:.1f}"))
+
+            def counter_page(cursor):
+                response, status = get_all_books_service(page_size, cursor)
+                assert status == 200
+                return response["books"], response["next_cursor"]
+
+            db.session.expunge_all()
+            with measure() as counters:
+                counter_result = walk_pages(counter_page)
+            assert counter_result == grouped_result, "count columns disagree with book_copy"
+            rows.append((size, "count columns", counters["queries"], f"{counters['seconds'] * 1000:.1f}"))
+
+    print_table(("books", "path", "queries", "ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_dashboard.py
+"""
+Librarian dashboard benchmark: the figures assembled from the list endpoints
+(every catalog page, every overdue page and the full user list, as the
+dashboard used to) vs GET /api/dashboard/summary, counted and cached.
+
+Usage:
+    python -m benchmarks.bench_dashboard [--sizes 10000 100000] [--repeat 10]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import db
+from app.models.Transaction import Transaction
+from app.models.User import User
+from app.services.book_management_service import get_all_books_service
+from app.services.borrow_service import check_overdue_books_service
+from app.services.dashboard_service import compute_dashboard_summary, dashboard_summary_service
+from app.services.user_management_service import get_all_users
+from benchmarks.common import make_app, measure, print_table, seed_books
+
+
+def seed_circulation(books, users):
+    """
+    Bulk insert `users` members and one open loan for every other copy, a third of them overdue.
+    """
+    db.session.execute(insert(User), [{
+        "id": i + 1,
+        "name": f"Member {i}",
+        "email": f"member{i}@example.com",
+        "password": "not-a-real-hash",
+        "role": "Member",
+        "barcode": f"U{i:09d}",
+    } for i in range(users)])
+    now = datetime.utcnow()
+    db.session.execute(insert(Transaction), [{
+        "user_id": i % users + 1,
+        "book_copy_id": 2 * i + 2,  # the copies seed_books marks unavailable
+        "checkout_date": now - timedelta(days=20),
+        "due_date": now + timedelta(days=7 if i % 3 else -3),
+        "return_date": None,
+        "fine_amount": 0.0,
+    } for i in range(books)])
+    db.session.commit()
+
+
+def walk(service, key):
+    """
+    Read every page of a keyset-paged service and return the number of items.
+    """
+    total, cursor = 0, None
+    while True:
+        response, status = service(200, cursor)
+        assert status == 200, response
+        total += len(response[key])
+        cursor = response["next_cursor"]
+        if not cursor:
+            return total
+
+
+def from_list_endpoints():
+    books = walk(get_all_books_service, "books")
+    overdue = walk(check_overdue_books_service, "overdue_books")
+    members = sum(1 for user in get_all_users()[0] if user["role"] == "Member")
+    return books, overdue, members
+
+
+def best_of(function, repeat):
+    best = None
+    for _ in range(repeat):
+        with measure() as stats:
+            function()
+        if best is None or stats["seconds"] < best["seconds"]:
+            best = dict(stats)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        app = make_app()
+        with app.app_context():
+            seed_books(size)
+            seed_circulation(size, args.users)
+            paths = [
+                ("list endpoints", lambda: from_list_endpoints(), max(1, args.repeat // 5)),
+                ("summary, counted", compute_dashboard_summary, args.repeat),
+                ("summary, cached", dashboard_summary_service, args.repeat),
+            ]
+            for description, function, repeat in paths:
+                stats = best_of(function, repeat)
+                rows.append((size, description, stats["queries"], f"{stats['seconds'] * 1000:.2f}"))
+            db.session.remove()
+
+    print_table(("books", "path", "queries", "ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_facets.py
+"""
+Facet benchmark: counting categories, authors and decades by pulling every
+matching row (what a client had to do before) vs facets=1 (grouped aggregates
+in one statement over the indexed columns).
+
+Usage:
+    python -m benchmarks.bench_facets [--sizes 10000 100000] [--repeat 10]
+"""
+import argparse
+import statistics
+import time
+from collections import Counter
+
+from app import db
+from app.services.search_service import search_books
+from benchmarks.common import make_app, print_table, seed_books
+
+# (query params, description) pairs
+QUERIES = [
+    ({}, "whole catalog"),
+    ({"title": "amber"}, "title, one word"),
+    ({"facet_decade": ["1950", "1960"]}, "two decades selected"),
+]
+
+
+def count_client_side(params):
+    """
+    Walk every page of the search and count the facets in Python.
+    """
+    counts = {"subject_category": Counter(), "author": Counter(), "decade": Counter()}
+    cursor = None
+    while True:
+        response, status = search_books({**params, "limit": 200, "cursor": cursor})
+        assert status == 200, response
+        for book in response["books"]:
+            counts["subject_category"][book["subject_category"]] += 1
+            counts["author"][book["author"]] += 1
+            counts["decade"][int(book["publication_date"][:4]) // 10 * 10] += 1
+        cursor = response["next_cursor"]
+        if not cursor:
+            return counts
+
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        app = make_app()
+        app.config['SEARCH_CACHE_ENABLED'] = False
+        with app.app_context():
+            seed_books(size)
+            for params, description in QUERIES:
+                client_ms = timed(lambda: count_client_side(params), max(1, args.repeat // 5))
+                facets_ms = timed(lambda: search_books({**params, "facets": "1"}), args.repeat)
+                rows.append((size, description, f"{client_ms:.1f}", f"{facets_ms:.1f}"))
+            db.session.remove()
+
+    print_table(("books", "query", "all rows ms", "facets=1 ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
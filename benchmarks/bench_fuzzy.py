@@ -0,0 +1,58 @@
+# benchmarks/bench_fuzzy.py
+"""
+Fuzzy search benchmark: the ilike substring scan vs fuzzy=1 through the trigram
+index, for correctly spelled and misspelled queries, as the catalog grows.
+
+Usage:
+    python -m benchmarks.bench_fuzzy [--sizes 10000 100000] [--repeat 20]
+"""
+import argparse
+import time
+
+from app import db
+from app.services import search_service
+from app.services.fuzzy_service import get_fuzzy_index
+from benchmarks.bench_search import timed_search
+from benchmarks.common import make_app, print_table, seed_books
+
+# (query params, description) pairs; the misspelled ones find nothing with ilike
+QUERIES = [
+    ({"author": "raven willow"}, "author, exact"),
+    ({"author": "raevn wilow"}, "author, misspelled"),
+    ({"title": "harbor meadow"}, "title, exact"),
+    ({"title": "harbour medow"}, "title, misspelled"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        app = make_app()
+        app.config['SEARCH_CACHE_ENABLED'] = False
+        with app.app_context():
+            seed_books(size)
+            started = time.perf_counter()
+            get_fuzzy_index()
+            rows.append((size, "(index build)", "", "", "", f"{(time.perf_counter() - started) * 1000:.0f}"))
+
+            fts_enabled = search_service.fts_enabled
+            search_service.fts_enabled = lambda: False
+            try:
+                for params, description in QUERIES:
+                    scan_count, scan_ms = timed_search(params, args.repeat)
+                    fuzzy_count, fuzzy_ms = timed_search({**params, "fuzzy": "1"}, args.repeat)
+                    rows.append((size, description, scan_count, f"{scan_ms:.2f}", fuzzy_count, f"{fuzzy_ms:.2f}"))
+            finally:
+                search_service.fts_enabled = fts_enabled
+            db.session.remove()
+
+    print_table(("books", "query", "scan rows", "scan ms", "fuzzy rows", "fuzzy ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
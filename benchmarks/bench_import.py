@@ -0,0 +1,79 @@
+# benchmarks/bench_import.py
+"""
+Catalog import benchmark: one add_book_service + create_book_copy_service call
+per record (one duplicate check and commit each) vs `flask catalog import`
+(streamed parse, prefetched duplicate set, chunked multi-row inserts).
+
+Usage:
+    python -m benchmarks.bench_import [--rows 100000] [--legacy-rows 2000] [--copies 2]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from app import db
+from app.services.book_management_service import add_book_service, create_book_copy_service
+from app.services.catalog_import_service import import_catalog
+from benchmarks.common import WORDS, make_app, print_table
+
+
+def write_catalog_csv(path, rows, copies):
+    """
+    Write a CSV of `rows` records; one in fifty repeats an earlier record (a duplicate).
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "subject_category", "publication_date", "copies", "rack_location"])
+        for i in range(rows):
+            n = i - 1 if i % 50 == 49 else i
+            writer.writerow([f"{WORDS[n % 40].title()} {WORDS[n // 40 % 40].title()} Volume {n}",
+                             f"{WORDS[n % 37].title()} {WORDS[n // 37 % 40].title()}",
+                             f"Category {n % 20}", f"{1900 + n % 120}-{1 + n % 12:02d}-{1 + n % 28:02d}",
+                             copies, f"R{n % 100}"])
+
+
+def legacy_import(path):
+    """
+    The previous path: the single-book services, once per record and once per copy.
+    """
+    with open(path, newline='') as f:
+        for record in csv.DictReader(f):
+            response, status = add_book_service(record)
+            if status == 201:
+                for _ in range(int(record["copies"])):
+                    create_book_copy_service(response["barcode"], {"rack_location": record["rack_location"]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--legacy-rows", type=int, default=2000)
+    parser.add_argument("--copies", type=int, default=2)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="lms-import-")
+    rows = []
+    for path_name, count, run in (("legacy", args.legacy_rows, "legacy"),
+                                  ("import", args.legacy_rows, "import"),
+                                  ("import", args.rows, "import")):
+        path = os.path.join(directory, f"{path_name}-{count}.csv")
+        write_catalog_csv(path, count, args.copies)
+        app = make_app()
+        with app.app_context():
+            started = time.perf_counter()
+            if run == "legacy":
+                legacy_import(path)
+            else:
+                with open(path, newline='') as stream:
+                    import_catalog(stream, 'csv')
+            seconds = time.perf_counter() - started
+            rows.append((run, count, f"{seconds:.2f}", f"{count / seconds:,.0f}"))
+            db.session.remove()
+
+    print_table(("path", "records", "seconds", "records/s"), rows)
+
+
+if __name__ == "__main__":
+    main()
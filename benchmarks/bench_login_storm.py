@@ -0,0 +1,117 @@
+# benchmarks/bench_login_storm.py
+"""
+Login storm benchmark: catalog page latency (GET /api/books) while many
+clients log in at once, with passwords hashed on the request threads (the
+previous behaviour, no limit) vs in the bounded PasswordHasher pool that
+turns away the excess with 503 / Retry-After.
+
+Storm clients honour Retry-After, as browsers retrying a login would.
+
+Usage:
+    python -m benchmarks.bench_login_storm [--clients 32] [--seconds 10] [--queue-depth 4]
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+from app import db
+from app.services.auth_service import register_user
+from app.services.password_service import PasswordHasher
+from benchmarks.common import make_app, print_table, seed_books
+
+CREDENTIALS = {"email": "storm@library.com", "password": "storm-password"}
+
+
+def storm(app, stop, counts, latencies, retry_after):
+    """
+    Log in over and over until `stop` is set, counting answers by status.
+    """
+    client = app.test_client()
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = client.post('/auth/login', json=CREDENTIALS)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        elif response.status_code == 503:
+            stop.wait(retry_after)
+
+
+def run_scenario(app, hasher, clients, seconds, headers):
+    """
+    Read catalog pages for `seconds` while `clients` threads log in; returns catalog and login figures.
+    """
+    app.extensions['password_hasher'] = hasher
+    stop = threading.Event()
+    counts, login_latencies = {}, []
+    threads = [threading.Thread(target=storm, args=(app, stop, counts, login_latencies,
+                                                     app.config['PASSWORD_HASH_RETRY_AFTER']))
+               for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    client = app.test_client()
+    catalog = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = client.get('/api/books?limit=50', headers=headers)
+        assert response.status_code == 200, response.json
+        catalog.append(time.perf_counter() - started)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    hasher.shutdown()
+    return catalog, counts, login_latencies
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--books", type=int, default=10000)
+    parser.add_argument("--queue-depth", type=int, default=4)
+    args = parser.parse_args()
+
+    app = make_app()
+    rows = []
+    with app.app_context():
+        seed_books(args.books)
+        register_user({**CREDENTIALS, "name": "Storm", "role": "Librarian"})
+        token = app.test_client().post('/auth/login', json=CREDENTIALS).json['access_token']
+        headers = {"Authorization": f"Bearer {token}"}
+
+        method = app.config['PASSWORD_HASH_METHOD']
+        workers = os.cpu_count() or 1
+        scenarios = [
+            ("no storm", 0, PasswordHasher(method, workers, args.queue_depth)),
+            ("request threads", args.clients, PasswordHasher(method, 0, args.clients)),
+            (f"process pool, {workers} workers", args.clients, PasswordHasher(method, workers, args.queue_depth)),
+        ]
+        for description, clients, hasher in scenarios:
+            catalog, counts, logins = run_scenario(app, hasher, clients, args.seconds, headers)
+            rows.append((
+                description, clients,
+                f"{statistics.median(catalog) * 1000:.1f}", f"{percentile(catalog, 0.95) * 1000:.1f}",
+                f"{len(catalog) / args.seconds:.1f}",
+                f"{counts.get(200, 0) / args.seconds:.1f}", counts.get(503, 0),
+                f"{percentile(logins, 0.95) * 1000:.0f}",
+            ))
+        db.session.remove()
+
+    print_table(("hashing", "clients", "catalog p50 ms", "catalog p95 ms", "catalog req/s",
+                 "logins/s", "503s", "login p95 ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
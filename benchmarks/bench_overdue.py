@@ -0,0 +1,119 @@
+# benchmarks/bench_overdue.py
+"""
+Overdue sweep benchmark: per-row lookups and commits vs the chunked set-based sweep,
+plus an incremental re-run of the sweep and a page read of GET /api/overdue-books.
+
+Usage:
+    python -m benchmarks.bench_overdue [--loans 10000] [--users 1000] [--skip-legacy]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import db
+from app.models.Book import Book
+from app.models.BookCopy import BookCopy
+from app.models.Transaction import Transaction
+from app.models.User import User
+from app.services.borrow_service import check_overdue_books_service
+from app.services.circulation_sweep_service import run_circulation_sweep
+from benchmarks.common import make_app, measure, print_table, seed_books
+
+
+def seed_overdue_loans(loans, users):
+    """
+    Bulk insert `users` members and `loans` overdue loans spread across them.
+    """
+    seed_books(loans // 2 + 1, copies_per_book=2)
+    db.session.execute(insert(User), [{
+        "id": i + 1,
+        "name": f"Member {i}",
+        "email": f"member{i}@example.com",
+        "password": "not-a-real-hash",
+        "role": "Member",
+        "barcode": f"U{i:09d}",
+    } for i in range(users)])
+    now = datetime.utcnow()
+    db.session.execute(insert(Transaction), [{
+        "user_id": i % users + 1,
+        "book_copy_id": i + 1,
+        "checkout_date": now - timedelta(days=30),
+        "due_date": now - timedelta(days=1 + i % 20),
+        "return_date": None,
+        "fine_amount": 0.0,
+    } for i in range(loans)])
+    db.session.commit()
+
+
+def legacy_check_overdue_books():
+    """
+    The previous implementation: three lookups and one commit per overdue loan.
+    """
+    current_date = datetime.utcnow()
+    overdue_transactions = Transaction.query.filter(
+        Transaction.due_date < current_date,
+        Transaction.return_date.is_(None)
+    ).all()
+
+    result = []
+    for transaction in overdue_transactions:
+        days_overdue = (current_date - transaction.due_date).days
+        fine_amount = days_overdue * 0.50
+        user = User.query.get(transaction.user_id)
+        book_copy = BookCopy.query.get(transaction.book_copy_id)
+        book = Book.query.get(book_copy.book_id) if book_copy else None
+        if user and book:
+            subject = "Overdue Book Notification"
+            body = f"Dear {user.name},\n\nThe book '{book.title}' is overdue by {days_overdue} days. Please return it as soon as possible to avoid further fines.\n\nThank you!"
+            user.add_notification(subject, body)
+        result.append({
+            "transaction_id": transaction.id,
+            "user_name": user.name if user else "Unknown",
+            "user_email": user.email if user else "Unknown",
+            "book_title": book.title if book else "Unknown",
+            "days_overdue": days_overdue,
+            "fine_amount": fine_amount,
+            "due_date": transaction.due_date.strftime("%Y-%m-%d")
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loans", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    rows = []
+    if not args.skip_legacy:
+        app = make_app()
+        with app.app_context():
+            seed_overdue_loans(args.loans, args.users)
+            with measure() as legacy:
+                count = len(legacy_check_overdue_books())
+            rows.append(("per-row lookups", count, legacy["queries"], f"{legacy['seconds']:.2f}"))
+
+    app = make_app()
+    with app.app_context():
+        seed_overdue_loans(args.loans, args.users)
+        with measure() as swept:
+            count = run_circulation_sweep()["overdue"]
+        rows.append(("chunked sweep", count, swept["queries"], f"{swept['seconds']:.2f}"))
+
+        # Nothing changed since the first run, so the cursor skips every loan
+        with measure() as incremental:
+            count = run_circulation_sweep()["overdue"]
+        rows.append(("incremental re-run", count, incremental["queries"], f"{incremental['seconds']:.2f}"))
+
+        with measure() as read:
+            response, status = check_overdue_books_service()
+            assert status == 200
+        rows.append(("GET page read", len(response["overdue_books"]), read["queries"], f"{read['seconds']:.4f}"))
+
+    print_table(("path", "overdue loans", "queries", "seconds"), rows)
+
+
+if __name__ == "__main__":
+    main()
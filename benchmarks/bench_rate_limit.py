@@ -0,0 +1,76 @@
+# benchmarks/bench_rate_limit.py
+"""
+Rate limiter benchmark:
+- cost of one bucket check with the in-memory and the SQLite-backed store
+- enforcement across worker processes: N processes take tokens from the same
+  login bucket at once; with per-process memory buckets each process allows
+  the full burst, with the shared SQLite store the host allows it once.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--checks 20000] [--workers 8] [--attempts 200]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from app.services.rate_limit_service import MemoryBucketStore, RateLimiter, SQLiteBucketStore
+from benchmarks.common import print_table
+
+# The default login limit: a burst of 20, then one every 3 seconds
+CAPACITY, PER_SECONDS = 20, 60
+
+
+def make_store(kind, path):
+    return SQLiteBucketStore(path) if kind == "sqlite" else MemoryBucketStore()
+
+
+def check_cost(kind, path, checks):
+    """
+    Microseconds per check, spread over 1000 client addresses.
+    """
+    limiter = RateLimiter(make_store(kind, path))
+    started = time.perf_counter()
+    for n in range(checks):
+        limiter.hit("login", f"ip:10.0.{n % 1000 // 250}.{n % 250}", CAPACITY, PER_SECONDS)
+    return (time.perf_counter() - started) / checks * 1e6
+
+
+def worker(args):
+    kind, path, attempts, start_at = args
+    limiter = RateLimiter(make_store(kind, path))
+    time.sleep(max(0.0, start_at - time.time()))
+    return sum(not limiter.hit("login", "ip:203.0.113.7", CAPACITY, PER_SECONDS) for _ in range(attempts))
+
+
+def enforcement(kind, path, workers, attempts):
+    """
+    Requests allowed in total when `workers` processes each try `attempts` logins from one address.
+    """
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        start_at = time.time() + 3.0
+        allowed = pool.map(worker, [(kind, path, attempts, start_at) for _ in range(workers)])
+    return sum(allowed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=200, help="login attempts per worker")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="lms-rate-limit-")
+    rows = []
+    for kind in ("memory", "sqlite"):
+        cost = check_cost(kind, os.path.join(directory, "cost.db"), args.checks)
+        allowed = enforcement(kind, os.path.join(directory, "shared.db"), args.workers, args.attempts)
+        rows.append((kind, f"{cost:.1f}", args.workers, args.workers * args.attempts, allowed))
+
+    print_table(("store", "us per check", "workers", "attempts", "allowed (limit: burst of 20)"), rows)
+
+
+if __name__ == "__main__":
+    main()
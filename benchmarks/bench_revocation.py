@@ -0,0 +1,86 @@
+# benchmarks/bench_revocation.py
+"""
+Token revocation check benchmark: cost per authenticated request of a
+revoked_token lookup on every request vs the RevocationStore (Bloom filter,
+then a cached table lookup for filter hits), with a table of revoked tokens.
+
+Usage:
+    python -m benchmarks.bench_revocation [--revoked 10000 100000] [--checks 20000]
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app import db
+from app.models.RevokedToken import RevokedToken
+from app.services.revocation_service import RevocationStore
+from benchmarks.common import make_app, measure, print_table
+
+
+def seed_revocations(count, chunk_size=10000):
+    """
+    Bulk insert `count` unexpired revoked jtis and return a few of them.
+    """
+    now = datetime.utcnow()
+    keys = []
+    for start in range(0, count, chunk_size):
+        rows = [{"key": str(uuid.uuid4()), "revoked_at": now, "expires_at": now + timedelta(minutes=15)}
+                for _ in range(min(chunk_size, count - start))]
+        db.session.execute(insert(RevokedToken), rows)
+        keys.extend(row["key"] for row in rows[:10])
+    db.session.commit()
+    return keys
+
+
+def lookup_every_request(payload):
+    """
+    The naive check: one indexed query per request.
+    """
+    with db.engine.connect() as connection:
+        return connection.execute(select(RevokedToken.id).where(
+            RevokedToken.key.in_([payload["jti"], f"user:{payload['sub']}"]))).first() is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revoked", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--checks", type=int, default=20000)
+    args = parser.parse_args()
+
+    rows = []
+    for count in args.revoked:
+        app = make_app()
+        with app.app_context():
+            revoked_keys = seed_revocations(count)
+            store = RevocationStore(app.config['REVOCATION_BLOOM_CAPACITY'], app.config['REVOCATION_BLOOM_ERROR_RATE'],
+                                    cache_ttl=60, sync_interval=3600, compact_interval=3600)
+            started = time.perf_counter()
+            store.is_revoked({"jti": "warm-up", "sub": "warm@example.com", "iat": 0})
+            load_ms = (time.perf_counter() - started) * 1000
+
+            valid = [{"jti": str(uuid.uuid4()), "sub": f"member{n}@example.com", "iat": 0} for n in range(args.checks)]
+            revoked = [{"jti": revoked_keys[n % len(revoked_keys)], "sub": "member@example.com", "iat": 0}
+                       for n in range(args.checks)]
+            paths = [
+                ("query per request", "valid", lookup_every_request, valid),
+                ("bloom filter", "valid", store.is_revoked, valid),
+                ("query per request", "revoked", lookup_every_request, revoked),
+                ("bloom filter", "revoked", store.is_revoked, revoked),
+            ]
+            for description, tokens, check, payloads in paths:
+                with measure() as stats:
+                    for payload in payloads:
+                        check(payload)
+                rows.append((count, description, tokens, stats["queries"],
+                             f"{stats['seconds'] / len(payloads) * 1e6:.1f}"))
+            rows.append((count, "filter build (once)", "-", 1, f"{load_ms * 1000:.0f}"))
+            db.session.remove()
+
+    print_table(("revoked", "check", "tokens", "queries", "us per check"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_search.py
+"""
+Search benchmark: ilike substring filters vs the FTS5 index, as the catalog grows.
+
+Usage:
+    python -m benchmarks.bench_search [--sizes 10000 100000 300000] [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+
+from app import db
+from app.services import search_service
+from benchmarks.common import make_app, print_table, seed_books
+
+# (query params, description) pairs issued against each catalog size
+QUERIES = [
+    ({"title": "harbor meadow"}, "title, two words"),
+    ({"author": "raven willow"}, "author, two words"),
+    ({"title": "nothingmatches"}, "title, no match"),
+]
+
+
+def timed_search(params, repeat):
+    """
+    Run search_books `repeat` times and return (result count, median milliseconds).
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response, status = search_service.search_books(params)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert status == 200, response
+    return len(response["books"]), statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 300000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        app = make_app()
+        with app.app_context():
+            seed_books(size)
+            fts_enabled = search_service.fts_enabled
+            for params, description in QUERIES:
+                search_service.fts_enabled = lambda: False
+                try:
+                    ilike_count, ilike_ms = timed_search(params, args.repeat)
+                finally:
+                    search_service.fts_enabled = fts_enabled
+                fts_count, fts_ms = timed_search(params, args.repeat)
+                rows.append((size, description, ilike_count, f"{ilike_ms:.2f}", fts_count, f"{fts_ms:.2f}"))
+            db.session.remove()
+
+    print_table(("books", "query", "ilike rows", "ilike ms", "fts rows", "fts ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
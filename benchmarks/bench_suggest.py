@@ -0,0 +1,59 @@
+# benchmarks/bench_suggest.py
+"""
+Typeahead benchmark: suggestion latency from the in-memory prefix index, for the
+first (uncached) and repeated lookups of each query, and the cost of applying a loan.
+
+Usage:
+    python -m benchmarks.bench_suggest [--sizes 10000 100000] [--repeat 2000] [--loans 10000]
+"""
+import argparse
+import random
+import time
+
+from app import db
+from app.services.suggest_service import get_suggest_index
+from benchmarks.common import make_app, print_table, seed_books
+
+# Partially typed queries, from one letter to several words
+QUERIES = ["a", "am", "amb", "amber", "amber v", "river", "volume 12", "zen"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--loans", type=int, default=10000)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        app = make_app()
+        with app.app_context():
+            seed_books(size)
+            started = time.perf_counter()
+            index = get_suggest_index()
+            rows.append((size, "(build)", f"{(time.perf_counter() - started) * 1000:.0f} ms", "", ""))
+
+            for query in QUERIES:
+                started = time.perf_counter()
+                index.suggest(query, 8)
+                first_ms = (time.perf_counter() - started) * 1000
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    index.suggest(query, 8)
+                cached_us = (time.perf_counter() - started) / args.repeat * 1e6
+                rows.append((size, repr(query), f"{first_ms:.2f} ms", f"{cached_us:.1f} us", ""))
+
+            # Loans re-rank the cached lists in place
+            started = time.perf_counter()
+            for _ in range(args.loans):
+                index.record_loans(random.randint(1, size))
+            loan_us = (time.perf_counter() - started) / args.loans * 1e6
+            rows.append((size, "(record loan)", "", "", f"{loan_us:.1f} us"))
+            db.session.remove()
+
+    print_table(("books", "query", "first", "repeated", "per loan"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_user_import.py
+"""
+Member import benchmark: one register_user call per row (an email lookup,
+a password hash and a commit each, as POST /auth/register does) vs
+`flask users import` (prefetched email set, passwords hashed in a process
+pool, chunked multi-row inserts) with one hashing process and with one per CPU.
+
+Password hashing (about 0.1 s per password with Werkzeug's default scrypt)
+dominates both paths: with one hashing process the bulk path only saves the
+per-row lookups and commits, and its speedup comes from the extra processes,
+roughly one times per CPU.
+
+Usage:
+    python -m benchmarks.bench_user_import [--rows 2000] [--legacy-rows 300]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from app import db
+from app.services.auth_service import register_user
+from app.services.user_import_service import import_users
+from benchmarks.common import make_app, print_table
+
+
+def write_roster_csv(path, rows):
+    """
+    Write a CSV roster of `rows` members; one in fifty repeats an earlier email (a duplicate).
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "email", "password", "role"])
+        for i in range(rows):
+            n = i - 1 if i % 50 == 49 else i
+            writer.writerow([f"Member {n}", f"member{n}@example.com", f"password-{n}", "Member"])
+
+
+def legacy_import(path):
+    """
+    The previous path: the registration service, once per row.
+    """
+    with open(path, newline='') as f:
+        for record in csv.DictReader(f):
+            register_user(record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--legacy-rows", type=int, default=300)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    directory = tempfile.mkdtemp(prefix="lms-user-import-")
+    runs = [("register_user", args.legacy_rows, None),
+            ("import", args.legacy_rows, 1),
+            ("import", args.rows, 1)]
+    if cpus > 1:
+        runs.append(("import", args.rows, cpus))
+
+    rows = []
+    for run, count, workers in runs:
+        path = os.path.join(directory, f"roster-{count}.csv")
+        write_roster_csv(path, count)
+        app = make_app()
+        with app.app_context():
+            started = time.perf_counter()
+            if workers is None:
+                legacy_import(path)
+            else:
+                with open(path, newline='') as stream:
+                    import_users(stream, workers=workers)
+            seconds = time.perf_counter() - started
+            rows.append((run, workers or "-", count, f"{seconds:.2f}", f"{count / seconds:,.1f}"))
+            db.session.remove()
+
+    print_table(("path", "hash workers", "rows", "seconds", "rows/s"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_users.py
+"""
+User search benchmark: loading every user as ORM objects and filtering in
+Python (what the user management screen did on every keystroke) vs
+GET /api/users?q=... (indexed prefix lookup, one page, selected columns).
+
+Usage:
+    python -m benchmarks.bench_users [--users 10000 100000] [--repeat 10]
+"""
+import argparse
+import json
+
+from sqlalchemy import insert
+
+from app import db
+from app.models.User import User
+from app.services.user_management_service import get_all_users
+from benchmarks.common import WORDS, make_app, measure, print_table
+
+# (search text, description) pairs
+QUERIES = [
+    ("a", "one letter"),
+    ("amber", "name word"),
+    ("delta1", "email prefix"),
+    ("U000004321", "barcode"),
+]
+
+
+def seed_users(count, chunk_size=5000):
+    """
+    Bulk insert `count` members with varied names and emails.
+    """
+    for start in range(0, count, chunk_size):
+        db.session.execute(insert(User), [{
+            "id": i + 1,
+            "name": f"{WORDS[i % 40].title()} {WORDS[i // 40 % 40].title()}",
+            "email": f"{WORDS[i // 7 % 40]}{i}@example.com",
+            "password": "not-a-real-hash",
+            "role": "Member",
+            "barcode": f"U{i:09d}",
+        } for i in range(start, min(start + chunk_size, count))])
+    db.session.commit()
+
+
+def legacy_search(q):
+    """
+    The previous path: every user hydrated and serialized, then filtered like the browser did.
+    """
+    users = [{"name": user.name, "email": user.email, "role": user.role, "barcode": user.barcode}
+             for user in User.query.all()]
+    payload = json.dumps(users)
+    q = q.lower()
+    return [user for user in users if q in user["name"].lower() or q in user["email"].lower()], len(payload)
+
+
+def best_of(function, repeat):
+    best = None
+    for _ in range(repeat):
+        with measure() as stats:
+            result = function()
+        if best is None or stats["seconds"] < best["seconds"]:
+            best = {**stats, "result": result}
+        db.session.expunge_all()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = []
+    for count in args.users:
+        app = make_app()
+        with app.app_context():
+            seed_users(count)
+            for q, description in QUERIES:
+                legacy = best_of(lambda: legacy_search(q), max(1, args.repeat // 5))
+                paged = best_of(lambda: get_all_users(q, 50), args.repeat)
+                paged_bytes = len(json.dumps(paged["result"][0]))
+                rows.append((count, description, f"{legacy['seconds'] * 1000:.1f}", legacy["result"][1],
+                             f"{paged['seconds'] * 1000:.2f}", paged_bytes))
+            db.session.remove()
+
+    print_table(("users", "query", "load all ms", "load all bytes", "q= ms", "q= bytes"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/common.py
+"""
+Shared helpers for the benchmark scripts.
+
+Each benchmark builds the app against a throwaway SQLite file, seeds it with
+bulk inserts and measures wall time plus the number of SQL statements issued.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event, insert
+
+from app import create_app, db
+from app.config import Config, TestingConfig
+
+
+# Vocabulary used to generate varied titles and author names
+WORDS = [
+    "amber", "atlas", "beacon", "bridge", "canyon", "cipher", "comet", "delta", "ember", "falcon",
+    "forest", "garden", "glacier", "harbor", "horizon", "island", "jasper", "kernel", "lantern", "meadow",
+    "mirror", "nebula", "oasis", "orbit", "prism", "quartz", "raven", "river", "saffron", "shadow",
+    "signal", "summit", "tempest", "thistle", "timber", "umber", "valley", "velvet", "willow", "zenith",
+]
+
+
+def make_app(path=None):
+    """
+    Create an app bound to a fresh SQLite database in a temporary directory.
+
+    Pass `path` to attach to an existing benchmark database instead (e.g. from a worker process).
+    """
+    path = path or os.path.join(tempfile.mkdtemp(prefix="lms-bench-"), "bench.db")
+
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        PASSWORD_HASH_METHOD = Config.PASSWORD_HASH_METHOD  # measure with the production hashing cost
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_books(count, copies_per_book=2, chunk_size=5000):
+    """
+    Bulk insert `count` books with `copies_per_book` copies each.
+
+    Every other copy is marked unavailable so availability counts are non-trivial.
+    Must be called inside an app context.
+    """
+    from app.models.Book import Book
+    from app.models.BookCopy import BookCopy
+
+    for start in range(0, count, chunk_size):
+        end = min(start + chunk_size, count)
+        db.session.execute(insert(Book), [{
+            "id": i + 1,
+            "barcode": f"B{i:09d}",
+            "title": f"{WORDS[i % 40].title()} {WORDS[i // 40 % 40].title()} Volume {i}",
+            "author": f"{WORDS[i % 37].title()} {WORDS[i // 37 % 40].title()}",
+            "subject_category": f"Category {i % 20}",
+            "publication_date": date(1900 + i % 120, 1 + i % 12, 1 + i % 28),
+            "available_count": (copies_per_book + 1) // 2,
+            "total_count": copies_per_book,
+        } for i in range(start, end)])
+        db.session.execute(insert(BookCopy), [{
+            "book_id": i + 1,
+            "rack_location": f"R{i % 100}",
+            "is_available": c % 2 == 0,
+        } for i in range(start, end) for c in range(copies_per_book)])
+        db.session.commit()
+
+
+@contextmanager
+def measure():
+    """
+    Count SQL statements and elapsed seconds for the enclosed block.
+
+    Yields a dict that is filled with `queries` and `seconds` on exit.
+    """
+    stats = {"queries": 0, "seconds": 0.0}
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        stats["queries"] += 1
+
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    started = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["seconds"] = time.perf_counter() - started
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+
+def print_table(headers, rows):
+    """
+    Print rows as a simple fixed-width table.
+    """
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
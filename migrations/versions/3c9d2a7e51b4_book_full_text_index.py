@@ -0,0 +1,27 @@
+"""book full-text index
+
+Revision ID: 3c9d2a7e51b4
+Revises: f36da4981958
+Create Date: 2026-10-18 20:15:42.518310
+
+"""
+from alembic import op
+
+from app.services.fts_service import create_book_fts, drop_book_fts
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9d2a7e51b4'
+down_revision = 'f36da4981958'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 virtual table over book(title, author, subject_category) plus its sync
+    # triggers; a no-op on engines without FTS5 (search falls back to ilike)
+    create_book_fts(op.get_bind())
+
+
+def downgrade():
+    drop_book_fts(op.get_bind())
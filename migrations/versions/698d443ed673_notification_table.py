@@ -0,0 +1,130 @@
+"""notification table
+
+Revision ID: 698d443ed673
+Revises: b39e51c13500
+Create Date: 2026-10-18 20:23:20.803128
+
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '698d443ed673'
+down_revision = 'b39e51c13500'
+branch_labels = None
+depends_on = None
+
+# Lightweight table definitions for the data migration (the models may change later)
+user_table = sa.table('user', sa.column('id', sa.Integer), sa.column('notifications', sa.Text))
+notification_table = sa.table(
+    'notification',
+    sa.column('id', sa.Integer),
+    sa.column('user_id', sa.Integer),
+    sa.column('subject', sa.String),
+    sa.column('body', sa.Text),
+    sa.column('book_title', sa.String),
+    sa.column('created_at', sa.DateTime),
+    sa.column('is_read', sa.Boolean),
+)
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+BATCH_SIZE = 1000
+
+
+def explode_notification_blobs(connection):
+    """
+    Copy every entry of user.notifications into its own notification row.
+    """
+    pending = []
+    blobs = connection.execute(
+        sa.select(user_table.c.id, user_table.c.notifications)
+        .where(user_table.c.notifications.isnot(None), user_table.c.notifications != '[]')
+    ).fetchall()
+    for user_id, blob in blobs:
+        try:
+            entries = json.loads(blob)
+        except ValueError:
+            continue
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                created_at = datetime.strptime(entry.get('timestamp'), TIMESTAMP_FORMAT)
+            except (TypeError, ValueError):
+                created_at = datetime.utcnow()
+            pending.append({
+                "user_id": user_id,
+                "subject": entry.get('subject') or '',
+                "body": entry.get('body') or '',
+                "book_title": entry.get('book_title'),
+                "created_at": created_at,
+                # The blobs had no read state, so migrated notifications start unread
+                "is_read": False,
+            })
+            if len(pending) >= BATCH_SIZE:
+                connection.execute(notification_table.insert(), pending)
+                pending = []
+    if pending:
+        connection.execute(notification_table.insert(), pending)
+
+
+def collapse_notification_rows(connection):
+    """
+    Rebuild user.notifications blobs from the notification rows (downgrade).
+    """
+    rows = connection.execute(
+        sa.select(notification_table).order_by(notification_table.c.user_id, notification_table.c.created_at,
+                                               notification_table.c.id)
+    ).fetchall()
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row.user_id, []).append({
+            "subject": row.subject,
+            "body": row.body,
+            "book_title": row.book_title,
+            "timestamp": row.created_at.strftime(TIMESTAMP_FORMAT),
+        })
+    connection.execute(user_table.update().values(notifications='[]'))
+    for user_id, entries in by_user.items():
+        connection.execute(
+            user_table.update().where(user_table.c.id == user_id).values(notifications=json.dumps(entries))
+        )
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('notification',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('book_title', sa.String(length=200), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+    # ### end Alembic commands ###
+    explode_notification_blobs(op.get_bind())
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('notifications')
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notifications', sa.TEXT(), nullable=True))
+
+    collapse_notification_rows(op.get_bind())
+
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_user_id_created_at')
+
+    op.drop_table('notification')
+    # ### end Alembic commands ###
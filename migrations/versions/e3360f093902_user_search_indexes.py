@@ -0,0 +1,27 @@
+"""user search indexes
+
+Revision ID: e3360f093902
+Revises: 9e7a0945b8e5
+Create Date: 2026-10-18 21:13:10.244582
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3360f093902'
+down_revision = '9e7a0945b8e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expression indexes for the case-insensitive user search (not detected by autogenerate)
+    op.create_index('ix_user_name_lower', 'user', [sa.text('lower(name)')], unique=False)
+    op.create_index('ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_email_lower', table_name='user')
+    op.drop_index('ix_user_name_lower', table_name='user')
@@ -136,3 +136,385 @@ def test_token_refresh_valid(test_client):
     assert response.status_code == 200
     assert "access_token" in response.json
 
+
+
+@pytest.mark.auth
+def test_login_wrong_password(test_client):
+    """
+    Test logging in to an existing account with the wrong password.
+    """
+    payload = {"name": "Wrong Password", "email": "wrongpassword@example.com", "password": "password123", "role": "Member"}
+    test_client.post('/auth/register', json=payload)
+    response = test_client.post('/auth/login', json={"email": payload["email"], "password": "password124"})
+    assert response.status_code == 401
+    assert "Invalid credentials" in response.json['error']
+
+
+@pytest.mark.auth
+def test_login_rehashes_outdated_password(test_client):
+    """
+    Test that a successful login rehashes a password stored with other hashing parameters.
+    """
+    from flask import current_app
+    from app import db
+    from app.models.User import User
+
+    payload = {"name": "Rehash User", "email": "rehash@example.com", "password": "password123", "role": "Member"}
+    assert test_client.post('/auth/register', json=payload).status_code == 201
+    user = User.query.filter_by(email=payload["email"]).first()
+    assert user.password.startswith("pbkdf2:sha256:1000$")
+
+    hasher = current_app.extensions['password_hasher']
+    method = hasher.method
+    hasher.method = 'pbkdf2:sha256:2000'
+    try:
+        # A failed login leaves the hash alone
+        response = test_client.post('/auth/login', json={"email": payload["email"], "password": "wrong"})
+        assert response.status_code == 401
+        db.session.expire_all()
+        assert User.query.filter_by(email=payload["email"]).first().password.startswith("pbkdf2:sha256:1000$")
+
+        response = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]})
+        assert response.status_code == 200
+        db.session.expire_all()
+        assert User.query.filter_by(email=payload["email"]).first().password.startswith("pbkdf2:sha256:2000$")
+    finally:
+        hasher.method = method
+
+    # The rehashed password still logs in
+    response = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]})
+    assert response.status_code == 200
+
+
+@pytest.mark.auth
+def test_login_sheds_load_when_hashing_is_saturated(test_client):
+    """
+    Test that logins and registrations get 503 with Retry-After while every hashing slot is taken.
+    """
+    from flask import current_app
+    from app.services.password_service import PasswordHasher
+
+    payload = {"name": "Storm User", "email": "storm@example.com", "password": "password123", "role": "Member"}
+    assert test_client.post('/auth/register', json=payload).status_code == 201
+
+    hasher = current_app.extensions['password_hasher']
+    saturated = PasswordHasher(hasher.method, workers=0, queue_depth=0)
+    current_app.extensions['password_hasher'] = saturated
+    try:
+        saturated._slots.acquire()  # a hash in progress holds the only slot
+        response = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]})
+        logging.info(f"Test Login Saturated - Output: {response.json}")
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(current_app.config['PASSWORD_HASH_RETRY_AFTER'])
+        response = test_client.post('/auth/register', json={**payload, "email": "storm2@example.com"})
+        assert response.status_code == 503 and 'Retry-After' in response.headers
+
+        # Once the slot is free again the same login goes through
+        saturated._slots.release()
+        response = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]})
+        assert response.status_code == 200
+    finally:
+        current_app.extensions['password_hasher'] = hasher
+
+
+@pytest.mark.auth
+def test_bulk_hashing_leaves_slots_for_logins(monkeypatch):
+    """
+    Test that a bulk hash (e.g. a member import) shares the login pool without ever taking its queue slots.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from werkzeug.security import check_password_hash
+    from app.services import password_service
+    from app.services.password_service import PasswordHasher
+
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=2, queue_depth=1)
+    free_slots = []
+    hash_passwords = password_service.hash_passwords
+
+    def watched(passwords, method):
+        free_slots.append(hasher._slots._value)
+        time.sleep(0.01)  # long enough for the next jobs to be waiting
+        return hash_passwords(passwords, method)
+
+    # Threads stand in for the worker processes so the jobs can be watched
+    monkeypatch.setattr(password_service, 'hash_passwords', watched)
+    hasher._pool = ThreadPoolExecutor(max_workers=2)
+    try:
+        passwords = [f"bulk-secret-{n}" for n in range(40)]
+        hashes = hasher.hash_many(passwords, jobs=5)
+    finally:
+        hasher.shutdown()
+    assert all(check_password_hash(h, p) for h, p in zip(hashes, passwords))
+    assert len(free_slots) > 2 and min(free_slots) == 1  # at most one job per worker, the queue slot stays free
+    assert hasher._slots._value == 3
+
+
+@pytest.mark.auth
+def test_login_embeds_user_claims(test_client):
+    """
+    Test that the access token carries the user's role, id, barcode and name as claims.
+    """
+    from flask_jwt_extended import decode_token
+    from app.models.User import User
+
+    payload = {"name": "Claims User", "email": "claims@example.com", "password": "password123", "role": "Member"}
+    test_client.post('/auth/register', json=payload)
+    login_response = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]})
+    claims = decode_token(login_response.json['access_token'])
+    user = User.query.filter_by(email=payload["email"]).first()
+    assert claims['sub'] == payload["email"]
+    assert (claims['role'], claims['id'], claims['barcode'], claims['name']) == \
+        ("Member", user.id, user.barcode, "Claims User")
+
+
+@pytest.mark.auth
+def test_token_refresh_keeps_claims(test_client):
+    """
+    Test that an access token from /auth/refresh carries the role claim, so role-protected routes accept it.
+    """
+    payload = {"name": "Refresh Librarian", "email": "refresh_librarian@library.com", "password": "password123",
+               "role": "Librarian"}
+    test_client.post('/auth/register', json=payload)
+    login_response = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]})
+    refresh_response = test_client.post('/auth/refresh',
+                                        headers={"Authorization": f"Bearer {login_response.json['refresh_token']}"})
+    assert refresh_response.status_code == 200
+
+    headers = {"Authorization": f"Bearer {refresh_response.json['access_token']}"}
+    response = test_client.get('/api/dashboard/summary', headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.auth
+def test_logout_revokes_tokens(test_client):
+    """
+    Test that logging out revokes the access token and the refresh token sent along.
+    """
+    payload = {"name": "Logout User", "email": "logout@example.com", "password": "password123", "role": "Member"}
+    test_client.post('/auth/register', json=payload)
+    tokens = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]}).json
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert test_client.get('/dashboard/get-current-user', headers=headers).status_code == 200
+
+    response = test_client.post('/auth/logout', json={"refresh_token": tokens['refresh_token']}, headers=headers)
+    logging.info(f"Test Logout - Output: {response.json}")
+    assert response.status_code == 200
+    assert response.json['message'] == "Logout successful"
+
+    response = test_client.get('/dashboard/get-current-user', headers=headers)
+    assert response.status_code == 401
+    response = test_client.post('/auth/refresh', headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+    assert response.status_code == 401
+
+    # Another session of the same user is unaffected
+    other = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]}).json
+    response = test_client.get('/dashboard/get-current-user',
+                               headers={"Authorization": f"Bearer {other['access_token']}"})
+    assert response.status_code == 200
+
+
+@pytest.mark.auth
+def test_revocation_check_needs_no_query(test_client):
+    """
+    Test that accepting a token that was not revoked runs no SQL (the Bloom filter answers).
+    """
+    from flask import current_app
+    from sqlalchemy import event
+    from app import db
+
+    payload = {"name": "Fast Path", "email": "fastpath@example.com", "password": "password123", "role": "Member"}
+    test_client.post('/auth/register', json=payload)
+    token = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]}).json
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    store = current_app.extensions['revocation_store']
+    sync_interval = store.sync_interval
+    store.sync_interval = 3600  # no periodic sync inside the measured request
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        assert test_client.get('/dashboard/member', headers=headers).status_code == 200
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            assert test_client.get('/dashboard/member', headers=headers).status_code == 200
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    finally:
+        store.sync_interval = sync_interval
+    assert statements == []
+
+
+@pytest.mark.auth
+def test_revocations_sync_and_compact_across_processes(test_client):
+    """
+    Test that a store in another process picks up revocations on its next sync, and that compaction
+    deletes expired revocations.
+    """
+    from datetime import datetime, timedelta
+    from flask import current_app
+    from flask_jwt_extended import decode_token
+    from app.models.RevokedToken import RevokedToken
+    from app.services.revocation_service import RevocationStore
+
+    payload = {"name": "Synced User", "email": "synced@example.com", "password": "password123", "role": "Member"}
+    test_client.post('/auth/register', json=payload)
+    token = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]}).json
+    access = decode_token(token['access_token'])
+
+    other_process = RevocationStore(1000, 0.01, cache_ttl=60, sync_interval=0, compact_interval=3600)
+    assert other_process.is_revoked(access) is False
+
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    assert test_client.post('/auth/logout', headers=headers).status_code == 200
+    assert other_process.is_revoked(access) is True
+
+    # An expired revocation is deleted by the next compaction
+    store = current_app.extensions['revocation_store']
+    store.revoke("expired-jti", datetime.utcnow() - timedelta(seconds=1))
+    assert RevokedToken.query.filter_by(key="expired-jti").count() == 1
+    compacting = RevocationStore(1000, 0.01, cache_ttl=60, sync_interval=0, compact_interval=0)
+    assert compacting.is_revoked(access) is True
+    assert RevokedToken.query.filter_by(key="expired-jti").count() == 0
+    assert RevokedToken.query.filter_by(key=access["jti"]).count() == 1
+
+
+@pytest.mark.auth
+def test_renewed_revocation_reaches_other_processes(test_client):
+    """
+    Test that renewing an expired revocation (e.g. a user deleted again) is picked up by another
+    process whose filter was built without it, on its next sync rather than its next compaction.
+    """
+    import time
+    from datetime import datetime, timedelta
+    from flask import current_app
+    from flask_jwt_extended import decode_token
+    from app.models.RevokedToken import RevokedToken
+    from app.services.revocation_service import RevocationStore, revoke_user_tokens, user_key
+
+    payload = {"name": "Renewed User", "email": "renewed@example.com", "password": "password123", "role": "Member"}
+    test_client.post('/auth/register', json=payload)
+    access = decode_token(test_client.post('/auth/login', json={"email": payload["email"],
+                                                                "password": payload["password"]}).json['access_token'])
+
+    # An old revocation of the user that has expired but not been compacted away yet
+    current_app.extensions['revocation_store'].revoke(user_key(payload["email"]), datetime.utcnow() - timedelta(seconds=1))
+    old_id = RevokedToken.query.filter_by(key=user_key(payload["email"])).one().id
+
+    # Another process whose filter was last built after it expired (a rebuild skips expired rows)
+    other_process = RevocationStore(1000, 0.01, cache_ttl=60, sync_interval=0, compact_interval=3600)
+    other_process._rebuild(compact=False)
+    other_process._compacted_at = other_process._synced_at = time.monotonic()
+    assert other_process.is_revoked(access) is False
+
+    revoke_user_tokens(payload["email"])
+    assert RevokedToken.query.filter_by(key=user_key(payload["email"])).one().id > old_id
+    assert other_process.is_revoked(access) is True
+
+
+@pytest.mark.auth
+def test_bloom_filter_has_no_false_negatives():
+    """
+    Test that every added key is found and that absent keys are rarely reported.
+    """
+    from app.services.revocation_service import BloomFilter
+
+    bloom = BloomFilter(2000, 0.01)
+    for n in range(2000):
+        bloom.add(f"added-{n}")
+    assert all(f"added-{n}" in bloom for n in range(2000))
+    false_positives = sum(f"absent-{n}" in bloom for n in range(10000))
+    assert false_positives < 300  # about 1% expected
+
+
+@pytest.fixture
+def rate_limits(test_client):
+    """
+    Enable rate limiting with small limits and fresh in-memory buckets for one test.
+    """
+    from flask import current_app
+    from app.services.rate_limit_service import MemoryBucketStore, RateLimiter
+
+    saved = (current_app.config['RATE_LIMIT_ENABLED'], current_app.config['RATE_LIMITS'],
+             current_app.extensions['rate_limiter'])
+    current_app.config['RATE_LIMIT_ENABLED'] = True
+    current_app.config['RATE_LIMITS'] = {'login': (3, 60), 'login_account': (2, 60), 'search': (2, 60)}
+    current_app.extensions['rate_limiter'] = RateLimiter(MemoryBucketStore())
+    yield current_app.extensions['rate_limiter']
+    (current_app.config['RATE_LIMIT_ENABLED'], current_app.config['RATE_LIMITS'],
+     current_app.extensions['rate_limiter']) = saved
+
+
+@pytest.mark.auth
+def test_login_rate_limited_per_account_and_ip(test_client, rate_limits):
+    """
+    Test that logins are limited per account and per client IP, with 429 and Retry-After.
+    """
+    payload = {"name": "Limited User", "email": "limited@example.com", "password": "password123", "role": "Member"}
+    test_client.post('/auth/register', json=payload)
+    credentials = {"email": payload["email"], "password": payload["password"]}
+
+    assert test_client.post('/auth/login', json=credentials).status_code == 200
+    assert test_client.post('/auth/login', json={**credentials, "password": "wrong"}).status_code == 401
+    response = test_client.post('/auth/login', json=credentials)
+    logging.info(f"Test Login Rate Limited - Output: {response.json}")
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == "30"  # 2 per 60 seconds: a token every 30 seconds
+
+    # The three attempts spent the address's tokens too, so another account is limited as well
+    other = {"email": "someone.else@example.com", "password": "password123"}
+    response = test_client.post('/auth/login', json=other)
+    assert response.status_code == 429 and response.headers['Retry-After'] == "20"
+
+    # Attempts from one address do not lock the account for the others
+    elsewhere = {"REMOTE_ADDR": "10.0.0.2"}
+    assert test_client.post('/auth/login', json=credentials, environ_base=elsewhere).status_code == 200
+
+    # A body that is not an object has no account; it is refused by the view, not the limiter
+    assert test_client.post('/auth/login', json=["email"], environ_base=elsewhere).status_code == 400
+
+    assert rate_limits.stats() == {"login": {"allowed": 5, "limited": 1}, "login_account": {"allowed": 3, "limited": 1}}
+
+
+@pytest.mark.auth
+def test_search_rate_limited_per_user_or_ip(test_client, rate_limits):
+    """
+    Test that searches are limited per JWT subject, and per IP address for anonymous callers.
+    """
+    for _ in range(2):
+        assert test_client.get('/api/search/books?title=limit').status_code == 200
+    response = test_client.get('/api/search/books?title=limit')
+    assert response.status_code == 429 and 'Retry-After' in response.headers
+
+    # A signed-in user has a bucket of their own
+    payload = {"name": "Limits Librarian", "email": "limits@library.com", "password": "password123", "role": "Librarian"}
+    test_client.post('/auth/register', json=payload)
+    token = test_client.post('/auth/login', json={"email": payload["email"], "password": payload["password"]}).json
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    assert test_client.get('/api/search/books?title=limit', headers=headers).status_code == 200
+
+    response = test_client.get('/api/dashboard/rate-limits', headers=headers)
+    logging.info(f"Test Rate Limit Stats - Output: {response.json}")
+    assert response.status_code == 200
+    assert response.json['enabled'] is True and response.json['store'] == "memory"
+    assert response.json['limits']['search'] == {"requests": 2, "per_seconds": 60, "allowed": 3, "limited": 1}
+
+
+@pytest.mark.auth
+def test_sqlite_buckets_shared_between_processes(tmp_path):
+    """
+    Test that two SQLite-backed stores (as in two worker processes) spend the same buckets, which refill over time.
+    """
+    from app.services.rate_limit_service import SQLiteBucketStore
+
+    path = str(tmp_path / "rate_limits.db")
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    now = 1000.0
+    assert first.take("login:ip:10.0.0.1", 2, 0.5, now) == (True, 1)
+    assert second.take("login:ip:10.0.0.1", 2, 0.5, now) == (True, 0)
+    assert first.take("login:ip:10.0.0.1", 2, 0.5, now)[0] is False
+    assert second.take("login:ip:10.0.0.2", 2, 0.5, now)[0] is True  # other keys are unaffected
+    assert second.take("login:ip:10.0.0.1", 2, 0.5, now + 2)[0] is True  # one token back after 2 seconds
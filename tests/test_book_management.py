@@ -624,4 +624,626 @@ class TestDeleteBookCopy:
     #     delete_response = test_client.delete(f'/api/book_copies/{barcode}/{copy_id}', headers=setup_headers)
     #     logging.info(f"Test Delete Unavailable Book Copy - Output: {delete_response.json}")
     #     assert delete_response.status_code == 400
-    #     assert "Cannot delete a book copy that is currently checked out" in delete_response.json['error']
\ No newline at end of file
+    #     assert "Cannot delete a book copy that is currently checked out" in delete_response.json['error']
+
+class TestCatalogCopyCounts:
+    """
+    Test cases for the copy counts returned by the catalog endpoints.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_headers(self, test_client):
+        """
+        Class-level setup for TestCatalogCopyCounts.
+        Registers a librarian, adds a book with three copies and marks one copy unavailable.
+        """
+        # Register the librarian
+        librarian_data = {
+            "name": "Librarian Twelve",
+            "email": "librarian12@library.com",
+            "password": "password123",
+            "role": "Librarian"
+        }
+        register_response = test_client.post('/auth/register', json=librarian_data)
+        assert register_response.status_code == 201, "Failed to register Librarian"
+
+        # Log in as the librarian
+        login_credentials = {
+            "email": "librarian12@library.com",
+            "password": "password123"
+        }
+        login_response = test_client.post('/auth/login', json=login_credentials)
+        assert login_response.status_code == 200, "Failed to log in as Librarian"
+        auth_token = login_response.json['access_token']
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        # Add a book with three copies
+        book_data = {
+            "title": "Counted Book",
+            "author": "Counted Author",
+            "subject_category": "Statistics",
+            "publication_date": "2015-05-05"
+        }
+        response = test_client.post('/api/books', json=book_data, headers=headers)
+        assert response.status_code == 201, "Failed to add book for testing copy counts"
+        barcode = response.json['barcode']
+
+        for location in ("C1", "C2", "C3"):
+            copy_response = test_client.post(f'/api/book_copies/{barcode}', json={"rack_location": location}, headers=headers)
+            assert copy_response.status_code == 201, "Failed to add book copy"
+
+        # Mark one copy as unavailable
+        copies_response = test_client.get(f'/api/book_copies/{barcode}', headers=headers)
+        copy_id = copies_response.json['book_copies'][0]['id']
+        modify_response = test_client.put(f'/api/book_copies/{barcode}/{copy_id}', json={"is_available": False}, headers=headers)
+        assert modify_response.status_code == 200, "Failed to mark book copy unavailable"
+
+        logging.info("Book and copies added successfully for TestCatalogCopyCounts.")
+        return {"headers": headers, "barcode": barcode}
+
+    @pytest.mark.book_management
+    def test_get_all_books_copy_counts(self, test_client, setup_headers):
+        """
+        Test that the catalog listing reports available and total copies.
+        """
+        response = test_client.get('/api/books', headers=setup_headers["headers"])
+        assert response.status_code == 200
+        book = next(b for b in response.json['books'] if b['barcode'] == setup_headers["barcode"])
+        logging.info(f"Test Catalog Copy Counts - Output: {book}")
+        assert book['available_copies'] == 2
+        assert book['total_copies'] == 3
+
+    @pytest.mark.book_management
+    def test_get_book_by_barcode_copy_counts(self, test_client, setup_headers):
+        """
+        Test that the book detail endpoint reports available and total copies.
+        """
+        response = test_client.get(f'/api/books/{setup_headers["barcode"]}', headers=setup_headers["headers"])
+        logging.info(f"Test Book Detail Copy Counts - Output: {response.json}")
+        assert response.status_code == 200
+        assert response.json['available_copies'] == 2
+        assert response.json['total_copies'] == 3
+
+    @pytest.mark.book_management
+    def test_get_all_books_single_query(self, test_client, setup_headers):
+        """
+        Test that listing the catalog does not issue a query per book.
+        """
+        from sqlalchemy import event
+        from app import db
+        from app.services.book_management_service import get_all_books_service
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        try:
+            response = get_all_books_service()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+
+        assert response[1] == 200
+        assert len(response[0]['books']) >= 1
+        assert len(statements) == 1, f"Expected 1 query, got {len(statements)}"
+        # Counts come from the denormalized columns, not from aggregating book_copy
+        assert "count(" not in statements[0].lower() and "group by" not in statements[0].lower(), statements[0]
+
+    @pytest.mark.book_management
+    def test_counts_follow_copy_changes(self, test_client, setup_headers):
+        """
+        Test that creating, modifying, deleting, issuing and returning copies keep the counts in step.
+        """
+        from app.models.User import User
+        from app.services.borrow_service import issue_book_service, return_book_service
+        from app.services.catalog_service import reconcile_copy_counts
+
+        headers = setup_headers["headers"]
+        response = test_client.post('/api/books', json={"title": "Tracked Book", "author": "Tracked Author",
+                                                        "subject_category": "Statistics",
+                                                        "publication_date": "2016-06-06"}, headers=headers)
+        barcode = response.json['barcode']
+
+        def counts():
+            book = test_client.get(f'/api/books/{barcode}', headers=headers).json
+            return book['available_copies'], book['total_copies']
+
+        for location in ("T1", "T2", "T3"):
+            test_client.post(f'/api/book_copies/{barcode}', json={"rack_location": location}, headers=headers)
+        assert counts() == (3, 3)
+
+        copy_id = test_client.get(f'/api/book_copies/{barcode}', headers=headers).json['book_copies'][0]['id']
+        test_client.put(f'/api/book_copies/{barcode}/{copy_id}', json={"is_available": False}, headers=headers)
+        assert counts() == (2, 3)
+        # Saving the same availability again must not count twice
+        test_client.put(f'/api/book_copies/{barcode}/{copy_id}', json={"is_available": False}, headers=headers)
+        assert counts() == (2, 3)
+        assert test_client.delete(f'/api/book_copies/{barcode}/{copy_id}', headers=headers).status_code == 200
+        assert counts() == (2, 2)
+
+        test_client.post('/auth/register', json={"name": "Tracked Member", "email": "tracked_member@example.com",
+                                                 "password": "password123", "role": "Member"})
+        member = User.query.filter_by(email="tracked_member@example.com").first()
+        issued = issue_book_service(member.barcode, barcode)
+        assert issued[1] == 201, issued
+        assert counts() == (1, 2)
+        assert return_book_service(issued[0]['transaction_id'])[1] == 200
+        assert counts() == (2, 2)
+
+        logging.info(f"Test Counts Follow Copy Changes - Output: {counts()}")
+        assert reconcile_copy_counts(repair=False) == []
+
+    @pytest.mark.book_management
+    def test_reconcile_counts_command(self, test_client, setup_headers):
+        """
+        Test that `flask catalog reconcile-counts` reports drift with --dry-run and repairs it otherwise.
+        """
+        from flask import current_app
+        from app import db
+        from app.models.Book import Book
+
+        barcode = setup_headers["barcode"]
+        db.session.execute(db.update(Book).where(Book.barcode == barcode).values(available_count=7, total_count=9))
+        db.session.commit()
+
+        runner = current_app.test_cli_runner()
+        result = runner.invoke(args=['catalog', 'reconcile-counts', '--dry-run'])
+        logging.info(f"Test Reconcile Counts (dry run) - Output: {result.output}")
+        assert f"{barcode}: available 7 -> 2, total 9 -> 3" in result.output
+        response = test_client.get(f'/api/books/{barcode}', headers=setup_headers["headers"])
+        assert (response.json['available_copies'], response.json['total_copies']) == (7, 9)
+
+        result = runner.invoke(args=['catalog', 'reconcile-counts'])
+        assert "Repaired drift on 1 book(s)." in result.output
+        response = test_client.get(f'/api/books/{barcode}', headers=setup_headers["headers"])
+        assert (response.json['available_copies'], response.json['total_copies']) == (2, 3)
+        assert "All copy counts are consistent." in runner.invoke(args=['catalog', 'reconcile-counts']).output
+
+
+class TestCatalogPagination:
+    """
+    Test cases for paging through the catalog with limit and cursor.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_headers(self, test_client):
+        """
+        Class-level setup for TestCatalogPagination.
+        Registers a librarian and adds several books to page through.
+        """
+        # Register the librarian
+        librarian_data = {
+            "name": "Librarian Thirteen",
+            "email": "librarian13@library.com",
+            "password": "password123",
+            "role": "Librarian"
+        }
+        register_response = test_client.post('/auth/register', json=librarian_data)
+        assert register_response.status_code == 201, "Failed to register Librarian"
+
+        # Log in as the librarian
+        login_credentials = {
+            "email": "librarian13@library.com",
+            "password": "password123"
+        }
+        login_response = test_client.post('/auth/login', json=login_credentials)
+        assert login_response.status_code == 200, "Failed to log in as Librarian"
+        auth_token = login_response.json['access_token']
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        # Add books to page through
+        for number in range(1, 6):
+            book_data = {
+                "title": f"Paged Book {number}",
+                "author": "Paged Author",
+                "subject_category": "Paging",
+                "publication_date": f"2010-01-0{number}"
+            }
+            response = test_client.post('/api/books', json=book_data, headers=headers)
+            assert response.status_code == 201, f"Failed to add book: {book_data['title']}"
+
+        logging.info("Books added successfully for TestCatalogPagination.")
+        return headers
+
+    @pytest.mark.book_management
+    def test_page_through_all_books(self, test_client, setup_headers):
+        """
+        Test that following next_cursor visits every book exactly once.
+        """
+        total = len(test_client.get('/api/books?limit=200', headers=setup_headers).json['books'])
+
+        seen_ids = []
+        url = '/api/books?limit=2'
+        while url:
+            response = test_client.get(url, headers=setup_headers)
+            assert response.status_code == 200
+            assert len(response.json['books']) <= 2
+            seen_ids.extend(book['id'] for book in response.json['books'])
+            next_cursor = response.json['next_cursor']
+            url = f'/api/books?limit=2&cursor={next_cursor}' if next_cursor else None
+
+        logging.info(f"Test Page Through All Books - Output: {seen_ids}")
+        assert len(seen_ids) == total
+        assert seen_ids == sorted(set(seen_ids))
+
+    @pytest.mark.book_management
+    def test_page_size_is_capped(self, test_client, setup_headers):
+        """
+        Test that a huge limit is capped at the server-side maximum.
+        """
+        from flask import current_app
+
+        response = test_client.get('/api/books?limit=100000', headers=setup_headers)
+        assert response.status_code == 200
+        assert len(response.json['books']) <= current_app.config['PAGE_SIZE_MAX']
+
+    @pytest.mark.book_management
+    def test_invalid_cursor(self, test_client, setup_headers):
+        """
+        Test that a malformed cursor is rejected.
+        """
+        response = test_client.get('/api/books?cursor=not-a-cursor', headers=setup_headers)
+        logging.info(f"Test Invalid Cursor - Output: {response.json}")
+        assert response.status_code == 400
+        assert "Invalid cursor" in response.json['error']
+
+    @pytest.mark.book_management
+    def test_invalid_limit(self, test_client, setup_headers):
+        """
+        Test that a non-positive limit is rejected.
+        """
+        response = test_client.get('/api/books?limit=0', headers=setup_headers)
+        assert response.status_code == 400
+        assert "limit" in response.json['error']
+
+
+class TestConditionalGet:
+    """
+    Test cases for the ETag / If-None-Match support of the catalog endpoints.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_headers(self, test_client):
+        """
+        Class-level setup for TestConditionalGet.
+        Registers a librarian and adds a book with one copy.
+        """
+        # Register the librarian
+        librarian_data = {
+            "name": "Librarian Fourteen",
+            "email": "librarian14@library.com",
+            "password": "password123",
+            "role": "Librarian"
+        }
+        register_response = test_client.post('/auth/register', json=librarian_data)
+        assert register_response.status_code == 201, "Failed to register Librarian"
+
+        # Log in as the librarian
+        login_credentials = {
+            "email": "librarian14@library.com",
+            "password": "password123"
+        }
+        login_response = test_client.post('/auth/login', json=login_credentials)
+        assert login_response.status_code == 200, "Failed to log in as Librarian"
+        auth_token = login_response.json['access_token']
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        # Add a book with one copy
+        book_data = {
+            "title": "Tagged Book",
+            "author": "Tagged Author",
+            "subject_category": "Caching",
+            "publication_date": "2017-07-07"
+        }
+        response = test_client.post('/api/books', json=book_data, headers=headers)
+        assert response.status_code == 201, "Failed to add book for testing ETags"
+        barcode = response.json['barcode']
+        copy_response = test_client.post(f'/api/book_copies/{barcode}', json={"rack_location": "E1"}, headers=headers)
+        assert copy_response.status_code == 201, "Failed to add book copy"
+
+        logging.info("Book added successfully for TestConditionalGet.")
+        return {"headers": headers, "barcode": barcode}
+
+    @pytest.mark.book_management
+    def test_catalog_responses_carry_etag(self, test_client, setup_headers):
+        """
+        Test that the catalog endpoints return an ETag and revalidation headers.
+        """
+        barcode = setup_headers["barcode"]
+        for url in ('/api/books', f'/api/books/{barcode}', f'/api/book_copies/{barcode}'):
+            response = test_client.get(url, headers=setup_headers["headers"])
+            logging.info(f"Test Catalog ETag - {url}: {response.headers.get('ETag')}")
+            assert response.status_code == 200
+            assert response.headers['ETag'].startswith('"catalog-')
+            assert response.headers['Cache-Control'] == "private, no-cache"
+
+        # Search results are the same for every user, so shared caches may keep them
+        response = test_client.get('/api/search/books?title=Tagged', headers=setup_headers["headers"])
+        assert response.headers['Cache-Control'] == "no-cache"
+
+    @pytest.mark.book_management
+    def test_if_none_match_returns_304_without_querying(self, test_client, setup_headers):
+        """
+        Test that a matching If-None-Match is answered with an empty 304 and no catalog query.
+        """
+        from sqlalchemy import event
+        from app import db
+
+        url = f'/api/books/{setup_headers["barcode"]}'
+        etag = test_client.get(url, headers=setup_headers["headers"]).headers['ETag']
+
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = test_client.get(url, headers={**setup_headers["headers"], "If-None-Match": etag})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        logging.info(f"Test 304 - Statements: {statements}")
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers['ETag'] == etag
+        assert len(statements) == 1 and "catalog_version" in statements[0]
+
+        # A stale tag gets the full body
+        response = test_client.get(url, headers={**setup_headers["headers"], "If-None-Match": '"catalog-0"'})
+        assert response.status_code == 200
+        assert response.json['barcode'] == setup_headers["barcode"]
+
+    @pytest.mark.book_management
+    def test_etag_changes_with_catalog_writes(self, test_client, setup_headers):
+        """
+        Test that book writes, copy writes and loans move the ETag, and reads do not.
+        """
+        from app.models.User import User
+        from app.services.borrow_service import issue_book_service
+
+        headers = setup_headers["headers"]
+        barcode = setup_headers["barcode"]
+
+        def etag():
+            return test_client.get(f'/api/books/{barcode}', headers=headers).headers['ETag']
+
+        seen = [etag()]
+        assert etag() == seen[-1]
+
+        test_client.put(f'/api/books/{barcode}', json={"title": "Retagged Book"}, headers=headers)
+        seen.append(etag())
+        test_client.post(f'/api/book_copies/{barcode}', json={"rack_location": "E2"}, headers=headers)
+        seen.append(etag())
+
+        test_client.post('/auth/register', json={"name": "Tagged Member", "email": "tagged_member@example.com",
+                                                 "password": "password123", "role": "Member"})
+        member = User.query.filter_by(email="tagged_member@example.com").first()
+        response, status = issue_book_service(member.barcode, barcode)
+        assert status == 201, response
+        seen.append(etag())
+
+        logging.info(f"Test ETag Changes - Output: {seen}")
+        assert len(set(seen)) == len(seen)
+
+    @pytest.mark.book_management
+    def test_etag_ignores_writes_the_catalog_does_not_show(self, test_client, setup_headers):
+        """
+        Test that a return moves the ETag (availability is shown) while a renewal and an edit saving
+        the same values do not.
+        """
+        from app.models.Transaction import Transaction
+        from app.models.User import User
+        from app.services.borrow_service import issue_book_service, renew_book_service, return_book_service
+
+        headers = setup_headers["headers"]
+        barcode = setup_headers["barcode"]
+
+        def etag():
+            return test_client.get(f'/api/books/{barcode}', headers=headers).headers['ETag']
+
+        test_client.post('/auth/register', json={"name": "Untagged Member", "email": "untagged_member@example.com",
+                                                 "password": "password123", "role": "Member"})
+        member = User.query.filter_by(email="untagged_member@example.com").first()
+        assert issue_book_service(member.barcode, barcode)[1] == 201
+        loan = Transaction.query.filter_by(user_id=member.id).first()
+
+        before = etag()
+        assert renew_book_service(loan.id)[1] == 200
+        title = test_client.get(f'/api/books/{barcode}', headers=headers).json['title']
+        assert test_client.put(f'/api/books/{barcode}', json={"title": title}, headers=headers).status_code == 200
+        assert etag() == before
+
+        assert return_book_service(loan.id)[1] == 200
+        assert etag() != before
+
+
+class TestCatalogImport:
+    """
+    Test cases for the bulk catalog import (upload endpoint and CLI).
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_headers(self, test_client):
+        """
+        Class-level setup for TestCatalogImport.
+        Registers a librarian and adds one book the imports will duplicate.
+        """
+        # Register the librarian
+        librarian_data = {
+            "name": "Librarian Fifteen",
+            "email": "librarian15@library.com",
+            "password": "password123",
+            "role": "Librarian"
+        }
+        register_response = test_client.post('/auth/register', json=librarian_data)
+        assert register_response.status_code == 201, "Failed to register Librarian"
+
+        # Log in as the librarian
+        login_credentials = {
+            "email": "librarian15@library.com",
+            "password": "password123"
+        }
+        login_response = test_client.post('/auth/login', json=login_credentials)
+        assert login_response.status_code == 200, "Failed to log in as Librarian"
+        auth_token = login_response.json['access_token']
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        # Add the book that is already in the catalog
+        book_data = {
+            "title": "Imported Existing",
+            "author": "Import Author",
+            "subject_category": "Imports",
+            "publication_date": "2001-02-03"
+        }
+        response = test_client.post('/api/books', json=book_data, headers=headers)
+        assert response.status_code == 201, "Failed to add book for testing imports"
+
+        logging.info("Book added successfully for TestCatalogImport.")
+        return headers
+
+    @staticmethod
+    def imported(test_client, headers, title):
+        response = test_client.get('/api/search/books', query_string={"title": title}, headers=headers)
+        return {book['title']: (book['available_copies'], book['total_copies']) for book in response.json['books']}
+
+    @pytest.mark.book_management
+    def test_import_csv_upload(self, test_client, setup_headers):
+        """
+        Test a CSV sent as the request body: new books with copies, duplicates skipped, bad rows reported.
+        """
+        body = (
+            "title,author,subject_category,publication_date,copies,rack_location\n"
+            "Imported Alpha,Import Author,Imports,2001-01-01,3,I1\n"
+            "Imported Existing,Import Author,Imports,2001-02-03,1,I2\n"
+            "Imported Beta,Import Author,Imports,01/02/2001,1,I3\n"
+            "Imported Gamma,Import Author,Imports,2001-03-03,,I5\n"
+            "Imported Delta,Import Author,Imports,2001-04-04,,\n"
+            "Imported Epsilon,Import Author,Imports,2001-05-05,2,\n"
+            "Imported Alpha,Import Author,Imports,2001-01-01,5,I4\n"
+        )
+        response = test_client.post('/api/books/import', data=body, content_type='text/csv', headers=setup_headers)
+        logging.info(f"Test Import CSV - Output: {response.json}")
+        assert response.status_code == 201
+        assert {key: response.json[key] for key in ("records", "books", "copies", "duplicates", "rejected")} == \
+            {"records": 7, "books": 3, "copies": 4, "duplicates": 2, "rejected": 2}
+        assert response.json['errors'] == [{"line": 4, "error": "Invalid date format. Use YYYY-MM-DD."},
+                                           {"line": 7, "error": "rack_location is required for copies"}]
+
+        books = self.imported(test_client, setup_headers, "Imported")
+        assert books["Imported Alpha"] == (3, 3)
+        assert books["Imported Gamma"] == (1, 1)  # one copy when only a rack location is given
+        assert books["Imported Delta"] == (0, 0)  # no copies without one
+        assert "Imported Beta" not in books and "Imported Epsilon" not in books
+
+        # Importing the same file again adds nothing
+        response = test_client.post('/api/books/import', data=body, content_type='text/csv', headers=setup_headers)
+        assert response.status_code == 200
+        assert response.json['books'] == 0 and response.json['duplicates'] == 5
+
+    @pytest.mark.book_management
+    def test_import_marc_file(self, test_client, setup_headers):
+        """
+        Test a MARC text (.mrk) file sent as a multipart upload, one copy per 852 field.
+        """
+        import io
+
+        mrk = (
+            "=LDR  00000nam a2200000 a 4500\n"
+            "=001  ocm0001\n"
+            "=100  1\\$aMarcauthor, Ann.\n"
+            "=245  10$aImported Marc :$bthe record /$cAnn Marcauthor.\n"
+            "=264  \\1$aLondon :$bPress,$c2005.\n"
+            "=650  \\0$aCataloging.\n"
+            "=852  \\\\$hM1\n"
+            "=852  \\\\$hM2\n"
+            "\n"
+            "=LDR  00000nam a2200000 a 4500\n"
+            "=245  10$aImported Marc without author\n"
+        )
+        response = test_client.post('/api/books/import', data={"file": (io.BytesIO(mrk.encode()), "branch.mrk")},
+                                    content_type='multipart/form-data', headers=setup_headers)
+        logging.info(f"Test Import MARC - Output: {response.json}")
+        assert response.status_code == 201
+        assert (response.json['books'], response.json['copies'], response.json['rejected']) == (1, 2, 1)
+        assert response.json['errors'][0]['line'] == 10
+
+        response = test_client.get('/api/search/books', query_string={"title": "Imported Marc"}, headers=setup_headers)
+        book = response.json['books'][0]
+        assert (book['title'], book['author'], book['subject_category'], book['publication_date']) == \
+            ("Imported Marc : the record", "Marcauthor, Ann", "Cataloging", "2005-01-01")
+        assert book['total_copies'] == 2
+
+    @pytest.mark.book_management
+    def test_import_cli_in_chunks(self, test_client, setup_headers, tmp_path):
+        """
+        Test that `flask catalog import` commits in chunks and reports progress.
+        """
+        from flask import current_app
+
+        path = tmp_path / "branch.ndjson"
+        path.write_text("".join(
+            f'{{"title": "Imported Chunk {n}", "author": "Import Author", "subject_category": "Imports", '
+            f'"publication_date": "2002-01-0{n}", "copies": 2, "rack_location": "J{n}"}}\n' for n in range(1, 6)
+        ) + "not json\n")
+
+        chunk_size = current_app.config['CATALOG_IMPORT_CHUNK_SIZE']
+        current_app.config['CATALOG_IMPORT_CHUNK_SIZE'] = 2
+        try:
+            result = current_app.test_cli_runner().invoke(args=['catalog', 'import', str(path)])
+        finally:
+            current_app.config['CATALOG_IMPORT_CHUNK_SIZE'] = chunk_size
+        logging.info(f"Test Import CLI - Output: {result.output}")
+        assert result.exit_code == 0, result.output
+        assert result.output.count("books and") == 4  # three chunks, then the summary
+        assert "Line 6: Line is not a JSON object" in result.output
+        assert "Imported 5 books and 10 copies from 6 records (0 duplicates skipped, 1 rejected)." in result.output
+        assert len(self.imported(test_client, setup_headers, "Imported Chunk")) == 5
+
+    @pytest.mark.book_management
+    def test_import_stopped_partway_reports_totals(self, test_client, setup_headers):
+        """
+        Test that an upload failing after a committed chunk says how much was imported before the error.
+        """
+        from flask import current_app
+        from app.models.Book import Book
+
+        rows = "".join(f"Imported Partial {n},Import Author,Imports,2003-01-01,1,P1\n" for n in range(400))
+        body = ("title,author,subject_category,publication_date,copies,rack_location\n" + rows).encode() \
+            + b"Imported Broken \xff,Import Author,Imports,2003-01-01,1,P1\n"
+
+        chunk_size = current_app.config['CATALOG_IMPORT_CHUNK_SIZE']
+        current_app.config['CATALOG_IMPORT_CHUNK_SIZE'] = 50
+        try:
+            response = test_client.post('/api/books/import', data=body, content_type='text/csv',
+                                        headers=setup_headers)
+        finally:
+            current_app.config['CATALOG_IMPORT_CHUNK_SIZE'] = chunk_size
+        logging.info(f"Test Import Stopped Partway - Output: {response.json}")
+        assert response.status_code == 400
+        assert response.json['error'].startswith("The file must be UTF-8 encoded (the import stopped after line")
+        assert response.json['partial'] is True
+        assert response.json['books'] > 0 and response.json['books'] % 50 == 0
+        assert response.json['copies'] == response.json['books']
+        assert response.json['line'] > response.json['books']
+
+        # The committed chunks are in the catalog
+        assert Book.query.filter(Book.title.like("Imported Partial %")).count() == response.json['books']
+
+    @pytest.mark.book_management
+    def test_import_validation(self, test_client, setup_headers):
+        """
+        Test that bad formats and headers are rejected, and that members cannot import.
+        """
+        response = test_client.post('/api/books/import?format=xml', data="<books/>", headers=setup_headers)
+        assert response.status_code == 400
+        assert "format must be one of" in response.json['error']
+
+        response = test_client.post('/api/books/import', data="title,author\nA,B\n", headers=setup_headers)
+        assert response.status_code == 400
+        assert response.json['error'] == "CSV header is missing: subject_category, publication_date"
+
+        test_client.post('/auth/register', json={"name": "Import Member", "email": "import_member@example.com",
+                                                 "password": "password123", "role": "Member"})
+        login_response = test_client.post('/auth/login', json={"email": "import_member@example.com",
+                                                                "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+        assert test_client.post('/api/books/import', data="", headers=headers).status_code == 403
@@ -0,0 +1,1080 @@
+import pytest
+import logging
+import re
+import socket
+import socketserver
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+
+@contextmanager
+def capture_statements():
+    """
+    Record every SQL statement (with its parameters) executed inside the block.
+    """
+    from sqlalchemy import event
+    from app import db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal local SMTP server that records the messages it receives.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def handle(self):
+            self.reply("220 stand-in ready")
+            envelope = None
+            for raw in self.rfile:
+                command = raw.decode().strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    self.reply("250 stand-in")
+                elif verb == "MAIL":
+                    envelope = {"from": command.split(":", 1)[1].strip("<> "), "to": []}
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    envelope["to"].append(command.split(":", 1)[1].strip("<> "))
+                    self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    for data in self.rfile:
+                        if data == b".\r\n":
+                            break
+                        lines.append(data.decode())
+                    envelope["data"] = "".join(lines)
+                    self.server.messages.append(envelope)
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("250 OK")
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), self.Handler)
+        self.messages = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+
+def unused_port():
+    """
+    Return a local port with nothing listening on it.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class TestCirculationQueryPlans:
+    """
+    Test cases checking that circulation queries are served by indexes.
+    """
+
+    # Indexes added for the circulation hot paths
+    EXPECTED_INDEXES = {
+        "ix_transaction_user_id_return_date",
+        "ix_transaction_user_id_checkout_date",
+        "ix_transaction_open_due_date",
+        "ix_book_copy_book_id_is_available",
+        "ix_reservation_book_id_status",
+        "ix_reservation_user_id_book_id_status",
+    }
+
+    @pytest.fixture(scope="class", autouse=True)
+    def circulation_statements(self, test_client):
+        """
+        Class-level setup for TestCirculationQueryPlans.
+        Runs every borrow service once and records the SQL statements they issue.
+        """
+        from app import db
+        from app.models.User import User
+        from app.models.Transaction import Transaction
+        from app.services import borrow_service
+        from app.services.circulation_sweep_service import run_circulation_sweep
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+
+        # Register a member and a second member who will hold a reservation
+        for name, email in (("Plan Member", "plan_member@example.com"), ("Plan Holder", "plan_holder@example.com")):
+            response = test_client.post('/auth/register', json={
+                "name": name,
+                "email": email,
+                "password": "password123",
+                "role": "Member"
+            })
+            assert response.status_code == 201, f"Failed to register {email}"
+        member = User.query.filter_by(email="plan_member@example.com").first()
+        holder = User.query.filter_by(email="plan_holder@example.com").first()
+
+        # One book with a single copy, one book with two copies
+        single = add_book_service({"title": "Plan Single", "author": "Plan Author",
+                                   "subject_category": "Plans", "publication_date": "2000-01-01"})[0]['barcode']
+        double = add_book_service({"title": "Plan Double", "author": "Plan Author",
+                                   "subject_category": "Plans", "publication_date": "2000-01-02"})[0]['barcode']
+        create_book_copy_service(single, {"rack_location": "P1"})
+        create_book_copy_service(double, {"rack_location": "P2"})
+        create_book_copy_service(double, {"rack_location": "P3"})
+
+        with capture_statements() as statements:
+            issued = borrow_service.issue_book_service(member.barcode, single)
+            assert issued[1] == 201, issued
+            checked_out = borrow_service.checkout_book_service(member.barcode, double)
+            assert checked_out[1] == 201, checked_out
+
+            reserved = borrow_service.reserve_book_service(holder.barcode, single)
+            assert reserved[1] == 201, reserved
+            cancelled = borrow_service.cancel_reservation_service(reserved[0]['reservation_id'])
+            assert cancelled[1] == 200, cancelled
+            assert borrow_service.reserve_book_service(holder.barcode, single)[1] == 201
+
+            renewed = borrow_service.renew_book_service(checked_out[0]['transaction_id'])
+            assert renewed[1] == 200, renewed
+
+            # Make the first loan overdue so the sweep has work to do
+            transaction = db.session.get(Transaction, issued[0]['transaction_id'])
+            transaction.due_date = datetime.utcnow() - timedelta(days=3)
+            db.session.commit()
+            assert run_circulation_sweep()["overdue"] == 1
+            overdue = borrow_service.check_overdue_books_service()
+            assert overdue[1] == 200, overdue
+            assert len(overdue[0]["overdue_books"]) == 1
+
+            returned = borrow_service.return_book_service(issued[0]['transaction_id'])
+            assert returned[1] == 200, returned
+
+            assert borrow_service.get_borrowing_history_service(member.id)[1] == 200
+            assert borrow_service.get_checked_out_books_service(member.id)[1] == 200
+
+        logging.info(f"Captured {len(statements)} circulation statements.")
+        return statements
+
+    def query_plans(self, statements):
+        """
+        Run EXPLAIN QUERY PLAN for every SELECT/UPDATE/DELETE and INSERT ... SELECT statement.
+        """
+        from app import db
+
+        plans = []
+        with db.engine.connect() as connection:
+            for statement, parameters in statements:
+                if not re.match(r"\s*(SELECT|UPDATE|DELETE|INSERT\b.*\bSELECT\b)", statement, re.IGNORECASE | re.DOTALL):
+                    continue
+                rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                plans.append((statement, [row[-1] for row in rows]))
+        return plans
+
+    @pytest.mark.borrowing
+    def test_no_full_scans_on_circulation_tables(self, test_client, circulation_statements):
+        """
+        Test that no circulation query scans a circulation table or a whole index.
+        """
+        for statement, plan in self.query_plans(circulation_statements):
+            logging.info(f"Query Plan - Statement: {statement} - Plan: {plan}")
+            for step in plan:
+                assert not re.match(r"SCAN (transaction|book_copy|reservation)\b", step), \
+                    f"Scan in plan {plan} for: {statement}"
+
+    @pytest.mark.borrowing
+    def test_circulation_indexes_are_used(self, test_client, circulation_statements):
+        """
+        Test that each index of the circulation index set serves at least one indexed lookup.
+        """
+        used = set()
+        for statement, plan in self.query_plans(circulation_statements):
+            for step in plan:
+                if step.startswith("SEARCH"):
+                    used.update(re.findall(r"INDEX (ix_\w+)", step))
+        logging.info(f"Circulation Indexes Used - Output: {sorted(used)}")
+        assert self.EXPECTED_INDEXES <= used, f"Unused indexes: {self.EXPECTED_INDEXES - used}"
+
+
+class TestOverdueSweep:
+    """
+    Test cases for the circulation sweep and the overdue books endpoint.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def overdue_loans(self, test_client):
+        """
+        Class-level setup for TestOverdueSweep.
+        Registers a librarian and a member, issues three copies to the member
+        and backdates the due dates so all three loans are overdue.
+        """
+        from app import db
+        from app.models.User import User
+        from app.models.Transaction import Transaction
+        from app.models.SweepState import SweepState
+        from app.services.borrow_service import issue_book_service
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+
+        # Register and log in the librarian
+        librarian_data = {
+            "name": "Librarian Overdue",
+            "email": "librarian_overdue@library.com",
+            "password": "password123",
+            "role": "Librarian"
+        }
+        assert test_client.post('/auth/register', json=librarian_data).status_code == 201
+        login_response = test_client.post('/auth/login', json={
+            "email": "librarian_overdue@library.com",
+            "password": "password123"
+        })
+        assert login_response.status_code == 200, "Failed to log in as Librarian"
+        headers = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+
+        # Register the member
+        member_data = {
+            "name": "Overdue Member",
+            "email": "overdue_member@example.com",
+            "password": "password123",
+            "role": "Member"
+        }
+        assert test_client.post('/auth/register', json=member_data).status_code == 201
+        member = User.query.filter_by(email="overdue_member@example.com").first()
+
+        # Issue three copies and make each loan overdue by a different number of days
+        barcode = add_book_service({"title": "Overdue Book", "author": "Overdue Author",
+                                    "subject_category": "Overdue", "publication_date": "1999-09-09"})[0]['barcode']
+        transaction_ids = []
+        for days_overdue in (5, 9, 2):
+            create_book_copy_service(barcode, {"rack_location": "O1"})
+            issued = issue_book_service(member.barcode, barcode)
+            assert issued[1] == 201, issued
+            transaction = db.session.get(Transaction, issued[0]['transaction_id'])
+            transaction.due_date = datetime.utcnow() - timedelta(days=days_overdue, hours=1)
+            transaction_ids.append(transaction.id)
+
+        # Backdated due dates can fall behind the cursors of earlier sweeps, so start fresh
+        SweepState.query.delete()
+        db.session.commit()
+
+        logging.info("Overdue loans created successfully for TestOverdueSweep.")
+        return {"headers": headers, "member_id": member.id, "member_barcode": member.barcode,
+                "book_barcode": barcode, "transaction_ids": transaction_ids}
+
+    def notifications(self, user_id, now=None):
+        """
+        Deliver queued notifications, then return the user's notifications oldest first.
+        """
+        from app.models.Notification import Notification
+        from app.services.outbox_service import drain_outbox
+
+        drain_outbox(now)
+        notifications = Notification.query.filter_by(user_id=user_id).order_by(Notification.id).all()
+        return [notification.to_dict() for notification in notifications]
+
+    @pytest.mark.borrowing
+    def test_sweep_in_chunks(self, test_client, overdue_loans):
+        """
+        Test that the sweep crosses chunk boundaries and notifies the borrower once per loan.
+        """
+        from app.services.circulation_sweep_service import run_circulation_sweep
+
+        before = len(self.notifications(overdue_loans["member_id"]))
+        counts = run_circulation_sweep(chunk_size=2)
+        logging.info(f"Test Sweep In Chunks - Output: {counts}")
+        assert counts == {"overdue": 3, "due_soon": 0}
+
+        notifications = self.notifications(overdue_loans["member_id"])
+        assert len(notifications) == before + 3
+        # Loans are visited in due-date order, oldest first
+        assert ["9 days" in n["body"] for n in notifications[-3:]] == [True, False, False]
+        assert all(n["subject"] == "Overdue Book Notification" for n in notifications[-3:])
+
+    @pytest.mark.borrowing
+    def test_sweep_is_incremental(self, test_client, overdue_loans):
+        """
+        Test that a re-run only notifies loans that became due soon or overdue since the last run.
+        """
+        from app import db
+        from app.models.Transaction import Transaction
+        from app.services.borrow_service import issue_book_service
+        from app.services.book_management_service import create_book_copy_service
+        from app.services.circulation_sweep_service import run_circulation_sweep
+
+        # Nothing changed since the previous sweep
+        assert run_circulation_sweep() == {"overdue": 0, "due_soon": 0}
+
+        # A loan due tomorrow gets one reminder
+        create_book_copy_service(overdue_loans["book_barcode"], {"rack_location": "O2"})
+        issued = issue_book_service(overdue_loans["member_barcode"], overdue_loans["book_barcode"])
+        assert issued[1] == 201, issued
+        transaction = db.session.get(Transaction, issued[0]['transaction_id'])
+        transaction.due_date = datetime.utcnow() + timedelta(days=1)
+        db.session.commit()
+
+        before = len(self.notifications(overdue_loans["member_id"]))
+        assert run_circulation_sweep() == {"overdue": 0, "due_soon": 1}
+        assert run_circulation_sweep() == {"overdue": 0, "due_soon": 0}
+        assert self.notifications(overdue_loans["member_id"])[-1]["subject"] == "Book Due Soon"
+
+        # Two days later the same loan is overdue and gets exactly one overdue notice
+        later = datetime.utcnow() + timedelta(days=2)
+        assert run_circulation_sweep(now=later) == {"overdue": 1, "due_soon": 0}
+        assert run_circulation_sweep(now=later) == {"overdue": 0, "due_soon": 0}
+        assert len(self.notifications(overdue_loans["member_id"], now=later)) == before + 2
+
+    @pytest.mark.borrowing
+    def test_stale_cursor_is_not_advanced(self, test_client, overdue_loans):
+        """
+        Test that a worker holding an outdated cursor cannot claim a chunk another worker handled.
+        """
+        from app import db
+        from app.models.SweepState import SweepState
+        from app.services.circulation_sweep_service import _advance_cursor, OVERDUE_SWEEP
+
+        state = SweepState.query.filter_by(name=OVERDUE_SWEEP).first()
+        assert state.cursor_due_date is not None
+        claimed = _advance_cursor(state.id, None, (datetime.utcnow(), 1), datetime.utcnow(), 0)
+        db.session.rollback()
+        assert claimed is False
+
+    @pytest.mark.borrowing
+    def test_overdue_books_endpoint(self, test_client, overdue_loans):
+        """
+        Test that the overdue books endpoint pages through overdue loans without notifying anyone.
+        """
+        before = len(self.notifications(overdue_loans["member_id"]))
+
+        response = test_client.get('/api/overdue-books?limit=2', headers=overdue_loans["headers"])
+        logging.info(f"Test Overdue Books Endpoint - Output: {response.json}")
+        assert response.status_code == 200
+        assert len(response.json["overdue_books"]) == 2
+        assert response.json["next_cursor"]
+        assert response.json["last_sweep_at"]
+
+        second = test_client.get(f'/api/overdue-books?limit=2&cursor={response.json["next_cursor"]}',
+                                 headers=overdue_loans["headers"])
+        assert second.status_code == 200
+        assert second.json["next_cursor"] is None
+        entries = response.json["overdue_books"] + second.json["overdue_books"]
+        assert [entry["transaction_id"] for entry in entries] == [overdue_loans["transaction_ids"][i] for i in (1, 0, 2)]
+        assert [entry["days_overdue"] for entry in entries] == [9, 5, 2]
+        assert [entry["fine_amount"] for entry in entries] == [4.5, 2.5, 1.0]
+
+        assert len(self.notifications(overdue_loans["member_id"])) == before
+
+    @pytest.mark.borrowing
+    def test_overdue_books_invalid_cursor(self, test_client, overdue_loans):
+        """
+        Test that a malformed cursor is rejected.
+        """
+        response = test_client.get('/api/overdue-books?cursor=bogus', headers=overdue_loans["headers"])
+        assert response.status_code == 400
+
+
+class TestNotificationOutbox:
+    """
+    Test cases for the notification outbox and its dispatcher.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def held_book(self, test_client):
+        """
+        Class-level setup for TestNotificationOutbox.
+        Lends the only copy of a book to one member while three others hold reservations on it.
+        """
+        from app.models.User import User
+        from app.services.borrow_service import issue_book_service, reserve_book_service
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+
+        members = {}
+        for name in ("borrower", "holder1", "holder2", "holder3"):
+            email = f"outbox_{name}@example.com"
+            response = test_client.post('/auth/register', json={
+                "name": f"Outbox {name.title()}",
+                "email": email,
+                "password": "password123",
+                "role": "Member"
+            })
+            assert response.status_code == 201, f"Failed to register {email}"
+            members[name] = User.query.filter_by(email=email).first()
+
+        barcode = add_book_service({"title": "Outbox Book", "author": "Outbox Author",
+                                    "subject_category": "Outbox", "publication_date": "2001-01-01"})[0]['barcode']
+        create_book_copy_service(barcode, {"rack_location": "X1"})
+        issued = issue_book_service(members["borrower"].barcode, barcode)
+        assert issued[1] == 201, issued
+        for name in ("holder1", "holder2", "holder3"):
+            assert reserve_book_service(members[name].barcode, barcode)[1] == 201
+
+        logging.info("Held book created successfully for TestNotificationOutbox.")
+        return {
+            "barcode": barcode,
+            "transaction_id": issued[0]['transaction_id'],
+            "holder_ids": [members[name].id for name in ("holder1", "holder2", "holder3")],
+            "holder_emails": {members[name].email for name in ("holder1", "holder2", "holder3")},
+        }
+
+    @pytest.fixture
+    def mail_config(self, test_client):
+        """
+        Point the dispatcher at a local SMTP stand-in for one test.
+        """
+        from flask import current_app
+
+        server = SMTPStandIn()
+        saved = {key: current_app.config[key] for key in ("MAIL_SERVER", "MAIL_PORT", "OUTBOX_MAX_ATTEMPTS")}
+        current_app.config.update(MAIL_SERVER="127.0.0.1", MAIL_PORT=server.server_address[1])
+        yield server
+        current_app.config.update(saved)
+        server.shutdown()
+        server.server_close()
+
+    def holder_notifications(self, held_book):
+        from app.models.Notification import Notification
+
+        return Notification.query.filter(Notification.user_id.in_(held_book["holder_ids"])).all()
+
+    @pytest.mark.borrowing
+    def test_return_queues_one_intent_per_hold(self, test_client, held_book):
+        """
+        Test that a return queues the reservation notices in one statement and delivers nothing inline.
+        """
+        from app.models.OutboxMessage import OutboxMessage
+        from app.services.borrow_service import return_book_service
+
+        with capture_statements() as statements:
+            returned = return_book_service(held_book["transaction_id"])
+        assert returned[1] == 200, returned
+
+        inserts = [statement for statement, _ in statements if statement.lstrip().upper().startswith("INSERT")]
+        assert len(inserts) == 1 and "outbox_message" in inserts[0]
+
+        queued = OutboxMessage.query.filter(OutboxMessage.user_id.in_(held_book["holder_ids"])).all()
+        logging.info(f"Test Return Queues Intents - Output: {[m.dedup_key for m in queued]}")
+        assert len(queued) == 3
+        assert all(m.status == 'Pending' and m.kind == 'reservation_available' for m in queued)
+        assert self.holder_notifications(held_book) == []
+
+    @pytest.mark.borrowing
+    def test_dispatch_delivers_email_and_in_app(self, test_client, held_book, mail_config):
+        """
+        Test that the dispatcher emails every holder once and records the in-app notification.
+        """
+        from app.models.OutboxMessage import OutboxMessage
+        from app.services.outbox_service import drain_outbox
+
+        counts = drain_outbox()
+        logging.info(f"Test Dispatch - Output: {counts}")
+        assert counts == {"sent": 3, "retried": 0, "failed": 0}
+        assert {rcpt for message in mail_config.messages for rcpt in message["to"]} == held_book["holder_emails"]
+        assert all("Subject: Book Reservation Available" in message["data"] for message in mail_config.messages)
+        assert all("Message-ID: <outbox-" in message["data"] for message in mail_config.messages)
+
+        notifications = self.holder_notifications(held_book)
+        assert len(notifications) == 3
+        assert all("'Outbox Book' you reserved is now available" in n.body for n in notifications)
+        assert OutboxMessage.query.filter_by(status='Sent').count() >= 3
+
+        # Nothing left to deliver
+        assert drain_outbox() == {"sent": 0, "retried": 0, "failed": 0}
+        assert len(mail_config.messages) == 3
+
+    @pytest.mark.borrowing
+    def test_requeue_is_deduplicated(self, test_client, held_book):
+        """
+        Test that saving an already available copy does not notify the holds again.
+        """
+        from app.models.OutboxMessage import OutboxMessage
+        from app.services.book_management_service import get_book_copies_service, modify_book_copy_service
+
+        copy_id = get_book_copies_service(held_book["barcode"])[0]["book_copies"][0]["id"]
+        assert modify_book_copy_service(held_book["barcode"], copy_id, {"is_available": True})[1] == 200
+        assert OutboxMessage.query.filter(OutboxMessage.user_id.in_(held_book["holder_ids"])).count() == 3
+
+    @pytest.mark.borrowing
+    def test_failed_delivery_is_retried(self, test_client, held_book, mail_config):
+        """
+        Test that an unreachable SMTP server leads to a delayed retry, not a lost or duplicated message.
+        """
+        from flask import current_app
+        from app import db
+        from app.models.OutboxMessage import OutboxMessage
+        from app.services.outbox_service import enqueue_messages, drain_outbox
+
+        enqueue_messages([{"kind": "reservation_available", "user_id": held_book["holder_ids"][0],
+                           "dedup_key": "test-retry"}])
+        db.session.commit()
+
+        port = current_app.config["MAIL_PORT"]
+        current_app.config["MAIL_PORT"] = unused_port()
+        assert drain_outbox() == {"sent": 0, "retried": 1, "failed": 0}
+        message = OutboxMessage.query.filter_by(dedup_key="test-retry").first()
+        assert message.attempts == 1 and message.status == 'Pending' and message.last_error
+        assert message.next_attempt_at > datetime.utcnow()
+        # The in-app notification does not wait for the email
+        assert message.notified_at is not None
+        assert len(self.holder_notifications(held_book)) == 4
+
+        # Once the server is back, the retry goes out when it is due
+        current_app.config["MAIL_PORT"] = port
+        assert drain_outbox() == {"sent": 0, "retried": 0, "failed": 0}
+        later = datetime.utcnow() + timedelta(hours=1)
+        assert drain_outbox(now=later) == {"sent": 1, "retried": 0, "failed": 0}
+        assert len(mail_config.messages) == 1
+        # ... and is not written again by the retry
+        assert len(self.holder_notifications(held_book)) == 4
+
+    @pytest.mark.borrowing
+    def test_gives_up_after_max_attempts(self, test_client, held_book, mail_config):
+        """
+        Test that a message is marked failed after OUTBOX_MAX_ATTEMPTS, keeping the in-app notification.
+        """
+        from flask import current_app
+        from app import db
+        from app.models.OutboxMessage import OutboxMessage
+        from app.services.outbox_service import enqueue_messages, drain_outbox
+
+        enqueue_messages([{"kind": "reservation_available", "user_id": held_book["holder_ids"][1],
+                           "dedup_key": "test-give-up"}])
+        db.session.commit()
+
+        current_app.config.update(MAIL_PORT=unused_port(), OUTBOX_MAX_ATTEMPTS=1)
+        assert drain_outbox() == {"sent": 0, "retried": 0, "failed": 1}
+        message = OutboxMessage.query.filter_by(dedup_key="test-give-up").first()
+        assert message.status == 'Failed'
+        assert len(self.holder_notifications(held_book)) == 5
+
+    @pytest.mark.borrowing
+    def test_notice_for_missing_loan_fails(self, test_client, held_book):
+        """
+        Test that a due-date notice whose loan is gone is marked failed without holding up the batch.
+        """
+        from app import db
+        from app.models.OutboxMessage import OutboxMessage
+        from app.services.outbox_service import enqueue_messages, drain_outbox
+
+        enqueue_messages([
+            {"kind": "overdue", "user_id": held_book["holder_ids"][0], "dedup_key": "test-missing-loan"},
+            {"kind": "reservation_available", "user_id": held_book["holder_ids"][0], "dedup_key": "test-after-missing"},
+        ])
+        db.session.commit()
+
+        assert drain_outbox() == {"sent": 1, "retried": 0, "failed": 1}
+        message = OutboxMessage.query.filter_by(dedup_key="test-missing-loan").first()
+        assert message.status == 'Failed' and message.attempts == 1 and message.last_error == "Loan not found"
+        assert message.claim_token is None
+
+    @pytest.mark.borrowing
+    def test_new_copy_notifies_pending_holds_again(self, test_client, held_book):
+        """
+        Test that every new availability event queues a fresh notice for holds that are still pending.
+        """
+        from app import db
+        from app.models.Book import Book
+        from app.models.OutboxMessage import OutboxMessage
+        from app.services.book_management_service import create_book_copy_service
+        from app.services.outbox_service import enqueue_reservation_available
+
+        def queued():
+            return OutboxMessage.query.filter(OutboxMessage.user_id.in_(held_book["holder_ids"]),
+                                              OutboxMessage.kind == 'reservation_available').count()
+
+        before = queued()
+        assert create_book_copy_service(held_book["barcode"], {"rack_location": "O2"})[1] == 201
+        assert queued() == before + 3
+
+        # The same event is still only queued once
+        book = Book.query.filter_by(barcode=held_book["barcode"]).first()
+        enqueue_reservation_available([book.id], f"return:{held_book['transaction_id']}")
+        assert queued() == before + 3
+        db.session.rollback()
+
+
+class TestCopyAllocation:
+    """
+    Test cases for atomic copy allocation under concurrent issues.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def contended_book(self, test_client):
+        """
+        Class-level setup for TestCopyAllocation.
+        Registers eight members and creates a book with three copies.
+        """
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+        from app.models.User import User
+
+        barcodes = []
+        for i in range(8):
+            email = f"race_member{i}@example.com"
+            response = test_client.post('/auth/register', json={
+                "name": f"Race Member {i}",
+                "email": email,
+                "password": "password123",
+                "role": "Member"
+            })
+            assert response.status_code == 201, f"Failed to register {email}"
+            barcodes.append(User.query.filter_by(email=email).first().barcode)
+
+        book_barcode = add_book_service({"title": "Race Book", "author": "Race Author",
+                                         "subject_category": "Race", "publication_date": "2002-02-02"})[0]['barcode']
+        for _ in range(3):
+            create_book_copy_service(book_barcode, {"rack_location": "Z1"})
+
+        return {"member_barcodes": barcodes, "book_barcode": book_barcode}
+
+    @pytest.mark.borrowing
+    def test_concurrent_issues_never_share_a_copy(self, test_client, contended_book):
+        """
+        Test that eight simultaneous issues of a three-copy book hand out each copy exactly once.
+        """
+        from flask import current_app
+        from app import db
+        from app.models.Transaction import Transaction
+        from app.services.borrow_service import issue_book_service
+
+        app = current_app._get_current_object()
+        barrier = threading.Barrier(len(contended_book["member_barcodes"]))
+        results = []
+
+        def issue(member_barcode):
+            with app.app_context():
+                barrier.wait()
+                results.append(issue_book_service(member_barcode, contended_book["book_barcode"]))
+                db.session.remove()
+
+        threads = [threading.Thread(target=issue, args=(barcode,)) for barcode in contended_book["member_barcodes"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        logging.info(f"Test Concurrent Issues - Output: {results}")
+        issued = [body for body, status in results if status == 201]
+        assert len(issued) == 3
+        assert sorted(status for _, status in results) == [201] * 3 + [400] * 5
+
+        copy_ids = [db.session.get(Transaction, body["transaction_id"]).book_copy_id for body in issued]
+        assert len(set(copy_ids)) == 3
+
+        # The denormalized available count was decremented exactly once per issue
+        from app.services.catalog_service import reconcile_copy_counts
+        assert reconcile_copy_counts(repair=False) == []
+
+    @pytest.mark.borrowing
+    def test_lock_retry_is_bounded(self, test_client, contended_book):
+        """
+        Test that "database is locked" is retried up to LOCK_RETRY_ATTEMPTS and other errors are not.
+        """
+        from flask import current_app
+        from sqlalchemy.exc import OperationalError
+        from app.services.borrow_service import retry_on_database_lock
+
+        calls = []
+
+        def locked_twice():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError("UPDATE book_copy", {}, Exception("database is locked"))
+            return "done"
+
+        assert retry_on_database_lock(locked_twice) == "done"
+        assert len(calls) == 3
+
+        calls.clear()
+
+        def always_locked():
+            calls.append(1)
+            raise OperationalError("UPDATE book_copy", {}, Exception("database is locked"))
+
+        with pytest.raises(OperationalError):
+            retry_on_database_lock(always_locked)
+        assert len(calls) == current_app.config['LOCK_RETRY_ATTEMPTS']
+
+        calls.clear()
+
+        def disk_error():
+            calls.append(1)
+            raise OperationalError("UPDATE book_copy", {}, Exception("disk I/O error"))
+
+        with pytest.raises(OperationalError):
+            retry_on_database_lock(disk_error)
+        assert len(calls) == 1
+
+
+class TestCirculationBatch:
+    """
+    Test cases for the batch circulation endpoint.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def circulation_desk(self, test_client):
+        """
+        Class-level setup for TestCirculationBatch.
+        Logs in a librarian and a member, registers two more members and creates
+        three books: "Cart A" (3 copies), "Cart B" (1 copy) and "Cart C" (6 copies).
+        """
+        from app.models.User import User
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+
+        users = {}
+        for name, role in (("librarian", "Librarian"), ("member1", "Member"), ("member2", "Member"), ("member3", "Member")):
+            email = f"batch_{name}@library.com"
+            response = test_client.post('/auth/register', json={
+                "name": f"Batch {name.title()}",
+                "email": email,
+                "password": "password123",
+                "role": role
+            })
+            assert response.status_code == 201, f"Failed to register {email}"
+            users[name] = User.query.filter_by(email=email).first().barcode
+
+        headers = {}
+        for name in ("librarian", "member1"):
+            login_response = test_client.post('/auth/login', json={
+                "email": f"batch_{name}@library.com",
+                "password": "password123"
+            })
+            assert login_response.status_code == 200, f"Failed to log in as {name}"
+            headers[name] = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+
+        books = {}
+        for title, copies in (("Cart A", 3), ("Cart B", 1), ("Cart C", 6)):
+            books[title] = add_book_service({"title": title, "author": "Cart Author", "subject_category": "Cart",
+                                             "publication_date": "2003-03-03"})[0]['barcode']
+            for _ in range(copies):
+                create_book_copy_service(books[title], {"rack_location": "C1"})
+
+        logging.info("Circulation desk created successfully for TestCirculationBatch.")
+        return {"users": users, "books": books, "headers": headers}
+
+    def post_batch(self, test_client, circulation_desk, operations, role="librarian"):
+        return test_client.post('/api/circulation/batch', json={"operations": operations},
+                                headers=circulation_desk["headers"][role])
+
+    @pytest.mark.borrowing
+    def test_mixed_cart(self, test_client, circulation_desk):
+        """
+        Test per-item results for a cart with successful and failing items, resolved with a fixed number of queries.
+        """
+        users, books = circulation_desk["users"], circulation_desk["books"]
+        operations = [
+            {"action": "issue", "user_barcode": users["member1"], "book_barcode": books["Cart A"]},
+            {"action": "issue", "user_barcode": users["member1"], "book_barcode": books["Cart A"]},
+            {"action": "issue", "user_barcode": users["member1"], "book_barcode": books["Cart B"]},
+            {"action": "issue", "user_barcode": users["member2"], "book_barcode": books["Cart B"]},
+            {"action": "issue", "user_barcode": "NOBODY", "book_barcode": books["Cart A"]},
+            {"action": "shelve", "transaction_id": 1},
+            {"action": "return"},
+        ]
+        with capture_statements() as statements:
+            response = self.post_batch(test_client, circulation_desk, operations)
+        logging.info(f"Test Mixed Cart - Output: {response.json}")
+        assert response.status_code == 200
+        results = response.json["results"]
+        assert [r["status"] for r in results] == [201, 201, 201, 400, 404, 400, 400]
+        assert results[3]["error"] == "No available copies of this book"
+        assert results[5]["error"] == "Unknown action"
+        assert response.json["summary"] == {"succeeded": 3, "failed": 4}
+
+        # Lookups do not grow with the cart: one IN query per kind plus the JWT and reservation lookups
+        selects = [s for s, _ in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) <= 5, selects
+
+    @pytest.mark.borrowing
+    def test_loan_limit_and_return_in_same_cart(self, test_client, circulation_desk):
+        """
+        Test that the 5-loan limit applies across the cart and that a return frees a slot for a later issue.
+        """
+        users, books = circulation_desk["users"], circulation_desk["books"]
+        issue = {"action": "issue", "user_barcode": users["member3"], "book_barcode": books["Cart C"]}
+
+        response = self.post_batch(test_client, circulation_desk, [issue] * 6)
+        results = response.json["results"]
+        assert [r["status"] for r in results] == [201] * 5 + [400]
+        assert "maximum number of books" in results[5]["error"]
+
+        response = self.post_batch(test_client, circulation_desk, [
+            {"action": "return", "transaction_id": results[0]["transaction_id"]},
+            issue,
+            {"action": "renew", "transaction_id": results[1]["transaction_id"]},
+            {"action": "renew", "transaction_id": results[0]["transaction_id"]},
+            {"action": "return", "transaction_id": 999999},
+        ])
+        logging.info(f"Test Loan Limit And Return - Output: {response.json}")
+        assert [r["status"] for r in response.json["results"]] == [200, 201, 200, 400, 404]
+        assert response.json["results"][2]["new_due_date"]
+
+    @pytest.mark.borrowing
+    def test_batch_validation(self, test_client, circulation_desk):
+        """
+        Test that the endpoint requires a librarian and a bounded, non-empty list of operations.
+        """
+        from flask import current_app
+
+        operation = {"action": "renew", "transaction_id": 1}
+        assert self.post_batch(test_client, circulation_desk, [operation], role="member1").status_code == 403
+        assert self.post_batch(test_client, circulation_desk, []).status_code == 400
+        too_many = [operation] * (current_app.config['CIRCULATION_BATCH_MAX'] + 1)
+        assert self.post_batch(test_client, circulation_desk, too_many).status_code == 400
+
+
+class TestBorrowingHistory:
+    """
+    Test cases for the paginated borrowing history, checked-out list and history export.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def history(self, test_client):
+        """
+        Class-level setup for TestBorrowingHistory.
+        Registers a member with seven loans checked out on consecutive days, of
+        which the three most recent are still open, and logs them in.
+        """
+        from app import db
+        from app.models.User import User
+        from app.models.Book import Book
+        from app.models.BookCopy import BookCopy
+        from app.models.Transaction import Transaction
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+
+        response = test_client.post('/auth/register', json={
+            "name": "History Member",
+            "email": "history_member@example.com",
+            "password": "password123",
+            "role": "Member"
+        })
+        assert response.status_code == 201, "Failed to register history member"
+        member = User.query.filter_by(email="history_member@example.com").first()
+
+        barcode = add_book_service({"title": "History Book", "author": "History Author",
+                                    "subject_category": "History", "publication_date": "1999-09-09"})[0]['barcode']
+        create_book_copy_service(barcode, {"rack_location": "H1"})
+        copy_id = BookCopy.query.join(Book).filter(Book.barcode == barcode).first().id
+
+        start = datetime(2024, 1, 1, 12)
+        for day in range(7):
+            checkout = start + timedelta(days=day)
+            db.session.add(Transaction(
+                user_id=member.id, book_copy_id=copy_id, checkout_date=checkout,
+                due_date=checkout + timedelta(days=20 - 2 * day),
+                return_date=checkout + timedelta(days=3) if day < 4 else None,
+                fine_amount=0.0
+            ))
+        db.session.commit()
+
+        login_response = test_client.post('/auth/login', json={
+            "email": "history_member@example.com",
+            "password": "password123"
+        })
+        assert login_response.status_code == 200, "Failed to log in history member"
+        logging.info("History member created successfully for TestBorrowingHistory.")
+        return {"user_id": member.id, "headers": {"Authorization": f"Bearer {login_response.json['access_token']}"}}
+
+    def get(self, test_client, history, path, **params):
+        return test_client.get(f"/api/users/{history['user_id']}/{path}", query_string=params,
+                               headers=history["headers"])
+
+    @pytest.mark.borrowing
+    def test_history_pages_newest_first(self, test_client, history):
+        """
+        Test that history pages cover every loan once, newest first, with one joined query per page.
+        """
+        dates, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            with capture_statements() as statements:
+                response = self.get(test_client, history, "borrowing-history", **params)
+            assert response.status_code == 200, response.json
+            # The user check and the page itself, however many loans are on the page
+            assert len(statements) == 2, statements
+            dates += [item["checkout_date"] for item in response.json["borrowing_history"]]
+            cursor = response.json["next_cursor"]
+            if not cursor:
+                break
+        logging.info(f"Test History Pages - Output: {dates}")
+        assert dates == [f"2024-01-0{day}" for day in range(7, 0, -1)]
+
+    @pytest.mark.borrowing
+    def test_history_date_range(self, test_client, history):
+        """
+        Test the inclusive checkout date filters and their validation.
+        """
+        response = self.get(test_client, history, "borrowing-history", start_date="2024-01-02", end_date="2024-01-04")
+        assert [item["checkout_date"] for item in response.json["borrowing_history"]] == \
+            ["2024-01-04", "2024-01-03", "2024-01-02"]
+
+        assert self.get(test_client, history, "borrowing-history", start_date="01/02/2024").status_code == 400
+        assert self.get(test_client, history, "borrowing-history",
+                        start_date="2024-01-04", end_date="2024-01-02").status_code == 400
+        assert self.get(test_client, history, "borrowing-history", cursor="not-a-cursor").status_code == 400
+        response = test_client.get("/api/users/999999/borrowing-history", headers=history["headers"])
+        assert response.status_code == 404
+
+    @pytest.mark.borrowing
+    def test_checked_out_pages_by_due_date(self, test_client, history):
+        """
+        Test that only open loans are listed, soonest due first, across pages.
+        """
+        response = self.get(test_client, history, "checked-out-books", limit=2)
+        assert response.status_code == 200, response.json
+        first_page = response.json
+        response = self.get(test_client, history, "checked-out-books", limit=2, cursor=first_page["next_cursor"])
+        assert response.json["next_cursor"] is None
+        items = first_page["checked_out_books"] + response.json["checked_out_books"]
+        logging.info(f"Test Checked Out Pages - Output: {items}")
+        # Later checkouts were lent for shorter periods, so they are due first
+        assert [item["checkout_date"] for item in items] == ["2024-01-07", "2024-01-06", "2024-01-05"]
+        assert all(item["book_title"] == "History Book" for item in items)
+
+    @pytest.mark.borrowing
+    def test_history_export(self, test_client, history):
+        """
+        Test the streamed CSV and NDJSON exports, read in chunks smaller than the history.
+        """
+        import csv
+        import io
+        import json
+        from flask import current_app
+
+        chunk_size = current_app.config['EXPORT_CHUNK_SIZE']
+        current_app.config['EXPORT_CHUNK_SIZE'] = 2
+        try:
+            response = self.get(test_client, history, "borrowing-history/export")
+            assert response.status_code == 200
+            assert response.mimetype == "text/csv"
+            assert "attachment" in response.headers["Content-Disposition"]
+            rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+            assert [row["checkout_date"] for row in rows] == [f"2024-01-0{day}" for day in range(7, 0, -1)]
+            assert rows[0]["return_date"] == "" and rows[-1]["return_date"] == "2024-01-04"
+
+            response = self.get(test_client, history, "borrowing-history/export", format="ndjson", end_date="2024-01-02")
+            assert response.mimetype == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            assert [line["checkout_date"] for line in lines] == ["2024-01-02", "2024-01-01"]
+        finally:
+            current_app.config['EXPORT_CHUNK_SIZE'] = chunk_size
+
+        assert self.get(test_client, history, "borrowing-history/export", format="xml").status_code == 400
+
+    @pytest.mark.borrowing
+    def test_history_export_of_other_user_forbidden(self, test_client, history):
+        """
+        Test that a member cannot export another user's history.
+        """
+        response = test_client.get(f"/api/users/{history['user_id'] + 1}/borrowing-history/export",
+                                   headers=history["headers"])
+        logging.info(f"Test History Export Other User - Output: {response.json}")
+        assert response.status_code == 403
+
+
+class TestDashboardSummary:
+    """
+    Test cases for the aggregated librarian dashboard figures.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def librarian_headers(self, test_client):
+        """
+        Class-level setup for TestDashboardSummary.
+        Registers and logs in a librarian.
+        """
+        response = test_client.post('/auth/register', json={
+            "name": "Dashboard Librarian",
+            "email": "dashboard_librarian@library.com",
+            "password": "password123",
+            "role": "Librarian"
+        })
+        assert response.status_code == 201, "Failed to register dashboard librarian"
+        login_response = test_client.post('/auth/login', json={
+            "email": "dashboard_librarian@library.com",
+            "password": "password123"
+        })
+        assert login_response.status_code == 200, "Failed to log in dashboard librarian"
+        return {"Authorization": f"Bearer {login_response.json['access_token']}"}
+
+    @staticmethod
+    def expected_summary():
+        from app.models.User import User
+        from app.models.Book import Book
+        from app.models.BookCopy import BookCopy
+        from app.models.Reservation import Reservation
+        from app.models.Transaction import Transaction
+
+        open_loans = Transaction.query.filter(Transaction.return_date.is_(None))
+        return {
+            "total_titles": Book.query.count(),
+            "total_copies": BookCopy.query.count(),
+            "available_copies": BookCopy.query.filter_by(is_available=True).count(),
+            "active_loans": open_loans.count(),
+            "overdue_loans": open_loans.filter(Transaction.due_date < datetime.utcnow()).count(),
+            "pending_reservations": Reservation.query.filter_by(status='Pending').count(),
+            "registered_members": User.query.filter_by(role='Member').count(),
+        }
+
+    @pytest.mark.borrowing
+    def test_summary_matches_counts_in_one_query(self, test_client, librarian_headers):
+        """
+        Test that every figure matches a direct count and all of them come from one statement.
+        """
+        from flask import current_app
+
+        current_app.extensions['dashboard_summary'].clear()
+        with capture_statements() as statements:
+            response = test_client.get('/api/dashboard/summary', headers=librarian_headers)
+        assert response.status_code == 200, response.json
+        logging.info(f"Test Dashboard Summary - Output: {response.json}")
+        assert len(statements) == 1, statements
+
+        summary = dict(response.json)
+        assert summary.pop("generated_at")
+        assert summary == self.expected_summary()
+
+    @pytest.mark.borrowing
+    def test_summary_is_cached_briefly(self, test_client, librarian_headers, monkeypatch):
+        """
+        Test that the figures are served from the cache until it expires.
+        """
+        from flask import current_app
+        from app.services.book_management_service import add_book_service
+
+        cache = current_app.extensions['dashboard_summary']
+        cache.clear()
+        first = test_client.get('/api/dashboard/summary', headers=librarian_headers).json
+        add_book_service({"title": "Dashboard Book", "author": "Dashboard Author",
+                          "subject_category": "Statistics", "publication_date": "2001-01-01"})
+
+        with capture_statements() as statements:
+            cached = test_client.get('/api/dashboard/summary', headers=librarian_headers).json
+        assert statements == []
+        assert cached == first
+
+        # Once the TTL has passed the figures are counted again
+        import time
+        monotonic = time.monotonic
+        monkeypatch.setattr(time, 'monotonic', lambda: monotonic() + cache.ttl + 1)
+        fresh = test_client.get('/api/dashboard/summary', headers=librarian_headers).json
+        assert fresh["total_titles"] == first["total_titles"] + 1
+
+    @pytest.mark.borrowing
+    def test_summary_requires_librarian(self, test_client):
+        """
+        Test that members cannot read the dashboard figures.
+        """
+        test_client.post('/auth/register', json={"name": "Dashboard Member", "email": "dashboard_member@example.com",
+                                                 "password": "password123", "role": "Member"})
+        login_response = test_client.post('/auth/login', json={"email": "dashboard_member@example.com",
+                                                                "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+        assert test_client.get('/api/dashboard/summary', headers=headers).status_code == 403
@@ -134,4 +134,478 @@ class TestSearchBooks:
         response = test_client.get('/api/search/books?title=Nonexistent Book')
         logging.info(f"Search with No Results - Output: {response.json}")
         assert response.status_code == 200
-        assert len(response.json['books']) == 0
\ No newline at end of file
+        assert len(response.json['books']) == 0
+
+    @pytest.mark.search
+    def test_search_pagination(self, test_client):
+        """
+        Test paging through ranked search results with limit and cursor.
+        """
+        first_page = test_client.get('/api/search/books?subject_category=Fiction&limit=1')
+        logging.info(f"Search Pagination First Page - Output: {first_page.json}")
+        assert first_page.status_code == 200
+        assert len(first_page.json['books']) == 1
+        assert first_page.json['next_cursor']
+
+        cursor = first_page.json['next_cursor']
+        second_page = test_client.get(f'/api/search/books?subject_category=Fiction&limit=1&cursor={cursor}')
+        logging.info(f"Search Pagination Second Page - Output: {second_page.json}")
+        assert second_page.status_code == 200
+        assert len(second_page.json['books']) == 1
+        assert second_page.json['next_cursor'] is None
+        assert second_page.json['books'][0]['id'] != first_page.json['books'][0]['id']
+
+    @pytest.mark.search
+    def test_search_by_title_prefix(self, test_client):
+        """
+        Test searching books by the beginning of a word in the title.
+        """
+        response = test_client.get('/api/search/books?title=Mocking')
+        logging.info(f"Search by Title Prefix - Output: {response.json}")
+        assert response.status_code == 200
+        assert len(response.json['books']) == 1
+        assert response.json['books'][0]['title'] == "To Kill a Mockingbird"
+
+    @pytest.mark.search
+    def test_search_index_follows_book_updates(self, test_client):
+        """
+        Test that the search index reflects renamed and deleted books.
+        """
+        from app.services.book_management_service import add_book_service, modify_book_service, delete_book_service
+
+        response = add_book_service({
+            "title": "Indexed Draft",
+            "author": "Index Author",
+            "subject_category": "Testing",
+            "publication_date": "2001-01-01"
+        })
+        assert response[1] == 201
+        barcode = response[0]['barcode']
+
+        assert modify_book_service(barcode, {"title": "Indexed Final"})[1] == 200
+        assert len(test_client.get('/api/search/books?title=Draft').json['books']) == 0
+        assert len(test_client.get('/api/search/books?title=Final').json['books']) == 1
+
+        assert delete_book_service(barcode)[1] == 200
+        assert len(test_client.get('/api/search/books?title=Final').json['books']) == 0
+
+    @pytest.mark.search
+    def test_search_without_full_text_index(self, test_client, monkeypatch):
+        """
+        Test that searching falls back to substring filters when FTS5 is unavailable.
+        """
+        monkeypatch.setattr('app.services.search_service.fts_enabled', lambda: False)
+        response = test_client.get('/api/search/books?title=ockingbir')
+        logging.info(f"Search Without Full Text Index - Output: {response.json}")
+        assert response.status_code == 200
+        assert len(response.json['books']) == 1
+        assert response.json['books'][0]['title'] == "To Kill a Mockingbird"
+
+
+class TestSearchCache:
+    """
+    Test cases for the search result cache and its invalidation.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_headers(self, test_client):
+        """
+        Class-level setup for TestSearchCache.
+        Registers and logs in a librarian and a member, and adds a book with one copy.
+        """
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+
+        headers = {}
+        for name, role in (("librarian", "Librarian"), ("member", "Member")):
+            email = f"cache_{name}@library.com"
+            register_response = test_client.post('/auth/register', json={
+                "name": f"Cache {name.title()}",
+                "email": email,
+                "password": "password123",
+                "role": role
+            })
+            assert register_response.status_code == 201, f"Failed to register {email}"
+            login_response = test_client.post('/auth/login', json={"email": email, "password": "password123"})
+            assert login_response.status_code == 200, f"Failed to log in as {email}"
+            headers[name] = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+
+        barcode = add_book_service({"title": "Cached Almanac", "author": "Cache Author",
+                                    "subject_category": "Caching", "publication_date": "2012-12-12"})[0]['barcode']
+        create_book_copy_service(barcode, {"rack_location": "K1"})
+        logging.info("Book added successfully for TestSearchCache.")
+        return {"headers": headers, "barcode": barcode}
+
+    def stats(self, test_client, setup_headers):
+        response = test_client.get('/api/search/cache-stats', headers=setup_headers["headers"]["librarian"])
+        assert response.status_code == 200
+        return response.json
+
+    @pytest.mark.search
+    def test_repeated_search_is_served_from_cache(self, test_client, setup_headers):
+        """
+        Test that near-identical queries share an entry and a hit runs no search SQL
+        (only the catalog version lookup behind the ETag).
+        """
+        from sqlalchemy import event
+        from app import db
+
+        before = self.stats(test_client, setup_headers)
+        first = test_client.get('/api/search/books?title=Cached%20Almanac')
+        assert first.status_code == 200 and len(first.json['books']) == 1
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            second = test_client.get('/api/search/books?title=%20cached%20%20ALMANAC')
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        after = self.stats(test_client, setup_headers)
+        logging.info(f"Test Search Cache Hit - Output: {after}")
+        assert second.json == first.json
+        assert len(statements) == 1 and "catalog_version" in statements[0]
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"] + 1
+
+    @pytest.mark.search
+    def test_catalog_writes_invalidate_cache(self, test_client, setup_headers):
+        """
+        Test that book edits and copy availability changes are visible on the next search.
+        """
+        from app.services.book_management_service import modify_book_service, modify_book_copy_service, \
+            get_book_copies_service
+
+        barcode = setup_headers["barcode"]
+        assert test_client.get('/api/search/books?title=Almanac').json['books'][0]['available_copies'] == 1
+
+        copy_id = get_book_copies_service(barcode)[0]['book_copies'][0]['id']
+        assert modify_book_copy_service(barcode, copy_id, {"is_available": False})[1] == 200
+        assert test_client.get('/api/search/books?title=Almanac').json['books'][0]['available_copies'] == 0
+
+        generation = self.stats(test_client, setup_headers)["generation"]
+        assert modify_book_service(barcode, {"title": "Cached Yearbook"})[1] == 200
+        assert self.stats(test_client, setup_headers)["generation"] > generation
+        assert test_client.get('/api/search/books?title=Almanac').json['books'] == []
+        assert len(test_client.get('/api/search/books?title=Yearbook').json['books']) == 1
+
+    @pytest.mark.search
+    def test_cache_bounds(self, test_client):
+        """
+        Test LRU eviction by size, expiry by age, and that results of an older generation are not stored.
+        """
+        from app.services.search_cache import SearchCache
+
+        cache = SearchCache(max_bytes=100, ttl=60)
+        cache.put((0, "a"), {"books": []}, 40)
+        cache.put((0, "b"), {"books": []}, 40)
+        assert cache.get((0, "a")) is not None  # "a" becomes most recently used
+        cache.put((0, "c"), {"books": []}, 40)
+        assert cache.get((0, "b")) is None
+        assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 80
+
+        cache.put((0, "huge"), {"books": []}, 101)
+        assert cache.get((0, "huge")) is None
+
+        cache.bump_generation()
+        cache.put((0, "stale"), {"books": []}, 10)
+        assert cache.stats()["entries"] == 0
+
+        expiring = SearchCache(max_bytes=100, ttl=0)
+        expiring.put((0, "a"), {"books": []}, 10)
+        assert expiring.get((0, "a")) is None
+        assert expiring.stats()["expirations"] == 1
+
+    @pytest.mark.search
+    def test_cache_stats_require_librarian(self, test_client, setup_headers):
+        """
+        Test that the cache statistics endpoint is restricted to librarians.
+        """
+        response = test_client.get('/api/search/cache-stats', headers=setup_headers["headers"]["member"])
+        assert response.status_code == 403
+
+
+class TestSearchSuggest:
+    """
+    Test cases for the typeahead suggestions endpoint.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_books(self, test_client):
+        """
+        Class-level setup for TestSearchSuggest.
+        Registers a member and adds two books with one copy each.
+        """
+        from app.models.User import User
+        from app.services.book_management_service import add_book_service, create_book_copy_service
+
+        register_response = test_client.post('/auth/register', json={
+            "name": "Suggest Member",
+            "email": "suggest_member@library.com",
+            "password": "password123",
+            "role": "Member"
+        })
+        assert register_response.status_code == 201, "Failed to register member"
+
+        barcodes = {}
+        for title, author in (("Quokka Quest", "Quentin Quarry"), ("Quokka Quilt", "Quinn Quill")):
+            barcodes[title] = add_book_service({"title": title, "author": author, "subject_category": "Suggest",
+                                                "publication_date": "2001-01-01"})[0]['barcode']
+            create_book_copy_service(barcodes[title], {"rack_location": "Q1"})
+        logging.info("Books added successfully for TestSearchSuggest.")
+        member = User.query.filter_by(email="suggest_member@library.com").first()
+        return {"barcodes": barcodes, "member_barcode": member.barcode}
+
+    @staticmethod
+    def suggest(test_client, query, **params):
+        response = test_client.get('/api/search/suggest', query_string={"q": query, **params})
+        assert response.status_code == 200
+        return [(suggestion["text"], suggestion["type"]) for suggestion in response.json['suggestions']]
+
+    @pytest.mark.search
+    def test_suggest_by_word_prefix(self, test_client):
+        """
+        Test that every word typed is matched as a word prefix, ignoring case and accents.
+        """
+        suggestions = self.suggest(test_client, "quo")
+        assert ("Quokka Quest", "title") in suggestions and ("Quokka Quilt", "title") in suggestions
+        assert set(self.suggest(test_client, "QUÍL qu")) == {("Quokka Quilt", "title"), ("Quinn Quill", "author")}
+        assert self.suggest(test_client, "quarry") == [("Quentin Quarry", "author")]
+        assert self.suggest(test_client, "quokkaz") == []
+        assert self.suggest(test_client, "  ") == []
+
+    @pytest.mark.search
+    def test_suggest_ranked_by_loans(self, test_client, setup_books):
+        """
+        Test that a committed loan moves the borrowed book ahead of equally matching ones.
+        """
+        from app.services.borrow_service import issue_book_service
+
+        assert self.suggest(test_client, "quokka")[0] == ("Quokka Quest", "title")  # shorter text wins a tie
+        issued = issue_book_service(setup_books["member_barcode"], setup_books["barcodes"]["Quokka Quilt"])
+        assert issued[1] == 201, issued
+        assert self.suggest(test_client, "quokka")[0] == ("Quokka Quilt", "title")
+        # The loan also counts for the author
+        assert set(self.suggest(test_client, "qui")[:2]) == {("Quokka Quilt", "title"), ("Quinn Quill", "author")}
+
+    @pytest.mark.search
+    def test_suggest_follows_catalog_writes(self, test_client, setup_books):
+        """
+        Test that renamed and deleted books are reflected without rebuilding the index.
+        """
+        from app.services.book_management_service import add_book_service, modify_book_service, delete_book_service
+
+        self.suggest(test_client, "quokka")  # make sure the index is built and the query cached
+        assert modify_book_service(setup_books["barcodes"]["Quokka Quest"], {"title": "Wombat Quest"})[1] == 200
+        assert ("Quokka Quest", "title") not in self.suggest(test_client, "quokka")
+        assert self.suggest(test_client, "womb") == [("Wombat Quest", "title")]
+
+        barcode = add_book_service({"title": "Quokka Quarterly", "author": "Quinn Quill",
+                                    "subject_category": "Suggest", "publication_date": "2002-02-02"})[0]['barcode']
+        assert ("Quokka Quarterly", "title") in self.suggest(test_client, "quokka")
+        assert delete_book_service(barcode)[1] == 200
+        assert ("Quokka Quarterly", "title") not in self.suggest(test_client, "quokka")
+        # The author still has another book
+        assert ("Quinn Quill", "author") in self.suggest(test_client, "quinn")
+
+    @pytest.mark.search
+    def test_suggest_limit(self, test_client):
+        """
+        Test that limit caps the number of suggestions and must be positive.
+        """
+        assert len(self.suggest(test_client, "qu", limit=1)) == 1
+        assert test_client.get('/api/search/suggest?q=qu&limit=0').status_code == 400
+
+
+class TestFuzzySearch:
+    """
+    Test cases for typo-tolerant (fuzzy=1) search.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_books(self, test_client):
+        """
+        Class-level setup for TestFuzzySearch.
+        Adds three books, two of them by the same author.
+        """
+        from app.services.book_management_service import add_book_service
+
+        barcodes = {}
+        for title, author, category in (("Pride and Prejudice", "Jane Austen", "Romance"),
+                                        ("Persuasion", "Jane Austen", "Romance"),
+                                        ("The Hobbit", "J. R. R. Tolkien", "Fantasy")):
+            barcodes[title] = add_book_service({"title": title, "author": author, "subject_category": category,
+                                                "publication_date": "1937-09-21"})[0]['barcode']
+        logging.info("Books added successfully for TestFuzzySearch.")
+        return barcodes
+
+    @staticmethod
+    def search(test_client, **params):
+        response = test_client.get('/api/search/books', query_string=params)
+        assert response.status_code == 200
+        return response.json
+
+    @pytest.mark.search
+    def test_fuzzy_search_tolerates_misspellings(self, test_client):
+        """
+        Test that a misspelled author only matches in fuzzy mode, with a similarity score.
+        """
+        assert self.search(test_client, author="Tolkein")['books'] == []
+        books = self.search(test_client, author="Tolkein", fuzzy=1)['books']
+        assert [book['title'] for book in books] == ["The Hobbit"]
+        assert 0.3 <= books[0]['similarity'] < 1
+
+    @pytest.mark.search
+    def test_fuzzy_search_ranks_by_similarity(self, test_client):
+        """
+        Test that every searched field has to match and the closest books come first.
+        """
+        books = self.search(test_client, author="Jane Austin", title="Prejudise", fuzzy=1)['books']
+        assert [book['title'] for book in books] == ["Pride and Prejudice"]
+
+        books = self.search(test_client, author="Jane Austin", fuzzy=1)['books']
+        assert {book['title'] for book in books} == {"Pride and Prejudice", "Persuasion"}
+        assert books[0]['similarity'] < 1
+        assert {book['similarity'] for book in self.search(test_client, author="Jane Austen", fuzzy=1)['books']} == {1}
+
+        assert self.search(test_client, author="Austin", subject_category="Fantasy", fuzzy=1)['books'] == []
+
+    @pytest.mark.search
+    def test_fuzzy_search_pagination(self, test_client):
+        """
+        Test that fuzzy results page with the (similarity, id) cursor without repeats.
+        """
+        first = self.search(test_client, author="Jane Austin", fuzzy=1, limit=1)
+        assert len(first['books']) == 1 and first['next_cursor']
+        second = self.search(test_client, author="Jane Austin", fuzzy=1, limit=1, cursor=first['next_cursor'])
+        assert len(second['books']) == 1
+        assert {first['books'][0]['title'], second['books'][0]['title']} == {"Pride and Prejudice", "Persuasion"}
+        assert test_client.get('/api/search/books?author=Austin&fuzzy=1&cursor=bad').status_code == 400
+
+    @pytest.mark.search
+    def test_fuzzy_index_follows_book_updates(self, test_client, setup_books):
+        """
+        Test that edited and deleted books are reflected without rebuilding the index.
+        """
+        from app.services.book_management_service import modify_book_service, delete_book_service
+
+        self.search(test_client, title="Hobit", fuzzy=1)  # make sure the index is built
+        assert modify_book_service(setup_books["The Hobbit"], {"title": "The Silmarillion"})[1] == 200
+        assert self.search(test_client, title="Hobit", fuzzy=1)['books'] == []
+        assert [book['title'] for book in self.search(test_client, title="Silmarilion", fuzzy=1)['books']] \
+            == ["The Silmarillion"]
+
+        assert delete_book_service(setup_books["The Hobbit"])[1] == 200
+        assert self.search(test_client, title="Silmarilion", fuzzy=1)['books'] == []
+
+    @pytest.mark.search
+    def test_stale_index_is_rebuilt_in_the_background(self, test_client, monkeypatch):
+        """
+        Test that an index due for a rebuild keeps answering from its current contents until the rebuild swaps in.
+        """
+        import threading
+        from flask import current_app
+        from app.services.fuzzy_service import FuzzyIndex
+
+        index = current_app.extensions['fuzzy_index']
+        self.search(test_client, author="Jane Austin", fuzzy=1)  # make sure the index is built
+        release = threading.Event()
+        load = FuzzyIndex.load
+
+        def slow_load(target, books):
+            release.wait(5)
+            load(target, books)
+
+        monkeypatch.setattr(FuzzyIndex, 'load', slow_load)
+        index.built_at = None  # As after a bulk import
+        books = self.search(test_client, title="Prejudise", fuzzy=1)['books']  # not in the search cache
+        assert [book['title'] for book in books] == ["Pride and Prejudice"]
+        builder = next(thread for thread in threading.enumerate() if thread.name == 'FuzzyIndex-build')
+        assert index.built_at is None
+
+        release.set()
+        builder.join(5)
+        assert index.built_at is not None
+
+
+class TestSearchFacets:
+    """
+    Test cases for facet counts and multi-valued facet filters.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_books(self, test_client):
+        """
+        Class-level setup for TestSearchFacets.
+        Adds four books titled "Facetbook ..." across two categories, two authors and two decades.
+        """
+        from app.services.book_management_service import add_book_service
+
+        for title, author, category, published in (("Facetbook One", "Ada Facet", "Poetry", "1951-01-01"),
+                                                   ("Facetbook Two", "Ada Facet", "Poetry", "1958-06-30"),
+                                                   ("Facetbook Three", "Ada Facet", "Drama", "1962-03-03"),
+                                                   ("Facetbook Four", "Bo Facet", "Drama", "1969-12-31")):
+            response = add_book_service({"title": title, "author": author, "subject_category": category,
+                                         "publication_date": published})
+            assert response[1] == 201, response
+        logging.info("Books added successfully for TestSearchFacets.")
+
+    @staticmethod
+    def search(test_client, query_string):
+        response = test_client.get(f'/api/search/books?title=Facetbook&{query_string}')
+        assert response.status_code == 200
+        return response.json
+
+    @pytest.mark.search
+    def test_facet_counts(self, test_client):
+        """
+        Test the counts per category, author and decade, most frequent first.
+        """
+        data = self.search(test_client, "facets=1")
+        assert len(data['books']) == 4
+        assert data['facets'] == {
+            "subject_category": [{"value": "Drama", "count": 2}, {"value": "Poetry", "count": 2}],
+            "author": [{"value": "Ada Facet", "count": 3}, {"value": "Bo Facet", "count": 1}],
+            "decade": [{"value": 1950, "count": 2}, {"value": 1960, "count": 2}],
+        }
+        assert 'facets' not in self.search(test_client, "")
+
+    @pytest.mark.search
+    def test_multi_valued_facet_filters(self, test_client):
+        """
+        Test that values of one facet are ORed, facets are ANDed, and each facet is
+        counted without its own selection.
+        """
+        data = self.search(test_client, "facets=1&facet_decade=1960&facet_author=Ada+Facet")
+        assert [book['title'] for book in data['books']] == ["Facetbook Three"]
+        # Decades are counted for Ada Facet only, authors for the 1960s only
+        assert data['facets']['decade'] == [{"value": 1950, "count": 2}, {"value": 1960, "count": 1}]
+        assert data['facets']['author'] == [{"value": "Ada Facet", "count": 1}, {"value": "Bo Facet", "count": 1}]
+
+        data = self.search(test_client, "facet_author=Ada+Facet&facet_author=Bo+Facet&facet_subject_category=Drama")
+        assert {book['title'] for book in data['books']} == {"Facetbook Three", "Facetbook Four"}
+
+    @pytest.mark.search
+    def test_facet_filters_share_cache_entries(self):
+        """
+        Test that the order and repeats of facet values do not change the cache key.
+        """
+        from app.services.search_cache import normalize_search_params
+
+        assert normalize_search_params({"facet_author": ["Bo Facet", "Ada Facet", "Bo Facet"]}) == \
+            normalize_search_params({"facet_author": ["Ada Facet", " Bo Facet"]}) == \
+            (("facet_author", ("Ada Facet", "Bo Facet")),)
+        assert normalize_search_params({"facet_author": []}) == ()
+
+    @pytest.mark.search
+    def test_invalid_decade(self, test_client):
+        """
+        Test that a decade must be a year divisible by 10.
+        """
+        for decade in ("1955", "sixties"):
+            response = test_client.get(f'/api/search/books?facet_decade={decade}')
+            assert response.status_code == 400
+            assert response.json['error'] == "facet_decade must be a year such as 1990"
@@ -52,9 +52,10 @@ class TestGetUsers:
         response = test_client.get('/api/users')
         logging.info(f"Test Get All Users - Output: {response.json}")
         assert response.status_code == 200
-        assert len(response.json) >= 3, f"Expected at least 3 users, got {len(response.json)}"
-        assert any(user['role'] == 'Member' for user in response.json), "No Member found in users"
-        assert any(user['role'] == 'Librarian' for user in response.json), "No Librarian found in users"
+        users = response.json['users']
+        assert len(users) >= 3, f"Expected at least 3 users, got {len(users)}"
+        assert any(user['role'] == 'Member' for user in users), "No Member found in users"
+        assert any(user['role'] == 'Librarian' for user in users), "No Librarian found in users"
 
     @pytest.mark.user_management
     def test_get_user_by_barcode(self, test_client):
@@ -64,7 +65,7 @@ class TestGetUsers:
         # Fetch all users to get a valid barcode
         all_users_response = test_client.get('/api/users')
         assert all_users_response.status_code == 200, "Failed to fetch all users"
-        barcode = all_users_response.json[0]['barcode']  # Use the first user's barcode
+        barcode = all_users_response.json['users'][0]['barcode']  # Use the first user's barcode
 
         # Fetch the user by barcode
         response = test_client.get(f'/api/users/barcode/{barcode}')
@@ -83,6 +84,55 @@ class TestGetUsers:
         assert response.status_code == 404
         assert "User not found" in response.json['error']
 
+    @pytest.mark.user_management
+    def test_search_users(self, test_client):
+        """
+        Test searching users by name or email prefix (any case) and by exact barcode.
+        """
+        for name, email in (("Quentin Searchable", "qs@example.com"), ("quinn Searchable", "quinn@example.com"),
+                            ("Other Person", "QUENTIN.other@example.com")):
+            test_client.post('/auth/register', json={"name": name, "email": email,
+                                                     "password": "password123", "role": "Member"})
+
+        def names(q):
+            response = test_client.get('/api/users', query_string={"q": q})
+            assert response.status_code == 200
+            return [user['name'] for user in response.json['users']]
+
+        logging.info(f"Test Search Users - Output: {names('Quentin')}")
+        assert names("Quentin") == ["Quentin Searchable", "Other Person"]
+        assert names("  qUI ") == ["quinn Searchable"]
+        assert names("quinn@") == ["quinn Searchable"]
+        assert names("Searchable") == []  # prefixes only
+
+        barcode = test_client.get('/api/users', query_string={"q": "qs@"}).json['users'][0]['barcode']
+        response = test_client.get('/api/users', query_string={"q": barcode})
+        assert [user['email'] for user in response.json['users']] == ["qs@example.com"]
+        # A barcode is matched in full, not by prefix
+        assert test_client.get('/api/users', query_string={"q": barcode[:-1]}).json['users'] == []
+
+    @pytest.mark.user_management
+    def test_users_pagination(self, test_client):
+        """
+        Test that following next_cursor visits every user exactly once.
+        """
+        total = len(test_client.get('/api/users?limit=200').json['users'])
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = test_client.get('/api/users', query_string=params)
+            assert response.status_code == 200
+            assert len(response.json['users']) <= 2
+            seen.extend(user['barcode'] for user in response.json['users'])
+            cursor = response.json['next_cursor']
+            if not cursor:
+                break
+
+        assert len(seen) == len(set(seen)) == total
+        assert test_client.get('/api/users?cursor=not-a-cursor').status_code == 400
+        assert test_client.get('/api/users?limit=0').status_code == 400
+
 
 class TestDeleteUsers:
     """
@@ -97,7 +147,7 @@ class TestDeleteUsers:
         # Fetch all users to get a valid member barcode
         all_users_response = test_client.get('/api/users')
         assert all_users_response.status_code == 200, "Failed to fetch all users"
-        member = next(user for user in all_users_response.json if user['role'] == 'Member')
+        member = next(user for user in all_users_response.json['users'] if user['role'] == 'Member')
         barcode = member['barcode']
 
         # Delete the member by barcode
@@ -118,7 +168,7 @@ class TestDeleteUsers:
         # Fetch all users to get a valid librarian barcode
         all_users_response = test_client.get('/api/users')
         assert all_users_response.status_code == 200, "Failed to fetch all users"
-        librarian = next(user for user in all_users_response.json if user['role'] == 'Librarian')
+        librarian = next(user for user in all_users_response.json['users'] if user['role'] == 'Librarian')
         barcode = librarian['barcode']
 
         # Attempt to delete the librarian
@@ -139,25 +189,318 @@ class TestDeleteUsers:
         assert "User not found" in response.json['error']
 
 
-# Skipped for now as it needs a user with notifications
-# class TestUserNotifications:
-#     """
-#     Test cases for user notifications.
-#     """
-# 
-#     @pytest.mark.user_management
-#     def test_get_user_notifications(self, test_client):
-#         """
-#         Test fetching notifications for a specific user using their barcode.
-#         """
-#         # Fetch all users to get a valid barcode
-#         all_users_response = test_client.get('/api/users')
-#         assert all_users_response.status_code == 200, "Failed to fetch all users"
-#         user = all_users_response.json[0]
-#         barcode = user['barcode']  # Use the user's barcode
-# 
-#         # Fetch notifications for the user using their barcode
-#         response = test_client.get(f'/api/users/barcode/{barcode}/notifications')
-#         logging.info(f"Test Get User Notifications - Output: {response.json}")
-#         assert response.status_code == 200
-#         assert isinstance(response.json, list), "Notifications should be a list"
\ No newline at end of file
+class TestUserNotifications:
+    """
+    Test cases for user notifications.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def notified_user(self, test_client):
+        """
+        Class-level setup for TestUserNotifications.
+        Logs in as a member and sends them five notifications.
+        """
+        from app import db
+        from app.models.User import User
+
+        login_response = test_client.post('/auth/login', json={
+            "email": "member2@example.com",
+            "password": "password123"
+        })
+        assert login_response.status_code == 200, "Failed to log in as Member"
+        headers = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+
+        user = User.query.filter_by(email="member2@example.com").first()
+        user.add_notification("First", "First body")
+        User.add_notifications_bulk([(user.id, f"Bulk {i}", f"Bulk body {i}", "Bulk Book") for i in range(4)])
+        db.session.commit()
+
+        # Another member, and a librarian, to check who may see these notifications
+        test_client.post('/auth/register', json={"name": "Other Member", "email": "notify_other@example.com",
+                                                 "password": "password123", "role": "Member"})
+        tokens = {}
+        for name, email in (("other", "notify_other@example.com"), ("librarian", "librarian1@library.com")):
+            response = test_client.post('/auth/login', json={"email": email, "password": "password123"})
+            assert response.status_code == 200, f"Failed to log in as {email}"
+            tokens[name] = {"Authorization": f"Bearer {response.json['access_token']}"}
+
+        return {"headers": headers, "barcode": user.barcode,
+                "other_headers": tokens["other"], "librarian_headers": tokens["librarian"]}
+
+    @pytest.mark.user_management
+    def test_get_user_notifications(self, test_client, notified_user):
+        """
+        Test paging through a user's notifications, newest first.
+        """
+        barcode = notified_user["barcode"]
+        response = test_client.get(f'/api/users/{barcode}/notifications?limit=3', headers=notified_user["headers"])
+        logging.info(f"Test Get User Notifications - Output: {response.json}")
+        assert response.status_code == 200
+        assert response.json["unread_count"] == 5
+        assert len(response.json["notifications"]) == 3
+        assert response.json["next_cursor"]
+
+        second = test_client.get(f'/api/users/{barcode}/notifications?limit=3&cursor={response.json["next_cursor"]}',
+                                 headers=notified_user["headers"])
+        assert second.status_code == 200
+        assert second.json["next_cursor"] is None
+        subjects = [n["subject"] for n in response.json["notifications"] + second.json["notifications"]]
+        assert subjects == ["Bulk 3", "Bulk 2", "Bulk 1", "Bulk 0", "First"]
+
+    @pytest.mark.user_management
+    def test_mark_notifications_read(self, test_client, notified_user):
+        """
+        Test marking some, then all, notifications as read.
+        """
+        barcode = notified_user["barcode"]
+        page = test_client.get(f'/api/users/{barcode}/notifications', headers=notified_user["headers"]).json
+        first_two = [n["id"] for n in page["notifications"][:2]]
+
+        response = test_client.post(f'/api/users/{barcode}/notifications/read', json={"ids": first_two},
+                                    headers=notified_user["headers"])
+        logging.info(f"Test Mark Notifications Read - Output: {response.json}")
+        assert response.status_code == 200
+        assert response.json["updated"] == 2
+
+        unread = test_client.get(f'/api/users/{barcode}/notifications?unread=1', headers=notified_user["headers"]).json
+        assert unread["unread_count"] == 3
+        assert not {n["id"] for n in unread["notifications"]} & set(first_two)
+
+        response = test_client.post(f'/api/users/{barcode}/notifications/read', headers=notified_user["headers"])
+        assert response.status_code == 200
+        assert response.json["updated"] == 3
+
+    @pytest.mark.user_management
+    def test_get_notifications_unknown_user(self, test_client, notified_user):
+        """
+        Test fetching notifications for a barcode that does not exist.
+        """
+        response = test_client.get('/api/users/INVALID123/notifications', headers=notified_user["librarian_headers"])
+        assert response.status_code == 404
+        assert "User not found" in response.json['error']
+
+    @pytest.mark.user_management
+    def test_notifications_of_other_member_forbidden(self, test_client, notified_user):
+        """
+        Test that a member can neither read nor mark another member's notifications, while a librarian can read them.
+        """
+        barcode = notified_user["barcode"]
+        response = test_client.get(f'/api/users/{barcode}/notifications', headers=notified_user["other_headers"])
+        logging.info(f"Test Other Member Notifications - Output: {response.json}")
+        assert response.status_code == 403
+
+        response = test_client.post(f'/api/users/{barcode}/notifications/read', headers=notified_user["other_headers"])
+        assert response.status_code == 403
+
+        response = test_client.get(f'/api/users/{barcode}/notifications', headers=notified_user["librarian_headers"])
+        assert response.status_code == 200
+
+
+class TestUserImport:
+    """
+    Test cases for the bulk member import (upload endpoint and CLI).
+    """
+
+    @pytest.fixture(scope="class")
+    def librarian_headers(self, test_client):
+        """
+        Class-level setup for TestUserImport.
+        Registers and logs in the librarian who runs the imports.
+        """
+        librarian_data = {
+            "name": "Librarian Import",
+            "email": "librarian_import@library.com",
+            "password": "password123",
+            "role": "Librarian"
+        }
+        register_response = test_client.post('/auth/register', json=librarian_data)
+        assert register_response.status_code == 201, "Failed to register Librarian"
+
+        login_response = test_client.post('/auth/login', json={"email": "librarian_import@library.com",
+                                                                "password": "password123"})
+        assert login_response.status_code == 200, "Failed to log in as Librarian"
+        return {"Authorization": f"Bearer {login_response.json['access_token']}"}
+
+    @pytest.mark.user_management
+    def test_import_csv_upload(self, test_client, librarian_headers):
+        """
+        Test a CSV roster sent as the request body: new members registered, duplicates skipped, bad rows reported.
+        """
+        body = (
+            "name,email,password,role\n"
+            "Imported One,imported1@example.com,secret-one,\n"
+            "Imported Two,imported2@example.com,secret-two,Member\n"
+            "Member Two Again,member2@example.com,password123,Member\n"
+            "Imported Three,imported3@example.com,,Member\n"
+            "Imported Librarian,imported_librarian@example.com,secret,Librarian\n"
+            "Imported Staff,imported_staff@library.com,secret-staff,Librarian\n"
+            "Imported One Again,imported1@example.com,other,Member\n"
+        )
+        response = test_client.post('/api/users/import', data=body, content_type='text/csv',
+                                    headers=librarian_headers)
+        logging.info(f"Test Import Users - Output: {response.json}")
+        assert response.status_code == 201
+        assert {key: response.json[key] for key in ("records", "users", "duplicates", "rejected")} == \
+            {"records": 7, "users": 3, "duplicates": 2, "rejected": 2}
+        assert response.json['errors'] == [{"line": 5, "error": "Missing required fields: password"},
+                                           {"line": 6, "error": "Invalid email for Librarian role"}]
+
+        # Imported members get a barcode and a role, and log in with their own password
+        users = {user['email']: user for user in test_client.get('/api/users?q=imported').json['users']}
+        assert set(users) == {"imported1@example.com", "imported2@example.com", "imported_staff@library.com"}
+        assert users["imported1@example.com"]['role'] == "Member"
+        assert users["imported_staff@library.com"]['role'] == "Librarian"
+        assert len({user['barcode'] for user in users.values()}) == 3
+        login_response = test_client.post('/auth/login', json={"email": "imported1@example.com",
+                                                                "password": "secret-one"})
+        assert login_response.status_code == 200
+
+        # Importing the same roster again adds nobody
+        response = test_client.post('/api/users/import', data=body, content_type='text/csv',
+                                    headers=librarian_headers)
+        assert response.status_code == 200
+        assert response.json['users'] == 0 and response.json['duplicates'] == 5
+
+    @pytest.mark.user_management
+    def test_import_cli_with_hashing_pool(self, test_client, librarian_headers, tmp_path):
+        """
+        Test that `flask users import` hashes in worker processes, commits in chunks and reports progress.
+        """
+        from flask import current_app
+
+        path = tmp_path / "roster.csv"
+        path.write_text("name,email,password\n" + "".join(
+            f"Pooled {n},pooled{n}@example.com,pooled-secret-{n}\n" for n in range(1, 6)
+        ) + "Pooled Bad,not-an-email,secret\n")
+
+        chunk_size = current_app.config['USER_IMPORT_CHUNK_SIZE']
+        current_app.config['USER_IMPORT_CHUNK_SIZE'] = 2
+        try:
+            result = current_app.test_cli_runner().invoke(args=['users', 'import', str(path), '--workers', '2'])
+        finally:
+            current_app.config['USER_IMPORT_CHUNK_SIZE'] = chunk_size
+        logging.info(f"Test Import Users CLI - Output: {result.output}")
+        assert result.exit_code == 0, result.output
+        assert result.output.count("users imported...") == 3  # three chunks
+        assert "Line 7: Invalid email address" in result.output
+        assert "Imported 5 users from 6 records (0 duplicates skipped, 1 rejected)." in result.output
+
+        login_response = test_client.post('/auth/login', json={"email": "pooled5@example.com",
+                                                                "password": "pooled-secret-5"})
+        assert login_response.status_code == 200
+
+    @pytest.mark.user_management
+    def test_import_validation(self, test_client, librarian_headers):
+        """
+        Test that a roster without the required columns is rejected, and that members cannot import.
+        """
+        response = test_client.post('/api/users/import', data="name,email\nA,a@example.com\n",
+                                    headers=librarian_headers)
+        assert response.status_code == 400
+        assert response.json['error'] == "CSV header is missing: password"
+
+        login_response = test_client.post('/auth/login', json={"email": "member2@example.com",
+                                                                "password": "password123"})
+        headers = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+        assert test_client.post('/api/users/import', data="", headers=headers).status_code == 403
+
+
+class TestCurrentUser:
+    """
+    Test cases for the dashboard pages and /dashboard/get-current-user, answered from token claims and the user cache.
+    """
+
+    @pytest.fixture(scope="class")
+    def member_headers(self, test_client):
+        """
+        Registers and logs in the member whose token the pages are requested with.
+        """
+        member_data = {
+            "name": "Member Cached",
+            "email": "member_cached@example.com",
+            "password": "password123",
+            "role": "Member"
+        }
+        register_response = test_client.post('/auth/register', json=member_data)
+        assert register_response.status_code == 201, "Failed to register Member"
+
+        login_response = test_client.post('/auth/login', json={"email": "member_cached@example.com",
+                                                                "password": "password123"})
+        assert login_response.status_code == 200, "Failed to log in as Member"
+        return {"Authorization": f"Bearer {login_response.json['access_token']}"}
+
+    @staticmethod
+    def count_statements(request):
+        """
+        Run `request` and return its response with the number of SQL statements it executed.
+        """
+        from sqlalchemy import event
+        from app import db
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = request()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        return response, len(statements)
+
+    @pytest.mark.user_management
+    def test_dashboard_pages_use_token_role(self, test_client, member_headers, monkeypatch):
+        """
+        Test that the dashboard pages check the role claim without querying the database.
+        """
+        from flask import current_app
+        from app.services.user_cache import UserCache
+
+        # No user is looked up, so even a disabled user cache costs no query
+        monkeypatch.setitem(current_app.extensions, 'user_cache', UserCache(0, 1))
+        response, queries = self.count_statements(lambda: test_client.get('/dashboard/', headers=member_headers))
+        assert response.status_code == 302 and response.headers['Location'].endswith('/dashboard/member')
+        assert queries == 0
+
+        response, queries = self.count_statements(lambda: test_client.get('/dashboard/member', headers=member_headers))
+        assert response.status_code == 200
+        assert queries == 0
+
+        response = test_client.get('/dashboard/librarian', headers=member_headers)
+        assert response.status_code == 302 and response.headers['Location'].endswith('/login')
+
+        response = test_client.get('/dashboard', headers=member_headers)
+        assert response.status_code == 302 and response.headers['Location'].endswith('/dashboard/member')
+
+    @pytest.mark.user_management
+    def test_current_user_cached_until_deleted(self, test_client, member_headers):
+        """
+        Test that /dashboard/get-current-user is served from the user cache, and that deleting the user evicts it.
+        """
+        from flask import current_app
+
+        response, queries = self.count_statements(
+            lambda: test_client.get('/dashboard/get-current-user', headers=member_headers))
+        logging.info(f"Test Get Current User - Output: {response.json}")
+        assert response.status_code == 200
+        assert (response.json['name'], response.json['email'], response.json['role']) == \
+            ("Member Cached", "member_cached@example.com", "Member")
+        assert queries == 0  # cached by the login
+
+        # A cold cache reads the user once, then serves it again
+        current_app.extensions['user_cache'].clear()
+        _, queries = self.count_statements(
+            lambda: test_client.get('/dashboard/get-current-user', headers=member_headers))
+        assert queries == 1
+        _, queries = self.count_statements(
+            lambda: test_client.get('/dashboard/get-current-user', headers=member_headers))
+        assert queries == 0
+
+        # Deleting the user evicts it from the cache and revokes its tokens
+        barcode = response.json['barcode']
+        response = test_client.delete('/api/users', json={"barcode": barcode})
+        assert response.status_code == 200
+        assert current_app.extensions['user_cache'].get("member_cached@example.com", lambda email: None) is None
+        response = test_client.get('/dashboard/get-current-user', headers=member_headers)
+        assert response.status_code == 401  # the deleted user's tokens are revoked